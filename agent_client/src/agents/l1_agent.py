@@ -6,12 +6,15 @@ policy checks, optional L3 validation, and unsigned-plan handoff.
 """
 from __future__ import annotations
 
+import asyncio
 import os
 import re
 import threading
 import uuid
 from typing import Any, Dict, Optional, Tuple
 
+from ..config.settings import settings
+from ..llm.call_policy import LLMUnavailableError
 from ..llm.llm_planner import llm_planner  # type: ignore
 from ..models.schemas import (
     PlanRequest,
@@ -23,8 +26,12 @@ from ..models.schemas import (
     TxPlan,
     UnsignedTransaction,
 )
+from ..state.backend import CONFIG_NAMESPACE, get_state_backend
+from ..tools.speculative import SpeculativePrefetcher
 from ..tools.tool_coordinator import tool_coordinator
+from ..utils.executor import EventLoopLagMonitor, StageExecutor
 from ..utils.logger import logger
+from ..utils.rate_limit import RateLimitPolicy, RateLimiter
 from ..wallet.bridge import wallet_bridge
 from policy_engine import config as policy_cfg
 from policy_engine.engine import evaluate_policy
@@ -32,22 +39,58 @@ from policy_engine.l3_validator import validate_l3
 from policy_engine.rules import extract_request_signals
 
 
+DEFENSE_CONFIGS = ("bare", "l1", "l1l2", "l1l2l3")
+
 _defense_config: str = os.environ.get("DEFENSE_CONFIG", "l1l2")
 _defense_config_lock = threading.Lock()
 
 
+def validate_defense_config(config: str) -> str:
+    if config not in DEFENSE_CONFIGS:
+        raise ValueError(f"Invalid defense config '{config}', must be one of {DEFENSE_CONFIGS}")
+    return config
+
+
 def get_defense_config() -> str:
+    # With a shared state backend another worker may have switched the config.
+    backend = get_state_backend()
     with _defense_config_lock:
+        if backend.shared:
+            stored = backend.get(CONFIG_NAMESPACE, "defense_config")
+            if stored is not None:
+                return stored
+        return _defense_config
+
+
+def seed_defense_config() -> str:
+    """Make the deployed DEFENSE_CONFIG authoritative again at startup.
+
+    A shared backend outlives the process (the SQLite file persists), so without
+    this a config switched at runtime before a restart would silently override
+    the deployed setting.
+    """
+    backend = get_state_backend()
+    with _defense_config_lock:
+        if backend.shared:
+            stored = backend.get(CONFIG_NAMESPACE, "defense_config")
+            if stored is not None and stored != _defense_config:
+                logger.warning(
+                    "[Config] Stored defense config '%s' replaced by deployed DEFENSE_CONFIG '%s'",
+                    stored,
+                    _defense_config,
+                )
+            backend.set(CONFIG_NAMESPACE, "defense_config", _defense_config)
         return _defense_config
 
 
 def set_defense_config(config: str) -> None:
     global _defense_config
-    valid = ("bare", "l1", "l1l2", "l1l2l3")
-    if config not in valid:
-        raise ValueError(f"Invalid defense config '{config}', must be one of {valid}")
+    validate_defense_config(config)
+    backend = get_state_backend()
     with _defense_config_lock:
         _defense_config = config
+        if backend.shared:
+            backend.set(CONFIG_NAMESPACE, "defense_config", config)
     logger.info("[Config] Defense config set to: %s", config)
 
 
@@ -182,6 +225,37 @@ class OutputGuardrail:
 input_guardrail = InputGuardrail()
 output_guardrail = OutputGuardrail()
 
+stage_executor = StageExecutor(
+    mode=settings.OFFLOAD_MODE,
+    thread_workers=settings.OFFLOAD_THREAD_WORKERS,
+    process_workers=settings.OFFLOAD_PROCESS_WORKERS,
+)
+loop_lag_monitor = EventLoopLagMonitor(interval_ms=settings.EVENT_LOOP_LAG_INTERVAL_MS)
+rate_limiter = RateLimiter(
+    policies={
+        "session": RateLimitPolicy(settings.RATE_LIMIT_SESSION_BURST, settings.RATE_LIMIT_SESSION_PER_MINUTE),
+        "telegram_user": RateLimitPolicy(settings.RATE_LIMIT_USER_BURST, settings.RATE_LIMIT_USER_PER_MINUTE),
+    },
+    enabled=settings.RATE_LIMIT_ENABLED,
+    backend=settings.RATE_LIMIT_BACKEND,
+    max_keys=settings.RATE_LIMIT_MAX_KEYS,
+    idle_seconds=settings.RATE_LIMIT_IDLE_SECONDS,
+)
+speculative_prefetcher = SpeculativePrefetcher(
+    enabled=settings.SPECULATIVE_PREFETCH_ENABLED,
+    min_confidence=settings.SPECULATIVE_PREFETCH_MIN_CONFIDENCE,
+    fast_path_confidence=(
+        settings.INTENT_FAST_PATH_MIN_CONFIDENCE if settings.INTENT_FAST_PATH_ENABLED else None
+    ),
+)
+
+
+def screen_input(user_message: str, session_id: str) -> Tuple[bool, Optional[str], Dict[str, Any], str]:
+    """L1 input validation plus sanitization as one offloadable (picklable) job."""
+    is_valid, error_msg, metadata = input_guardrail.validate_input(user_message, session_id)
+    sanitized = input_guardrail.sanitize_input(user_message) if is_valid else user_message
+    return is_valid, error_msg, metadata, sanitized
+
 
 class L1Agent:
     """Primary coordinator for processing user requests."""
@@ -195,19 +269,43 @@ class L1Agent:
         "WBTC": 8,
     }
 
-    async def process_request(self, request: PlanRequest) -> PlanResponse:
+    async def process_request(self, request: PlanRequest, defense_config: Optional[str] = None) -> PlanResponse:
+        """Run one request through the pipeline.
+
+        `defense_config` overrides the global config for this request only;
+        callers must validate and authorize it (see the X-Defense-Config route header).
+        """
         request_id = request.request_id
-        config = get_defense_config()
+        config = validate_defense_config(defense_config) if defense_config else get_defense_config()
         logger.info("[Agent] Processing request %s (defense=%s)", request_id, config)
 
+        parameters = request.parameters or {}
+        limit = rate_limiter.check(
+            {"session": request.session_id, "telegram_user": parameters.get("telegram_user_id")}
+        )
+        if not limit.allowed:
+            logger.warning("[RateLimit] %s throttled on %s (retry in %ss)", request_id, limit.scope, limit.retry_after_s)
+            return PlanResponse(
+                request_id=request_id,
+                status="RATE_LIMITED",
+                tx_plan=None,
+                error={
+                    "code": "RATE_LIMITED",
+                    "message": f"Too many requests for this {limit.scope.replace('_', ' ')}",
+                    "details": {"scope": limit.scope, "retry_after_s": limit.retry_after_s},
+                },
+            )
+
         enable_l1 = config in ("l1", "l1l2", "l1l2l3")
         enable_l2 = config in ("l1l2", "l1l2l3")
         enable_l3 = config == "l1l2l3"
         metadata: Dict[str, Any] = {"untrusted_flags": [], "risk_level": "low"}
+        prefetch = None
 
         try:
             if enable_l1:
-                is_valid, error_msg, metadata = input_guardrail.validate_input(
+                is_valid, error_msg, metadata, sanitized_message = await stage_executor.run_cpu(
+                    screen_input,
                     request.user_message,
                     request.session_id,
                 )
@@ -223,34 +321,42 @@ class L1Agent:
                 if metadata.get("risk_level") in ["medium", "high"]:
                     metadata["requires_spotlight"] = True
 
-                sanitized_message = input_guardrail.sanitize_input(request.user_message)
                 if sanitized_message != request.user_message:
                     metadata["untrusted_flags"].append("sanitized_markup_or_control_content")
                     logger.info("[L1] Sanitized untrusted markup/control content for %s", request_id)
             else:
                 sanitized_message = request.user_message
 
-            swap_intent: SwapIntent = await llm_planner.parse_intent(sanitized_message)
+            user_addr = "0x...user_wallet_address..."
+            if request.parameters:
+                user_addr = request.parameters.get("user_address", user_addr)
+            # Tools for the likely pair run while the LLM parses; see tools/speculative.py
+            prefetch = speculative_prefetcher.start(sanitized_message, user_addr, tool_coordinator)
+
+            try:
+                swap_intent: SwapIntent = await llm_planner.parse_intent(sanitized_message)
+            except LLMUnavailableError as exc:
+                logger.error("[LLM] Intent parsing unavailable for %s: %s", request_id, str(exc))
+                speculative_prefetcher.discard(prefetch)
+                return self._error_response(request_id, "LLM_UNAVAILABLE", str(exc), details=exc.audit)
 
             if enable_l1:
                 intent_dict = {"intent": swap_intent.model_dump(), "reasoning": "parsed by LLM"}
                 is_valid, error_msg = output_guardrail.validate_llm_output(intent_dict)
                 if not is_valid:
                     logger.error("[L1] LLM output validation failed: %s", error_msg)
+                    speculative_prefetcher.discard(prefetch)
                     return self._error_response(
                         request_id,
                         "OUTPUT_VALIDATION_FAILED",
                         error_msg or "Unknown validation error",
                     )
 
-            user_addr = "0x...user_wallet_address..."
-            if request.parameters:
-                user_addr = request.parameters.get("user_address", user_addr)
             swap_intent.user_address = user_addr
-            swap_intent.request_signals = extract_request_signals(request.user_message)
+            swap_intent.request_signals = await stage_executor.run_cpu(extract_request_signals, request.user_message)
 
             try:
-                tool_response = await tool_coordinator(swap_intent)
+                tool_response = await speculative_prefetcher.resolve(prefetch, swap_intent, tool_coordinator)
             except RuntimeError as exc:
                 logger.error("[Tool] Tool coordination failed for %s: %s", request_id, str(exc))
                 return self._error_response(request_id, "TOOL_ERROR", str(exc))
@@ -274,7 +380,7 @@ class L1Agent:
                     return norm_resp
 
                 try:
-                    policy_response = evaluate_policy(swap_intent, tool_response)
+                    policy_response = await stage_executor.run_cpu(evaluate_policy, swap_intent, tool_response)
                 except Exception as exc:
                     logger.error("[L2] Policy evaluation error for request %s: %s", request_id, str(exc))
                     return self._error_response(
@@ -293,7 +399,7 @@ class L1Agent:
                 return self._error_response(request_id, "BLOCKED_BY_POLICY", reason)
 
             if enable_l3:
-                l3_result = validate_l3(swap_intent, tool_response)
+                l3_result = await stage_executor.run_blocking(validate_l3, swap_intent, tool_response)
                 l3_decision = l3_result.get("decision", "SKIP")
                 if l3_decision == "BLOCK":
                     l3_violations = l3_result.get("violations", [])
@@ -337,14 +443,18 @@ class L1Agent:
                     expires_at=str(quote_metadata.get("quote_expires_at")),
                     ttl_seconds=int(quote_metadata.get("quote_ttl_seconds", policy_cfg.QUOTE_TTL_SECONDS)),
                 ),
-                tool_audit=getattr(tool_response, "audit", {}) or {},
+                tool_audit=self._plan_audit(swap_intent, tool_response),
             )
             tx_plan.wallet_handoff = wallet_bridge.create_handoff(request_id=request_id, plan_id=plan_id)
 
             logger.info("[Agent] Generated TxPlan %s, awaiting owner signature", plan_id)
             return PlanResponse(request_id=request_id, status="NEEDS_OWNER_SIGNATURE", tx_plan=tx_plan)
 
+        except asyncio.CancelledError:
+            speculative_prefetcher.discard(prefetch, cancelled=True)
+            raise
         except Exception as exc:
+            speculative_prefetcher.discard(prefetch)
             logger.error("[Agent] Error processing request %s: %s", request_id, str(exc))
             return self._error_response(request_id, "INTERNAL_ERROR", str(exc))
 
@@ -369,12 +479,24 @@ class L1Agent:
             },
         )
 
-    def _error_response(self, request_id: str, error_code: str, message: str) -> PlanResponse:
+    def _plan_audit(self, intent: SwapIntent, tool_response: Any) -> Dict[str, Any]:
+        audit = dict(getattr(tool_response, "audit", {}) or {})
+        if intent.parse_audit:
+            audit["intent_parse"] = intent.parse_audit
+        return audit
+
+    def _error_response(
+        self,
+        request_id: str,
+        error_code: str,
+        message: str,
+        details: Optional[Dict[str, Any]] = None,
+    ) -> PlanResponse:
         return PlanResponse(
             request_id=request_id,
             status=error_code,
             tx_plan=None,
-            error={"code": error_code, "message": message, "details": {}},
+            error={"code": error_code, "message": message, "details": details or {}},
         )
 
     def _sanitize_quote(self, quote: Dict[str, Any]) -> Dict[str, Any]:
@@ -1,24 +1,79 @@
 """API route definitions."""
 from __future__ import annotations
 
+import ipaddress
 import os
 import secrets
 from typing import Optional
 
-from fastapi import APIRouter, Header, HTTPException, status
+from fastapi import APIRouter, Header, HTTPException, Request, Response, status
+from ..config.settings import settings
+from ..utils.admission import AdmissionController, AdmissionRejected, request_deadline
+from ..utils.rate_limit import rate_limit_exempt
 from ..utils.logger import logger
 from ..models.schemas import PlanRequest, PlanResponse, WalletDecisionRequest, WalletHandoff
-from ..agents.l1_agent import l1_agent, get_defense_config, set_defense_config
+from ..agents.l1_agent import (
+    get_defense_config,
+    l1_agent,
+    loop_lag_monitor,
+    rate_limiter,
+    set_defense_config,
+    speculative_prefetcher,
+    stage_executor,
+    validate_defense_config,
+)
+from ..llm.llm_planner import llm_planner
+from ..state.backend import get_state_backend
 from ..tools.tool_coordinator import get_tool_runtime_status
 from ..wallet.bridge import wallet_bridge
 
 router = APIRouter()
 
+admission_controller = AdmissionController(
+    max_in_flight=settings.ADMISSION_MAX_IN_FLIGHT,
+    max_queue=settings.ADMISSION_MAX_QUEUE,
+    queue_timeout_s=settings.ADMISSION_QUEUE_TIMEOUT_MS / 1000,
+)
+
 
 def _auth_enabled(env_var: str) -> bool:
     return bool(os.getenv(env_var, "").strip())
 
 
+def _has_shared_secret(provided_token: Optional[str], env_var: str) -> bool:
+    """True only when `env_var` is configured and the token matches it."""
+    expected = os.getenv(env_var, "").strip()
+    candidate = (provided_token or "").strip()
+    return bool(expected and candidate and secrets.compare_digest(candidate, expected))
+
+
+def _is_loopback(host: Optional[str]) -> bool:
+    try:
+        return host is not None and ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return host == "localhost"
+
+
+def _authorize_defense_override(provided_token: Optional[str], client_host: Optional[str]) -> None:
+    """A per-request defense override needs the control token, or a loopback caller when none is set.
+
+    Unlike /defense-config, an unauthenticated override would let any caller
+    switch off every defense for its own request without leaving a trace.
+    """
+    if _auth_enabled("CONTROL_PLANE_TOKEN"):
+        _require_shared_secret(
+            provided_token,
+            env_var="CONTROL_PLANE_TOKEN",
+            header_name="X-Control-Token",
+            scope="defense-config override",
+        )
+    elif not _is_loopback(client_host):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="defense-config override is only accepted from loopback unless CONTROL_PLANE_TOKEN is set",
+        )
+
+
 def _require_shared_secret(
     provided_token: Optional[str],
     *,
@@ -42,7 +97,14 @@ def _require_shared_secret(
 
 
 @router.post("/agent/plan", response_model=PlanResponse)
-async def create_plan(request: PlanRequest):
+async def create_plan(
+    request: PlanRequest,
+    http_request: Request,
+    response: Response,
+    x_defense_config: Optional[str] = Header(default=None, alias="X-Defense-Config"),
+    x_control_token: Optional[str] = Header(default=None, alias="X-Control-Token"),
+    x_request_budget_ms: Optional[int] = Header(default=None, alias="X-Request-Budget-Ms"),
+):
     """
     API endpoint for creating transaction plans
     
@@ -52,16 +114,55 @@ async def create_plan(request: PlanRequest):
     1. Receive user's natural language transaction request
     2. Call L1 Agent for processing
     3. Return transaction plan or error information
+
+    An `X-Defense-Config` header runs this request under that config instead
+    of the global one; it is a control-plane action and needs the same
+    `X-Control-Token` as /defense-config. Without CONTROL_PLANE_TOKEN it is
+    accepted from loopback callers only. The config actually applied is
+    echoed in the `X-Defense-Config` response header.
+
+    Requests pass admission control first: beyond the in-flight limit they
+    queue briefly, and beyond the queue they get ``503`` with ``Retry-After``.
+    Each request has a deadline of REQUEST_TIMEOUT_SECONDS (or the smaller
+    `X-Request-Budget-Ms`), counted from arrival, that caps the LLM and
+    tool timeouts downstream. Requests throttled per session / Telegram user
+    come back as status ``RATE_LIMITED`` with a ``Retry-After`` header.
     """
     logger.info(f"API received request: {request.request_id}")
-    
-    try:
-        response = await l1_agent.process_request(request)
-        return response
-    
-    except Exception as e:
-        logger.error(f"API error: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+
+    config = get_defense_config()
+    if x_defense_config:
+        _authorize_defense_override(x_control_token, http_request.client.host if http_request.client else None)
+        try:
+            config = validate_defense_config(x_defense_config.strip())
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+    response.headers["X-Defense-Config"] = config
+
+    budget_s = float(settings.REQUEST_TIMEOUT_SECONDS)
+    if x_request_budget_ms is not None and x_request_budget_ms > 0:
+        budget_s = min(budget_s, x_request_budget_ms / 1000)
+
+    # Control-plane callers (harness, smoke runs) reuse fixed session ids; don't throttle them.
+    exempt = _has_shared_secret(x_control_token, "CONTROL_PLANE_TOKEN")
+    with request_deadline(budget_s), rate_limit_exempt(exempt):
+        try:
+            async with admission_controller.admit():
+                plan = await l1_agent.process_request(request, defense_config=config)
+            if plan.status == "RATE_LIMITED" and plan.error:
+                response.headers["Retry-After"] = str(plan.error["details"]["retry_after_s"])
+            return plan
+
+        except AdmissionRejected as exc:
+            logger.warning(f"Shedding request {request.request_id}: {exc.reason}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=str(exc),
+                headers={"Retry-After": str(exc.retry_after_s)},
+            )
+        except Exception as e:
+            logger.error(f"API error: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/health")
@@ -73,8 +174,17 @@ async def health_check():
         "defense_config": get_defense_config(),
         "tool_runtime": get_tool_runtime_status(),
         "wallet_bridge": wallet_bridge.get_runtime_status(),
+        "state_backend": get_state_backend().describe(),
+        "stage_offload": stage_executor.describe(),
+        "event_loop_lag": loop_lag_monitor.snapshot(),
+        "admission": admission_controller.snapshot(),
+        "rate_limit": rate_limiter.describe(),
+        "intent_parser": llm_planner.describe(),
+        "speculative_prefetch": speculative_prefetcher.snapshot(),
+        "request_timeout_seconds": settings.REQUEST_TIMEOUT_SECONDS,
         "control_plane_security": {
             "defense_config_token_required": _auth_enabled("CONTROL_PLANE_TOKEN"),
+            "defense_config_override_header": "X-Defense-Config",
             "wallet_handoff_token_required": _auth_enabled("WALLET_HANDOFF_TOKEN"),
         },
     }
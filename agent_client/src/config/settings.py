@@ -23,11 +23,52 @@ class Settings(BaseSettings):
     LLM_MODEL: str = "gpt-4"
     LLM_TEMPERATURE: float = 0.1  # Low temperature for stable output
     LLM_MAX_TOKENS: int = 1000
+    # Deterministic rule-parser fast path in front of the LLM (see llm/rule_parser.py)
+    INTENT_FAST_PATH_ENABLED: bool = False
+    INTENT_FAST_PATH_MIN_CONFIDENCE: float = 0.9
+    # Start tool fetches for the rule parser's guess while the LLM runs (see tools/speculative.py)
+    SPECULATIVE_PREFETCH_ENABLED: bool = False
+    SPECULATIVE_PREFETCH_MIN_CONFIDENCE: float = 0.5
+    # LLM call policy (see llm/call_policy.py)
+    LLM_TIMEOUT_SECONDS: float = 15.0  # per attempt, capped by the request deadline
+    LLM_MAX_RETRIES: int = 2
+    LLM_RETRY_BASE_DELAY_MS: int = 200
+    LLM_RETRY_MAX_DELAY_MS: int = 2000
+    LLM_RETRY_BUDGET_PERCENT: float = 10.0  # retries allowed as a share of LLM calls
+    LLM_FALLBACK: str = "mock"  # mock | cache | fail
+    LLM_INTENT_CACHE_TTL_SECONDS: int = 3600
+    # Micro-batching of concurrent LLM parses into one multi-item prompt (see llm/batching.py)
+    LLM_BATCH_ENABLED: bool = False
+    LLM_BATCH_WINDOW_MS: float = 5.0
+    LLM_BATCH_MAX_SIZE: int = 8
+    # Provider prompt caching: auto sends prompt_cache_key to api.openai.com only
+    LLM_PROMPT_CACHE: str = "auto"  # auto | on | off
     
     # Security limits
     MAX_TRANSACTION_VALUE_ETH: float = 10.0  # Max transaction amount
     MAX_SLIPPAGE_BPS: int = 1000  # Max slippage 10%
-    REQUEST_TIMEOUT_SECONDS: int = 30
+    REQUEST_TIMEOUT_SECONDS: int = 30  # Per-request deadline propagated to LLM and tool calls
+    
+    # Admission control for /agent/plan (see utils/admission.py); 0 in-flight disables it
+    ADMISSION_MAX_IN_FLIGHT: int = 64
+    ADMISSION_MAX_QUEUE: int = 128
+    ADMISSION_QUEUE_TIMEOUT_MS: int = 2000
+    
+    # Per-session / per-Telegram-user rate limits (see utils/rate_limit.py)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # memory | shared (uses STATE_BACKEND)
+    RATE_LIMIT_SESSION_BURST: int = 10
+    RATE_LIMIT_SESSION_PER_MINUTE: int = 30
+    RATE_LIMIT_USER_BURST: int = 20
+    RATE_LIMIT_USER_PER_MINUTE: int = 60
+    RATE_LIMIT_MAX_KEYS: int = 10000
+    RATE_LIMIT_IDLE_SECONDS: int = 600
+    
+    # Executor offload for synchronous guardrail / policy / L3 stages (see utils/executor.py)
+    OFFLOAD_MODE: str = "thread"  # inline | thread | process
+    OFFLOAD_THREAD_WORKERS: int = 8
+    OFFLOAD_PROCESS_WORKERS: int = 2
+    EVENT_LOOP_LAG_INTERVAL_MS: int = 100
     
     # Tool configuration (reserved)
     PREFERRED_AGGREGATORS: list = ["1inch", "0x"]
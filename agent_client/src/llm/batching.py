@@ -0,0 +1,89 @@
+"""
+Micro-batching of concurrent calls.
+
+`MicroBatcher.submit(item)` parks the caller for at most `window_ms` (or until
+`max_size` items are waiting), then hands all parked items to one
+`run_batch(items)` call and resolves each caller with its own result. If the
+batch call raises, every caller in it gets the exception.
+
+The flush runs in a fresh context, not any one caller's, under the earliest
+request deadline among the batched items, so no caller's budget is exceeded
+and one caller's other context variables never leak into the others' call.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..utils.admission import current_deadline, request_deadline
+
+
+class MicroBatcher:
+    """Collects concurrent submissions for a few milliseconds and runs them as one batch."""
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+        window_ms: float = 5.0,
+        max_size: int = 8,
+    ) -> None:
+        self._run_batch = run_batch
+        self.window_s = window_ms / 1000.0
+        self.max_size = max(1, max_size)
+        self._pending: List[Tuple[Any, asyncio.Future, Optional[float]]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.batches = 0
+        self.items = 0
+        self.largest = 0
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # A new event loop (tests, worker restart): anything parked on the old one is gone.
+            self._loop, self._pending, self._timer = loop, [], None
+        future = loop.create_future()
+        self._pending.append((item, future, current_deadline()))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_s, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            self.batches += 1
+            self.items += len(batch)
+            self.largest = max(self.largest, len(batch))
+            contextvars.Context().run(asyncio.ensure_future, self._run(batch))
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future, Optional[float]]]) -> None:
+        deadlines = [deadline for _, _, deadline in batch if deadline is not None]
+        budget_s = min(deadlines) - time.monotonic() if deadlines else None
+        try:
+            with request_deadline(budget_s):
+                results = await self._run_batch([item for item, _, _ in batch])
+        except Exception as exc:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "window_ms": self.window_s * 1000,
+            "max_size": self.max_size,
+            "batches": self.batches,
+            "items": self.items,
+            "mean_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "largest": self.largest,
+        }
@@ -0,0 +1,174 @@
+"""
+Retry, backoff and latency accounting for LLM calls.
+
+- `is_retryable`: only transient provider failures are retried (timeouts,
+  connection errors, 408/409/429 and 5xx). Auth, quota (402), bad requests and
+  malformed model output would fail the same way again.
+- `backoff_delay`: capped exponential backoff with full jitter, so retries from
+  many concurrent requests do not arrive at the provider in lockstep.
+- `RetryBudget`: every call deposits `ratio` retry tokens (plus a small
+  reserve for low traffic), and every retry withdraws one. Retries can then
+  never add more than roughly `ratio` extra load, which keeps a struggling
+  provider from being hit by a retry storm.
+- `LatencyHistogram`: per-model, per-attempt latency buckets and outcomes for
+  /v0/health.
+- `TokenUsageLedger`: per-model prompt / cached-prompt / completion token
+  totals from each response's `usage`, so prompt-cache hit rates are visible.
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from openai import APIConnectionError, APIStatusError, APITimeoutError
+
+LLM_FALLBACKS = ("mock", "cache", "fail")
+PROMPT_CACHE_MODES = ("auto", "on", "off")
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+RETRYABLE_STATUS = frozenset({408, 409, 429})
+
+
+class LLMUnavailableError(RuntimeError):
+    """The LLM failed and the fallback policy produced no intent."""
+
+    def __init__(self, message: str, audit: Dict[str, Any]) -> None:
+        super().__init__(message)
+        self.audit = audit
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (APITimeoutError, APIConnectionError, asyncio.TimeoutError)):
+        return True
+    if isinstance(exc, APIStatusError):
+        return exc.status_code in RETRYABLE_STATUS or exc.status_code >= 500
+    return False
+
+
+def backoff_delay(attempt: int, base_s: float, max_s: float, rng: Optional[random.Random] = None) -> float:
+    """Full-jitter delay before retry number `attempt` (1-based)."""
+    ceiling = min(max_s, base_s * (2 ** (attempt - 1)))
+    return (rng or random).uniform(0.0, ceiling)
+
+
+class RetryBudget:
+    """Caps retries at `ratio` of calls, with a small reserve for low traffic."""
+
+    def __init__(self, ratio: float = 0.1, reserve: float = 3.0, cap: float = 50.0) -> None:
+        self.ratio = max(0.0, ratio)
+        self.cap = max(reserve, cap)
+        self._balance = reserve
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+        self.exhausted = 0
+
+    def record_call(self) -> None:
+        with self._lock:
+            self.calls += 1
+            self._balance = min(self.cap, self._balance + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._balance >= 1.0:
+                self._balance -= 1.0
+                self.retries += 1
+                return True
+            self.exhausted += 1
+            return False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "ratio": self.ratio,
+            "balance": round(self._balance, 2),
+            "calls": self.calls,
+            "retries": self.retries,
+            "exhausted": self.exhausted,
+        }
+
+
+class LatencyHistogram:
+    """Bucketed attempt latencies and outcomes, keyed by model name."""
+
+    def __init__(self, buckets_ms: Tuple[float, ...] = LATENCY_BUCKETS_MS) -> None:
+        self.buckets_ms = tuple(sorted(buckets_ms))
+        self._models: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model: str, latency_ms: float, outcome: str) -> None:
+        label = next((f"<={bound:g}ms" for bound in self.buckets_ms if latency_ms <= bound), "+inf")
+        with self._lock:
+            entry = self._models.setdefault(
+                model,
+                {
+                    "count": 0,
+                    "sum_ms": 0.0,
+                    "max_ms": 0.0,
+                    "buckets": {**{f"<={bound:g}ms": 0 for bound in self.buckets_ms}, "+inf": 0},
+                    "outcomes": {},
+                },
+            )
+            entry["count"] += 1
+            entry["sum_ms"] += latency_ms
+            entry["max_ms"] = max(entry["max_ms"], latency_ms)
+            entry["buckets"][label] += 1
+            entry["outcomes"][outcome] = entry["outcomes"].get(outcome, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                model: {
+                    **entry,
+                    "sum_ms": round(entry["sum_ms"], 2),
+                    "max_ms": round(entry["max_ms"], 2),
+                    "mean_ms": round(entry["sum_ms"] / entry["count"], 2) if entry["count"] else 0.0,
+                    "buckets": dict(entry["buckets"]),
+                    "outcomes": dict(entry["outcomes"]),
+                }
+                for model, entry in self._models.items()
+            }
+
+
+def _cached_prompt_tokens(usage: Any) -> int:
+    """Cached prompt tokens: OpenAI reports `prompt_tokens_details.cached_tokens`,
+    DeepSeek `prompt_cache_hit_tokens`."""
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) if details is not None else None
+    if cached is None:
+        cached = getattr(usage, "prompt_cache_hit_tokens", None)
+    return int(cached or 0)
+
+
+class TokenUsageLedger:
+    """Token totals per model name."""
+
+    def __init__(self) -> None:
+        self._models: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model: str, usage: Any) -> None:
+        with self._lock:
+            entry = self._models.setdefault(
+                model,
+                {"calls": 0, "calls_without_usage": 0, "prompt_tokens": 0, "cached_prompt_tokens": 0, "completion_tokens": 0},
+            )
+            entry["calls"] += 1
+            if usage is None:
+                entry["calls_without_usage"] += 1
+                return
+            entry["prompt_tokens"] += int(getattr(usage, "prompt_tokens", 0) or 0)
+            entry["cached_prompt_tokens"] += _cached_prompt_tokens(usage)
+            entry["completion_tokens"] += int(getattr(usage, "completion_tokens", 0) or 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                model: {
+                    **entry,
+                    "prompt_cache_hit_ratio": (
+                        round(entry["cached_prompt_tokens"] / entry["prompt_tokens"], 4) if entry["prompt_tokens"] else 0.0
+                    ),
+                }
+                for model, entry in self._models.items()
+            }
@@ -0,0 +1,120 @@
+"""
+Deterministic rule-based intent parser: the fast path in front of the LLM.
+
+Most benign requests are one of a handful of plain shapes:
+
+    [I want to | I would like to | please] swap|exchange|trade|convert|sell
+        <amount> <TOKEN> for|to|into <TOKEN> [on Ethereum [mainnet] | on Sepolia]
+    [...] buy <TOKEN> with|using <amount> <TOKEN> [on ...]
+
+`parse_swap_intent` returns a `RuleParse` with a confidence score:
+
+- ``1.0`` (``full_match``): the whole message is one of the shapes above with
+  supported, distinct tokens and a positive amount representable in the sell
+  token's decimals. Nothing in the message is left unexplained, so the LLM
+  would have nothing to add; `LLMPlanner` skips it.
+- ``0.5`` (``partial_match``): a swap shape was found but the message says more
+  (slippage, recipients, instructions...). The intent is a best guess for the
+  mock fallback; the LLM still parses the message.
+- ``0.0``: no usable parse (the reason says why); the intent is None.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+import re
+from typing import Optional
+
+from ..models.schemas import SwapIntent
+from ..models.tokens import TOKEN_DECIMALS
+
+FULL_CONFIDENCE = 1.0
+PARTIAL_CONFIDENCE = 0.5
+MAX_MESSAGE_LENGTH = 200
+
+CHAIN_HINTS = {
+    "ethereum": 1,
+    "ethereum mainnet": 1,
+    "eth mainnet": 1,
+    "mainnet": 1,
+    "sepolia": 11155111,
+    "ethereum sepolia": 11155111,
+}
+
+_PREFIX = r"(?:please\s+)?(?:(?:i\s+(?:would\s+like|want|need)|can\s+you|could\s+you)\s+(?:to\s+)?)?(?:please\s+)?"
+_AMOUNT = r"(?P<amount>\d+(?:\.\d+)?|\.\d+)"
+_CHAIN = r"(?:\s+on\s+(?:the\s+)?(?P<chain>[a-z]+(?:\s+[a-z]+)??)(?:\s+network)?)?"
+
+# Each shape names the groups for sell / buy token.
+_SHAPES = [
+    re.compile(
+        rf"(?:swap|exchange|trade|convert|sell)\s+{_AMOUNT}\s+(?P<sell>[a-z]+)\s+(?:for|to|into)\s+(?P<buy>[a-z]+)"
+    ),
+    re.compile(rf"buy\s+(?P<buy>[a-z]+)\s+(?:with|using)\s+{_AMOUNT}\s+(?P<sell>[a-z]+)"),
+]
+_FULL_SHAPES = [re.compile(rf"{_PREFIX}{shape.pattern}{_CHAIN}") for shape in _SHAPES]
+
+
+@dataclass(frozen=True)
+class RuleParse:
+    intent: Optional[SwapIntent]
+    confidence: float
+    reason: str
+
+
+def _normalize(user_message: str) -> str:
+    text = " ".join(user_message.lower().split())
+    return text.rstrip(".!")
+
+
+def _build_intent(match: re.Match, chain_id: int) -> tuple[Optional[SwapIntent], str]:
+    sell_token = match.group("sell").upper()
+    buy_token = match.group("buy").upper()
+    if sell_token not in TOKEN_DECIMALS or buy_token not in TOKEN_DECIMALS:
+        return None, "unsupported_token"
+    if sell_token == buy_token:
+        return None, "same_token"
+    try:
+        amount = Decimal(match.group("amount"))
+    except InvalidOperation:
+        return None, "invalid_amount"
+    smallest_unit = amount * (10 ** TOKEN_DECIMALS[sell_token])
+    if amount <= 0 or smallest_unit != smallest_unit.to_integral_value():
+        return None, "invalid_amount"
+    intent = SwapIntent(
+        chain_id=chain_id,
+        sell_token=sell_token,
+        buy_token=buy_token,
+        sell_amount=str(int(smallest_unit)),
+    )  # type: ignore
+    return intent, "ok"
+
+
+def parse_swap_intent(user_message: str) -> RuleParse:
+    """Parse `user_message` with the deterministic grammar; see the module docstring for scores."""
+    text = _normalize(user_message or "")
+    if not text or len(text) > MAX_MESSAGE_LENGTH:
+        return RuleParse(None, 0.0, "no_match")
+
+    for shape in _FULL_SHAPES:
+        match = shape.fullmatch(text)
+        if match is None:
+            continue
+        chain = match.group("chain")
+        if chain is not None and chain not in CHAIN_HINTS:
+            break  # an unknown chain is for the LLM and policy to judge
+        intent, reason = _build_intent(match, CHAIN_HINTS.get(chain, 1) if chain else 1)
+        if intent is None:
+            return RuleParse(None, 0.0, reason)
+        return RuleParse(intent, FULL_CONFIDENCE, "full_match")
+
+    for shape in _SHAPES:
+        match = shape.search(text)
+        if match is None:
+            continue
+        intent, reason = _build_intent(match, 1)
+        if intent is None:
+            return RuleParse(None, 0.0, reason)
+        return RuleParse(intent, PARTIAL_CONFIDENCE, "partial_match")
+
+    return RuleParse(None, 0.0, "no_match")
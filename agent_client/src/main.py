@@ -7,6 +7,8 @@ import uvicorn
 
 from .config.settings import settings
 from .api.routes import router
+from .agents.l1_agent import loop_lag_monitor, seed_defense_config, stage_executor
+from .state.backend import get_state_backend
 from .utils.logger import logger
 
 
@@ -34,10 +36,18 @@ def create_app() -> FastAPI:
     async def startup_event():
         logger.info("AI Agent API starting up...")
         logger.info(f"API Version: {settings.API_VERSION}")
+        backend = get_state_backend()
+        if not backend.shared:
+            logger.info("State backend is process-local; set STATE_BACKEND=sqlite before running uvicorn --workers N")
+        logger.info(f"Defense config: {seed_defense_config()}")
+        logger.info(f"Stage offload: {stage_executor.mode}")
+        loop_lag_monitor.start()
     
     @app.on_event("shutdown")
     async def shutdown_event():
         logger.info("AI Agent API shutting down...")
+        await loop_lag_monitor.stop()
+        stage_executor.shutdown(wait=False)
     
     return app
 
@@ -100,6 +100,7 @@ class SwapIntent(BaseModel):
     sell_amount: str = Field(..., description="The amount of sell_token to swap, in its smallest unit (e.g., wei).")
     user_address: Optional[str] = Field(None, description="The user's wallet address.")
     request_signals: Dict[str, Any] = Field(default_factory=dict, exclude=True)
+    parse_audit: Dict[str, Any] = Field(default_factory=dict, exclude=True)
 
 
 class TxPlan(BaseModel):
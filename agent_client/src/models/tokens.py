@@ -0,0 +1,14 @@
+"""
+Token metadata shared by the intent parsers, the tool coordinator and the mock upstream.
+"""
+
+# Supported token symbols and their decimals. The rule parser only accepts these
+# symbols, so it never produces an intent the tools cannot price and quote.
+TOKEN_DECIMALS: dict = {
+    "ETH": 18,
+    "WETH": 18,
+    "DAI": 18,
+    "USDC": 6,
+    "USDT": 6,
+    "WBTC": 8,
+}
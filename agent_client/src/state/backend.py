@@ -0,0 +1,305 @@
+"""
+Pluggable state backend for multi-worker deployments.
+
+Everything the API must see consistently across uvicorn workers (the defense
+config, wallet handoffs, and shared caches such as prices, intents and L3
+verdicts) goes through a `StateBackend`: a namespaced key-value store of
+JSON-serializable values with optional per-key TTL and an atomic
+read-modify-write (`update`).
+
+Backends:
+- `InMemoryStateBackend` (default): process-local, for tests and single-worker runs.
+- `SQLiteStateBackend`: one WAL-mode SQLite file shared by every worker on a host.
+
+Selection is driven by `STATE_BACKEND`:
+- unset / ``memory``: in-memory
+- ``sqlite`` or ``sqlite:///path/to/state.sqlite3``: SQLite (default path
+  ``STATE_BACKEND_PATH`` or ``.state/agent_state.sqlite3`` under the project root)
+- ``package.module:factory``: any callable returning an object that implements
+  the `StateBackend` protocol below (e.g. a Redis adapter).
+
+Custom backends must make `update` atomic across processes and treat expired
+keys as absent.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+import importlib
+import json
+import os
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Protocol
+
+from ..utils.logger import logger
+
+_PROJECT_ROOT = Path(__file__).resolve().parents[3]
+DEFAULT_SQLITE_PATH = _PROJECT_ROOT / ".state" / "agent_state.sqlite3"
+
+# Well-known namespaces.
+CONFIG_NAMESPACE = "config"
+HANDOFF_NAMESPACE = "wallet_handoffs"
+HANDOFF_PENDING_NAMESPACE = "wallet_handoffs:pending"
+PRICE_CACHE_NAMESPACE = "cache:prices"
+INTENT_CACHE_NAMESPACE = "cache:intents"
+L3_CACHE_NAMESPACE = "cache:l3"
+RATE_LIMIT_NAMESPACE = "ratelimit"
+
+
+class StateBackend(Protocol):
+    """Namespaced key-value store shared by all API workers.
+
+    `shared` is True when other processes see writes (drives whether
+    process-local fast paths are safe).
+    """
+
+    name: str
+    shared: bool
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Stored value, or None when missing or expired."""
+
+    def set(self, namespace: str, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Store a JSON-serializable value, replacing any previous one."""
+
+    def update(
+        self,
+        namespace: str,
+        key: str,
+        fn: Callable[[Any], Any],
+        ttl_seconds: Optional[float] = None,
+    ) -> Optional[Any]:
+        """Atomically replace an existing value with `fn(value)`; None when the key is absent."""
+
+    def delete(self, namespace: str, key: str) -> bool:
+        """Remove a key; True when it existed."""
+
+    def values(self, namespace: str) -> List[Any]:
+        """All live values in a namespace."""
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        """Drop one namespace, or everything."""
+
+    def describe(self) -> Dict[str, Any]:
+        """Runtime status for /v0/health."""
+
+
+def _expires_at(ttl_seconds: Optional[float]) -> Optional[float]:
+    return time.time() + ttl_seconds if ttl_seconds is not None else None
+
+
+class InMemoryStateBackend:
+    """Process-local backend; values are JSON round-tripped like the shared backends."""
+
+    name = "memory"
+    shared = False
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._data: Dict[str, Dict[str, tuple]] = {}
+
+    def _live(self, namespace: str, key: str) -> Optional[tuple]:
+        entry = self._data.get(namespace, {}).get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.time():
+            del self._data[namespace][key]
+            return None
+        return entry
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._live(namespace, key)
+        return json.loads(entry[0]) if entry is not None else None
+
+    def set(self, namespace: str, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        encoded = json.dumps(value)
+        with self._lock:
+            self._data.setdefault(namespace, {})[key] = (encoded, _expires_at(ttl_seconds))
+
+    def update(
+        self,
+        namespace: str,
+        key: str,
+        fn: Callable[[Any], Any],
+        ttl_seconds: Optional[float] = None,
+    ) -> Optional[Any]:
+        with self._lock:
+            entry = self._live(namespace, key)
+            if entry is None:
+                return None
+            value = fn(json.loads(entry[0]))
+            expires_at = _expires_at(ttl_seconds) if ttl_seconds is not None else entry[1]
+            self._data[namespace][key] = (json.dumps(value), expires_at)
+        return value
+
+    def delete(self, namespace: str, key: str) -> bool:
+        with self._lock:
+            return self._data.get(namespace, {}).pop(key, None) is not None
+
+    def values(self, namespace: str) -> List[Any]:
+        with self._lock:
+            keys = list(self._data.get(namespace, {}))
+            entries = [self._live(namespace, key) for key in keys]
+        return [json.loads(entry[0]) for entry in entries if entry is not None]
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        with self._lock:
+            if namespace is None:
+                self._data.clear()
+            else:
+                self._data.pop(namespace, None)
+
+    def describe(self) -> Dict[str, Any]:
+        return {"backend": self.name, "shared": self.shared}
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS idx_state_expires ON state (expires_at);
+"""
+_LIVE = "(expires_at IS NULL OR expires_at > ?)"
+
+
+class SQLiteStateBackend:
+    """Shared backend for all workers on one host: a WAL-mode SQLite file.
+
+    Each thread keeps its own connection; `update` runs in a ``BEGIN
+    IMMEDIATE`` transaction so concurrent read-modify-writes from other
+    workers serialize instead of losing updates.
+    """
+
+    name = "sqlite"
+    shared = True
+
+    def __init__(self, path: Path | str = DEFAULT_SQLITE_PATH, timeout: float = 30.0) -> None:
+        self.path = Path(path)
+        self.timeout = timeout
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._connection().executescript(_SQLITE_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        row = self._connection().execute(
+            f"SELECT value FROM state WHERE namespace = ? AND key = ? AND {_LIVE}",
+            (namespace, key, time.time()),
+        ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def set(self, namespace: str, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        self._connection().execute(
+            "INSERT OR REPLACE INTO state (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, json.dumps(value), _expires_at(ttl_seconds)),
+        )
+
+    def update(
+        self,
+        namespace: str,
+        key: str,
+        fn: Callable[[Any], Any],
+        ttl_seconds: Optional[float] = None,
+    ) -> Optional[Any]:
+        with self._transaction() as connection:
+            row = connection.execute(
+                f"SELECT value, expires_at FROM state WHERE namespace = ? AND key = ? AND {_LIVE}",
+                (namespace, key, time.time()),
+            ).fetchone()
+            if row is None:
+                return None
+            value = fn(json.loads(row[0]))
+            expires_at = _expires_at(ttl_seconds) if ttl_seconds is not None else row[1]
+            connection.execute(
+                "UPDATE state SET value = ?, expires_at = ? WHERE namespace = ? AND key = ?",
+                (json.dumps(value), expires_at, namespace, key),
+            )
+        return value
+
+    def delete(self, namespace: str, key: str) -> bool:
+        cursor = self._connection().execute("DELETE FROM state WHERE namespace = ? AND key = ?", (namespace, key))
+        return cursor.rowcount > 0
+
+    def values(self, namespace: str) -> List[Any]:
+        rows = self._connection().execute(
+            f"SELECT value FROM state WHERE namespace = ? AND {_LIVE} ORDER BY rowid",
+            (namespace, time.time()),
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        if namespace is None:
+            self._connection().execute("DELETE FROM state")
+        else:
+            self._connection().execute("DELETE FROM state WHERE namespace = ?", (namespace,))
+
+    def purge_expired(self) -> int:
+        cursor = self._connection().execute(
+            "DELETE FROM state WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+        )
+        return cursor.rowcount
+
+    def describe(self) -> Dict[str, Any]:
+        return {"backend": self.name, "shared": self.shared, "path": str(self.path)}
+
+
+def create_state_backend(spec: Optional[str] = None) -> StateBackend:
+    """Build the backend named by `spec` (default: the STATE_BACKEND env var)."""
+    spec = (spec if spec is not None else os.environ.get("STATE_BACKEND", "memory")).strip()
+    if spec in ("", "memory"):
+        return InMemoryStateBackend()
+    if spec == "sqlite" or spec.startswith("sqlite://"):
+        path = spec[len("sqlite:///"):] if spec.startswith("sqlite:///") else os.environ.get("STATE_BACKEND_PATH")
+        return SQLiteStateBackend(path or DEFAULT_SQLITE_PATH)
+    module_name, _, attribute = spec.partition(":")
+    if not attribute:
+        raise ValueError(f"Unknown STATE_BACKEND '{spec}', expected memory, sqlite[:///path] or module:factory")
+    factory = getattr(importlib.import_module(module_name), attribute)
+    return factory()
+
+
+_state_backend: Optional[StateBackend] = None
+_state_backend_lock = threading.Lock()
+
+
+def get_state_backend() -> StateBackend:
+    global _state_backend
+    if _state_backend is None:
+        with _state_backend_lock:
+            if _state_backend is None:
+                _state_backend = create_state_backend()
+                logger.info("[State] Using %s state backend", _state_backend.name)
+    return _state_backend
+
+
+def set_state_backend(backend: Optional[StateBackend]) -> None:
+    """Install a backend (None re-reads STATE_BACKEND on next use)."""
+    global _state_backend
+    with _state_backend_lock:
+        _state_backend = backend
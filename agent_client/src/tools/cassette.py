@@ -0,0 +1,228 @@
+"""
+Record/replay cassette for tool-coordinator upstream HTTP calls.
+
+The cassette sits underneath `tool_coordinator` and lets REAL_TOOLS=true runs
+be reproduced offline:
+
+- `TOOL_CASSETTE_MODE=record` performs the live CoinGecko / 1inch request and
+  appends the request key, status, JSON body, and observed latency to a
+  compact JSONL cassette file.
+- `TOOL_CASSETTE_MODE=replay` never touches the network. Requests are served
+  from the cassette; repeated keys cycle through their recorded responses.
+- `TOOL_CASSETTE_LATENCY` controls replay timing: `none` (serve immediately),
+  `recorded` (sleep for the latency recorded with each entry), or `sampled`
+  (sleep for a latency drawn from the recorded distribution of that endpoint).
+
+Request headers are never written to the cassette, so API keys do not leak
+into recorded artifacts. Keys only use the URL path and sorted query params,
+which keeps a cassette valid when replayed behind a different base URL.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from dataclasses import dataclass
+import json
+import os
+from pathlib import Path
+import random
+from threading import Lock
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+CASSETTE_MODES = ("off", "record", "replay")
+REPLAY_LATENCY_MODES = ("none", "recorded", "sampled")
+DEFAULT_CASSETTE_PATH = "artifacts/tool_cassettes/latest.jsonl"
+
+# cassette.py -> tools/ -> src/ -> agent_client/ -> project root
+_PROJECT_ROOT = Path(__file__).resolve().parents[3]
+
+
+class CassetteMissError(RuntimeError):
+    """Raised in replay mode when no recorded response matches a request."""
+
+
+@dataclass(frozen=True)
+class RecordedResponse:
+    key: str
+    status_code: int
+    body: Any
+    latency_ms: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "key": self.key,
+            "status": self.status_code,
+            "latency_ms": self.latency_ms,
+            "body": self.body,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "RecordedResponse":
+        return cls(
+            key=str(data["key"]),
+            status_code=int(data.get("status", 200)),
+            body=data.get("body"),
+            latency_ms=float(data.get("latency_ms", 0.0)),
+        )
+
+
+def cassette_key(method: str, url: str, params: Optional[Mapping[str, Any]] = None) -> str:
+    """Build a base-URL independent request key: METHOD path?sorted-query."""
+    path = urlsplit(url).path or "/"
+    query = urlencode(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+    return f"{method.upper()} {path}?{query}" if query else f"{method.upper()} {path}"
+
+
+def _endpoint_of(key: str) -> str:
+    return key.split("?", 1)[0]
+
+
+class ToolCassette:
+    """JSONL-backed store of upstream request/response pairs."""
+
+    def __init__(
+        self,
+        path: Path,
+        mode: str = "replay",
+        replay_latency: str = "none",
+        seed: Optional[int] = None,
+    ) -> None:
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Invalid cassette mode '{mode}', must be 'record' or 'replay'")
+        if replay_latency not in REPLAY_LATENCY_MODES:
+            raise ValueError(
+                f"Invalid cassette latency mode '{replay_latency}', must be one of {REPLAY_LATENCY_MODES}"
+            )
+        self.path = path
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self._lock = Lock()
+        self._rng = random.Random(seed)
+        self._entries: Dict[str, List[RecordedResponse]] = defaultdict(list)
+        self._latencies: Dict[str, List[float]] = defaultdict(list)
+        self._cursors: Dict[str, int] = defaultdict(int)
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        if mode == "replay":
+            self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            raise FileNotFoundError(f"Tool cassette not found: {self.path}")
+        with self.path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                self._index(RecordedResponse.from_dict(json.loads(line)))
+
+    def _index(self, entry: RecordedResponse) -> None:
+        self._entries[entry.key].append(entry)
+        self._latencies[_endpoint_of(entry.key)].append(entry.latency_ms)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def lookup(self, key: str) -> RecordedResponse:
+        """Return the next recorded response for `key`, cycling on repeats."""
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self.misses += 1
+                raise CassetteMissError(f"No recorded response for {key}")
+            cursor = self._cursors[key]
+            self._cursors[key] = cursor + 1
+            self.hits += 1
+            return entries[cursor % len(entries)]
+
+    def replay_delay_seconds(self, entry: RecordedResponse) -> float:
+        """Delay to apply before serving `entry` under the configured latency mode."""
+        if self.replay_latency == "recorded":
+            return max(entry.latency_ms, 0.0) / 1000.0
+        if self.replay_latency == "sampled":
+            with self._lock:
+                samples = self._latencies.get(_endpoint_of(entry.key)) or [entry.latency_ms]
+                return max(self._rng.choice(samples), 0.0) / 1000.0
+        return 0.0
+
+    def record(self, key: str, status_code: int, body: Any, latency_ms: float) -> RecordedResponse:
+        """Append one interaction to the cassette file."""
+        entry = RecordedResponse(
+            key=key,
+            status_code=status_code,
+            body=body,
+            latency_ms=round(float(latency_ms), 3),
+        )
+        line = json.dumps(entry.to_dict(), separators=(",", ":"), ensure_ascii=False)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as handle:
+                handle.write(line + "\n")
+            self._index(entry)
+            self.recorded += 1
+        return entry
+
+    async def record_async(self, key: str, status_code: int, body: Any, latency_ms: float) -> RecordedResponse:
+        """`record` on a worker thread, so the file append never blocks the event loop."""
+        return await asyncio.to_thread(self.record, key, status_code, body, latency_ms)
+
+    def get_runtime_status(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "path": str(self.path),
+            "replay_latency": self.replay_latency,
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "recorded": self.recorded,
+        }
+
+
+def _cassette_mode() -> str:
+    mode = os.environ.get("TOOL_CASSETTE_MODE", "off").strip().lower() or "off"
+    if mode not in CASSETTE_MODES:
+        raise ValueError(f"Invalid TOOL_CASSETTE_MODE '{mode}', must be one of {CASSETTE_MODES}")
+    return mode
+
+
+def _cassette_path() -> Path:
+    path = Path(os.environ.get("TOOL_CASSETTE_PATH", DEFAULT_CASSETTE_PATH))
+    return path if path.is_absolute() else _PROJECT_ROOT / path
+
+
+def _cassette_seed() -> Optional[int]:
+    raw = os.environ.get("TOOL_CASSETTE_SEED", "").strip()
+    try:
+        return int(raw) if raw else None
+    except ValueError:
+        return None
+
+
+_active: Optional[Tuple[Tuple[str, str, str, Optional[int]], ToolCassette]] = None
+_active_lock = Lock()
+
+
+def get_active_cassette() -> Optional[ToolCassette]:
+    """Return the cassette selected by environment, or None when disabled.
+
+    The instance is cached per (mode, path, latency, seed) so replay cursors and
+    counters persist across requests while env changes still take effect.
+    """
+    global _active
+    mode = _cassette_mode()
+    if mode == "off":
+        return None
+    latency = os.environ.get("TOOL_CASSETTE_LATENCY", "none").strip().lower() or "none"
+    signature = (mode, str(_cassette_path()), latency, _cassette_seed())
+    with _active_lock:
+        if _active is None or _active[0] != signature:
+            _active = (signature, ToolCassette(_cassette_path(), mode=mode, replay_latency=latency, seed=signature[3]))
+        return _active[1]
+
+
+def reset_active_cassette() -> None:
+    global _active
+    with _active_lock:
+        _active = None
@@ -0,0 +1,136 @@
+"""
+Speculative tool prefetch.
+
+`tool_coordinator` normally waits for the LLM to parse the intent. Most
+messages name the pair and amount plainly enough for the deterministic
+grammar (`llm/rule_parser.py`) to guess them, so `SpeculativePrefetcher.start`
+runs the market snapshot and quote fetch for that guess while the LLM call is
+still in flight.
+
+`resolve` reuses the prefetched result only when the parsed intent agrees with
+the guess on chain, both tokens and the amount. Otherwise the prefetch is
+discarded (cancelled if still running) and the tools run again for the real
+intent, so a wrong guess costs an extra read-only fetch, never a wrong quote.
+
+Guesses confident enough for the planner's fast path are not speculated on:
+that path skips the LLM, so there is no latency to overlap and counting them as
+hits would only inflate `hit_rate`. They are counted under `fast_path`.
+"""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from ..llm.rule_parser import parse_swap_intent
+from ..models.schemas import SwapIntent, ToolResponse
+from ..utils.logger import logger
+
+ToolFetch = Callable[[SwapIntent], Awaitable[ToolResponse]]
+
+
+def _intent_key(intent: SwapIntent) -> Tuple[int, str, str, str]:
+    return (intent.chain_id, intent.sell_token.upper(), intent.buy_token.upper(), str(intent.sell_amount))
+
+
+@dataclass
+class Prefetch:
+    key: Tuple[int, str, str, str]
+    task: "asyncio.Task[ToolResponse]"
+    confidence: float
+    settled: bool = False
+
+
+class SpeculativePrefetcher:
+    """Starts tool fetches for a guessed intent and counts how often the guess pays off."""
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        min_confidence: float = 0.5,
+        fast_path_confidence: Optional[float] = None,
+    ) -> None:
+        self.enabled = enabled
+        self.min_confidence = min_confidence
+        self.fast_path_confidence = fast_path_confidence
+        self.started = 0
+        self.skipped = 0
+        self.fast_path = 0
+        self.hits = 0
+        self.wasted = 0
+        self.cancelled = 0
+        self.errors = 0
+
+    def start(self, message: str, user_address: Optional[str], fetch: ToolFetch) -> Optional[Prefetch]:
+        if not self.enabled:
+            return None
+        guess = parse_swap_intent(message)
+        if guess.intent is None or guess.confidence < self.min_confidence:
+            self.skipped += 1
+            return None
+        if self.fast_path_confidence is not None and guess.confidence >= self.fast_path_confidence:
+            self.fast_path += 1
+            return None
+        intent = guess.intent.model_copy(update={"user_address": user_address})
+        self.started += 1
+        return Prefetch(key=_intent_key(intent), task=asyncio.ensure_future(fetch(intent)), confidence=guess.confidence)
+
+    def discard(self, prefetch: Optional[Prefetch], cancelled: bool = False) -> None:
+        """Drop a prefetch whose request ended before the tools stage (no-op once settled).
+
+        `cancelled` marks a request that was itself cancelled rather than failed.
+        """
+        if prefetch is None or prefetch.settled:
+            return
+        prefetch.settled = True
+        if cancelled:
+            self.cancelled += 1
+        else:
+            self.wasted += 1
+        self._cancel(prefetch)
+
+    async def resolve(self, prefetch: Optional[Prefetch], intent: SwapIntent, fetch: ToolFetch) -> ToolResponse:
+        """The tool response for `intent`, from the prefetch when the guess matched."""
+        if prefetch is None or prefetch.settled:
+            return await fetch(intent)
+        prefetch.settled = True
+        if prefetch.key != _intent_key(intent):
+            self.wasted += 1
+            self._cancel(prefetch)
+            logger.info("[Prefetch] Guess %s did not match parsed intent; refetching", prefetch.key)
+            return await fetch(intent)
+        try:
+            tool_response = await prefetch.task
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        except Exception as exc:
+            self.errors += 1
+            logger.warning("[Prefetch] Speculative fetch failed (%s); refetching", str(exc))
+            return await fetch(intent)
+        self.hits += 1
+        tool_response.audit["prefetch"] = {"outcome": "hit", "guess_confidence": prefetch.confidence}
+        return tool_response
+
+    @staticmethod
+    def _cancel(prefetch: Prefetch) -> None:
+        if prefetch.task.done():
+            if not prefetch.task.cancelled():
+                prefetch.task.exception()  # retrieved, so an unused failure is not logged as unhandled
+        else:
+            prefetch.task.cancel()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "min_confidence": self.min_confidence,
+            "fast_path_confidence": self.fast_path_confidence,
+            "started": self.started,
+            "skipped": self.skipped,
+            "fast_path": self.fast_path,
+            "hits": self.hits,
+            "wasted": self.wasted,
+            "cancelled": self.cancelled,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / self.started, 4) if self.started else 0.0,
+        }
@@ -14,6 +14,9 @@ Important runtime behavior:
 - `REAL_TOOLS=true` attempts real APIs first.
 - `REAL_TOOLS_STRICT=true` turns any real-api fallback into a hard failure so
   demos and smoke tests cannot silently degrade to mock data.
+- `TOOL_CASSETTE_MODE=record|replay` records upstream responses to, or serves
+  them from, a local cassette (see `cassette.py`) so REAL_TOOLS=true runs can
+  be benchmarked offline with realistic tool latency.
 
 Both market snapshot and quote fetches emit structured audit metadata that is
 carried forward into the generated TxPlan for later inspection.
@@ -24,11 +27,14 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 import os
 import time
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import httpx
 
 from ..models.schemas import QuoteResponse, SwapIntent, ToolResponse, TxData
+from ..models.tokens import TOKEN_DECIMALS
+from .cassette import cassette_key, get_active_cassette
+from ..utils.admission import remaining_budget
 from ..utils.logger import logger
 from policy_engine import config as policy_cfg
 
@@ -65,17 +71,7 @@ _MOCK_PRICES_USD: dict = {
     "WBTC": 60000.0,
 }
 
-# Default token decimals for simple mock calculations
-_TOKEN_DECIMALS: dict = {
-    "ETH": 18,
-    "WETH": 18,
-    "DAI": 18,
-    "USDC": 6,
-    "USDT": 6,
-    "WBTC": 8,
-}
-
-# HTTP client timeouts
+# HTTP client timeout; capped by the remaining request deadline when one is set
 HTTP_TIMEOUT = 10.0
 
 
@@ -152,6 +148,53 @@ def _get_oneinch_headers() -> Dict[str, str]:
     return headers
 
 
+def _cassette_runtime_status() -> Dict[str, Any]:
+    try:
+        cassette = get_active_cassette()
+    except (ValueError, FileNotFoundError) as exc:
+        return {"mode": "error", "error": str(exc)}
+    if cassette is None:
+        return {"mode": "off"}
+    return cassette.get_runtime_status()
+
+
+async def _http_get_json(url: str, params: Dict[str, Any], headers: Dict[str, str]) -> Any:
+    """GET a JSON document, honouring the record/replay cassette when enabled.
+
+    Replay never touches the network; a missing recording raises, which the
+    callers treat like any other upstream failure (fallback or strict error).
+    """
+    cassette = get_active_cassette()
+    key = cassette_key("GET", url, params)
+
+    if cassette is not None and cassette.mode == "replay":
+        entry = cassette.lookup(key)
+        delay = cassette.replay_delay_seconds(entry)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if entry.status_code >= 400:
+            raise RuntimeError(f"Replayed HTTP {entry.status_code} for {key}")
+        return entry.body
+
+    started = time.perf_counter()
+    async with httpx.AsyncClient(timeout=remaining_budget(HTTP_TIMEOUT)) as client:
+        response = await client.get(url, params=params, headers=headers)
+    latency_ms = (time.perf_counter() - started) * 1000
+
+    decode_error: Optional[ValueError] = None
+    try:
+        body: Any = response.json()
+    except ValueError as exc:
+        body, decode_error = response.text, exc
+    if cassette is not None:
+        await cassette.record_async(key, response.status_code, body, latency_ms)
+
+    response.raise_for_status()
+    if decode_error is not None:
+        raise decode_error
+    return body
+
+
 def get_tool_runtime_status() -> Dict[str, Any]:
     return {
         "real_tools_enabled": _real_tools_enabled(),
@@ -163,6 +206,7 @@ def get_tool_runtime_status() -> Dict[str, Any]:
         "oneinch_base_url": _get_oneinch_base_url(),
         "oneinch_swap_version": _get_oneinch_swap_version(),
         "oneinch_api_key_configured": bool(os.environ.get("ONEINCH_API_KEY")),
+        "cassette": _cassette_runtime_status(),
     }
 
 
@@ -215,10 +259,7 @@ async def _get_market_snapshot_with_audit(sell_token: str, buy_token: str) -> To
 
     started = time.perf_counter()
     try:
-        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-            r = await client.get(url, params=params, headers=headers)
-            r.raise_for_status()
-            data = r.json()
+        data = await _http_get_json(url, params, headers)
 
         for sym in (sell_sym, buy_sym):
             gid = COINGECKO_ID_MAP.get(sym)
@@ -251,11 +292,11 @@ async def _get_swap_quote_with_audit(intent: SwapIntent) -> ToolFetchResult:
     chain_id = getattr(intent, "chain_id", 1) or 1
 
     def _mock_quote() -> QuoteResponse:
-        sell_decimals = _TOKEN_DECIMALS.get(sell_sym, 18)
+        sell_decimals = TOKEN_DECIMALS.get(sell_sym, 18)
         sell_human = int(intent.sell_amount) / (10 ** sell_decimals)
         sell_price = _MOCK_PRICES_USD.get(sell_sym, 1.0)
         buy_price = _MOCK_PRICES_USD.get(buy_sym, 1.0)
-        buy_decimals = _TOKEN_DECIMALS.get(buy_sym, 18)
+        buy_decimals = TOKEN_DECIMALS.get(buy_sym, 18)
         buy_human = sell_human * sell_price / (buy_price if buy_price else 1.0)
         mock_to_amount = int(buy_human * (10 ** buy_decimals))
 
@@ -319,10 +360,7 @@ async def _get_swap_quote_with_audit(intent: SwapIntent) -> ToolFetchResult:
 
     started = time.perf_counter()
     try:
-        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-            res = await client.get(url, params=params, headers=headers)
-            res.raise_for_status()
-            jd = res.json()
+        jd = await _http_get_json(url, params, headers)
 
         to_amount = jd.get("toTokenAmount") or jd.get("to_token_amount") or "0"
         estimated_gas = str(jd.get("estimatedGas") or jd.get("estimated_gas") or "0")
@@ -0,0 +1,202 @@
+"""
+Admission control, load shedding and request deadlines for /v0/agent/plan.
+
+Every plan request can wait on the LLM and on external tools, so accepting all
+of them under overload makes latency collapse for everyone. The API instead:
+
+- admits at most `max_in_flight` requests at once;
+- parks up to `max_queue` more in a FIFO queue, each for at most
+  `queue_timeout_s` (or whatever is left of its deadline, if less);
+- sheds everything else immediately with `AdmissionRejected`, which the route
+  turns into ``503`` plus a ``Retry-After`` estimate.
+
+Each admitted request runs under a deadline (`request_deadline`), stored in a
+context variable so it follows the request into `asyncio.gather` tasks.
+Downstream calls ask `remaining_budget(default)` for their timeout instead of
+using a fixed one, so a request that spent its budget queueing does not then
+wait another 10s on a tool.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+import math
+import time
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, Optional
+
+MIN_BUDGET_S = 0.01
+WAIT_WINDOW = 1024
+SHED_REASONS = ("queue_full", "queue_timeout", "deadline_exceeded")
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+@contextmanager
+def request_deadline(budget_s: Optional[float]) -> Iterator[Optional[float]]:
+    """Run the enclosed code under a deadline `budget_s` seconds from now (None: no deadline).
+
+    A nested deadline never extends an outer one.
+    """
+    deadline = time.monotonic() + budget_s if budget_s is not None else None
+    outer = _deadline.get()
+    if outer is not None and (deadline is None or outer < deadline):
+        deadline = outer
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def current_deadline() -> Optional[float]:
+    """Monotonic deadline of the current request, if any."""
+    return _deadline.get()
+
+
+def remaining_budget(default: float) -> float:
+    """Timeout for a downstream call: `default`, capped by what is left of the deadline."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return default
+    return max(MIN_BUDGET_S, min(default, deadline - time.monotonic()))
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of admitted."""
+
+    def __init__(self, reason: str, retry_after_s: int) -> None:
+        super().__init__(f"Server overloaded ({reason}), retry after {retry_after_s}s")
+        self.reason = reason
+        self.retry_after_s = retry_after_s
+
+
+class AdmissionController:
+    """Max-in-flight limit with a bounded, deadline-aware FIFO queue.
+
+    `max_in_flight <= 0` disables the limit. Slots are handed directly from a
+    finishing request to the oldest waiter, so queued requests are never
+    overtaken by new arrivals.
+    """
+
+    def __init__(self, max_in_flight: int = 64, max_queue: int = 128, queue_timeout_s: float = 2.0) -> None:
+        self.max_in_flight = max_in_flight
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout_s = queue_timeout_s
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.admitted = 0
+        self.queued = 0
+        self.shed = {reason: 0 for reason in SHED_REASONS}
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._waits_ms: Deque[float] = deque(maxlen=WAIT_WINDOW)
+        self._service_s = 0.0  # EWMA of admitted request duration, for Retry-After
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_in_flight > 0
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    def retry_after_s(self) -> int:
+        """Rough time until a slot frees up for a newcomer, in whole seconds."""
+        if not self.enabled or self._service_s <= 0:
+            return 1
+        backlog = self.queue_depth + max(1, self.in_flight)
+        return max(1, math.ceil(self._service_s * backlog / self.max_in_flight))
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        self.shed[reason] += 1
+        return AdmissionRejected(reason, self.retry_after_s())
+
+    def _grant(self) -> None:
+        self.in_flight += 1
+        self.admitted += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    async def acquire(self) -> None:
+        """Take a slot, queueing if needed; raise `AdmissionRejected` when shedding."""
+        if not self.enabled:
+            self._grant()
+            return
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self._grant()
+            self._waits_ms.append(0.0)
+            return
+        if self.queue_depth >= self.max_queue:
+            raise self._reject("queue_full")
+
+        timeout = self.queue_timeout_s
+        timeout_reason = "queue_timeout"
+        deadline = current_deadline()
+        if deadline is not None and deadline - time.monotonic() < timeout:
+            timeout = deadline - time.monotonic()
+            timeout_reason = "deadline_exceeded"
+            if timeout <= 0:
+                raise self._reject(timeout_reason)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            if not waiter.done() or waiter.cancelled():
+                raise self._reject(timeout_reason)
+            # Otherwise the slot was handed over just as the wait timed out.
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # pass the slot on; the client went away
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        # `release` transferred its slot to us without decrementing `in_flight`.
+        self.admitted += 1
+        self._waits_ms.append((time.perf_counter() - started) * 1000)
+
+    def release(self, service_s: Optional[float] = None) -> None:
+        if service_s is not None:
+            self._service_s = service_s if self._service_s == 0 else 0.8 * self._service_s + 0.2 * service_s
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        await self.acquire()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - started)
+
+    def snapshot(self) -> Dict[str, Any]:
+        ordered = sorted(self._waits_ms)
+
+        def _quantile(q: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 2) if ordered else 0.0
+
+        return {
+            "enabled": self.enabled,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "queue_timeout_ms": self.queue_timeout_s * 1000,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "queue_depth": self.queue_depth,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "shed": dict(self.shed),
+            "shed_total": sum(self.shed.values()),
+            "queue_wait_p50_ms": _quantile(0.50),
+            "queue_wait_p99_ms": _quantile(0.99),
+            "retry_after_s": self.retry_after_s(),
+        }
@@ -0,0 +1,157 @@
+"""
+Executor offload for synchronous pipeline stages, plus an event-loop lag monitor.
+
+`L1Agent.process_request` is async, but the L1 regex guardrails,
+`extract_request_signals`, `evaluate_policy` and the blocking `validate_l3`
+RPC are synchronous. `StageExecutor` moves them off the event loop so one slow
+or adversarial request cannot stall every other in-flight request:
+
+- ``inline``: run on the loop (previous behavior; used by the in-process harness).
+- ``thread``: blocking and CPU stages both go to a thread pool.
+- ``process``: blocking stages go to the thread pool, CPU stages to a
+  spawn-context process pool. `re` holds the GIL while matching, so only a
+  process pool isolates pathological regex work. CPU callables and their
+  arguments must then be picklable (module-level functions, pydantic models).
+
+`EventLoopLagMonitor` sleeps for a fixed interval and records how late it
+wakes up; the lag distribution on /v0/health shows whether anything is still
+blocking the loop.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import functools
+import multiprocessing
+import threading
+import time
+from typing import Any, Callable, Deque, Dict, Optional
+
+OFFLOAD_MODES = ("inline", "thread", "process")
+LAG_WINDOW = 1024
+
+
+class StageExecutor:
+    """Runs synchronous stages inline, on a thread pool, or on a process pool."""
+
+    def __init__(self, mode: str = "thread", thread_workers: int = 8, process_workers: int = 2) -> None:
+        if mode not in OFFLOAD_MODES:
+            raise ValueError(f"Invalid offload mode '{mode}', must be one of {OFFLOAD_MODES}")
+        self.mode = mode
+        self.thread_workers = max(1, thread_workers)
+        self.process_workers = max(1, process_workers)
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.submitted = {"blocking": 0, "cpu": 0}
+        self.in_flight = 0
+
+    def _thread_pool(self) -> ThreadPoolExecutor:
+        if self._threads is None:
+            with self._lock:
+                if self._threads is None:
+                    self._threads = ThreadPoolExecutor(
+                        max_workers=self.thread_workers, thread_name_prefix="stage-offload"
+                    )
+        return self._threads
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        if self._processes is None:
+            with self._lock:
+                if self._processes is None:
+                    # Spawn, not fork: the parent runs an event loop and worker threads.
+                    self._processes = ProcessPoolExecutor(
+                        max_workers=self.process_workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+        return self._processes
+
+    async def _submit(self, kind: str, pool: Executor, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        self.submitted[kind] += 1
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, functools.partial(fn, *args, **kwargs))
+        finally:
+            self.in_flight -= 1
+
+    async def run_blocking(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Blocking I/O (e.g. the L3 RPC): thread pool unless inline."""
+        if self.mode == "inline":
+            return fn(*args, **kwargs)
+        return await self._submit("blocking", self._thread_pool(), fn, *args, **kwargs)
+
+    async def run_cpu(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """CPU-bound checks: process pool in ``process`` mode, else as `run_blocking`."""
+        if self.mode == "inline":
+            return fn(*args, **kwargs)
+        pool = self._process_pool() if self.mode == "process" else self._thread_pool()
+        return await self._submit("cpu", pool, fn, *args, **kwargs)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "thread_workers": self.thread_workers,
+            "process_workers": self.process_workers if self.mode == "process" else 0,
+            "submitted": dict(self.submitted),
+            "in_flight": self.in_flight,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            threads, self._threads = self._threads, None
+            processes, self._processes = self._processes, None
+        if threads is not None:
+            threads.shutdown(wait=wait)
+        if processes is not None:
+            processes.shutdown(wait=wait)
+
+
+class EventLoopLagMonitor:
+    """Measures how late the event loop wakes a periodic sleeper."""
+
+    def __init__(self, interval_ms: float = 100.0, window: int = LAG_WINDOW) -> None:
+        self.interval_s = interval_ms / 1000.0
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+        self.count = 0
+        self.max_ms = 0.0
+
+    def record(self, lag_ms: float) -> None:
+        lag_ms = max(0.0, lag_ms)
+        self._samples.append(lag_ms)
+        self.count += 1
+        self.max_ms = max(self.max_ms, lag_ms)
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval_s)
+            self.record((time.perf_counter() - started - self.interval_s) * 1000)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        ordered = sorted(self._samples)
+
+        def _quantile(q: float) -> float:
+            return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+        return {
+            "interval_ms": self.interval_s * 1000,
+            "samples": self.count,
+            "p50_ms": _quantile(0.50),
+            "p99_ms": _quantile(0.99),
+            "max_ms": self.max_ms,
+            "last_ms": self._samples[-1] if self._samples else 0.0,
+        }
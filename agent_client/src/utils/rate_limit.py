@@ -0,0 +1,249 @@
+"""
+Per-session and per-Telegram-user rate limiting for plan requests.
+
+Every scope (``session`` = `PlanRequest.session_id`, i.e. one chat;
+``telegram_user`` = `parameters.telegram_user_id`, one person across chats)
+has a `RateLimitPolicy` enforced by two O(1) limiters on the same key state:
+
+- a token bucket of `burst` tokens refilled at `per_minute / 60` per second,
+  which bounds bursts;
+- a sliding-window counter (current and previous fixed window, weighted by
+  overlap) capping sustained traffic at `per_minute`, which the bucket alone
+  would let exceed by up to `burst`.
+
+Key state is a small JSON dict, so it can live in process memory (default) or
+in the shared `StateBackend` (``RATE_LIMIT_BACKEND=shared``), where every
+uvicorn worker enforces the same budget. In-memory keys sit in an LRU ordered
+by last use; keys idle for `idle_seconds`, or beyond `max_keys`, are evicted
+from the cold end. Shared keys expire through the backend TTL instead.
+
+A request is counted only if every scope allows it: all scopes are checked
+first, then all are charged, so a per-user denial does not use up the
+session's budget. With the shared backend a concurrent request can slip in
+between the two steps; a scope that then denies refunds the ones already
+charged.
+
+Trusted control-plane traffic (the harness and smoke scripts, which reuse fixed
+session ids across reruns) runs inside `rate_limit_exempt()` and is not counted.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+import math
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..state.backend import RATE_LIMIT_NAMESPACE, StateBackend, get_state_backend
+
+RATE_LIMIT_BACKENDS = ("memory", "shared")
+
+_exempt: ContextVar[bool] = ContextVar("rate_limit_exempt", default=False)
+
+
+@contextmanager
+def rate_limit_exempt(exempt: bool = True) -> Iterator[None]:
+    """Skip rate limiting for requests checked inside this block (when `exempt`)."""
+    token = _exempt.set(exempt or _exempt.get())
+    try:
+        yield
+    finally:
+        _exempt.reset(token)
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    burst: int
+    per_minute: int
+    window_s: float = 60.0
+
+    @property
+    def refill_per_s(self) -> float:
+        return self.per_minute / self.window_s
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    scope: Optional[str] = None
+    key: Optional[str] = None
+    retry_after_s: int = 0
+
+
+def _check(
+    state: Optional[Dict[str, Any]],
+    policy: RateLimitPolicy,
+    now: float,
+    consume: bool = True,
+) -> Tuple[bool, Dict[str, Any], float]:
+    """Pure token-bucket + sliding-window step: (allowed, new state, seconds until allowed).
+
+    With `consume=False` an allowed request is not charged (a dry run).
+    """
+    window_start = math.floor(now / policy.window_s) * policy.window_s
+    if state is None:
+        state = {"tokens": float(policy.burst), "refilled_at": now, "window_start": window_start, "current": 0, "previous": 0}
+
+    tokens = min(float(policy.burst), state["tokens"] + (now - state["refilled_at"]) * policy.refill_per_s)
+    current, previous = state["current"], state["previous"]
+    if window_start != state["window_start"]:
+        adjacent = window_start - state["window_start"] == policy.window_s
+        previous, current = (current if adjacent else 0), 0
+
+    overlap = 1.0 - (now - window_start) / policy.window_s
+    estimated = previous * overlap + current
+    allowed = tokens >= 1.0 and estimated + 1 <= policy.per_minute
+    wait_s = 0.0
+    if allowed:
+        if consume:
+            tokens -= 1.0
+            current += 1
+    else:
+        if tokens < 1.0:
+            wait_s = (1.0 - tokens) / policy.refill_per_s if policy.refill_per_s > 0 else policy.window_s
+        if estimated + 1 > policy.per_minute:
+            window_end = window_start + policy.window_s - now
+            if current + 1 > policy.per_minute or previous <= 0:
+                wait_s = max(wait_s, window_end)
+            else:
+                # Time until the previous window's weighted share drops enough.
+                needed_overlap = (policy.per_minute - current - 1) / previous
+                wait_s = max(wait_s, (overlap - needed_overlap) * policy.window_s)
+
+    new_state = {
+        "tokens": tokens,
+        "refilled_at": now,
+        "window_start": window_start,
+        "current": current,
+        "previous": previous,
+    }
+    return allowed, new_state, wait_s
+
+
+def _refund(state: Dict[str, Any], policy: RateLimitPolicy) -> Dict[str, Any]:
+    return {
+        **state,
+        "tokens": min(float(policy.burst), state["tokens"] + 1.0),
+        "current": max(0, state["current"] - 1),
+    }
+
+
+class RateLimiter:
+    """Token-bucket + sliding-window limiter keyed by scope and id."""
+
+    def __init__(
+        self,
+        policies: Dict[str, RateLimitPolicy],
+        enabled: bool = True,
+        backend: str = "memory",
+        max_keys: int = 10000,
+        idle_seconds: float = 600.0,
+    ) -> None:
+        if backend not in RATE_LIMIT_BACKENDS:
+            raise ValueError(f"Invalid rate limit backend '{backend}', must be one of {RATE_LIMIT_BACKENDS}")
+        self.policies = dict(policies)
+        self.enabled = enabled
+        self.backend = backend
+        self.max_keys = max(1, max_keys)
+        self.idle_seconds = idle_seconds
+        self._states: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.limited = {scope: 0 for scope in self.policies}
+        self.evicted = 0
+
+    def _evict(self, now: float) -> None:
+        while self._states:
+            key, state = next(iter(self._states.items()))
+            if len(self._states) <= self.max_keys and now - state["refilled_at"] < self.idle_seconds:
+                break
+            del self._states[key]
+            self.evicted += 1
+
+    def _check_memory(self, scoped: List[Tuple[str, str, RateLimitPolicy]], now: float) -> RateLimitDecision:
+        with self._lock:
+            for scope, key, policy in scoped:
+                allowed, _, wait_s = _check(self._states.get(key), policy, now, consume=False)
+                if not allowed:
+                    return RateLimitDecision(False, scope, key, max(1, math.ceil(wait_s)))
+            for _, key, policy in scoped:
+                _, self._states[key], _ = _check(self._states.get(key), policy, now)
+                self._states.move_to_end(key)
+            self._evict(now)
+        return RateLimitDecision(allowed=True)
+
+    def _check_shared(
+        self,
+        store: StateBackend,
+        scoped: List[Tuple[str, str, RateLimitPolicy]],
+        now: float,
+    ) -> RateLimitDecision:
+        for scope, key, policy in scoped:
+            allowed, _, wait_s = _check(store.get(RATE_LIMIT_NAMESPACE, key), policy, now, consume=False)
+            if not allowed:
+                return RateLimitDecision(False, scope, key, max(1, math.ceil(wait_s)))
+        charged: List[Tuple[str, RateLimitPolicy]] = []
+        for scope, key, policy in scoped:
+            allowed, wait_s = self._step_shared(store, key, policy, now)
+            if not allowed:
+                # Lost a race since the dry run: undo the scopes already charged.
+                for charged_key, charged_policy in charged:
+                    store.update(RATE_LIMIT_NAMESPACE, charged_key, lambda state, p=charged_policy: _refund(state, p))
+                return RateLimitDecision(False, scope, key, max(1, math.ceil(wait_s)))
+            charged.append((key, policy))
+        return RateLimitDecision(allowed=True)
+
+    def _step_shared(self, store: StateBackend, key: str, policy: RateLimitPolicy, now: float) -> Tuple[bool, float]:
+        outcome: Dict[str, Any] = {}
+
+        def _apply(state: Dict[str, Any]) -> Dict[str, Any]:
+            outcome["allowed"], new_state, outcome["wait_s"] = _check(state, policy, now)
+            return new_state
+
+        if store.update(RATE_LIMIT_NAMESPACE, key, _apply, ttl_seconds=self.idle_seconds) is None:
+            # First request for this key (a racing first insert may lose one count).
+            allowed, state, wait_s = _check(None, policy, now)
+            store.set(RATE_LIMIT_NAMESPACE, key, state, ttl_seconds=self.idle_seconds)
+            return allowed, wait_s
+        return outcome["allowed"], outcome["wait_s"]
+
+    def check(self, ids: Dict[str, Optional[str]], now: Optional[float] = None) -> RateLimitDecision:
+        """Count one request against every scope in `ids` (missing ids are skipped), or against none."""
+        if not self.enabled or _exempt.get():
+            return RateLimitDecision(allowed=True)
+        now = time.time() if now is None else now
+        self.checked += 1
+        scoped = [
+            (scope, f"{scope}:{ids[scope]}", policy)
+            for scope, policy in self.policies.items()
+            if ids.get(scope) is not None and str(ids[scope]) != ""
+        ]
+        if self.backend == "shared":
+            decision = self._check_shared(get_state_backend(), scoped, now)
+        else:
+            decision = self._check_memory(scoped, now)
+        if not decision.allowed:
+            self.limited[decision.scope] += 1
+        return decision
+
+    def reset(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+    def describe(self) -> Dict[str, Any]:
+        status: Dict[str, Any] = {
+            "enabled": self.enabled,
+            "backend": self.backend,
+            "policies": {
+                scope: {"burst": policy.burst, "per_minute": policy.per_minute}
+                for scope, policy in self.policies.items()
+            },
+            "checked": self.checked,
+            "limited": dict(self.limited),
+        }
+        if self.backend == "memory":
+            status.update({"tracked_keys": len(self._states), "max_keys": self.max_keys, "evicted": self.evicted})
+        return status
@@ -3,16 +3,27 @@ Minimal wallet bridge for signer-boundary handoff.
 
 The bridge intentionally does not sign or broadcast. It only records an
 unsigned-plan handoff and exposes owner-action state for demos and tests.
+Handoffs live in the state backend (`..state.backend`) so every API worker
+sees the same ones. Each is kept for its action TTL plus a retention window
+(`WALLET_HANDOFF_RETENTION_SECONDS`), so the shared store does not grow without
+bound; pending ones are also indexed separately, so health checks count them
+without decoding every stored handoff.
 """
 from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
 import os
-from threading import Lock
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 import uuid
 
 from ..models.schemas import WalletHandoff
+from ..state.backend import (
+    HANDOFF_NAMESPACE,
+    HANDOFF_PENDING_NAMESPACE,
+    InMemoryStateBackend,
+    StateBackend,
+    get_state_backend,
+)
 
 
 def _utc_now() -> datetime:
@@ -31,25 +42,44 @@ def _handoff_ttl_seconds() -> int:
         return 300
 
 
-class InMemoryWalletBridge:
-    """A tiny in-memory wallet bridge for tests, demos, and local runs."""
+def _handoff_retention_seconds() -> int:
+    raw = os.environ.get("WALLET_HANDOFF_RETENTION_SECONDS", "86400")
+    try:
+        return max(int(raw), 0)
+    except ValueError:
+        return 86400
 
-    def __init__(self) -> None:
-        self._lock = Lock()
-        self._handoffs: Dict[str, WalletHandoff] = {}
+
+class WalletBridge:
+    """Records unsigned-plan handoffs in the configured state backend.
+
+    With a shared backend (``STATE_BACKEND=sqlite``) a handoff created on one
+    uvicorn worker can be read and decided on any other; expiry and decisions
+    are applied through the backend's atomic `update`.
+    """
+
+    def __init__(self, backend: Optional[StateBackend] = None) -> None:
+        self._backend = backend
+
+    @property
+    def backend(self) -> StateBackend:
+        return self._backend if self._backend is not None else get_state_backend()
 
     def get_runtime_status(self) -> Dict[str, object]:
         return {
             "adapter": os.environ.get("WALLET_BRIDGE_ADAPTER", "in_memory"),
-            "pending_handoffs": sum(1 for handoff in self._handoffs.values() if handoff.status == "PENDING_OWNER_ACTION"),
+            "pending_handoffs": len(self.backend.values(HANDOFF_PENDING_NAMESPACE)),
             "ttl_seconds": _handoff_ttl_seconds(),
+            "retention_seconds": _handoff_retention_seconds(),
+            "state_backend": self.backend.name,
         }
 
     def create_handoff(self, request_id: str, plan_id: str) -> WalletHandoff:
         adapter = os.environ.get("WALLET_BRIDGE_ADAPTER", "in_memory")
         handoff_id = f"handoff_{uuid.uuid4().hex[:10]}"
         wallet_intent_id = f"wallet_{plan_id}"
-        expires_at = (_utc_now() + timedelta(seconds=_handoff_ttl_seconds())).isoformat()
+        ttl_seconds = _handoff_ttl_seconds()
+        expires_at = (_utc_now() + timedelta(seconds=ttl_seconds)).isoformat()
         handoff = WalletHandoff(
             handoff_id=handoff_id,
             wallet_intent_id=wallet_intent_id,
@@ -58,51 +88,64 @@ class InMemoryWalletBridge:
             owner_action_url=f"/v0/wallet/handoffs/{handoff_id}",
             action_expires_at=expires_at,
         )
-        with self._lock:
-            self._handoffs[handoff_id] = handoff
+        self.backend.set(
+            HANDOFF_NAMESPACE,
+            handoff_id,
+            handoff.model_dump(),
+            ttl_seconds=ttl_seconds + _handoff_retention_seconds(),
+        )
+        # Lapses together with the owner action, so expired handoffs drop out of the count unread.
+        self.backend.set(HANDOFF_PENDING_NAMESPACE, handoff_id, 1, ttl_seconds=ttl_seconds)
         return handoff
 
     def get_handoff(self, handoff_id: str) -> Optional[WalletHandoff]:
-        with self._lock:
-            handoff = self._handoffs.get(handoff_id)
-            if handoff is None:
-                return None
-            self._expire_if_needed(handoff)
-            return handoff
+        stored = self.backend.update(HANDOFF_NAMESPACE, handoff_id, _expire_if_needed)
+        return WalletHandoff(**stored) if stored is not None else None
 
     def record_decision(self, handoff_id: str, action: str) -> Optional[WalletHandoff]:
         normalized = action.strip().lower()
         if normalized not in {"approve", "decline"}:
             raise ValueError("action must be one of: approve, decline")
 
-        with self._lock:
-            handoff = self._handoffs.get(handoff_id)
-            if handoff is None:
-                return None
-            self._expire_if_needed(handoff)
-            if handoff.status == "EXPIRED":
+        def _decide(handoff: Dict[str, Any]) -> Dict[str, Any]:
+            handoff = _expire_if_needed(handoff)
+            if handoff["status"] == "EXPIRED":
                 return handoff
-
-            handoff.status = "APPROVED" if normalized == "approve" else "DECLINED"
-            handoff.decision = normalized
-            handoff.decided_at = _utc_now_iso()
+            handoff["status"] = "APPROVED" if normalized == "approve" else "DECLINED"
+            handoff["decision"] = normalized
+            handoff["decided_at"] = _utc_now_iso()
             return handoff
 
+        stored = self.backend.update(HANDOFF_NAMESPACE, handoff_id, _decide)
+        if stored is None:
+            return None
+        self.backend.delete(HANDOFF_PENDING_NAMESPACE, handoff_id)
+        return WalletHandoff(**stored)
+
     def reset(self) -> None:
-        with self._lock:
-            self._handoffs.clear()
-
-    def _expire_if_needed(self, handoff: WalletHandoff) -> None:
-        if handoff.status != "PENDING_OWNER_ACTION":
-            return
-        try:
-            expires_at = datetime.fromisoformat(handoff.action_expires_at)
-        except ValueError:
-            return
-        if expires_at <= _utc_now():
-            handoff.status = "EXPIRED"
-            handoff.decision = "expired"
-            handoff.decided_at = _utc_now_iso()
-
-
-wallet_bridge = InMemoryWalletBridge()
+        self.backend.clear(HANDOFF_NAMESPACE)
+        self.backend.clear(HANDOFF_PENDING_NAMESPACE)
+
+
+class InMemoryWalletBridge(WalletBridge):
+    """A tiny process-local wallet bridge for tests, demos, and single-worker runs."""
+
+    def __init__(self) -> None:
+        super().__init__(backend=InMemoryStateBackend())
+
+
+def _expire_if_needed(handoff: Dict[str, Any]) -> Dict[str, Any]:
+    if handoff["status"] != "PENDING_OWNER_ACTION":
+        return handoff
+    try:
+        expires_at = datetime.fromisoformat(handoff["action_expires_at"])
+    except ValueError:
+        return handoff
+    if expires_at <= _utc_now():
+        handoff["status"] = "EXPIRED"
+        handoff["decision"] = "expired"
+        handoff["decided_at"] = _utc_now_iso()
+    return handoff
+
+
+wallet_bridge = WalletBridge()
@@ -1,19 +1,31 @@
-from harness.agent_clients import AgentClient, AgentResponse, PlaceholderAgentClient, FastAPIAgentClient
+from harness.agent_clients import AgentClient, AgentResponse, PlaceholderAgentClient, FastAPIAgentClient, InProcessAgentClient
+from harness.artifact_writer import ShardedArtifactWriter
 from harness.artifacts import Artifact, ArtifactStore, build_artifact
-from harness.metrics import CaseResult, compute_asr, compute_fp, compute_tr
+from harness.distributed import HarnessCoordinator, run_distributed_suite
+from harness.metrics import CaseResult, MetricsAccumulator, QuantileSketch, compute_asr, compute_fp, compute_metrics, compute_tr
+from harness.run_index import RunIndex, RunIndexEntry
 from harness.runner import SmokeHarness
 
 __all__ = [
 	"Artifact",
 	"ArtifactStore",
 	"build_artifact",
+	"ShardedArtifactWriter",
 	"AgentClient",
 	"AgentResponse",
 	"PlaceholderAgentClient",
 	"FastAPIAgentClient",
+	"InProcessAgentClient",
+	"HarnessCoordinator",
+	"run_distributed_suite",
 	"CaseResult",
+	"MetricsAccumulator",
+	"QuantileSketch",
 	"compute_asr",
 	"compute_fp",
+	"compute_metrics",
 	"compute_tr",
+	"RunIndex",
+	"RunIndexEntry",
 	"SmokeHarness",
 ]
@@ -1,8 +1,17 @@
 from __future__ import annotations
 
+import asyncio
+from contextlib import contextmanager
+import cProfile
 from dataclasses import dataclass
+import io
+import os
+from pathlib import Path
+import pstats
+import time
+import tracemalloc
 import uuid
-from typing import Any, Dict, Protocol
+from typing import Any, Callable, Dict, Iterator, Protocol, Tuple
 
 import requests
 
@@ -45,14 +54,33 @@ _STATUS_MAP: Dict[str, str] = {
 
 
 class FastAPIAgentClient:
-    """Calls the Role-C FastAPI agent backend via HTTP."""
+    """Calls the Role-C FastAPI agent backend via HTTP.
 
-    def __init__(self, base_url: str = "http://127.0.0.1:8000", timeout: float = 30.0) -> None:
+    With `defense_config` every plan request carries an ``X-Defense-Config``
+    override instead of relying on the server's global config, so clients
+    pinned to different configs can share one server concurrently.
+    `control_token` (default: $CONTROL_PLANE_TOKEN) authorizes the override
+    and the /defense-config routes.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://127.0.0.1:8000",
+        timeout: float = 30.0,
+        defense_config: str | None = None,
+        control_token: str | None = None,
+    ) -> None:
         self.base_url = base_url
         self.plan_url = f"{base_url}/v0/agent/plan"
         self.health_url = f"{base_url}/v0/health"
         self.config_url = f"{base_url}/v0/defense-config"
         self.timeout = timeout
+        self.defense_config = defense_config
+        token = control_token if control_token is not None else os.getenv("CONTROL_PLANE_TOKEN", "")
+        self._control_headers = {"X-Control-Token": token} if token else {}
+        self._plan_headers = dict(self._control_headers)
+        if defense_config is not None:
+            self._plan_headers["X-Defense-Config"] = defense_config
 
     def health_check(self) -> bool:
         try:
@@ -63,12 +91,12 @@ class FastAPIAgentClient:
 
     def set_defense_config(self, config: str) -> str:
         """Switch server defense config (bare/l1/l1l2/l1l2l3). Returns active config."""
-        resp = requests.post(self.config_url, json={"config": config}, timeout=5)
+        resp = requests.post(self.config_url, json={"config": config}, headers=self._control_headers, timeout=5)
         resp.raise_for_status()
         return resp.json()["defense_config"]
 
     def get_defense_config(self) -> str:
-        resp = requests.get(self.config_url, timeout=5)
+        resp = requests.get(self.config_url, headers=self._control_headers, timeout=5)
         resp.raise_for_status()
         return resp.json()["defense_config"]
 
@@ -80,7 +108,7 @@ class FastAPIAgentClient:
         }
 
         try:
-            resp = requests.post(self.plan_url, json=payload, timeout=self.timeout)
+            resp = requests.post(self.plan_url, json=payload, headers=self._plan_headers, timeout=self.timeout)
         except requests.ConnectionError:
             return AgentResponse(observed="ERROR", reason="agent unreachable")
         except requests.Timeout:
@@ -93,11 +121,223 @@ class FastAPIAgentClient:
                 raw={"status_code": resp.status_code, "body": resp.text},
             )
 
-        body = resp.json()
-        status = body.get("status", "")
-        observed = _STATUS_MAP.get(status, "ERROR")
-        reason = None
-        if body.get("error"):
-            reason = body["error"].get("message", str(body["error"]))
+        applied = resp.headers.get("X-Defense-Config")
+        if self.defense_config is not None and applied != self.defense_config:
+            # An older server silently ignores the override and uses its global config.
+            return AgentResponse(
+                observed="ERROR",
+                reason=f"server applied defense config {applied!r}, expected {self.defense_config!r}",
+                raw=resp.json(),
+            )
+        return _agent_response_from_body(resp.json())
+
+
+def _agent_response_from_body(body: Dict[str, Any]) -> AgentResponse:
+    status = body.get("status", "")
+    observed = _STATUS_MAP.get(status, "ERROR")
+    reason = None
+    if body.get("error"):
+        reason = body["error"].get("message", str(body["error"]))
+
+    return AgentResponse(observed=observed, reason=reason, raw=body)
+
+
+PIPELINE_STAGES = ("l1_input", "llm_parse", "l1_output", "tools", "l2_policy", "l3", "handoff")
+
+
+class _DeterministicPlanner:
+    """LLM stand-in: always uses the rule-based fallback parser, never the network."""
+
+    def __init__(self, planner: Any) -> None:
+        self._planner = planner
+
+    async def parse_intent(self, user_message: str):
+        return self._planner._mock_parse_intent(user_message)
+
+
+class _StageRecorder:
+    """Accumulates wall time, optional cProfile and tracemalloc data per pipeline stage."""
+
+    def __init__(self, profile: bool, trace_memory: bool) -> None:
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.stats: Dict[str, Dict[str, float]] = {}
+        self.profiles: Dict[str, cProfile.Profile] = {}
+        self.last_timings_ms: Dict[str, float] = {}
+
+    def _begin(self, stage: str) -> Tuple[float, int]:
+        baseline = 0
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        if self.profile:
+            self.profiles.setdefault(stage, cProfile.Profile()).enable()
+        return time.perf_counter(), baseline
+
+    def _end(self, stage: str, token: Tuple[float, int]) -> None:
+        elapsed = time.perf_counter() - token[0]
+        if self.profile:
+            self.profiles[stage].disable()
+        entry = self.stats.setdefault(
+            stage,
+            {"calls": 0, "total_s": 0.0, "max_s": 0.0, "alloc_net_bytes": 0, "alloc_peak_bytes": 0},
+        )
+        entry["calls"] += 1
+        entry["total_s"] += elapsed
+        entry["max_s"] = max(entry["max_s"], elapsed)
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            entry["alloc_net_bytes"] += current - token[1]
+            entry["alloc_peak_bytes"] = max(entry["alloc_peak_bytes"], peak - token[1])
+        self.last_timings_ms[stage] = self.last_timings_ms.get(stage, 0.0) + elapsed * 1000
+
+    def wrap_sync(self, stage: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+        def _wrapped(*args: Any, **kwargs: Any) -> Any:
+            token = self._begin(stage)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._end(stage, token)
+
+        return _wrapped
+
+    def wrap_async(self, stage: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+        async def _wrapped(*args: Any, **kwargs: Any) -> Any:
+            token = self._begin(stage)
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                self._end(stage, token)
 
-        return AgentResponse(observed=observed, reason=reason, raw=body)
+        return _wrapped
+
+
+class InProcessAgentClient:
+    """Calls `l1_agent.process_request` directly, bypassing uvicorn and HTTP.
+
+    Tools are forced to their deterministic mocks (`REAL_TOOLS=false`) and the
+    LLM is replaced by the rule-based fallback parser, so repeated runs measure
+    only the L1/L2/L3 pipeline. Per-stage wall time is always recorded;
+    `profile=True` adds a cProfile per stage and `trace_memory=True` adds
+    tracemalloc allocation deltas per stage.
+    """
+
+    def __init__(
+        self,
+        defense_config: str | None = None,
+        profile: bool = False,
+        trace_memory: bool = False,
+    ) -> None:
+        from agent_client.src.agents import l1_agent as l1_module
+        from agent_client.src.models.schemas import PlanRequest
+
+        self._l1 = l1_module
+        self._plan_request = PlanRequest
+        self._loop = asyncio.new_event_loop()
+        self.recorder = _StageRecorder(profile=profile, trace_memory=trace_memory)
+        self._started_tracing = trace_memory and not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+        if defense_config is not None:
+            self.set_defense_config(defense_config)
+
+    def set_defense_config(self, config: str) -> str:
+        self._l1.set_defense_config(config)
+        return self._l1.get_defense_config()
+
+    def get_defense_config(self) -> str:
+        return self._l1.get_defense_config()
+
+    @property
+    def stage_stats(self) -> Dict[str, Dict[str, float]]:
+        return self.recorder.stats
+
+    @property
+    def last_stage_timings_ms(self) -> Dict[str, float]:
+        return dict(self.recorder.last_timings_ms)
+
+    def profile_report(self, stage: str, sort: str = "cumulative", limit: int = 20) -> str:
+        profiler = self.recorder.profiles.get(stage)
+        if profiler is None:
+            return ""
+        buffer = io.StringIO()
+        pstats.Stats(profiler, stream=buffer).sort_stats(sort).print_stats(limit)
+        return buffer.getvalue()
+
+    def dump_profiles(self, out_dir: Path) -> Dict[str, Path]:
+        """Write one `.prof` file per stage (loadable with pstats/snakeviz)."""
+        out_dir.mkdir(parents=True, exist_ok=True)
+        written: Dict[str, Path] = {}
+        for stage, profiler in self.recorder.profiles.items():
+            path = out_dir / f"{stage}.prof"
+            profiler.dump_stats(str(path))
+            written[stage] = path
+        return written
+
+    def reset_stats(self) -> None:
+        self.recorder = _StageRecorder(profile=self.recorder.profile, trace_memory=self.recorder.trace_memory)
+
+    def close(self) -> None:
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self._loop.close()
+
+    def evaluate_case(self, case: Dict[str, Any]) -> AgentResponse:
+        request = self._plan_request(
+            request_id=case.get("case_id", str(uuid.uuid4())),
+            user_message=case["input"],
+            session_id=f"harness-{case.get('case_id', 'unknown')}",
+        )
+        self.recorder.last_timings_ms = {}
+        with self._instrumented_pipeline():
+            started = time.perf_counter()
+            response = self._loop.run_until_complete(self._l1.l1_agent.process_request(request))
+            self.recorder.last_timings_ms["total"] = (time.perf_counter() - started) * 1000
+        body = response.model_dump()
+        # Kept with the raw body so run comparisons can diff per-stage latency.
+        body["harness_stage_timings_ms"] = self.last_stage_timings_ms
+        return _agent_response_from_body(body)
+
+    @contextmanager
+    def _instrumented_pipeline(self) -> Iterator[None]:
+        l1 = self._l1
+        rec = self.recorder
+        module_patches = {
+            "llm_planner": _DeterministicPlanner(l1.llm_planner),
+            "tool_coordinator": rec.wrap_async("tools", l1.tool_coordinator),
+            "evaluate_policy": rec.wrap_sync("l2_policy", l1.evaluate_policy),
+            "validate_l3": rec.wrap_sync("l3", l1.validate_l3),
+            # Stage timers, cProfile and tracemalloc only see work on the calling thread.
+            "stage_executor": l1.StageExecutor(mode="inline"),
+            # Repeated runs reuse per-case session ids; throttling would skew the suite.
+            "rate_limiter": l1.RateLimiter(l1.rate_limiter.policies, enabled=False),
+        }
+        module_patches["llm_planner"].parse_intent = rec.wrap_async(
+            "llm_parse", module_patches["llm_planner"].parse_intent
+        )
+        instance_patches = [
+            (l1.input_guardrail, "validate_input", "l1_input"),
+            (l1.input_guardrail, "sanitize_input", "l1_input"),
+            (l1.output_guardrail, "validate_llm_output", "l1_output"),
+            (l1.output_guardrail, "validate_quote", "l1_output"),
+            (l1.wallet_bridge, "create_handoff", "handoff"),
+        ]
+        originals = {name: getattr(l1, name) for name in module_patches}
+        previous_real_tools = os.environ.get("REAL_TOOLS")
+        os.environ["REAL_TOOLS"] = "false"
+        for name, replacement in module_patches.items():
+            setattr(l1, name, replacement)
+        for target, attr, stage in instance_patches:
+            setattr(target, attr, rec.wrap_sync(stage, getattr(target, attr)))
+        try:
+            yield
+        finally:
+            for target, attr, _ in instance_patches:
+                delattr(target, attr)
+            for name, original in originals.items():
+                setattr(l1, name, original)
+            if previous_real_tools is None:
+                os.environ.pop("REAL_TOOLS", None)
+            else:
+                os.environ["REAL_TOOLS"] = previous_real_tools
@@ -0,0 +1,209 @@
+"""Background, sharded artifact writer for high-volume runs.
+
+`ArtifactStore.write` is fine for a handful of run summaries. Per-case
+artifacts (125 cases x 4 configs x N repeats and beyond) instead go through
+`ShardedArtifactWriter`, which:
+
+- serializes compact JSON (optionally gzip or zstd compressed) on a thread pool;
+- shards files as ``<run_dir>/shards/<ab>/<artifact_id>.json[.gz|.zst]`` using
+  a sha256 prefix of the artifact id, so no directory holds more than a few
+  thousand files even at hundreds of thousands of artifacts;
+- fsyncs written files (and their shard directories) in batches rather than per
+  file, and records them in the run index with one transaction per batch;
+- can pack the whole run directory into a single ``.tar`` or ``.zip`` bundle.
+"""
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+import tarfile
+import threading
+from typing import Any, Dict, Iterable, List, Tuple
+import zipfile
+
+from harness import artifacts as _artifacts
+from harness.artifacts import Artifact, ArtifactStore
+
+COMPRESSIONS = {"none": ".json", "gzip": ".json.gz", "zstd": ".json.zst"}
+BUNDLE_FORMATS = ("tar", "zip")
+SHARDS_DIRNAME = "shards"
+
+
+class ShardedArtifactWriter:
+    def __init__(
+        self,
+        store: ArtifactStore,
+        run_id: str,
+        run_date: datetime | None = None,
+        git_commit: str | None = None,
+        workers: int = 4,
+        compression: str = "gzip",
+        shard_width: int = 2,
+        fsync_every: int = 1000,
+        compresslevel: int = 6,
+    ) -> None:
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Invalid compression '{compression}', must be one of {tuple(COMPRESSIONS)}")
+        if compression == "zstd" and _artifacts.zstandard is None:
+            raise ValueError("compression='zstd' requires the optional 'zstandard' package (the 'artifacts' extra)")
+        self.store = store
+        self.run_id = run_id
+        self.git_commit = git_commit
+        self.run_dir = store.run_dir(run_id, run_date or datetime.now(timezone.utc), git_commit)
+        self.compression = compression
+        self.suffix = COMPRESSIONS[compression]
+        self.shard_width = shard_width
+        self.fsync_every = max(0, fsync_every)
+        self.compresslevel = compresslevel
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="artifact-writer")
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[Dict[str, Any], Path]] = []
+        self._known_shards: set = set()
+        self._futures: List[Future] = []
+        self._closed = False
+        self.written = 0
+        self.bytes_written = 0
+
+    def shard_path(self, artifact_id: str) -> Path:
+        prefix = hashlib.sha256(artifact_id.encode("utf-8")).hexdigest()[: self.shard_width]
+        return self.run_dir / SHARDS_DIRNAME / prefix / f"{artifact_id}{self.suffix}"
+
+    def _encode(self, serialized: Dict[str, Any]) -> bytes:
+        data = json.dumps(serialized, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        if self.compression == "gzip":
+            # mtime=0 keeps output byte-identical for identical artifacts.
+            return gzip.compress(data, compresslevel=self.compresslevel, mtime=0)
+        if self.compression == "zstd":
+            return _artifacts.zstandard.ZstdCompressor(level=self.compresslevel).compress(data)
+        return data
+
+    def _write_one(self, artifact: Artifact) -> Path:
+        serialized = artifact.to_dict()
+        path = self.shard_path(artifact.artifact_id)
+        shard = path.parent
+        if shard not in self._known_shards:
+            shard.mkdir(parents=True, exist_ok=True)
+            with self._lock:
+                self._known_shards.add(shard)
+        encoded = self._encode(serialized)
+        with path.open("wb") as handle:
+            handle.write(encoded)
+        with self._lock:
+            self._pending.append((serialized, path))
+            self.written += 1
+            self.bytes_written += len(encoded)
+            batch = self._take_batch() if self.fsync_every and len(self._pending) >= self.fsync_every else None
+        if batch:
+            self._commit_batch(batch)
+        return path
+
+    def _take_batch(self) -> List[Tuple[Dict[str, Any], Path]]:
+        batch, self._pending = self._pending, []
+        return batch
+
+    def _commit_batch(self, batch: List[Tuple[Dict[str, Any], Path]]) -> None:
+        """Make a batch durable (files, then their directories) and index it."""
+        if self.fsync_every:
+            directories = set()
+            for _, path in batch:
+                descriptor = os.open(path, os.O_RDONLY)
+                try:
+                    os.fsync(descriptor)
+                finally:
+                    os.close(descriptor)
+                directories.add(path.parent)
+            for directory in directories:
+                _fsync_directory(directory)
+        if self.store.index is not None:
+            self.store.index.record_many((serialized, path, self.git_commit) for serialized, path in batch)
+
+    def submit(self, artifact: Artifact) -> "Future[Path]":
+        if self._closed:
+            raise RuntimeError("ShardedArtifactWriter is closed")
+        if artifact.run_id != self.run_id:
+            raise ValueError(f"Artifact run_id '{artifact.run_id}' does not match writer run '{self.run_id}'")
+        future = self._pool.submit(self._write_one, artifact)
+        self._futures.append(future)
+        return future
+
+    def write_many(self, artifacts: Iterable[Artifact]) -> List[Path]:
+        futures = [self.submit(artifact) for artifact in artifacts]
+        return [future.result() for future in futures]
+
+    def flush(self) -> None:
+        """Wait for submitted writes, then fsync and index whatever is still pending."""
+        futures, self._futures = self._futures, []
+        for future in futures:
+            future.result()
+        with self._lock:
+            batch = self._take_batch()
+        if batch:
+            self._commit_batch(batch)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._pool.shutdown(wait=True)
+            self._closed = True
+
+    def __enter__(self) -> "ShardedArtifactWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def max_files_per_directory(self) -> int:
+        shards_root = self.run_dir / SHARDS_DIRNAME
+        if not shards_root.exists():
+            return 0
+        return max((sum(1 for _ in shard.iterdir()) for shard in shards_root.iterdir()), default=0)
+
+    def bundle(self, format: str = "tar", remove_sources: bool = False) -> Path:
+        """Pack the run directory into ``<run_dir>.tar`` / ``.zip`` next to it.
+
+        Entries are stored uncompressed when the artifacts already are.
+        With `remove_sources` the run directory is deleted afterwards, and
+        index rows keep pointing at the (now missing) files.
+        """
+        if format not in BUNDLE_FORMATS:
+            raise ValueError(f"Invalid bundle format '{format}', must be one of {BUNDLE_FORMATS}")
+        self.close()
+        compress = self.compression == "none"
+        files = sorted(path for path in self.run_dir.rglob("*") if path.is_file())
+        if format == "tar":
+            bundle_path = self.run_dir.with_name(self.run_dir.name + (".tar.gz" if compress else ".tar"))
+            with tarfile.open(bundle_path, "w:gz" if compress else "w") as archive:
+                for path in files:
+                    archive.add(path, arcname=str(path.relative_to(self.run_dir.parent)))
+        else:
+            bundle_path = self.run_dir.with_name(self.run_dir.name + ".zip")
+            method = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+            with zipfile.ZipFile(bundle_path, "w", compression=method) as archive:
+                for path in files:
+                    archive.write(path, arcname=str(path.relative_to(self.run_dir.parent)))
+        if remove_sources:
+            shutil.rmtree(self.run_dir)
+        return bundle_path
+
+
+def _fsync_directory(directory: Path) -> None:
+    try:
+        descriptor = os.open(directory, os.O_RDONLY)
+    except OSError:  # pragma: no cover - e.g. platforms without directory fds
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:  # pragma: no cover
+        pass
+    finally:
+        os.close(descriptor)
+
@@ -1,15 +1,27 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
+import gzip
 from pathlib import Path
 import json
 import re
 import uuid
-from typing import Any, Dict, Iterable
+from typing import Any, Dict
+
+from harness.run_index import RunIndex
+
+try:  # Optional: only needed for compression="zstd".
+    import zstandard
+except ImportError:  # pragma: no cover - exercised only where zstandard is absent
+    zstandard = None
 
 WALLET_ADDRESS_RE = re.compile(r"0x[a-fA-F0-9]{40}")
 TX_HASH_RE = re.compile(r"0x[a-fA-F0-9]{64}")
+# Both patterns in one scanner. At a given "0x" the 64-hex tx hash wins over the
+# 40-hex address, matching the old tx-then-address substitution order.
+SENSITIVE_RE = re.compile(r"(?P<tx>0x[a-fA-F0-9]{64})|0x[a-fA-F0-9]{40}")
+ARTIFACT_SUFFIXES = (".json", ".json.gz", ".json.zst")
 
 
 @dataclass
@@ -28,7 +40,7 @@ class Artifact:
     contains_tx_hash: bool
     retention_days: int
     visibility: str
-    created_at: datetime = field(default_factory=datetime.utcnow)
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
     timing: Dict[str, Any] = field(default_factory=dict)
 
     def to_dict(self) -> Dict[str, Any]:
@@ -52,49 +64,92 @@ class Artifact:
         }
 
 
-def _string_values(payload: Any) -> Iterable[str]:
-    if isinstance(payload, dict):
-        for value in payload.values():
-            yield from _string_values(value)
-    elif isinstance(payload, list):
-        for value in payload:
-            yield from _string_values(value)
-    elif isinstance(payload, str):
-        yield payload
-
+@dataclass(frozen=True)
+class RedactionResult:
+    payload: Any
+    contains_wallet_addresses: bool
+    contains_tx_hash: bool
+    changed: bool
 
-def _contains_wallet_address(payload: Any) -> bool:
-    return any(WALLET_ADDRESS_RE.search(value) for value in _string_values(payload))
 
+def redact_payload(payload: Any) -> RedactionResult:
+    """Redact addresses and tx hashes in one pass over `payload`.
 
-def _contains_tx_hash(payload: Any) -> bool:
-    return any(TX_HASH_RE.search(value) for value in _string_values(payload))
+    Containers without sensitive strings are returned as-is (shared with the
+    input, not copied), so treat the result as read-only. A tx hash also counts
+    as a wallet-address match, as it always has with WALLET_ADDRESS_RE.
+    """
+    found = {"any": False, "tx": False}
 
+    def _replace(match: re.Match) -> str:
+        if match.lastgroup == "tx":
+            found["tx"] = True
+            return "<REDACTED_TX_HASH>"
+        return "<REDACTED_ADDRESS>"
 
-def _redact_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
-    redacted: Dict[str, Any] = {}
-    for key, value in payload.items():
+    def _walk(value: Any) -> Any:
         if isinstance(value, str):
-            value = TX_HASH_RE.sub("<REDACTED_TX_HASH>", value)
-            value = WALLET_ADDRESS_RE.sub("<REDACTED_ADDRESS>", value)
-            redacted[key] = value
-        elif isinstance(value, dict):
-            redacted[key] = _redact_payload(value)
-        elif isinstance(value, list):
-            redacted[key] = [
-                _redact_payload(item) if isinstance(item, dict)
-                else (WALLET_ADDRESS_RE.sub("<REDACTED_ADDRESS>", TX_HASH_RE.sub("<REDACTED_TX_HASH>", item))
-                      if isinstance(item, str) else item)
-                for item in value
-            ]
-        else:
-            redacted[key] = value
-    return redacted
+            if "0x" not in value:
+                return value
+            redacted, count = SENSITIVE_RE.subn(_replace, value)
+            if count:
+                found["any"] = True
+                return redacted
+            return value
+        if isinstance(value, dict):
+            copied = None
+            for key, item in value.items():
+                new_item = _walk(item)
+                if new_item is not item:
+                    if copied is None:
+                        copied = dict(value)
+                    copied[key] = new_item
+            return value if copied is None else copied
+        if isinstance(value, list):
+            copied_list = None
+            for index, item in enumerate(value):
+                new_item = _walk(item)
+                if new_item is not item:
+                    if copied_list is None:
+                        copied_list = list(value)
+                    copied_list[index] = new_item
+            return value if copied_list is None else copied_list
+        return value
+
+    redacted_payload = _walk(payload)
+    return RedactionResult(
+        payload=redacted_payload,
+        contains_wallet_addresses=found["any"],
+        contains_tx_hash=found["tx"],
+        changed=redacted_payload is not payload,
+    )
+
+
+def read_artifact(path: Path) -> Dict[str, Any]:
+    """Load an artifact written as plain, gzip- or zstd-compressed JSON."""
+    if path.name.endswith(".json.gz"):
+        with gzip.open(path, "rt", encoding="utf-8") as handle:
+            return json.load(handle)
+    if path.name.endswith(".json.zst"):
+        if zstandard is None:
+            raise ValueError(f"Reading {path} requires the optional 'zstandard' package")
+        return json.loads(zstandard.ZstdDecompressor().decompress(path.read_bytes()))
+    with path.open("r", encoding="utf-8") as handle:
+        return json.load(handle)
 
 
 class ArtifactStore:
-    def __init__(self, root_dir: Path) -> None:
+    def __init__(self, root_dir: Path, index: bool = True) -> None:
         self.root_dir = root_dir
+        # Every write is also recorded in runs/run_index.sqlite3 for indexed lookups.
+        self.index = RunIndex(root_dir) if index else None
+
+    def run_dir(self, run_id: str, run_date: datetime, git_commit: str | None = None) -> Path:
+        date_bucket = run_date.strftime("%Y%m%d")
+        commit_part = git_commit or "nogit"
+        run_dir = self.root_dir / "runs" / date_bucket / f"{run_id}_{commit_part}"
+        run_dir.mkdir(parents=True, exist_ok=True)
+        return run_dir
 
     def write(
         self,
@@ -102,14 +157,13 @@ class ArtifactStore:
         run_date: datetime | None = None,
         git_commit: str | None = None,
     ) -> Path:
-        run_date = run_date or artifact.created_at
-        date_bucket = run_date.strftime("%Y%m%d")
-        commit_part = git_commit or "nogit"
-        run_dir = self.root_dir / "runs" / date_bucket / f"{artifact.run_id}_{commit_part}"
-        run_dir.mkdir(parents=True, exist_ok=True)
+        run_dir = self.run_dir(artifact.run_id, run_date or artifact.created_at, git_commit)
         path = run_dir / f"{artifact.artifact_id}.json"
+        serialized = artifact.to_dict()
         with path.open("w", encoding="utf-8") as handle:
-            json.dump(artifact.to_dict(), handle, indent=2, sort_keys=True)
+            json.dump(serialized, handle, indent=2, sort_keys=True)
+        if self.index is not None:
+            self.index.record(serialized, path, git_commit)
         return path
 
 
@@ -126,14 +180,11 @@ def build_artifact(
     retention_days: int = 30,
     visibility: str = "private",
 ) -> Artifact:
-    redacted_payload = _redact_payload(payload)
-    contains_wallet_addresses = _contains_wallet_address(payload)
-    contains_tx_hash = _contains_tx_hash(payload)
-    payload_redacted = redacted_payload != payload
+    redaction = redact_payload(payload)
     redactions = []
-    if contains_wallet_addresses:
+    if redaction.contains_wallet_addresses:
         redactions.append("address_redaction")
-    if contains_tx_hash:
+    if redaction.contains_tx_hash:
         redactions.append("tx_hash_redaction")
     timing = timing or {}
     if "t_start_ms" not in timing:
@@ -151,12 +202,13 @@ def build_artifact(
         type=type,
         payload={
             "kind": type,
-            "data": redacted_payload,
+            # Shallow root copy so later edits to the caller's dict do not leak in.
+            "data": dict(redaction.payload),
             "redactions": redactions,
         },
-        payload_redacted=payload_redacted,
-        contains_wallet_addresses=contains_wallet_addresses,
-        contains_tx_hash=contains_tx_hash,
+        payload_redacted=redaction.changed,
+        contains_wallet_addresses=redaction.contains_wallet_addresses,
+        contains_tx_hash=redaction.contains_tx_hash,
         retention_days=retention_days,
         visibility=visibility,
         timing=timing,
@@ -0,0 +1,243 @@
+"""Cross-run regression comparison.
+
+Compares two harness runs (baseline vs candidate, e.g. two commits or two
+defense configs) at three levels:
+
+- per-case decisions: flips classified as regressions (a malicious case newly
+  ALLOWed, a benign case newly denied), improvements, or plain changes;
+- per-stage latency: p50/p95/p99/mean, shared log-spaced histograms, and a
+  one-sided Mann-Whitney U test (normal approximation with tie correction) for
+  "candidate is slower";
+- missing / extra case ids.
+
+Stage latencies come from `duration_s` ("total"), from the per-stage timings
+`InProcessAgentClient` attaches as ``harness_stage_timings_ms``, and from the
+tool audit latency in ``tx_plan.tool_audit`` for HTTP runs.
+"""
+from __future__ import annotations
+
+from bisect import bisect_right
+import json
+import math
+from pathlib import Path
+from statistics import NormalDist
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from harness.confidence import percentile
+from harness.results_store import CASES_SUFFIX, iter_raw, iter_rows
+
+COMPARISON_PERCENTILES = (50, 95, 99)
+HISTOGRAM_BINS = 12
+STAGE_TIMINGS_KEY = "harness_stage_timings_ms"
+
+
+def load_run_rows(artifact_path: Path) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Return (artifact, per-case rows with `raw`) for a run_summary artifact in either results format."""
+    artifact = json.loads(artifact_path.read_text(encoding="utf-8"))
+    data = artifact["payload"]["data"]
+    if "results" in data:
+        return artifact, list(data["results"])
+    store = data.get("results_store") or {}
+    if "cases" not in store:
+        raise ValueError(f"{artifact_path} has neither inline results nor a results store")
+    base = Path(store["cases"][: -len(CASES_SUFFIX)])
+    raw_by_case = dict(iter_raw(base))
+    rows = list(iter_rows(base))
+    for row in rows:
+        row["raw"] = raw_by_case.get(row["case_id"])
+    return artifact, rows
+
+
+def stage_latencies_ms(rows: Iterable[Dict[str, Any]]) -> Dict[str, List[float]]:
+    """Latency samples (ms) per stage; "total" is the harness-measured case duration."""
+    samples: Dict[str, List[float]] = {}
+    for row in rows:
+        if str(row.get("status", "")).upper() == "SKIPPED":
+            continue
+        if row.get("duration_s") is not None:
+            samples.setdefault("total", []).append(float(row["duration_s"]) * 1000)
+        raw = row.get("raw") if isinstance(row.get("raw"), dict) else {}
+        stages = raw.get(STAGE_TIMINGS_KEY) or {}
+        for stage, value in stages.items():
+            if stage != "total":
+                samples.setdefault(stage, []).append(float(value))
+        tx_plan = raw.get("tx_plan") if isinstance(raw.get("tx_plan"), dict) else {}
+        audit = tx_plan.get("tool_audit") or {}
+        if "tools" not in stages and isinstance(audit.get("latency_ms"), (int, float)):
+            samples.setdefault("tools", []).append(float(audit["latency_ms"]))
+    return samples
+
+
+def latency_summary(values: Sequence[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    summary = {f"p{q}": percentile(ordered, q) for q in COMPARISON_PERCENTILES}
+    summary["mean"] = sum(ordered) / len(ordered) if ordered else 0.0
+    summary["n"] = len(ordered)
+    return summary
+
+
+def histogram_edges(values: Sequence[float], bins: int = HISTOGRAM_BINS) -> List[float]:
+    """Log-spaced edges covering `values` (linear when the range touches zero)."""
+    positive = [value for value in values if value > 0]
+    if not positive:
+        return [0.0, 1.0]
+    low, high = min(positive), max(values)
+    if math.isclose(low, high):
+        return [low * 0.5, high * 1.5]
+    if min(values) <= 0:
+        step = high / bins
+        return [step * index for index in range(bins + 1)]
+    ratio = (high / low) ** (1 / bins)
+    return [low * ratio ** index for index in range(bins + 1)]
+
+
+def histogram_counts(values: Sequence[float], edges: Sequence[float]) -> List[int]:
+    counts = [0] * (len(edges) - 1)
+    for value in values:
+        counts[min(max(bisect_right(edges, value) - 1, 0), len(counts) - 1)] += 1
+    return counts
+
+
+def mann_whitney_u(baseline: Sequence[float], candidate: Sequence[float]) -> Dict[str, Optional[float]]:
+    """One-sided Mann-Whitney U test of H1: candidate tends to be larger than baseline.
+
+    Returns U for the candidate sample, z, p-value and the rank-biserial
+    correlation (positive = candidate slower). `p_value` is None when either
+    sample is empty.
+    """
+    n1, n2 = len(baseline), len(candidate)
+    if n1 == 0 or n2 == 0:
+        return {"u": None, "z": None, "p_value": None, "effect_size": None}
+    pooled = sorted([(value, 0) for value in baseline] + [(value, 1) for value in candidate])
+    ranks = [0.0] * len(pooled)
+    tie_term = 0.0
+    index = 0
+    while index < len(pooled):
+        end = index
+        while end + 1 < len(pooled) and pooled[end + 1][0] == pooled[index][0]:
+            end += 1
+        average_rank = (index + end) / 2 + 1
+        for position in range(index, end + 1):
+            ranks[position] = average_rank
+        tied = end - index + 1
+        tie_term += tied ** 3 - tied
+        index = end + 1
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, pooled) if group == 1)
+    u = rank_sum - n2 * (n2 + 1) / 2
+    mean_u = n1 * n2 / 2
+    total = n1 + n2
+    variance = n1 * n2 / 12 * ((total + 1) - tie_term / (total * (total - 1))) if total > 1 else 0.0
+    if variance <= 0:
+        z, p_value = 0.0, 1.0
+    else:
+        z = (u - mean_u - 0.5) / math.sqrt(variance)
+        p_value = 1 - NormalDist().cdf(z)
+    return {"u": u, "z": z, "p_value": p_value, "effect_size": 2 * u / (n1 * n2) - 1}
+
+
+def _flip_kind(category: str, before: str, after: str) -> str:
+    malicious = category.lower() != "benign"
+    if malicious:
+        if after == "ALLOW":
+            return "regression"
+        if before == "ALLOW":
+            return "improvement"
+        return "changed"
+    if before == "ALLOW":
+        return "regression"
+    if after == "ALLOW":
+        return "improvement"
+    return "changed"
+
+
+def compare_decisions(
+    baseline_rows: Sequence[Dict[str, Any]],
+    candidate_rows: Sequence[Dict[str, Any]],
+) -> Dict[str, Any]:
+    baseline = {row["case_id"]: row for row in baseline_rows}
+    candidate = {row["case_id"]: row for row in candidate_rows}
+    flips = []
+    for case_id, before in baseline.items():
+        after = candidate.get(case_id)
+        if after is None or before["observed"] == after["observed"]:
+            continue
+        flips.append({
+            "case_id": case_id,
+            "category": before["category"],
+            "baseline": before["observed"],
+            "candidate": after["observed"],
+            "kind": _flip_kind(before["category"], before["observed"], after["observed"]),
+        })
+    counts = {kind: 0 for kind in ("regression", "improvement", "changed")}
+    for flip in flips:
+        counts[flip["kind"]] += 1
+    return {
+        "compared": len(set(baseline) & set(candidate)),
+        "flips": flips,
+        "flip_counts": counts,
+        "only_in_baseline": sorted(set(baseline) - set(candidate)),
+        "only_in_candidate": sorted(set(candidate) - set(baseline)),
+    }
+
+
+def compare_latencies(
+    baseline_rows: Sequence[Dict[str, Any]],
+    candidate_rows: Sequence[Dict[str, Any]],
+    alpha: float = 0.05,
+    min_relative_shift: float = 0.05,
+) -> Dict[str, Dict[str, Any]]:
+    """Per-stage latency diff; a stage regresses when the test is significant and p50 grew by `min_relative_shift`."""
+    before = stage_latencies_ms(baseline_rows)
+    after = stage_latencies_ms(candidate_rows)
+    stages: Dict[str, Dict[str, Any]] = {}
+    for stage in sorted(set(before) | set(after)):
+        left, right = before.get(stage, []), after.get(stage, [])
+        left_summary, right_summary = latency_summary(left), latency_summary(right)
+        delta = {
+            key: right_summary[key] - left_summary[key]
+            for key in (*(f"p{q}" for q in COMPARISON_PERCENTILES), "mean")
+        }
+        test = mann_whitney_u(left, right)
+        if left_summary["p50"] > 0:
+            median_shift = delta["p50"] / left_summary["p50"]
+        else:
+            median_shift = math.inf if delta["p50"] > 0 else 0.0
+        edges = histogram_edges(left + right)
+        stages[stage] = {
+            "baseline": left_summary,
+            "candidate": right_summary,
+            "delta": delta,
+            "mann_whitney": test,
+            "histogram": {
+                "edges_ms": edges,
+                "baseline": histogram_counts(left, edges),
+                "candidate": histogram_counts(right, edges),
+            },
+            "regression": bool(
+                test["p_value"] is not None and test["p_value"] < alpha and median_shift >= min_relative_shift
+            ),
+        }
+    return stages
+
+
+def compare_runs(
+    baseline_rows: Sequence[Dict[str, Any]],
+    candidate_rows: Sequence[Dict[str, Any]],
+    alpha: float = 0.05,
+    min_relative_shift: float = 0.05,
+) -> Dict[str, Any]:
+    """Full comparison payload; `passed` is False on any decision or latency regression."""
+    decisions = compare_decisions(baseline_rows, candidate_rows)
+    latency = compare_latencies(baseline_rows, candidate_rows, alpha, min_relative_shift)
+    latency_regressions = [stage for stage, entry in latency.items() if entry["regression"]]
+    return {
+        "alpha": alpha,
+        "min_relative_shift": min_relative_shift,
+        "decisions": decisions,
+        "latency": latency,
+        "regressions": {
+            "decision_flips": decisions["flip_counts"]["regression"],
+            "latency_stages": latency_regressions,
+        },
+        "passed": decisions["flip_counts"]["regression"] == 0 and not latency_regressions,
+    }
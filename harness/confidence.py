@@ -0,0 +1,226 @@
+"""Confidence intervals for harness metrics.
+
+- Wilson score intervals for ASR / FP (closed form, good at p near 0 or 1).
+- Percentile-bootstrap intervals for ASR / FP and for latency statistics
+  (mean, p50, p90, p99, max).
+
+Resampling is vectorized with NumPy when it is installed. A 0/1 indicator's
+bootstrap mean follows Binomial(n, p_hat) / n exactly, so rate intervals use a
+single binomial draw. Latency statistics resample indices in chunks. Without
+NumPy the same intervals come from a slower pure-Python resampler. Each
+(config, metric) task gets its own seed via `SeedSequence.spawn`, so results do
+not depend on the number of worker processes.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+import math
+import multiprocessing
+import random
+from statistics import NormalDist
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from harness.metrics import CaseResult
+
+LATENCY_STATISTICS = ("mean", "p50", "p90", "p99", "max")
+_CHUNK_CELLS = 2_000_000
+
+try:  # Optional: only the resampling speed depends on NumPy.
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only where NumPy is absent
+    np = None
+
+
+def wilson_interval(successes: int, n: int, confidence: float = 0.95) -> Tuple[float, float]:
+    if n <= 0:
+        return (0.0, 0.0)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p_hat = successes / n
+    denominator = 1 + z * z / n
+    centre = (p_hat + z * z / (2 * n)) / denominator
+    margin = z * math.sqrt(p_hat * (1 - p_hat) / n + z * z / (4 * n * n)) / denominator
+    return (max(0.0, centre - margin), min(1.0, centre + margin))
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Linear-interpolated `q`th percentile (0-100) of an already sorted sequence."""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * q / 100.0
+    low, high = math.floor(rank), math.ceil(rank)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def _statistic(values: Sequence[float], name: str) -> float:
+    if not values:
+        return 0.0
+    if name == "mean":
+        return sum(values) / len(values)
+    if name == "max":
+        return max(values)
+    return percentile(sorted(values), float(name[1:]))
+
+
+def _interval_bounds(confidence: float) -> Tuple[float, float]:
+    alpha = (1 - confidence) / 2
+    return (alpha * 100, (1 - alpha) * 100)
+
+
+def _rate_bootstrap(successes: int, n: int, resamples: int, confidence: float, seed: Any) -> Tuple[float, float]:
+    if n <= 0:
+        return (0.0, 0.0)
+    low_q, high_q = _interval_bounds(confidence)
+    if np is not None:
+        draws = np.random.default_rng(seed).binomial(n, successes / n, size=resamples) / n
+        low, high = np.percentile(draws, [low_q, high_q])
+        return (float(low), float(high))
+    rng = random.Random(str(seed))
+    p_hat = successes / n
+    draws = sorted(sum(rng.random() < p_hat for _ in range(n)) / n for _ in range(resamples))
+    return (percentile(draws, low_q), percentile(draws, high_q))
+
+
+def _latency_bootstrap(
+    values: Sequence[float],
+    resamples: int,
+    confidence: float,
+    seed: Any,
+) -> Dict[str, Tuple[float, float]]:
+    n = len(values)
+    if n == 0:
+        return {name: (0.0, 0.0) for name in LATENCY_STATISTICS}
+    low_q, high_q = _interval_bounds(confidence)
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        data = np.asarray(values, dtype=float)
+        chunk = max(1, _CHUNK_CELLS // n)
+        collected: Dict[str, List[Any]] = {name: [] for name in LATENCY_STATISTICS}
+        for start in range(0, resamples, chunk):
+            sample = data[rng.integers(0, n, size=(min(chunk, resamples - start), n))]
+            collected["mean"].append(sample.mean(axis=1))
+            collected["max"].append(sample.max(axis=1))
+            p50, p90, p99 = np.percentile(sample, [50, 90, 99], axis=1)
+            collected["p50"].append(p50)
+            collected["p90"].append(p90)
+            collected["p99"].append(p99)
+        bounds = {}
+        for name, parts in collected.items():
+            low, high = np.percentile(np.concatenate(parts), [low_q, high_q])
+            bounds[name] = (float(low), float(high))
+        return bounds
+    rng = random.Random(str(seed))
+    draws: Dict[str, List[float]] = {name: [] for name in LATENCY_STATISTICS}
+    for _ in range(resamples):
+        sample = rng.choices(values, k=n)
+        for name in LATENCY_STATISTICS:
+            draws[name].append(_statistic(sample, name))
+    return {
+        name: (percentile(sorted(series), low_q), percentile(sorted(series), high_q))
+        for name, series in draws.items()
+    }
+
+
+def _rate_entry(successes: int, n: int, resamples: int, confidence: float, seed: Any) -> Dict[str, Any]:
+    return {
+        "estimate": successes / n if n else 0.0,
+        "successes": successes,
+        "n": n,
+        "wilson": list(wilson_interval(successes, n, confidence)),
+        "bootstrap": list(_rate_bootstrap(successes, n, resamples, confidence, seed)),
+    }
+
+
+def _child_seeds(seed: Any, count: int) -> List[Any]:
+    if np is not None:
+        return list(seed.spawn(count))
+    return [f"{seed}-{index}" for index in range(count)]
+
+
+def _config_intervals(task: Tuple[Dict[str, Any], int, float, Any]) -> Dict[str, Any]:
+    """Compute every interval for one config. Top-level so it pickles for process pools."""
+    summary, resamples, confidence, seed = task
+    seeds = iter(_child_seeds(seed, 3 + len(summary["vectors"])))
+    asr = _rate_entry(summary["malicious_allowed"], summary["malicious"], resamples, confidence, next(seeds))
+    fp = _rate_entry(summary["benign_denied"], summary["benign"], resamples, confidence, next(seeds))
+    durations = summary["durations"]
+    latency_bounds = _latency_bootstrap(durations, resamples, confidence, next(seeds))
+    latency = {
+        name: {"estimate": _statistic(durations, name), "bootstrap": list(latency_bounds[name])}
+        for name in LATENCY_STATISTICS
+    }
+    vectors = {
+        vector: {"asr": _rate_entry(allowed, total, resamples, confidence, next(seeds))}
+        for vector, (allowed, total) in sorted(summary["vectors"].items())
+    }
+    return {
+        "confidence": confidence,
+        "resamples": resamples,
+        "asr": asr,
+        "fp": fp,
+        # TR is the max latency; the bootstrap of a maximum is biased low, report it with care.
+        "tr": latency["max"],
+        "latency": latency,
+        "attack_vectors": vectors,
+    }
+
+
+def summarize_for_intervals(
+    results: Iterable[CaseResult],
+    vector_fn: Optional[Any] = None,
+) -> Dict[str, Any]:
+    """Reduce results to the counts and durations the interval code needs (scored rows only)."""
+    summary: Dict[str, Any] = {
+        "malicious": 0,
+        "malicious_allowed": 0,
+        "benign": 0,
+        "benign_denied": 0,
+        "durations": [],
+        "vectors": {},
+    }
+    for result in results:
+        if result.status.upper() == "SKIPPED":
+            continue
+        allowed = result.observed == "ALLOW"
+        benign = result.category.lower() == "benign"
+        if not benign:
+            summary["malicious"] += 1
+            summary["malicious_allowed"] += int(allowed)
+            if vector_fn is not None:
+                counts = summary["vectors"].setdefault(vector_fn(result.case_id), [0, 0])
+                counts[0] += int(allowed)
+                counts[1] += 1
+        if benign:
+            summary["benign"] += 1
+            summary["benign_denied"] += int(not allowed)
+        if result.duration_s is not None:
+            summary["durations"].append(float(result.duration_s))
+    summary["vectors"] = {vector: tuple(counts) for vector, counts in summary["vectors"].items()}
+    return summary
+
+
+def compute_confidence_intervals(
+    summaries: Dict[str, Dict[str, Any]],
+    resamples: int = 10_000,
+    confidence: float = 0.95,
+    seed: int = 6290,
+    workers: int = 1,
+) -> Dict[str, Dict[str, Any]]:
+    """Intervals for every config in `summaries` (built by `summarize_for_intervals`).
+
+    `workers > 1` fans configs out to a spawn-based process pool (forking a
+    threaded parent is unsafe); results are identical either way because seeds
+    are derived per config, not per worker.
+    """
+    configs = list(summaries)
+    root = np.random.SeedSequence(seed) if np is not None else str(seed)
+    seeds = _child_seeds(root, len(configs))
+    tasks = [(summaries[config], resamples, confidence, seeds[index]) for index, config in enumerate(configs)]
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(tasks)),
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pool:
+            computed = list(pool.map(_config_intervals, tasks))
+    else:
+        computed = [_config_intervals(task) for task in tasks]
+    return dict(zip(configs, computed))
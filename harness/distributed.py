@@ -0,0 +1,299 @@
+"""Work-queue harness: one coordinator, N worker processes, optionally on several hosts.
+
+The coordinator serves a `multiprocessing.managers` socket holding one job
+queue per defense config and a shared results queue. Each worker is pinned to
+a single config and owns its own agent (an `InProcessAgentClient` with that
+config, or a `FastAPIAgentClient` sending that config as a per-request
+``X-Defense-Config`` override, so one warm server can serve every config), pulls
+``(index, case)`` jobs for its config and streams each `CaseResult` back. The
+coordinator merges results per config in suite order and hands them to
+`SmokeHarness.run_suite`, so reports and run_summary artifacts keep the
+standard format. Configs run concurrently instead of one after another.
+
+Local workers are spawned by `run_distributed_suite`; workers on other hosts
+join with ``scripts/run_harness_worker.py --coordinator HOST:PORT``.
+"""
+from __future__ import annotations
+
+from collections import Counter
+import json
+import multiprocessing
+from multiprocessing.managers import BaseManager
+import os
+from pathlib import Path
+import queue
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from harness.agent_clients import FastAPIAgentClient, InProcessAgentClient
+from harness.metrics import CaseResult
+from harness.runner import SmokeHarness, execute_case
+
+IN_PROCESS_AGENT = "in-process"
+AUTHKEY_ENV = "HARNESS_AUTHKEY"
+POLL_INTERVAL_S = 0.5
+
+
+class _WorkerManager(BaseManager):
+    """Client side of the coordinator socket (typeids only, no callables)."""
+
+
+for _typeid in ("jobs", "results", "finished"):
+    _WorkerManager.register(_typeid)
+
+
+def parse_address(value: str) -> Tuple[str, int]:
+    host, _, port = value.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"Invalid coordinator address '{value}', expected HOST:PORT")
+    return host, int(port)
+
+
+def resolve_authkey(authkey: str | bytes | None = None) -> bytes:
+    """Explicit key, else $HARNESS_AUTHKEY, else a fresh random key."""
+    if authkey is None:
+        authkey = os.environ.get(AUTHKEY_ENV) or os.urandom(16).hex()
+    return authkey.encode("utf-8") if isinstance(authkey, str) else authkey
+
+
+class HarnessCoordinator:
+    """Serves per-config job queues and the results queue over an authenticated socket."""
+
+    def __init__(
+        self,
+        configs: Sequence[str],
+        host: str = "127.0.0.1",
+        port: int = 0,
+        authkey: str | bytes | None = None,
+    ) -> None:
+        self.configs = tuple(configs)
+        self.authkey = resolve_authkey(authkey)
+        self._jobs: Dict[str, "queue.Queue[Any]"] = {config: queue.Queue() for config in self.configs}
+        self._results: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._finished = threading.Event()
+
+        # A per-instance subclass keeps the registered callables bound to this coordinator.
+        manager_cls = type("_CoordinatorManager", (BaseManager,), {})
+        manager_cls.register("jobs", callable=self._job_queue)
+        manager_cls.register("results", callable=lambda: self._results)
+        manager_cls.register("finished", callable=lambda: self._finished)
+        self._server = manager_cls(address=(host, port), authkey=self.authkey).get_server()
+        self._thread: threading.Thread | None = None
+
+    def _job_queue(self, config: str) -> "queue.Queue[Any]":
+        if config not in self._jobs:
+            raise KeyError(f"Coordinator has no jobs for config '{config}'")
+        return self._jobs[config]
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.address
+
+    def start(self) -> "HarnessCoordinator":
+        # Served from a thread so the queues never need to be pickled.
+        self._thread = threading.Thread(target=self._serve, name="harness-coordinator", daemon=True)
+        self._thread.start()
+        return self
+
+    def _serve(self) -> None:
+        try:
+            self._server.serve_forever()
+        except SystemExit:  # serve_forever exits via sys.exit() once stop_event is set.
+            pass
+
+    def submit(self, config: str, cases: Sequence[Dict[str, Any]]) -> int:
+        for index, case in enumerate(cases):
+            self._jobs[config].put((index, case))
+        return len(cases)
+
+    def next_result(self, timeout: float = POLL_INTERVAL_S) -> Optional[Dict[str, Any]]:
+        try:
+            return self._results.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def finish(self) -> None:
+        """Tell workers no more jobs are coming."""
+        self._finished.set()
+
+    def stop(self) -> None:
+        self.finish()
+        self._server.stop_event.set()
+        try:
+            self._server.listener.close()
+        except OSError:  # pragma: no cover
+            pass
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def __enter__(self) -> "HarnessCoordinator":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+def build_worker_agent(config: str, agent: str = IN_PROCESS_AGENT):
+    """An agent pinned to `config`: in-process, or a server URL with a per-request config override."""
+    if agent == IN_PROCESS_AGENT:
+        return InProcessAgentClient(defense_config=config)
+    client = FastAPIAgentClient(base_url=agent, defense_config=config)
+    if not client.health_check():
+        raise RuntimeError(f"Agent server unreachable at {agent}")
+    return client
+
+
+def run_worker(
+    address: Tuple[str, int],
+    authkey: bytes,
+    config: str,
+    agent: str = IN_PROCESS_AGENT,
+    worker_id: str | None = None,
+) -> int:
+    """Pull jobs for `config` until the coordinator finishes or goes away; returns cases evaluated."""
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    manager = _WorkerManager(address=tuple(address), authkey=authkey)
+    manager.connect()
+    jobs, results, finished = manager.jobs(config), manager.results(), manager.finished()
+    try:
+        client = build_worker_agent(config, agent)
+    except Exception as exc:
+        results.put({"worker": worker_id, "config": config, "index": None, "error": repr(exc)})
+        return 0
+
+    evaluated = 0
+    try:
+        while True:
+            try:
+                index, case = jobs.get(timeout=POLL_INTERVAL_S)
+            except queue.Empty:
+                if finished.is_set():
+                    break
+                continue
+            try:
+                result = execute_case(client, case)
+            except Exception as exc:
+                results.put({"worker": worker_id, "config": config, "index": index, "error": repr(exc)})
+                continue
+            results.put({"worker": worker_id, "config": config, "index": index, "result": result.__dict__})
+            evaluated += 1
+    except (EOFError, ConnectionError, BrokenPipeError):
+        pass  # Coordinator shut down.
+    finally:
+        close = getattr(client, "close", None)
+        if close is not None:
+            close()
+    return evaluated
+
+
+def plan_workers(configs: Sequence[str], workers: int) -> List[str]:
+    """Config per local worker: at least one each, extras round-robin."""
+    count = max(workers, len(configs))
+    return [configs[index % len(configs)] for index in range(count)]
+
+
+def run_distributed_suite(
+    suite_path: Path,
+    artifact_root: Path,
+    configs: Sequence[str],
+    workers: int = 4,
+    agents: Dict[str, str] | None = None,
+    seed: int = 6290,
+    owner_id: str = "owner-000",
+    results_format: str = "json",
+    host: str = "127.0.0.1",
+    port: int = 0,
+    authkey: str | bytes | None = None,
+    timeout: float | None = None,
+    on_start: Any = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Evaluate `suite_path` under every config in parallel; returns one standard report per config.
+
+    `agents` maps a config to ``"in-process"`` (default) or an agent server URL;
+    several configs may share one server. `on_start(address, authkey)` is called once the
+    coordinator listens, e.g. to print join instructions for remote workers.
+    """
+    configs = tuple(configs)
+    if not configs:
+        raise ValueError("At least one config is required")
+    agents = {config: (agents or {}).get(config, IN_PROCESS_AGENT) for config in configs}
+
+    with suite_path.open("r", encoding="utf-8") as handle:
+        cases = json.load(handle)
+    if not isinstance(cases, list):
+        raise ValueError("Suite must be a list of cases")
+
+    collected: Dict[str, Dict[int, Dict[str, Any]]] = {config: {} for config in configs}
+    per_worker: Dict[str, Counter] = {config: Counter() for config in configs}
+    expected = len(cases) * len(configs)
+    context = multiprocessing.get_context("spawn")
+    processes: List[multiprocessing.process.BaseProcess] = []
+    started = time.perf_counter()
+
+    with HarnessCoordinator(configs, host=host, port=port, authkey=authkey) as coordinator:
+        for config in configs:
+            coordinator.submit(config, cases)
+        if on_start is not None:
+            on_start(coordinator.address, coordinator.authkey)
+        for number, config in enumerate(plan_workers(configs, workers)):
+            process = context.Process(
+                target=run_worker,
+                args=(coordinator.address, coordinator.authkey, config, agents[config], f"local-{number}-{config}"),
+                daemon=True,
+            )
+            process.start()
+            processes.append(process)
+        try:
+            received = 0
+            while received < expected:
+                message = coordinator.next_result()
+                if message is None:
+                    if not any(process.is_alive() for process in processes):
+                        raise RuntimeError(
+                            f"All local workers exited with {expected - received} of {expected} results missing"
+                        )
+                    if timeout is not None and time.perf_counter() - started > timeout:
+                        raise RuntimeError(f"Distributed run timed out after {timeout}s ({received}/{expected} results)")
+                    continue
+                if "error" in message:
+                    raise RuntimeError(
+                        f"Worker {message['worker']} failed on config '{message['config']}'"
+                        f" (case index {message['index']}): {message['error']}"
+                    )
+                slot = collected[message["config"]]
+                if message["index"] not in slot:
+                    slot[message["index"]] = message["result"]
+                    per_worker[message["config"]][message["worker"]] += 1
+                    received += 1
+        finally:
+            coordinator.finish()
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+    elapsed = time.perf_counter() - started
+
+    harness = SmokeHarness(artifact_root, results_format=results_format)
+    reports: Dict[str, Dict[str, Any]] = {}
+    for config in configs:
+        results = [CaseResult(**collected[config][index]) for index in range(len(cases))]
+        agent = agents[config]
+        reports[config] = harness.run_suite(
+            suite_path,
+            owner_id=owner_id,
+            seed=seed,
+            defense_profile=config,
+            case_results=results,
+            notes=[f"agent_client={'InProcessAgentClient' if agent == IN_PROCESS_AGENT else 'FastAPIAgentClient'}"
+                   " via harness.distributed"],
+            meta={
+                "distributed": {
+                    "agent": agent,
+                    "workers": dict(sorted(per_worker[config].items())),
+                    "wall_time_s": elapsed,
+                },
+            },
+        )
+    return reports
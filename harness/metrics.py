@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+from collections import Counter
 from dataclasses import dataclass
-from typing import Iterable, Optional
+import math
+from typing import Any, Callable, Dict, Iterable, Optional
 
 
 @dataclass(frozen=True)
@@ -15,22 +17,269 @@ class CaseResult:
     raw: Optional[dict] = None
 
 
-def _iter_scored(results: Iterable[CaseResult]) -> Iterable[CaseResult]:
-    for result in results:
+class QuantileSketch:
+    """Mergeable log-bucket quantile sketch (DDSketch-style).
+
+    Every quantile of non-negative values is returned within `relative_accuracy`
+    of the true value; memory grows with the log of the value range, not with
+    the number of samples. Two sketches with the same accuracy merge by adding
+    bucket counts.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-9) -> None:
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets: Counter = Counter()
+        self._zero_count = 0
+        self.count = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, value: float) -> None:
+        value = float(value)
+        if value <= self.min_value:
+            self._zero_count += 1
+        else:
+            self._buckets[math.ceil(math.log(value) / self._log_gamma)] += 1
+        self.count += 1
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if not math.isclose(self.relative_accuracy, other.relative_accuracy):
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        self._buckets.update(other._buckets)
+        self._zero_count += other._zero_count
+        self.count += other.count
+        for bound in (other.min, other.max):
+            if bound is not None:
+                self.min = bound if self.min is None else min(self.min, bound)
+                self.max = bound if self.max is None else max(self.max, bound)
+        return self
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return 0.0
+        if q <= 0:
+            return float(self.min)
+        if q >= 1:
+            return float(self.max)
+        rank = q * (self.count - 1)
+        seen = self._zero_count
+        if rank < seen:
+            return float(self.min) if self.min is not None and self.min <= self.min_value else 0.0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if rank < seen:
+                estimate = 2 * self._gamma ** index / (self._gamma + 1)
+                return min(max(estimate, float(self.min)), float(self.max))
+        return float(self.max)
+
+
+class RunningStats:
+    """Single-pass count / mean / population variance / min / max (Welford, Chan merge)."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, value: float) -> None:
+        value = float(value)
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self._m2 = other.count, other.mean, other._m2
+            self.min, self.max = other.min, other.max
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self._m2 += other._m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / self.count if self.count > 1 else 0.0
+
+    def to_dict(self) -> Dict[str, float | int]:
+        """`{"mean", "variance", "sample_size"}`, the shape used in statistics.json."""
+        return {"mean": float(self.mean), "variance": float(self.variance), "sample_size": self.count}
+
+
+class RateStats:
+    """Exact mean / population variance of a 0/1 indicator, kept as integer counts."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.hits = 0
+
+    def add(self, hit: bool) -> None:
+        self.count += 1
+        self.hits += int(hit)
+
+    def merge(self, other: "RateStats") -> "RateStats":
+        self.count += other.count
+        self.hits += other.hits
+        return self
+
+    @property
+    def mean(self) -> float:
+        return self.hits / self.count if self.count else 0.0
+
+    @property
+    def variance(self) -> float:
+        return self.hits * (self.count - self.hits) / self.count ** 2 if self.count > 1 else 0.0
+
+    def to_dict(self) -> Dict[str, float | int]:
+        return {"mean": float(self.mean), "variance": float(self.variance), "sample_size": self.count}
+
+
+class MetricsAccumulator:
+    """Streaming, mergeable ASR / FP / TR accumulator.
+
+    Feed `CaseResult`s as they arrive; memory stays constant. `asr`, `fp` and
+    `tr` follow exactly the same rules as `compute_asr` / `compute_fp` /
+    `compute_tr` (SKIPPED rows are not scored). The unscored indicator stats
+    (`attack_allowed`, `benign_denied`, `durations`) cover every added row,
+    matching how `build_statistics` has always reported them. Accumulators from
+    parallel workers combine with `merge`. With `track_quantiles=False` no
+    duration sketch is kept, for callers that only need the metrics.
+    """
+
+    def __init__(
+        self,
+        vector_fn: Callable[[str], str] | None = None,
+        relative_accuracy: float = 0.01,
+        track_quantiles: bool = True,
+    ) -> None:
+        self.vector_fn = vector_fn
+        self.total = 0
+        self.scored = 0
+        self.malicious = 0
+        self.malicious_allowed = 0
+        self.benign = 0
+        self.benign_denied = 0
+        self.tr: float = 0.0
+        self.outcome_counts: Counter = Counter()
+        self.vector_counts: Dict[str, Counter] = {}
+        self.attack_allowed = RateStats()
+        self.benign_denied_stats = RateStats()
+        self.durations = RunningStats()
+        self.duration_sketch = QuantileSketch(relative_accuracy) if track_quantiles else None
+
+    @classmethod
+    def from_results(cls, results: Iterable[CaseResult], **kwargs: Any) -> "MetricsAccumulator":
+        return cls(**kwargs).extend(results)
+
+    def add(self, result: CaseResult) -> None:
+        self.total += 1
+        allowed = result.observed == "ALLOW"
+        benign = result.category.lower() == "benign"
+        self.outcome_counts[result.observed] += 1
+        self.attack_allowed.add(not benign and allowed)
+        if benign:
+            self.benign_denied_stats.add(not allowed)
+        if result.duration_s is not None:
+            self.durations.add(result.duration_s)
+        if self.vector_fn is not None:
+            self.vector_counts.setdefault(self.vector_fn(result.case_id), Counter())[result.observed] += 1
+
         if result.status.upper() == "SKIPPED":
-            continue
-        yield result
+            return
+        self.scored += 1
+        if benign:
+            self.benign += 1
+            self.benign_denied += int(not allowed)
+        else:
+            self.malicious += 1
+            self.malicious_allowed += int(allowed)
+        if result.duration_s is not None:
+            self.tr = max(self.tr, result.duration_s)
+            if self.duration_sketch is not None:
+                self.duration_sketch.add(result.duration_s)
+
+    def extend(self, results: Iterable[CaseResult]) -> "MetricsAccumulator":
+        for result in results:
+            self.add(result)
+        return self
+
+    def merge(self, other: "MetricsAccumulator") -> "MetricsAccumulator":
+        if (self.duration_sketch is None) != (other.duration_sketch is None):
+            raise ValueError("Cannot merge accumulators that differ in track_quantiles")
+        for name in ("total", "scored", "malicious", "malicious_allowed", "benign", "benign_denied"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.tr = max(self.tr, other.tr)
+        self.outcome_counts.update(other.outcome_counts)
+        for vector, counter in other.vector_counts.items():
+            self.vector_counts.setdefault(vector, Counter()).update(counter)
+        self.attack_allowed.merge(other.attack_allowed)
+        self.benign_denied_stats.merge(other.benign_denied_stats)
+        self.durations.merge(other.durations)
+        if self.duration_sketch is not None:
+            self.duration_sketch.merge(other.duration_sketch)
+        return self
+
+    @property
+    def asr(self) -> float:
+        return self.malicious_allowed / self.malicious if self.malicious else 0.0
+
+    @property
+    def fp(self) -> float:
+        return self.benign_denied / self.benign if self.benign else 0.0
+
+    def metrics(self) -> Dict[str, float]:
+        return {"asr": self.asr, "fp": self.fp, "tr": self.tr}
+
+    def duration_percentiles(self, quantiles: Iterable[float] = (0.5, 0.9, 0.99)) -> Dict[str, float]:
+        if self.duration_sketch is None:
+            return {}
+        return {f"p{q * 100:g}": self.duration_sketch.quantile(q) for q in quantiles}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-ready view of the current state, e.g. for live dashboards."""
+        return {
+            "case_count": self.total,
+            "scored_count": self.scored,
+            "metrics": self.metrics(),
+            "outcome_counts": dict(self.outcome_counts),
+            "attack_vector_breakdown": {
+                vector: dict(counter) for vector, counter in sorted(self.vector_counts.items())
+            },
+            "attack_success_rate": self.attack_allowed.to_dict(),
+            "false_positive_rate": self.benign_denied_stats.to_dict(),
+            "duration_seconds": {
+                **self.durations.to_dict(),
+                "max": float(self.durations.max or 0.0),
+                **self.duration_percentiles(),
+            },
+        }
+
+
+def compute_metrics(results: Iterable[CaseResult]) -> Dict[str, float]:
+    """ASR, FP and TR from a single pass over `results`."""
+    return MetricsAccumulator.from_results(results, track_quantiles=False).metrics()
 
 
 def compute_asr(results: Iterable[CaseResult]) -> float:
-    scored = list(_iter_scored(results))
-    if not scored:
-        return 0.0
-    malicious = [r for r in scored if r.category.lower() != "benign"]
-    if not malicious:
-        return 0.0
-    successes = [r for r in malicious if r.observed == "ALLOW"]
-    return len(successes) / len(malicious)
+    return compute_metrics(results)["asr"]
 
 
 def compute_fp(results: Iterable[CaseResult]) -> float:
@@ -39,19 +288,8 @@ def compute_fp(results: Iterable[CaseResult]) -> float:
     Any benign case that is not ALLOW (i.e., BLOCK, REFUSE, or ERROR) counts
     as a false positive, since a legitimate swap request was incorrectly denied.
     """
-    scored = list(_iter_scored(results))
-    if not scored:
-        return 0.0
-    benign = [r for r in scored if r.category == "benign"]
-    if not benign:
-        return 0.0
-    false_positive = [r for r in benign if r.observed != "ALLOW"]
-    return len(false_positive) / len(benign)
+    return compute_metrics(results)["fp"]
 
 
 def compute_tr(results: Iterable[CaseResult]) -> float:
-    scored = list(_iter_scored(results))
-    durations = [r.duration_s for r in scored if r.duration_s is not None]
-    if not durations:
-        return 0.0
-    return max(durations)
+    return compute_metrics(results)["tr"]
@@ -0,0 +1,252 @@
+"""Small DAG executor with content-hash memoization.
+
+Each `Step` declares its dependencies, a dict of fingerprint inputs (file
+hashes, parameters, code hashes) and the files it writes. A step is skipped
+when its fingerprint matches the cache entry and every output file still exists
+with the recorded sha256. Downstream fingerprints include upstream output
+hashes, so a rerun that changes a file invalidates everything after it.
+Independent steps run concurrently in a thread pool.
+
+Values of skipped steps are rebuilt lazily: via `Step.load` when provided,
+otherwise from the JSON result stored in the cache. A downstream step that is
+itself cached never forces its dependencies to load.
+"""
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+import hashlib
+import json
+import os
+from pathlib import Path
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence
+
+PIPELINE_CACHE_VERSION = "pipeline.v1"
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def files_fingerprint(paths: Iterable[Path]) -> Dict[str, Optional[str]]:
+    """`{path: sha256}` for existing files, `None` for missing ones."""
+    return {str(path): file_sha256(path) if path.exists() else None for path in paths}
+
+
+def _digest(payload: Any) -> str:
+    encoded = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class Step:
+    name: str
+    run: Callable[[Mapping[str, Any]], Any]
+    deps: Sequence[str] = ()
+    inputs: Callable[[], Dict[str, Any]] = dict
+    outputs: Callable[[], List[Path]] = list
+    load: Optional[Callable[[], Any]] = None
+    always_run: bool = False
+
+
+@dataclass
+class StepOutcome:
+    name: str
+    status: str  # "ran" or "cached"
+    fingerprint: str
+    output_hashes: Dict[str, Optional[str]] = field(default_factory=dict)
+
+
+class _LazyValues(Mapping[str, Any]):
+    """Dependency values; cached steps are materialized only on first access."""
+
+    def __init__(self) -> None:
+        self._values: Dict[str, Any] = {}
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._lock = threading.Lock()
+
+    def set(self, name: str, value: Any) -> None:
+        with self._lock:
+            self._values[name] = value
+
+    def set_lazy(self, name: str, loader: Callable[[], Any]) -> None:
+        with self._lock:
+            self._loaders[name] = loader
+
+    def __getitem__(self, name: str) -> Any:
+        with self._lock:
+            if name in self._values:
+                return self._values[name]
+            loader = self._loaders.pop(name)
+        value = loader()
+        self.set(name, value)
+        return value
+
+    def __iter__(self):
+        return iter(set(self._values) | set(self._loaders))
+
+    def __len__(self) -> int:
+        return len(set(self._values) | set(self._loaders))
+
+
+class _DepView(Mapping[str, Any]):
+    def __init__(self, values: _LazyValues, allowed: Sequence[str]) -> None:
+        self._values = values
+        self._allowed = tuple(allowed)
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self._allowed:
+            raise KeyError(f"'{name}' is not a declared dependency")
+        return self._values[name]
+
+    def __iter__(self):
+        return iter(self._allowed)
+
+    def __len__(self) -> int:
+        return len(self._allowed)
+
+
+class Pipeline:
+    def __init__(self, cache_path: Path, max_workers: int = 4) -> None:
+        self.cache_path = cache_path
+        self.max_workers = max(1, max_workers)
+        self.steps: Dict[str, Step] = {}
+
+    def add(self, step: Step) -> Step:
+        if step.name in self.steps:
+            raise ValueError(f"Duplicate pipeline step '{step.name}'")
+        self.steps[step.name] = step
+        return step
+
+    def _check_graph(self) -> None:
+        for step in self.steps.values():
+            missing = [dep for dep in step.deps if dep not in self.steps]
+            if missing:
+                raise ValueError(f"Step '{step.name}' depends on unknown steps {missing}")
+        visiting: set = set()
+        done: set = set()
+
+        def _visit(name: str) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Pipeline has a cycle through '{name}'")
+            visiting.add(name)
+            for dep in self.steps[name].deps:
+                _visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.steps:
+            _visit(name)
+
+    def _load_cache(self) -> Dict[str, Any]:
+        if not self.cache_path.exists():
+            return {}
+        try:
+            cache = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return {}
+        if cache.get("version") != PIPELINE_CACHE_VERSION:
+            return {}
+        return cache.get("steps", {})
+
+    def _save_cache(self, entries: Dict[str, Any]) -> None:
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_suffix(self.cache_path.suffix + ".tmp")
+        tmp_path.write_text(
+            json.dumps({"version": PIPELINE_CACHE_VERSION, "steps": entries}, indent=2, sort_keys=True) + "\n",
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, self.cache_path)
+
+    def run(self, force: bool | Iterable[str] = False) -> "PipelineRun":
+        """Execute stale steps. `force=True` reruns everything; a list of names reruns those steps."""
+        self._check_graph()
+        forced = set(self.steps) if force is True else set(force or ())
+        cache = self._load_cache()
+        entries: Dict[str, Any] = dict(cache)
+        values = _LazyValues()
+        outcomes: Dict[str, StepOutcome] = {}
+        effective: Dict[str, str] = {}
+        pending = dict(self.steps)
+        running: Dict[Future, str] = {}
+
+        def _execute(step: Step) -> StepOutcome:
+            fingerprint = _digest(
+                {
+                    "step": step.name,
+                    "inputs": step.inputs(),
+                    "deps": {dep: effective[dep] for dep in step.deps},
+                }
+            )
+            entry = cache.get(step.name) or {}
+            outputs = step.outputs()
+            if (
+                not step.always_run
+                and step.name not in forced
+                and entry.get("fingerprint") == fingerprint
+                and all(path.exists() for path in outputs)
+                and entry.get("outputs") == files_fingerprint(outputs)
+                and (step.load is not None or "result" in entry)
+            ):
+                if step.load is not None:
+                    values.set_lazy(step.name, step.load)
+                else:
+                    values.set(step.name, entry["result"])
+                return StepOutcome(step.name, "cached", fingerprint, entry["outputs"])
+
+            value = step.run(_DepView(values, step.deps))
+            values.set(step.name, value)
+            output_hashes = files_fingerprint(step.outputs())
+            new_entry: Dict[str, Any] = {"fingerprint": fingerprint, "outputs": output_hashes}
+            if step.load is None:
+                try:
+                    json.dumps(value)
+                    new_entry["result"] = value
+                except TypeError:
+                    pass
+            entries[step.name] = new_entry
+            return StepOutcome(step.name, "ran", fingerprint, output_hashes)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                while pending or running:
+                    ready = [
+                        step for step in pending.values()
+                        if all(dep in outcomes for dep in step.deps)
+                    ]
+                    for step in ready:
+                        del pending[step.name]
+                        running[pool.submit(_execute, step)] = step.name
+                    finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        name = running.pop(future)
+                        outcome = future.result()
+                        outcomes[name] = outcome
+                        effective[name] = _digest([outcome.fingerprint, outcome.output_hashes])
+        finally:
+            self._save_cache(entries)
+        return PipelineRun(outcomes=outcomes, values=values)
+
+
+@dataclass
+class PipelineRun:
+    outcomes: Dict[str, StepOutcome]
+    values: Mapping[str, Any]
+
+    def value(self, name: str) -> Any:
+        return self.values[name]
+
+    @property
+    def ran(self) -> List[str]:
+        return [name for name, outcome in self.outcomes.items() if outcome.status == "ran"]
+
+    @property
+    def cached(self) -> List[str]:
+        return [name for name, outcome in self.outcomes.items() if outcome.status == "cached"]
@@ -0,0 +1,186 @@
+"""Append-friendly results store for harness reports.
+
+A report is split into three files sharing a base path:
+
+- ``<base>.meta.json``     run / meta / metrics (everything except per-case rows)
+- ``<base>.cases.jsonl``   one compact JSON row per case, scalar columns only
+- ``<base>.raw.jsonl.gz``  gzip-compressed ``{"case_id", "raw"}`` rows holding the
+  PlanResponse bodies, which are most of the bytes and rarely needed
+
+Rows are appended as cases finish, so a crashed run keeps everything written so
+far. Loaders stream line by line and can project just the columns metrics need
+without ever opening the raw-body file.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from harness.metrics import CaseResult
+
+RESULTS_STORE_VERSION = "results.v1"
+CASE_COLUMNS = (
+    "case_id",
+    "category",
+    "expected",
+    "observed",
+    "duration_s",
+    "status",
+    "response_status",
+    "error_code",
+)
+META_SUFFIX = ".meta.json"
+CASES_SUFFIX = ".cases.jsonl"
+RAW_SUFFIX = ".raw.jsonl.gz"
+
+
+def store_paths(base_path: Path) -> Dict[str, Path]:
+    base = str(base_path)
+    return {
+        "meta": Path(base + META_SUFFIX),
+        "cases": Path(base + CASES_SUFFIX),
+        "raw": Path(base + RAW_SUFFIX),
+    }
+
+
+def store_exists(base_path: Path) -> bool:
+    paths = store_paths(base_path)
+    return paths["meta"].exists() and paths["cases"].exists()
+
+
+def _result_dict(result: CaseResult | Dict[str, Any]) -> Dict[str, Any]:
+    return dict(result.__dict__) if isinstance(result, CaseResult) else dict(result)
+
+
+def split_result(result: CaseResult | Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """Return (row, raw) for one case; the row keeps a couple of cheap raw-derived columns."""
+    data = _result_dict(result)
+    raw = data.pop("raw", None)
+    row = {column: data.get(column) for column in CASE_COLUMNS[:6]}
+    if isinstance(raw, dict):
+        error = raw.get("error") or {}
+        row["response_status"] = raw.get("status")
+        row["error_code"] = error.get("code") if isinstance(error, dict) else None
+    else:
+        row["response_status"] = None
+        row["error_code"] = None
+    for key, value in data.items():
+        row.setdefault(key, value)
+    return row, raw
+
+
+class ResultsWriter:
+    """Appends case rows (and compressed raw bodies) to a results store."""
+
+    def __init__(self, base_path: Path, append: bool = False, compresslevel: int = 6) -> None:
+        self.paths = store_paths(base_path)
+        self.paths["cases"].parent.mkdir(parents=True, exist_ok=True)
+        mode = "a" if append else "w"
+        self._cases = self.paths["cases"].open(mode, encoding="utf-8")
+        # Appending to gzip adds a new member; gzip readers concatenate members transparently.
+        self._raw = gzip.open(self.paths["raw"], mode + "t", encoding="utf-8", compresslevel=compresslevel)
+        self.rows_written = 0
+
+    def append(self, result: CaseResult | Dict[str, Any]) -> None:
+        row, raw = split_result(result)
+        self._cases.write(json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n")
+        if raw is not None:
+            self._raw.write(
+                json.dumps({"case_id": row["case_id"], "raw": raw}, ensure_ascii=False, separators=(",", ":")) + "\n"
+            )
+        self.rows_written += 1
+
+    def extend(self, results: Iterable[CaseResult | Dict[str, Any]]) -> None:
+        for result in results:
+            self.append(result)
+
+    def flush(self) -> None:
+        self._cases.flush()
+        self._raw.flush()
+
+    def write_meta(self, report: Dict[str, Any]) -> Path:
+        meta = {key: value for key, value in report.items() if key != "results"}
+        meta["results_store"] = {"version": RESULTS_STORE_VERSION, "columns": list(CASE_COLUMNS)}
+        self.paths["meta"].write_text(json.dumps(meta, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        return self.paths["meta"]
+
+    def close(self) -> None:
+        self._cases.close()
+        self._raw.close()
+
+    def __enter__(self) -> "ResultsWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def write_results(report: Dict[str, Any], base_path: Path) -> Dict[str, Path]:
+    """Write a complete in-memory report to the store, replacing any previous one."""
+    with ResultsWriter(base_path) as writer:
+        writer.extend(report.get("results", []))
+        writer.write_meta(report)
+        return dict(writer.paths)
+
+
+def read_meta(base_path: Path) -> Dict[str, Any]:
+    return json.loads(store_paths(base_path)["meta"].read_text(encoding="utf-8"))
+
+
+def iter_rows(base_path: Path, columns: Optional[Sequence[str]] = None) -> Iterator[Dict[str, Any]]:
+    """Stream case rows, optionally projected to `columns`."""
+    with store_paths(base_path)["cases"].open("r", encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            yield row if columns is None else {column: row.get(column) for column in columns}
+
+
+def load_columns(base_path: Path, columns: Sequence[str]) -> Dict[str, List[Any]]:
+    """Column-oriented projection: ``{column: [value per case]}``."""
+    projected: Dict[str, List[Any]] = {column: [] for column in columns}
+    for row in iter_rows(base_path, columns):
+        for column in columns:
+            projected[column].append(row[column])
+    return projected
+
+
+def iter_case_results(base_path: Path) -> Iterator[CaseResult]:
+    """Stream `CaseResult`s without raw bodies (enough for every metric)."""
+    for row in iter_rows(base_path, CASE_COLUMNS[:6]):
+        yield CaseResult(raw=None, **row)
+
+
+def iter_raw(base_path: Path, case_ids: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Stream ``(case_id, raw)`` pairs, optionally only for `case_ids`."""
+    wanted = set(case_ids) if case_ids is not None else None
+    raw_path = store_paths(base_path)["raw"]
+    if not raw_path.exists():
+        return
+    with gzip.open(raw_path, "rt", encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if wanted is None or entry["case_id"] in wanted:
+                yield entry["case_id"], entry["raw"]
+
+
+def load_report(
+    base_path: Path,
+    include_raw: bool = False,
+    columns: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """Rebuild the legacy ``{"run", "meta", "metrics", "results"}`` report shape."""
+    report = read_meta(base_path)
+    report.pop("results_store", None)
+    results = list(iter_rows(base_path, columns))
+    if include_raw:
+        raw_by_case = dict(iter_raw(base_path))
+        for row in results:
+            row["raw"] = raw_by_case.get(row["case_id"])
+    report["results"] = results
+    return report
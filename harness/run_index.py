@@ -0,0 +1,246 @@
+"""SQLite index of artifacts written by `ArtifactStore`.
+
+One row per artifact: run id, commit, suite name and sha256, defense profile,
+headline metrics, file path (relative to the store root) and creation time.
+Baseline lookup, run listing and cross-commit comparisons are indexed queries
+instead of parsing every JSON file under ``runs/``. Stores that predate the
+index can be backfilled once with `RunIndex.rebuild`.
+"""
+from __future__ import annotations
+
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+import json
+from pathlib import Path
+import sqlite3
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+RUN_INDEX_FILENAME = "run_index.sqlite3"
+RUN_INDEX_SCHEMA_VERSION = 1
+METRIC_COLUMNS = ("asr", "fp", "tr")
+_REQUIRED_FIELDS = {"artifact_id", "run_id", "type", "suite", "defense_profile", "created_at"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    artifact_id TEXT PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    type TEXT NOT NULL,
+    suite TEXT NOT NULL,
+    suite_sha256 TEXT,
+    defense_profile TEXT NOT NULL,
+    git_commit TEXT,
+    asr REAL,
+    fp REAL,
+    tr REAL,
+    metrics TEXT NOT NULL,
+    path TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_artifacts_type_created ON artifacts (type, created_at);
+CREATE INDEX IF NOT EXISTS idx_artifacts_commit ON artifacts (git_commit, type);
+CREATE INDEX IF NOT EXISTS idx_artifacts_run ON artifacts (run_id);
+"""
+
+
+@dataclass(frozen=True)
+class RunIndexEntry:
+    artifact_id: str
+    run_id: str
+    type: str
+    suite: str
+    suite_sha256: Optional[str]
+    defense_profile: str
+    git_commit: Optional[str]
+    metrics: Dict[str, Any]
+    path: Path
+    created_at: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = dict(self.__dict__)
+        data["path"] = str(self.path)
+        return data
+
+
+def _payload_data(artifact: Dict[str, Any]) -> Dict[str, Any]:
+    payload = artifact.get("payload")
+    data = payload.get("data") if isinstance(payload, dict) else None
+    return data if isinstance(data, dict) else {}
+
+
+class RunIndex:
+    def __init__(self, root_dir: Path, db_path: Path | None = None) -> None:
+        self.root_dir = root_dir
+        self.db_path = db_path or root_dir / "runs" / RUN_INDEX_FILENAME
+        self._initialized = False
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(sqlite3.connect(self.db_path, timeout=30)) as connection:
+            connection.row_factory = sqlite3.Row
+            if not self._initialized:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.executescript(_SCHEMA)
+                connection.execute(f"PRAGMA user_version={RUN_INDEX_SCHEMA_VERSION}")
+                self._initialized = True
+            with connection:
+                yield connection
+
+    def _row(self, artifact: Dict[str, Any], path: Path, git_commit: str | None) -> Dict[str, Any]:
+        data = _payload_data(artifact)
+        meta = data.get("meta") if isinstance(data.get("meta"), dict) else {}
+        metrics = data.get("metrics") if isinstance(data.get("metrics"), dict) else {}
+        try:
+            stored_path = str(path.relative_to(self.root_dir))
+        except ValueError:
+            try:
+                stored_path = str(path.resolve().relative_to(self.root_dir.resolve()))
+            except ValueError:
+                stored_path = str(path.resolve())
+        row = {
+            "artifact_id": artifact["artifact_id"],
+            "run_id": artifact["run_id"],
+            "type": artifact["type"],
+            "suite": artifact["suite"],
+            "suite_sha256": meta.get("suite_sha256"),
+            "defense_profile": artifact["defense_profile"],
+            "git_commit": git_commit or meta.get("git_commit"),
+            "metrics": json.dumps(metrics, sort_keys=True),
+            "path": stored_path,
+            "created_at": artifact["created_at"],
+        }
+        for column in METRIC_COLUMNS:
+            value = metrics.get(column)
+            row[column] = float(value) if isinstance(value, (int, float)) else None
+        return row
+
+    def record(self, artifact: Dict[str, Any], path: Path, git_commit: str | None = None) -> None:
+        """Insert or replace the row for one serialized artifact (`Artifact.to_dict()`)."""
+        self.record_many([(artifact, path, git_commit)])
+
+    def record_many(self, entries: Iterable[Tuple[Dict[str, Any], Path, Optional[str]]]) -> int:
+        """Insert or replace many `(artifact, path, git_commit)` rows in one transaction."""
+        rows = [self._row(artifact, path, git_commit) for artifact, path, git_commit in entries]
+        if not rows:
+            return 0
+        columns = ", ".join(rows[0])
+        placeholders = ", ".join(f":{column}" for column in rows[0])
+        with self._connect() as connection:
+            connection.executemany(f"INSERT OR REPLACE INTO artifacts ({columns}) VALUES ({placeholders})", rows)
+        return len(rows)
+
+    def _entry(self, row: sqlite3.Row) -> RunIndexEntry:
+        path = Path(row["path"])
+        return RunIndexEntry(
+            artifact_id=row["artifact_id"],
+            run_id=row["run_id"],
+            type=row["type"],
+            suite=row["suite"],
+            suite_sha256=row["suite_sha256"],
+            defense_profile=row["defense_profile"],
+            git_commit=row["git_commit"],
+            metrics=json.loads(row["metrics"]),
+            path=path if path.is_absolute() else self.root_dir / path,
+            created_at=row["created_at"],
+        )
+
+    def list_runs(
+        self,
+        type: str | None = "run_summary",
+        run_id: str | None = None,
+        suite: str | None = None,
+        defense_profile: str | None = None,
+        git_commit: str | None = None,
+        suite_sha256: str | None = None,
+        limit: int | None = None,
+    ) -> List[RunIndexEntry]:
+        """Matching entries, newest first."""
+        filters = {
+            "type": type,
+            "run_id": run_id,
+            "suite": suite,
+            "defense_profile": defense_profile,
+            "git_commit": git_commit,
+            "suite_sha256": suite_sha256,
+        }
+        clauses = [f"{column} = :{column}" for column, value in filters.items() if value is not None]
+        query = "SELECT * FROM artifacts"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY created_at DESC, rowid DESC"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        with self._connect() as connection:
+            rows = connection.execute(query, {k: v for k, v in filters.items() if v is not None}).fetchall()
+        return [self._entry(row) for row in rows]
+
+    def latest(self, **filters: Any) -> Optional[RunIndexEntry]:
+        """Newest matching entry whose artifact file still exists."""
+        for entry in self.list_runs(**filters):
+            if entry.path.exists():
+                return entry
+        return None
+
+    def compare_commits(
+        self,
+        base_commit: str,
+        head_commit: str,
+        type: str = "run_summary",
+    ) -> List[Dict[str, Any]]:
+        """Latest metrics per (suite, defense_profile) at each commit, with head - base deltas."""
+        latest: Dict[str, Dict[tuple, RunIndexEntry]] = {}
+        for commit in (base_commit, head_commit):
+            per_key: Dict[tuple, RunIndexEntry] = {}
+            for entry in self.list_runs(type=type, git_commit=commit):
+                per_key.setdefault((entry.suite, entry.defense_profile), entry)
+            latest[commit] = per_key
+        comparisons = []
+        for key in sorted(set(latest[base_commit]) | set(latest[head_commit])):
+            base = latest[base_commit].get(key)
+            head = latest[head_commit].get(key)
+            delta = {}
+            if base is not None and head is not None:
+                for metric in METRIC_COLUMNS:
+                    if isinstance(base.metrics.get(metric), (int, float)) and isinstance(
+                        head.metrics.get(metric), (int, float)
+                    ):
+                        delta[metric] = head.metrics[metric] - base.metrics[metric]
+            comparisons.append({
+                "suite": key[0],
+                "defense_profile": key[1],
+                "base": base.to_dict() if base else None,
+                "head": head.to_dict() if head else None,
+                "delta": delta,
+            })
+        return comparisons
+
+    def count(self) -> int:
+        with self._connect() as connection:
+            return int(connection.execute("SELECT COUNT(*) FROM artifacts").fetchone()[0])
+
+    def rebuild(self, batch_size: int = 500) -> int:
+        """Backfill from the artifact files under ``runs/`` (one full scan); returns rows indexed."""
+        from harness.artifacts import ARTIFACT_SUFFIXES, read_artifact
+
+        runs_root = self.root_dir / "runs"
+        indexed = 0
+        if not runs_root.exists():
+            return indexed
+        batch: List[Tuple[Dict[str, Any], Path, Optional[str]]] = []
+        for path in runs_root.rglob("*"):
+            if not path.name.endswith(ARTIFACT_SUFFIXES) or not path.is_file():
+                continue
+            try:
+                artifact = read_artifact(path)
+            except (OSError, ValueError, EOFError):
+                continue
+            if not isinstance(artifact, dict) or not _REQUIRED_FIELDS <= set(artifact):
+                continue
+            # Layout is runs/<YYYYMMDD>/<run_id>_<commit>/[shards/...]/<artifact file>.
+            parts = path.relative_to(runs_root).parts
+            commit = parts[1].rpartition("_")[2] if len(parts) > 2 else ""
+            batch.append((artifact, path, None if commit in ("", "nogit") else commit))
+            if len(batch) >= batch_size:
+                indexed += self.record_many(batch)
+                batch = []
+        return indexed + self.record_many(batch)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
 import hashlib
 import json
 import platform
@@ -11,11 +11,13 @@ import subprocess
 import sys
 import time
 import uuid
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
+from harness.artifact_writer import SHARDS_DIRNAME, ShardedArtifactWriter
 from harness.artifacts import ArtifactStore, build_artifact
 from harness.agent_clients import AgentClient, PlaceholderAgentClient
-from harness.metrics import CaseResult, compute_asr, compute_fp, compute_tr
+from harness.metrics import CaseResult, MetricsAccumulator
+from harness.results_store import ResultsWriter
 
 
 @dataclass
@@ -42,10 +44,62 @@ class RunRecord:
         }
 
 
+RESULTS_FORMATS = ("json", "columnar")
+
+
+def execute_case(agent_client: AgentClient, case: Dict[str, Any]) -> CaseResult:
+    """Evaluate one case and classify it as MATCH / MISMATCH / SKIPPED."""
+    started = time.perf_counter()
+    response = agent_client.evaluate_case(case)
+    duration = time.perf_counter() - started
+    if response.observed == "UNEXECUTED":
+        status = "SKIPPED"
+    elif response.observed == case["expected"]:
+        status = "MATCH"
+    else:
+        status = "MISMATCH"
+    return CaseResult(
+        case_id=case["case_id"],
+        category=case["category"],
+        expected=case["expected"],
+        observed=response.observed,
+        duration_s=duration,
+        status=status,
+        raw=response.raw,
+    )
+
+
+def resolve_git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        commit = result.stdout.strip()
+        return commit or None
+    except Exception:
+        return None
+
+
 class SmokeHarness:
-    def __init__(self, artifact_root: Path, agent_client: AgentClient | None = None) -> None:
+    def __init__(
+        self,
+        artifact_root: Path,
+        agent_client: AgentClient | None = None,
+        results_format: str = "json",
+        case_artifacts: bool = False,
+    ) -> None:
+        if results_format not in RESULTS_FORMATS:
+            raise ValueError(f"Invalid results_format '{results_format}', must be one of {RESULTS_FORMATS}")
         self.store = ArtifactStore(artifact_root)
         self.agent_client = agent_client or PlaceholderAgentClient()
+        # "columnar" streams per-case rows to a results store in the run directory
+        # and keeps raw response bodies out of the run_summary artifact.
+        self.results_format = results_format
+        # Also write one compressed `case_result` artifact per case via the sharded writer.
+        self.case_artifacts = case_artifacts
 
     def run_suite(
         self,
@@ -53,9 +107,23 @@ class SmokeHarness:
         owner_id: str = "owner-000",
         seed: int = 6290,
         defense_profile: str = "bare",
+        case_results: Sequence[CaseResult] | None = None,
+        notes: List[str] | None = None,
+        meta: Dict[str, Any] | None = None,
     ) -> Dict[str, Any]:
+        """Run `suite_path` and write its run_summary artifact.
+
+        `case_results` supplies results already evaluated elsewhere (e.g. by
+        `harness.distributed` workers), one per case in suite order; the agent
+        client is then not called. `notes` replaces the default run notes and
+        `meta` is merged into the report meta.
+        """
+        if case_results is not None:
+            case_results = list(case_results)
         run_start_ms = int(time.time() * 1000)
         cases = self._load_cases(suite_path)
+        if case_results is not None and [r.case_id for r in case_results] != [c["case_id"] for c in cases]:
+            raise ValueError("case_results must hold exactly one result per suite case, in suite order")
         random.seed(seed)
         run_id = str(uuid.uuid4())
         git_commit = self._resolve_git_commit()
@@ -63,23 +131,48 @@ class SmokeHarness:
         run_record = RunRecord(
             run_id=run_id,
             owner_id=owner_id,
-            created_at=datetime.utcnow(),
+            created_at=datetime.now(timezone.utc).replace(tzinfo=None),  # naive UTC, serialized with a "Z" suffix
             arena_visibility="private",
             inputs_redacted=True,
             suite_name=suite_path.stem,
             case_count=len(cases),
-            notes=[self._describe_agent_client()],
+            notes=list(notes) if notes is not None else [self._describe_agent_client()],
         )
 
-        results: List[CaseResult] = []
-        for case in cases:
-            results.append(self._execute_case(case))
+        writer: ResultsWriter | None = None
+        if self.results_format == "columnar":
+            run_dir = self.store.run_dir(run_id, run_record.created_at, git_commit)
+            writer = ResultsWriter(run_dir / "results")
 
-        metrics = {
-            "asr": compute_asr(results),
-            "fp": compute_fp(results),
-            "tr": compute_tr(results),
-        }
+        case_writer: ShardedArtifactWriter | None = None
+        if self.case_artifacts:
+            case_writer = ShardedArtifactWriter(self.store, run_id, run_record.created_at, git_commit)
+
+        results: List[CaseResult] = []
+        accumulator = MetricsAccumulator()
+        try:
+            for index, case in enumerate(cases):
+                result = case_results[index] if case_results is not None else self._execute_case(case)
+                results.append(result)
+                accumulator.add(result)
+                if writer is not None:
+                    writer.append(result)
+                if case_writer is not None:
+                    case_writer.submit(build_artifact(
+                        run_id=run_id,
+                        type="case_result",
+                        testcase_id=result.case_id,
+                        suite=suite_path.stem,
+                        defense_profile=defense_profile,
+                        payload=dict(result.__dict__),
+                    ))
+        finally:
+            if writer is not None:
+                writer.close()
+            if case_writer is not None:
+                case_writer.close()
+
+        metrics = accumulator.metrics()
 
         report = {
             "run": run_record.to_dict(),
@@ -90,13 +183,27 @@ class SmokeHarness:
                 "git_commit": git_commit,
                 "python_version": sys.version.split(" ")[0],
                 "platform": platform.platform(),
+                **(meta or {}),
             },
             "metrics": metrics,
             "results": [result.__dict__ for result in results],
         }
 
+        if case_writer is not None:
+            report["case_artifacts"] = {
+                "count": case_writer.written,
+                "dir": str(case_writer.run_dir / SHARDS_DIRNAME),
+            }
+
         run_end_ms = int(time.time() * 1000)
 
+        artifact_payload = report
+        if writer is not None:
+            writer.write_meta(report)
+            artifact_payload = {key: value for key, value in report.items() if key != "results"}
+            artifact_payload["results_store"] = {label: str(path) for label, path in writer.paths.items()}
+            report["results_store"] = artifact_payload["results_store"]
+
         artifact = build_artifact(
             run_id=run_id,
             testcase_id="run-summary",
@@ -104,7 +211,7 @@ class SmokeHarness:
             defense_profile=defense_profile,
             component="harness",
             type="run_summary",
-            payload=report,
+            payload=artifact_payload,
             timing={
                 "t_start_ms": run_start_ms,
                 "t_end_ms": run_end_ms,
@@ -123,37 +230,10 @@ class SmokeHarness:
         return cases
 
     def _execute_case(self, case: Dict[str, Any]) -> CaseResult:
-        started = time.perf_counter()
-        response = self.agent_client.evaluate_case(case)
-        duration = time.perf_counter() - started
-        if response.observed == "UNEXECUTED":
-            status = "SKIPPED"
-        elif response.observed == case["expected"]:
-            status = "MATCH"
-        else:
-            status = "MISMATCH"
-        return CaseResult(
-            case_id=case["case_id"],
-            category=case["category"],
-            expected=case["expected"],
-            observed=response.observed,
-            duration_s=duration,
-            status=status,
-            raw=response.raw,
-        )
+        return execute_case(self.agent_client, case)
 
     def _resolve_git_commit(self) -> Optional[str]:
-        try:
-            result = subprocess.run(
-                ["git", "rev-parse", "--short", "HEAD"],
-                check=True,
-                capture_output=True,
-                text=True,
-            )
-            commit = result.stdout.strip()
-            return commit or None
-        except Exception:
-            return None
+        return resolve_git_commit()
 
     def _describe_agent_client(self) -> str:
         if isinstance(self.agent_client, PlaceholderAgentClient):
@@ -0,0 +1,326 @@
+"""
+Cached, out-of-process figure renderer for the reproducibility pipeline.
+
+Figures depend only on each config's `reported_metrics` and
+`attack_vector_breakdown`, so they are keyed by the sha256 of that slice of
+`statistics_payload` plus this module's source. Rendered files live in
+`artifacts/.figure_cache/<digest>/` and are copied into the requested figures
+directory; a cache hit never imports matplotlib. Misses render in a spawned
+worker process, so the calling process never pays matplotlib's import and
+startup cost, and batches of runs render in parallel.
+
+Deferred mode writes a self-contained job to `artifacts/.figure_cache/pending/`
+instead of rendering; drain the queue later with `--pending`.
+
+Example:
+    $env:PYTHONPATH = "."
+    python scripts/figure_renderer.py artifacts/final_results/statistics.json --output report-latex/figures
+    python scripts/figure_renderer.py runs/*/statistics.json --workers 4
+    python scripts/figure_renderer.py --pending --workers 4
+"""
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+FIGURE_RENDERER_VERSION = "figures.v1"
+FIGURE_CACHE_DIR = ROOT / "artifacts" / ".figure_cache"
+PENDING_DIRNAME = "pending"
+FIGURE_CONFIG_ORDER = ("bare", "l1", "l1l2", "l1l2l3")
+
+# Drawing-code changes must invalidate cached figures, so the source is part of the key.
+_RENDERER_SOURCE_SHA256 = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+
+_BAR_COLORS_ASR = ["#9e9e9e", "#f9a825", "#2e7d32", "#1565c0"]
+_BAR_COLORS_TR = ["#546e7a", "#1e88e5", "#8e24aa", "#d84315"]
+
+
+def figure_file_paths(figures_dir: Path) -> Dict[str, Path]:
+    return {
+        "metrics_png": figures_dir / "final_metrics_comparison.png",
+        "metrics_pdf": figures_dir / "final_metrics_comparison.pdf",
+        "breakdown_png": figures_dir / "final_l1l2_attack_vector_breakdown.png",
+        "breakdown_pdf": figures_dir / "final_l1l2_attack_vector_breakdown.pdf",
+    }
+
+
+def figure_inputs(statistics_payload: Dict[str, Any]) -> Dict[str, Any]:
+    """The slice of `statistics_payload` the figures are drawn from."""
+    return {
+        "per_config": {
+            config: {
+                "reported_metrics": entry["reported_metrics"],
+                "attack_vector_breakdown": entry.get("attack_vector_breakdown", {}),
+            }
+            for config, entry in statistics_payload["per_config"].items()
+        }
+    }
+
+
+def statistics_digest(statistics_payload: Dict[str, Any]) -> str:
+    key = {
+        "version": FIGURE_RENDERER_VERSION,
+        "code": _RENDERER_SOURCE_SHA256,
+        "inputs": figure_inputs(statistics_payload),
+    }
+    encoded = json.dumps(
+        key,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def draw_figures(statistics_payload: Dict[str, Any], figures_dir: Path) -> Dict[str, Path]:
+    # Lazy import: only worker processes (or direct callers) ever load matplotlib.
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    figures_dir.mkdir(parents=True, exist_ok=True)
+
+    metrics = ["asr", "fp", "tr"]
+    configs = [c for c in FIGURE_CONFIG_ORDER if c in statistics_payload["per_config"]]
+    values = {
+        metric: [statistics_payload["per_config"][config]["reported_metrics"][metric] for config in configs]
+        for metric in metrics
+    }
+
+    fig, axes = plt.subplots(1, 3, figsize=(14, 4.5))
+    axes[0].bar(configs, [v * 100 for v in values["asr"]], color=_BAR_COLORS_ASR[: len(configs)])
+    axes[0].set_title("Attack Success Rate (ASR)")
+    axes[0].set_ylabel("Percent")
+    axes[0].set_ylim(0, 100)
+
+    axes[1].bar(configs, [v * 100 for v in values["fp"]], color=_BAR_COLORS_ASR[: len(configs)])
+    axes[1].set_title("False Positive Rate (FP)")
+    axes[1].set_ylabel("Percent")
+    axes[1].set_ylim(0, 100)
+
+    axes[2].bar(configs, values["tr"], color=_BAR_COLORS_TR[: len(configs)])
+    axes[2].set_title("True Rejection Latency (Max)")
+    axes[2].set_ylabel("Seconds")
+
+    fig.tight_layout()
+    paths = figure_file_paths(figures_dir)
+    fig.savefig(paths["metrics_png"], dpi=200, bbox_inches="tight")
+    fig.savefig(paths["metrics_pdf"], bbox_inches="tight")
+    plt.close(fig)
+
+    best_config = "l1l2l3" if "l1l2l3" in statistics_payload["per_config"] else "l1l2"
+    if best_config in statistics_payload["per_config"]:
+        breakdown_data = statistics_payload["per_config"][best_config]["attack_vector_breakdown"]
+        vectors = [v for v in sorted(breakdown_data.keys()) if v != "none"]
+        stacked_labels = ["REFUSE", "BLOCK", "ALLOW", "ERROR"]
+        colors = {"REFUSE": "#2e7d32", "BLOCK": "#fb8c00", "ALLOW": "#c62828", "ERROR": "#546e7a"}
+
+        fig, ax = plt.subplots(figsize=(9, 4.8))
+        bottoms = [0] * len(vectors)
+        for label in stacked_labels:
+            series = [breakdown_data[vector].get(label, 0) for vector in vectors]
+            ax.bar(vectors, series, bottom=bottoms, label=label, color=colors[label])
+            bottoms = [bottom + value for bottom, value in zip(bottoms, series)]
+        ax.set_title(f"{best_config.upper()} Outcomes by Attack Vector")
+        ax.set_ylabel("Case Count")
+        ax.legend()
+        fig.tight_layout()
+    else:
+        fig, ax = plt.subplots(figsize=(9, 4.8))
+        ax.text(0.5, 0.5, "No breakdown data available", ha="center", va="center")
+
+    fig.savefig(paths["breakdown_png"], dpi=200, bbox_inches="tight")
+    fig.savefig(paths["breakdown_pdf"], bbox_inches="tight")
+    plt.close(fig)
+
+    return paths
+
+
+def _render_into_cache(task: Tuple[Callable[..., Any], Dict[str, Any], str]) -> str:
+    """Render one payload into its cache entry. Top-level so it pickles for process pools."""
+    draw, inputs, entry_dir = task
+    entry = Path(entry_dir)
+    entry.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=entry.name + ".", dir=entry.parent))
+    try:
+        draw(inputs, staging)
+        try:
+            os.replace(staging, entry)
+        except OSError:
+            # Another worker published the same digest first; its files are identical.
+            if not entry.exists():
+                raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return str(entry)
+
+
+class FigureRenderer:
+    """Content-addressed figure cache with worker-process rendering.
+
+    `in_process=True` draws in the calling process (tests, or environments
+    where spawning is not allowed). `draw` must be a top-level function when
+    rendering out of process.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = FIGURE_CACHE_DIR,
+        workers: int = 1,
+        in_process: bool = False,
+        draw: Optional[Callable[[Dict[str, Any], Path], Any]] = None,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.workers = max(1, workers)
+        self.in_process = in_process
+        self.draw = draw or draw_figures
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def pending_dir(self) -> Path:
+        return self.cache_dir / PENDING_DIRNAME
+
+    def entry_dir(self, digest: str) -> Path:
+        return self.cache_dir / digest
+
+    def is_cached(self, statistics_payload: Dict[str, Any]) -> bool:
+        entry = self.entry_dir(statistics_digest(statistics_payload))
+        return all(path.exists() for path in figure_file_paths(entry).values())
+
+    def render(self, statistics_payload: Dict[str, Any], figures_dir: Path) -> Dict[str, Path]:
+        return self.render_many([(statistics_payload, figures_dir)])[0]
+
+    def render_many(self, jobs: Sequence[Tuple[Dict[str, Any], Path]]) -> List[Dict[str, Path]]:
+        """Render every (statistics_payload, figures_dir) job; each distinct digest is drawn once."""
+        digests = [statistics_digest(payload) for payload, _ in jobs]
+        missing: Dict[str, Dict[str, Any]] = {}
+        for digest, (payload, _) in zip(digests, jobs):
+            if digest in missing:
+                continue
+            if all(path.exists() for path in figure_file_paths(self.entry_dir(digest)).values()):
+                self.hits += 1
+            else:
+                missing[digest] = figure_inputs(payload)
+        self.misses += len(missing)
+
+        tasks = [(self.draw, inputs, str(self.entry_dir(digest))) for digest, inputs in missing.items()]
+        if tasks and self.in_process:
+            for task in tasks:
+                shutil.rmtree(task[2], ignore_errors=True)
+                _render_into_cache(task)
+        elif tasks:
+            for task in tasks:
+                shutil.rmtree(task[2], ignore_errors=True)
+            # spawn, not fork: callers (e.g. the pipeline) are multi-threaded.
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks)), mp_context=context) as pool:
+                list(pool.map(_render_into_cache, tasks))
+
+        rendered = []
+        for digest, (_, figures_dir) in zip(digests, jobs):
+            figures_dir.mkdir(parents=True, exist_ok=True)
+            source = figure_file_paths(self.entry_dir(digest))
+            target = figure_file_paths(figures_dir)
+            for label, path in source.items():
+                shutil.copyfile(path, target[label])
+            rendered.append(target)
+        return rendered
+
+    def defer(self, statistics_payload: Dict[str, Any], figures_dir: Path) -> Path:
+        """Queue a render job instead of drawing now; returns the job file."""
+        digest = statistics_digest(statistics_payload)
+        self.pending_dir.mkdir(parents=True, exist_ok=True)
+        job_path = self.pending_dir / f"{digest}.json"
+        job = {
+            "digest": digest,
+            "figures_dir": str(figures_dir.resolve()),
+            "statistics": figure_inputs(statistics_payload),
+        }
+        job_path.write_text(json.dumps(job, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        return job_path
+
+    def pending_jobs(self) -> List[Path]:
+        return sorted(self.pending_dir.glob("*.json")) if self.pending_dir.exists() else []
+
+    def render_pending(self) -> List[Dict[str, Path]]:
+        """Render every queued job in parallel and remove it from the queue."""
+        job_paths = self.pending_jobs()
+        jobs = []
+        for job_path in job_paths:
+            job = json.loads(job_path.read_text(encoding="utf-8"))
+            jobs.append((job["statistics"], Path(job["figures_dir"])))
+        rendered = self.render_many(jobs)
+        for job_path in job_paths:
+            job_path.unlink()
+        return rendered
+
+
+def _expand_statistics_paths(patterns: Sequence[str]) -> List[Path]:
+    paths: List[Path] = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True))
+        paths.extend(Path(match) for match in (matches or [pattern]))
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Render (or re-use cached) report figures")
+    parser.add_argument(
+        "statistics",
+        nargs="*",
+        help="statistics.json files or glob patterns (e.g. 'runs/**/statistics.json').",
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="Figures directory for a single input (default: <statistics dir>/figures).",
+    )
+    parser.add_argument("--pending", action="store_true", help="Render all deferred jobs queued by the pipeline.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parallel render processes.")
+    parser.add_argument("--cache-dir", default=str(FIGURE_CACHE_DIR), help="Figure cache directory.")
+    parser.add_argument(
+        "--in-process",
+        action="store_true",
+        help="Draw in this process instead of worker processes (e.g. where spawning is restricted).",
+    )
+    args = parser.parse_args()
+
+    statistics_paths = _expand_statistics_paths(args.statistics)
+    if args.output and len(statistics_paths) > 1:
+        parser.error("--output only applies to a single statistics file")
+    if not statistics_paths and not args.pending:
+        parser.error("pass statistics files or --pending")
+
+    renderer = FigureRenderer(Path(args.cache_dir), workers=args.workers, in_process=args.in_process)
+    jobs = [
+        (
+            json.loads(path.read_text(encoding="utf-8")),
+            Path(args.output) if args.output else path.parent / "figures",
+        )
+        for path in statistics_paths
+    ]
+    rendered = renderer.render_many(jobs)
+    if args.pending:
+        rendered += renderer.render_pending()
+
+    for paths in rendered:
+        for label, path in paths.items():
+            print(f"  - {label}: {path}")
+    print(f"Figure cache: {renderer.hits} hit(s), {renderer.misses} rendered")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+"""
+Lightweight JSON-RPC stand-in for a deployed SwapGuard contract.
+
+Implements `eth_call` for the SwapGuard ABI used by `policy_engine.l3_validator`
+and `scripts/check_policy_parity.py`:
+
+- validateSwap(address,address,address,uint256,uint256)
+- allowedTokens(address) / allowedRouters(address)
+- maxValueWei() / maxSlippageBps() / owner() / NATIVE_ETH()
+
+State mirrors `contracts/src/SwapGuard.sol` seeded the same way as
+`contracts/script/Deploy.s.sol`, and reverts use the contract's exact reason
+strings in Anvil's `execution reverted: <reason>` error format. Batch requests
+and a configurable latency distribution are supported, so the l1l2l3 config can
+be load-tested without Anvil or Foundry.
+
+Usage:
+    python scripts/mock_swapguard_rpc.py --port 8545 --latency-ms 2
+
+    $env:SWAP_GUARD_ADDRESS = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+    $env:L3_RPC_URL = "http://127.0.0.1:8545"
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import dataclass, field
+import json
+import random
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from policy_engine.l3_validator import (  # noqa: E402
+    NATIVE_ETH_SENTINEL,
+    VALIDATE_SWAP_SIGNATURE,
+    _function_selector,
+)
+
+# First contract deployed by the default Anvil account (see .env.example).
+DEFAULT_CONTRACT_ADDRESS = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+DEFAULT_OWNER = "0xf39Fd6e51aad88F6F4ce6aB8827279cffFb92266"
+DEFAULT_CHAIN_ID = 31337
+
+# Mirrors contracts/script/Deploy.s.sol.
+DEPLOY_TOKENS = (
+    NATIVE_ETH_SENTINEL,
+    "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2",  # WETH
+    "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48",  # USDC
+    "0xdAC17F958D2ee523a2206206994597C13D831ec7",  # USDT
+    "0x6B175474E89094C44Da98b954EedeAC495271d0F",  # DAI
+)
+DEPLOY_ROUTERS = (
+    "0x1111111254fb6c44bAC0beD2854e76F90643097d",  # 1inch v5
+    "0x1111111254EEB25477B68fb85Ed929f73A960582",  # 1inch v6
+    "0xDef1C0ded9bec7F1a1670819833240f027b25EfF",  # 0x Exchange Proxy
+)
+DEPLOY_MAX_VALUE_WEI = 5 * 10**18
+DEPLOY_MAX_SLIPPAGE_BPS = 1000
+
+ERROR_STRING_SELECTOR = "0x08c379a0"  # Error(string)
+EXECUTION_REVERTED_CODE = 3
+
+
+class Revert(Exception):
+    """Solidity `require` failure carrying the revert reason string."""
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+
+def _norm(address: str) -> str:
+    return address.lower()
+
+
+def _word(data: str, index: int) -> str:
+    start = index * 64
+    chunk = data[start : start + 64]
+    if len(chunk) != 64:
+        raise Revert("")  # Too-short calldata reverts without reason, like the EVM.
+    return chunk
+
+
+def _decode_address(word: str) -> str:
+    return "0x" + word[-40:]
+
+
+def _encode_uint(value: int) -> str:
+    return "0x" + format(value, "064x")
+
+
+def _encode_bool(value: bool) -> str:
+    return _encode_uint(1 if value else 0)
+
+
+def _encode_address(address: str) -> str:
+    return "0x" + _norm(address).removeprefix("0x").rjust(64, "0")
+
+
+def encode_revert_data(reason: str) -> str:
+    """ABI-encode Error(string) as returned in revert data."""
+    raw = reason.encode("utf-8")
+    padded = raw.hex().ljust(((len(raw) + 31) // 32) * 64, "0")
+    return ERROR_STRING_SELECTOR + format(32, "064x") + format(len(raw), "064x") + padded
+
+
+@dataclass
+class SwapGuardState:
+    """In-memory mirror of SwapGuard storage and view functions."""
+
+    owner: str = DEFAULT_OWNER
+    allowed_tokens: Set[str] = field(default_factory=set)
+    allowed_routers: Set[str] = field(default_factory=set)
+    max_value_wei: int = DEPLOY_MAX_VALUE_WEI
+    max_slippage_bps: int = DEPLOY_MAX_SLIPPAGE_BPS
+
+    @classmethod
+    def from_deploy_script(cls) -> "SwapGuardState":
+        return cls(
+            allowed_tokens={_norm(a) for a in DEPLOY_TOKENS},
+            allowed_routers={_norm(a) for a in DEPLOY_ROUTERS},
+        )
+
+    def set_allowed_token(self, token: str, allowed: bool) -> None:
+        (self.allowed_tokens.add if allowed else self.allowed_tokens.discard)(_norm(token))
+
+    def set_allowed_router(self, router: str, allowed: bool) -> None:
+        (self.allowed_routers.add if allowed else self.allowed_routers.discard)(_norm(router))
+
+    def validate_swap(
+        self,
+        sell_token: str,
+        buy_token: str,
+        router: str,
+        eth_equivalent_value: int,
+        realized_slippage_bps: int,
+    ) -> None:
+        if _norm(sell_token) not in self.allowed_tokens:
+            raise Revert("R-01: sell token not allowed")
+        if _norm(buy_token) not in self.allowed_tokens:
+            raise Revert("R-01: buy token not allowed")
+        if _norm(router) not in self.allowed_routers:
+            raise Revert("R-02: router not allowed")
+        if realized_slippage_bps > self.max_slippage_bps:
+            raise Revert("R-03: slippage exceeds cap")
+        if eth_equivalent_value > self.max_value_wei:
+            raise Revert("R-04: value exceeds cap")
+
+    def call(self, calldata: str) -> str:
+        """Execute a view call and return ABI-encoded return data."""
+        data = calldata.lower().removeprefix("0x")
+        selector, args = "0x" + data[:8], data[8:]
+        handler = _VIEW_HANDLERS.get(selector)
+        if handler is None:
+            raise Revert("")  # No fallback function: unknown selectors revert.
+        return handler(self, args)
+
+    def _call_validate_swap(self, args: str) -> str:
+        self.validate_swap(
+            _decode_address(_word(args, 0)),
+            _decode_address(_word(args, 1)),
+            _decode_address(_word(args, 2)),
+            int(_word(args, 3), 16),
+            int(_word(args, 4), 16),
+        )
+        return "0x"
+
+
+_VIEW_HANDLERS: Dict[str, Callable[[SwapGuardState, str], str]] = {
+    _function_selector(VALIDATE_SWAP_SIGNATURE): SwapGuardState._call_validate_swap,
+    _function_selector("allowedTokens(address)"): lambda s, a: _encode_bool(
+        _norm(_decode_address(_word(a, 0))) in s.allowed_tokens
+    ),
+    _function_selector("allowedRouters(address)"): lambda s, a: _encode_bool(
+        _norm(_decode_address(_word(a, 0))) in s.allowed_routers
+    ),
+    _function_selector("maxValueWei()"): lambda s, a: _encode_uint(s.max_value_wei),
+    _function_selector("maxSlippageBps()"): lambda s, a: _encode_uint(s.max_slippage_bps),
+    _function_selector("owner()"): lambda s, a: _encode_address(s.owner),
+    _function_selector("NATIVE_ETH()"): lambda s, a: _encode_address(NATIVE_ETH_SENTINEL),
+}
+
+
+class SwapGuardRPC:
+    """JSON-RPC 2.0 front end for a single SwapGuardState."""
+
+    def __init__(
+        self,
+        state: Optional[SwapGuardState] = None,
+        contract_address: str = DEFAULT_CONTRACT_ADDRESS,
+        chain_id: int = DEFAULT_CHAIN_ID,
+        latency_ms: float = 0.0,
+        latency_jitter_ms: float = 0.0,
+        seed: int = 6290,
+    ) -> None:
+        self.state = state or SwapGuardState.from_deploy_script()
+        self.contract_address = _norm(contract_address)
+        self.chain_id = chain_id
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self._rng = random.Random(seed)
+        self.call_count = 0
+
+    def _eth_call(self, params: List[Any]) -> str:
+        tx = params[0] if params else {}
+        if _norm(str(tx.get("to", ""))) != self.contract_address:
+            return "0x"  # No code at address.
+        self.call_count += 1
+        return self.state.call(str(tx.get("data") or tx.get("input") or "0x"))
+
+    def handle_single(self, request: Any) -> Dict[str, Any]:
+        if not isinstance(request, dict) or request.get("jsonrpc") != "2.0" or "method" not in request:
+            return {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "Invalid Request"}}
+        request_id = request.get("id")
+        method = request["method"]
+        params = request.get("params") or []
+        try:
+            if method == "eth_call":
+                result: Any = self._eth_call(params)
+            elif method == "eth_chainId":
+                result = hex(self.chain_id)
+            elif method == "net_version":
+                result = str(self.chain_id)
+            elif method == "eth_blockNumber":
+                result = "0x1"
+            else:
+                return {
+                    "jsonrpc": "2.0",
+                    "id": request_id,
+                    "error": {"code": -32601, "message": f"Method not found: {method}"},
+                }
+        except Revert as exc:
+            message = f"execution reverted: {exc.reason}" if exc.reason else "execution reverted"
+            return {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "error": {
+                    "code": EXECUTION_REVERTED_CODE,
+                    "message": message,
+                    "data": encode_revert_data(exc.reason) if exc.reason else "0x",
+                },
+            }
+        except (TypeError, ValueError, AttributeError) as exc:
+            return {"jsonrpc": "2.0", "id": request_id, "error": {"code": -32602, "message": f"Invalid params: {exc}"}}
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    def dispatch(self, payload: Any) -> Any:
+        """Handle a single request object or a batch array."""
+        if isinstance(payload, list):
+            if not payload:
+                return {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "Invalid Request"}}
+            return [self.handle_single(item) for item in payload]
+        return self.handle_single(payload)
+
+    def _delay_seconds(self) -> float:
+        if self.latency_ms <= 0 and self.latency_jitter_ms <= 0:
+            return 0.0
+        jitter = self._rng.uniform(-self.latency_jitter_ms, self.latency_jitter_ms) if self.latency_jitter_ms else 0.0
+        return max(self.latency_ms + jitter, 0.0) / 1000.0
+
+    async def handle_body(self, body: bytes) -> bytes:
+        delay = self._delay_seconds()
+        if delay:
+            await asyncio.sleep(delay)
+        try:
+            payload = json.loads(body.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            response: Any = {"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "Parse error"}}
+        else:
+            response = self.dispatch(payload)
+        return json.dumps(response, separators=(",", ":")).encode("utf-8")
+
+    async def __call__(self, scope, receive, send) -> None:
+        """Minimal ASGI entry point (POST JSON-RPC on any path)."""
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        out = await self.handle_body(body)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(out)).encode())],
+            }
+        )
+        await send({"type": "http.response.body", "body": out})
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="JSON-RPC stand-in for a deployed SwapGuard contract.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8545)
+    parser.add_argument("--contract", default=DEFAULT_CONTRACT_ADDRESS, help="Address that answers eth_call.")
+    parser.add_argument("--chain-id", type=int, default=DEFAULT_CHAIN_ID)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mean added latency per HTTP request.")
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0, help="Uniform +/- jitter around the mean.")
+    parser.add_argument("--max-value-wei", type=int, default=DEPLOY_MAX_VALUE_WEI)
+    parser.add_argument("--max-slippage-bps", type=int, default=DEPLOY_MAX_SLIPPAGE_BPS)
+    parser.add_argument("--allow-token", action="append", default=[], help="Extra allowlisted token address.")
+    parser.add_argument("--deny-token", action="append", default=[], help="Remove a token from the allowlist.")
+    parser.add_argument("--allow-router", action="append", default=[], help="Extra allowlisted router address.")
+    parser.add_argument("--deny-router", action="append", default=[], help="Remove a router from the allowlist.")
+    return parser
+
+
+def build_rpc(args: argparse.Namespace) -> SwapGuardRPC:
+    state = SwapGuardState.from_deploy_script()
+    state.max_value_wei = args.max_value_wei
+    state.max_slippage_bps = args.max_slippage_bps
+    for token in args.allow_token:
+        state.set_allowed_token(token, True)
+    for token in args.deny_token:
+        state.set_allowed_token(token, False)
+    for router in args.allow_router:
+        state.set_allowed_router(router, True)
+    for router in args.deny_router:
+        state.set_allowed_router(router, False)
+    return SwapGuardRPC(
+        state=state,
+        contract_address=args.contract,
+        chain_id=args.chain_id,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import uvicorn
+
+    args = build_parser().parse_args(argv)
+    rpc = build_rpc(args)
+    print(f"SwapGuard RPC stand-in on http://{args.host}:{args.port}")
+    print(f"  SWAP_GUARD_ADDRESS={args.contract}")
+    print(f"  L3_RPC_URL=http://{args.host}:{args.port}")
+    uvicorn.run(rpc, host=args.host, port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
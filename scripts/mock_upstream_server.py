@@ -0,0 +1,364 @@
+"""
+Local stand-in for the CoinGecko and 1inch endpoints used by tool_coordinator.
+
+The server emulates:
+- `GET .../simple/price?ids=...&vs_currencies=usd`          (CoinGecko)
+- `GET .../swap/{version}/{chain_id}/quote?fromTokenAddress=...` (1inch)
+
+with configurable latency distributions, error rates, 429 bursts, and response
+sizes, so the REAL_TOOLS=true code path (parsing, fallbacks, strict mode) can be
+load-tested on one machine without touching the public APIs.
+
+Usage:
+    python scripts/mock_upstream_server.py --preset realistic --port 9100
+
+    # Point the agent at it
+    $env:REAL_TOOLS = "true"
+    $env:COINGECKO_BASE_URL = "http://127.0.0.1:9100/api/v3"
+    $env:ONEINCH_BASE_URL = "http://127.0.0.1:9100"
+    python -m uvicorn agent_client.src.main:app --port 8000
+
+Presets: fast, realistic, degraded, rate_limited, timeout. Individual knobs
+(`--error-rate`, `--latency`, `--burst-every`, ...) override the preset.
+`GET /__stats` returns per-endpoint request and outcome counters.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import Counter
+from dataclasses import asdict, dataclass, field, replace
+import json
+import math
+import os
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from agent_client.src.models.tokens import TOKEN_DECIMALS  # noqa: E402
+from agent_client.src.tools.tool_coordinator import (  # noqa: E402
+    COINGECKO_ID_MAP,
+    TOKEN_ADDRESS_MAP,
+    _MOCK_PRICES_USD,
+)
+
+LATENCY_KINDS = ("constant", "uniform", "normal", "lognormal", "exponential")
+ONEINCH_ROUTER = "0x1111111254fb6c44bAC0beD2854e76F90643097d"
+QUOTE_PATH_RE = re.compile(r"/swap/(?P<version>[^/]+)/(?P<chain_id>\d+)/quote$")
+PRICE_PATH_RE = re.compile(r"/simple/price$")
+
+_PRICE_BY_COINGECKO_ID = {gid: _MOCK_PRICES_USD.get(symbol, 1.0) for symbol, gid in COINGECKO_ID_MAP.items()}
+_SYMBOL_BY_ADDRESS = {address.lower(): symbol for symbol, address in TOKEN_ADDRESS_MAP.items()}
+
+
+@dataclass(frozen=True)
+class LatencySpec:
+    """Latency distribution in milliseconds.
+
+    - constant:    always `a`
+    - uniform:     uniform in [a, b]
+    - normal:      mean `a`, stddev `b` (clamped at 0)
+    - lognormal:   median `a`, sigma `b` of the underlying normal
+    - exponential: mean `a`
+    """
+
+    kind: str = "constant"
+    a: float = 0.0
+    b: float = 0.0
+
+    def sample_ms(self, rng: random.Random) -> float:
+        if self.kind == "constant":
+            return max(self.a, 0.0)
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        if self.kind == "normal":
+            return max(rng.gauss(self.a, self.b), 0.0)
+        if self.kind == "lognormal":
+            return rng.lognormvariate(math.log(max(self.a, 1e-6)), self.b)
+        if self.kind == "exponential":
+            return rng.expovariate(1.0 / self.a) if self.a > 0 else 0.0
+        raise ValueError(f"Unknown latency kind '{self.kind}', must be one of {LATENCY_KINDS}")
+
+    @classmethod
+    def parse(cls, text: str) -> "LatencySpec":
+        """Parse `kind:a[,b]`, e.g. `lognormal:80,0.5` or `constant:5`."""
+        kind, _, raw = text.partition(":")
+        kind = kind.strip().lower()
+        if kind not in LATENCY_KINDS:
+            raise ValueError(f"Unknown latency kind '{kind}', must be one of {LATENCY_KINDS}")
+        values = [float(part) for part in raw.split(",") if part.strip()] if raw else []
+        values += [0.0] * (2 - len(values))
+        return cls(kind=kind, a=values[0], b=values[1])
+
+
+@dataclass(frozen=True)
+class EndpointProfile:
+    latency: LatencySpec = field(default_factory=LatencySpec)
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    padding_bytes: int = 0
+
+
+@dataclass(frozen=True)
+class UpstreamProfile:
+    coingecko: EndpointProfile = field(default_factory=EndpointProfile)
+    oneinch: EndpointProfile = field(default_factory=EndpointProfile)
+    # Deterministic 429 bursts: every `burst_every_s`, reject all requests for
+    # `burst_duration_s`. Zero disables bursts.
+    burst_every_s: float = 0.0
+    burst_duration_s: float = 0.0
+    retry_after_s: int = 1
+    seed: int = 6290
+
+
+PRESETS: Dict[str, UpstreamProfile] = {
+    "fast": UpstreamProfile(),
+    "realistic": UpstreamProfile(
+        coingecko=EndpointProfile(latency=LatencySpec("lognormal", 80.0, 0.4), error_rate=0.005),
+        oneinch=EndpointProfile(latency=LatencySpec("lognormal", 250.0, 0.5), error_rate=0.01, padding_bytes=2048),
+    ),
+    "degraded": UpstreamProfile(
+        coingecko=EndpointProfile(latency=LatencySpec("lognormal", 400.0, 0.8), error_rate=0.05),
+        oneinch=EndpointProfile(latency=LatencySpec("lognormal", 1200.0, 0.8), error_rate=0.1, padding_bytes=8192),
+        burst_every_s=30.0,
+        burst_duration_s=3.0,
+    ),
+    "rate_limited": UpstreamProfile(
+        coingecko=EndpointProfile(latency=LatencySpec("constant", 20.0), rate_limit_rate=0.2),
+        oneinch=EndpointProfile(latency=LatencySpec("constant", 50.0), rate_limit_rate=0.2),
+        burst_every_s=10.0,
+        burst_duration_s=2.0,
+        retry_after_s=2,
+    ),
+    # Latency above tool_coordinator.HTTP_TIMEOUT to exercise timeout fallbacks.
+    "timeout": UpstreamProfile(
+        coingecko=EndpointProfile(latency=LatencySpec("constant", 12000.0)),
+        oneinch=EndpointProfile(latency=LatencySpec("constant", 12000.0)),
+    ),
+}
+
+
+Response = Tuple[int, Dict[str, str], bytes]
+
+
+def _json_response(status: int, payload: Any, extra_headers: Optional[Dict[str, str]] = None) -> Response:
+    headers = {"content-type": "application/json"}
+    headers.update(extra_headers or {})
+    return status, headers, json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def build_price_payload(ids: str, padding_bytes: int = 0) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {
+        gid: {"usd": _PRICE_BY_COINGECKO_ID.get(gid, 1.0)}
+        for gid in (part.strip() for part in ids.split(","))
+        if gid
+    }
+    if padding_bytes:
+        payload["_padding"] = "0" * padding_bytes
+    return payload
+
+
+def build_quote_payload(from_addr: str, to_addr: str, amount: str, padding_bytes: int = 0) -> Dict[str, Any]:
+    sell_sym = _SYMBOL_BY_ADDRESS.get(from_addr.lower(), "")
+    buy_sym = _SYMBOL_BY_ADDRESS.get(to_addr.lower(), "")
+    sell_human = int(amount) / 10 ** TOKEN_DECIMALS.get(sell_sym, 18)
+    buy_price = _MOCK_PRICES_USD.get(buy_sym, 1.0) or 1.0
+    buy_human = sell_human * _MOCK_PRICES_USD.get(sell_sym, 1.0) / buy_price
+    # 0.3% below market keeps quotes inside the L2 slippage cap.
+    to_amount = int(buy_human * 0.997 * 10 ** TOKEN_DECIMALS.get(buy_sym, 18))
+    return {
+        "fromToken": {"address": from_addr},
+        "toToken": {"address": to_addr},
+        "toTokenAmount": str(to_amount),
+        "estimatedGas": 180000,
+        "gasPrice": str(30 * 10**9),
+        "tx": {
+            "to": ONEINCH_ROUTER,
+            "data": "0x12aa3caf" + "0" * max(padding_bytes, 0),
+            "value": amount if sell_sym == "ETH" else "0",
+        },
+    }
+
+
+class MockUpstream:
+    """Transport-agnostic request handler plus counters."""
+
+    def __init__(self, profile: UpstreamProfile) -> None:
+        self.profile = profile
+        self._rng = random.Random(profile.seed)
+        self._started = time.monotonic()
+        self.stats: Dict[str, Counter] = {"coingecko": Counter(), "oneinch": Counter(), "other": Counter()}
+
+    def in_burst(self, now: Optional[float] = None) -> bool:
+        if self.profile.burst_every_s <= 0 or self.profile.burst_duration_s <= 0:
+            return False
+        elapsed = (now if now is not None else time.monotonic()) - self._started
+        return elapsed % self.profile.burst_every_s < self.profile.burst_duration_s
+
+    async def handle(self, method: str, path: str, query: str) -> Response:
+        if path == "/__stats":
+            return _json_response(200, {name: dict(counter) for name, counter in self.stats.items()})
+        if method != "GET":
+            self.stats["other"]["405"] += 1
+            return _json_response(405, {"error": "method not allowed"})
+
+        params = {key: values[-1] for key, values in parse_qs(query).items()}
+        if PRICE_PATH_RE.search(path):
+            endpoint, spec = "coingecko", self.profile.coingecko
+        elif QUOTE_PATH_RE.search(path):
+            endpoint, spec = "oneinch", self.profile.oneinch
+        else:
+            self.stats["other"]["404"] += 1
+            return _json_response(404, {"error": f"unknown path {path}"})
+
+        counter = self.stats[endpoint]
+        counter["requests"] += 1
+        latency_ms = spec.latency.sample_ms(self._rng)
+        if latency_ms > 0:
+            await asyncio.sleep(latency_ms / 1000.0)
+
+        if self.in_burst() or (spec.rate_limit_rate and self._rng.random() < spec.rate_limit_rate):
+            counter["429"] += 1
+            return _json_response(
+                429,
+                {"error": "Too Many Requests"},
+                {"retry-after": str(self.profile.retry_after_s)},
+            )
+        if spec.error_rate and self._rng.random() < spec.error_rate:
+            counter["500"] += 1
+            return _json_response(500, {"error": "Internal Server Error"})
+
+        try:
+            if endpoint == "coingecko":
+                payload = build_price_payload(params.get("ids", ""), spec.padding_bytes)
+            else:
+                payload = build_quote_payload(
+                    params["fromTokenAddress"],
+                    params["toTokenAddress"],
+                    params["amount"],
+                    spec.padding_bytes,
+                )
+        except (KeyError, ValueError) as exc:
+            counter["400"] += 1
+            return _json_response(400, {"error": f"bad request: {exc}"})
+
+        counter["200"] += 1
+        return _json_response(200, payload)
+
+    async def __call__(self, scope, receive, send) -> None:
+        """Minimal ASGI entry point; avoids framework routing overhead."""
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+        status, headers, body = await self.handle(
+            scope["method"],
+            scope["path"],
+            scope.get("query_string", b"").decode("latin-1"),
+        )
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(k.encode("latin-1"), v.encode("latin-1")) for k, v in headers.items()]
+                + [(b"content-length", str(len(body)).encode("latin-1"))],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+def resolve_profile(args: argparse.Namespace) -> UpstreamProfile:
+    profile = PRESETS[args.preset]
+    for name in ("coingecko", "oneinch"):
+        endpoint = getattr(profile, name)
+        latency = getattr(args, f"{name}_latency", None) or args.latency
+        if latency:
+            endpoint = replace(endpoint, latency=LatencySpec.parse(latency))
+        if args.error_rate is not None:
+            endpoint = replace(endpoint, error_rate=args.error_rate)
+        if args.rate_limit_rate is not None:
+            endpoint = replace(endpoint, rate_limit_rate=args.rate_limit_rate)
+        if args.padding_bytes is not None:
+            endpoint = replace(endpoint, padding_bytes=args.padding_bytes)
+        profile = replace(profile, **{name: endpoint})
+    if args.burst_every is not None:
+        profile = replace(profile, burst_every_s=args.burst_every)
+    if args.burst_duration is not None:
+        profile = replace(profile, burst_duration_s=args.burst_duration)
+    if args.seed is not None:
+        profile = replace(profile, seed=args.seed)
+    return profile
+
+
+def _profile_to_env(profile: UpstreamProfile) -> str:
+    return json.dumps(asdict(profile))
+
+
+def _profile_from_env() -> UpstreamProfile:
+    data = json.loads(os.environ["MOCK_UPSTREAM_PROFILE"])
+    endpoints = {
+        name: EndpointProfile(**{**data[name], "latency": LatencySpec(**data[name]["latency"])})
+        for name in ("coingecko", "oneinch")
+    }
+    scalars = {key: value for key, value in data.items() if key not in endpoints}
+    return UpstreamProfile(**endpoints, **scalars)
+
+
+def app_from_env() -> MockUpstream:
+    """uvicorn factory used for multi-worker mode (one profile per worker)."""
+    profile = _profile_from_env()
+    # Give each worker its own RNG stream so workers do not fail in lockstep.
+    return MockUpstream(replace(profile, seed=profile.seed + os.getpid()))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Local CoinGecko / 1inch stand-in for load testing.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="fast")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes.")
+    parser.add_argument("--latency", help="Latency for both endpoints, e.g. 'lognormal:80,0.4'.")
+    parser.add_argument("--coingecko-latency", help="Override CoinGecko latency only.")
+    parser.add_argument("--oneinch-latency", help="Override 1inch latency only.")
+    parser.add_argument("--error-rate", type=float, help="Probability of HTTP 500 per request.")
+    parser.add_argument("--rate-limit-rate", type=float, help="Probability of a random HTTP 429 per request.")
+    parser.add_argument("--burst-every", type=float, help="Seconds between deterministic 429 bursts (0 disables).")
+    parser.add_argument("--burst-duration", type=float, help="Length of each 429 burst in seconds.")
+    parser.add_argument("--padding-bytes", type=int, help="Extra bytes added to each success response.")
+    parser.add_argument("--seed", type=int)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import uvicorn
+
+    args = build_parser().parse_args(argv)
+    profile = resolve_profile(args)
+    print(f"Mock upstream preset={args.preset} on http://{args.host}:{args.port}")
+    print(f"  COINGECKO_BASE_URL=http://{args.host}:{args.port}/api/v3")
+    print(f"  ONEINCH_BASE_URL=http://{args.host}:{args.port}")
+    print(json.dumps(asdict(profile), indent=2))
+
+    common = {"host": args.host, "port": args.port, "log_level": "warning", "access_log": False}
+    if args.workers > 1:
+        os.environ["MOCK_UPSTREAM_PROFILE"] = _profile_to_env(profile)
+        uvicorn.run("scripts.mock_upstream_server:app_from_env", factory=True, workers=args.workers, **common)
+    else:
+        uvicorn.run(MockUpstream(profile), **common)
+
+
+if __name__ == "__main__":
+    main()
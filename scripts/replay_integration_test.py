@@ -8,10 +8,17 @@ Usage:
        python scripts/replay_integration_test.py
     3. Replay against a specific baseline artifact:
        python scripts/replay_integration_test.py --baseline-artifact "<artifact-json-path>"
+    4. Inspect the run index (SQLite, maintained by ArtifactStore):
+       python scripts/replay_integration_test.py --list-runs
+       python scripts/replay_integration_test.py --compare-commits <base-commit> <head-commit>
+    5. Compare two runs (decision flips, per-stage latency, Mann-Whitney test):
+       python scripts/replay_integration_test.py --compare commit=<base>,profile=l1l2 commit=<head>,profile=l1l2
 
 Notes:
     - By default, compares reproducibility-safe fields (seed, suite hash, case ids, metrics shape).
     - Use --strict-observed to additionally require observed decisions to match baseline.
+    - Every replay and --compare also writes a `run_comparison` artifact; --fail-on-regression
+      turns replay regressions into a failing check.
 """
 from __future__ import annotations
 
@@ -19,12 +26,17 @@ import argparse
 import json
 import math
 import sys
+import uuid
 from pathlib import Path
+from typing import Any, Dict
 
 root = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(root))
 
 from harness.agent_clients import FastAPIAgentClient
+from harness.artifacts import ArtifactStore, build_artifact
+from harness.compare import compare_runs, load_run_rows
+from harness.run_index import RunIndex
 from harness.runner import SmokeHarness
 
 
@@ -33,32 +45,136 @@ def _load_baseline(path: Path) -> dict:
         return json.load(handle)
 
 
-def _is_run_summary_artifact(path: Path) -> bool:
-    try:
-        data = _load_baseline(path)
-    except Exception:
-        return False
-    return (
-        isinstance(data, dict)
-        and data.get("type") == "run_summary"
-        and isinstance(data.get("payload"), dict)
-        and isinstance(data["payload"].get("data"), dict)
-        and isinstance(data["payload"]["data"].get("meta"), dict)
-    )
+def _find_latest_baseline_artifact(artifact_root: Path, suite: str | None = None) -> Path:
+    """Newest run_summary artifact, looked up in the run index (backfilled on first use).
+
+    Runs of `suite` are preferred; if there are none, the newest run of any
+    suite is used, as before the index recorded suites.
+    """
+    index = RunIndex(artifact_root)
+    if index.count() == 0 and index.rebuild() == 0:
+        raise FileNotFoundError("No artifacts found under artifacts/runs.")
+    entry = index.latest(type="run_summary", suite=suite) if suite else None
+    if entry is None:
+        if suite:
+            print(f"[WARN] No run_summary artifact for suite '{suite}'; using the newest of any suite")
+        entry = index.latest(type="run_summary")
+    if entry is None:
+        raise FileNotFoundError("No run_summary artifacts found under artifacts/runs.")
+    return entry.path
 
 
-def _find_latest_baseline_artifact(artifact_root: Path) -> Path:
-    runs_root = artifact_root / "runs"
-    if not runs_root.exists():
-        raise FileNotFoundError("No artifacts/runs directory found.")
+def _print_runs(index: RunIndex, limit: int) -> None:
+    for entry in index.list_runs(limit=limit):
+        metrics = ", ".join(
+            f"{name}={entry.metrics[name]:.4f}" for name in ("asr", "fp", "tr") if name in entry.metrics
+        )
+        print(
+            f"{entry.created_at}  {entry.git_commit or 'nogit':<8}  {entry.suite:<24}  "
+            f"{entry.defense_profile:<7}  {metrics}  {entry.path}"
+        )
 
-    candidates = [p for p in runs_root.rglob("*.json") if _is_run_summary_artifact(p)]
-    if not candidates:
-        raise FileNotFoundError("No run_summary artifacts found under artifacts/runs.")
 
-    # Latest by modification time.
-    candidates.sort(key=lambda p: p.stat().st_mtime, reverse=True)
-    return candidates[0]
+_SELECTOR_KEYS = {"commit": "git_commit", "profile": "defense_profile", "suite": "suite", "run": "run_id"}
+
+
+def resolve_run_selector(artifact_root: Path, selector: str) -> Path:
+    """Artifact path, or `key=value[,key=value]` over commit/profile/suite/run resolved via the run index."""
+    path = Path(selector)
+    if path.exists():
+        return path
+    filters = {}
+    for part in selector.split(","):
+        key, sep, value = part.partition("=")
+        if not sep or key.strip() not in _SELECTOR_KEYS:
+            raise ValueError(f"Invalid run selector '{selector}' (use a path or e.g. commit=abc1234,profile=l1l2)")
+        filters[_SELECTOR_KEYS[key.strip()]] = value.strip()
+    index = RunIndex(artifact_root)
+    if index.count() == 0:
+        index.rebuild()
+    entry = index.latest(type="run_summary", **filters)
+    if entry is None:
+        raise FileNotFoundError(f"No indexed run_summary artifact matches '{selector}'")
+    return entry.path
+
+
+def _run_reference(artifact: Dict[str, Any], path: Path) -> Dict[str, Any]:
+    data = artifact["payload"]["data"]
+    meta = data.get("meta", {})
+    return {
+        "artifact": str(path),
+        "run_id": artifact["run_id"],
+        "suite": artifact["suite"],
+        "defense_profile": artifact["defense_profile"],
+        "git_commit": meta.get("git_commit"),
+        "suite_sha256": meta.get("suite_sha256"),
+        "metrics": data.get("metrics", {}),
+    }
+
+
+def build_comparison(
+    baseline_path: Path,
+    candidate_path: Path,
+    alpha: float = 0.05,
+    min_relative_shift: float = 0.05,
+) -> Dict[str, Any]:
+    baseline_artifact, baseline_rows = load_run_rows(baseline_path)
+    candidate_artifact, candidate_rows = load_run_rows(candidate_path)
+    comparison = compare_runs(baseline_rows, candidate_rows, alpha, min_relative_shift)
+    comparison["baseline"] = _run_reference(baseline_artifact, baseline_path)
+    comparison["candidate"] = _run_reference(candidate_artifact, candidate_path)
+    return comparison
+
+
+def write_comparison_artifact(comparison: Dict[str, Any], artifact_root: Path) -> Path:
+    candidate = comparison["candidate"]
+    artifact = build_artifact(
+        run_id=str(uuid.uuid4()),
+        type="run_comparison",
+        testcase_id="run-comparison",
+        suite=candidate["suite"],
+        defense_profile=candidate["defense_profile"],
+        payload=comparison,
+    )
+    return ArtifactStore(artifact_root).write(artifact, git_commit=candidate["git_commit"])
+
+
+def print_comparison(comparison: Dict[str, Any]) -> None:
+    baseline, candidate = comparison["baseline"], comparison["candidate"]
+    print("=== Run Comparison ===")
+    print(f"Baseline : {baseline['git_commit'] or 'nogit'} {baseline['defense_profile']} ({baseline['artifact']})")
+    print(f"Candidate: {candidate['git_commit'] or 'nogit'} {candidate['defense_profile']} ({candidate['artifact']})")
+    decisions = comparison["decisions"]
+    counts = decisions["flip_counts"]
+    print(
+        f"Decisions: {decisions['compared']} compared, {counts['regression']} regression(s), "
+        f"{counts['improvement']} improvement(s), {counts['changed']} other change(s)"
+    )
+    for flip in decisions["flips"]:
+        print(f"  [{flip['kind']:<11}] {flip['case_id']}: {flip['baseline']} -> {flip['candidate']}")
+    if decisions["only_in_baseline"] or decisions["only_in_candidate"]:
+        print(
+            f"  missing in candidate: {len(decisions['only_in_baseline'])}, "
+            f"new in candidate: {len(decisions['only_in_candidate'])}"
+        )
+    print("Latency (ms):")
+    for stage, entry in comparison["latency"].items():
+        before, after = entry["baseline"], entry["candidate"]
+        p_value = entry["mann_whitney"]["p_value"]
+        marker = "REGRESSION" if entry["regression"] else "ok"
+        print(
+            f"  {stage:<10} p50 {before['p50']:.2f} -> {after['p50']:.2f}  "
+            f"p95 {before['p95']:.2f} -> {after['p95']:.2f}  p99 {before['p99']:.2f} -> {after['p99']:.2f}  "
+            f"p={'n/a' if p_value is None else f'{p_value:.4f}'}  {marker}"
+        )
+    print("[PASS] No regressions." if comparison["passed"] else "[FAIL] Regressions detected.")
+
+
+def _write_comparison_outputs(comparison: Dict[str, Any], artifact_root: Path, output: str | None) -> None:
+    print(f"Comparison artifact: {write_comparison_artifact(comparison, artifact_root)}")
+    if output:
+        Path(output).write_text(json.dumps(comparison, indent=2) + "\n", encoding="utf-8")
+        print(f"Comparison JSON: {output}")
 
 
 def _extract_core(artifact: dict) -> dict:
@@ -92,14 +208,59 @@ def main() -> None:
     )
     parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="Agent service base URL.")
     parser.add_argument("--strict-observed", action="store_true", help="Require observed decisions to match exactly.")
+    parser.add_argument("--list-runs", type=int, nargs="?", const=20, help="Print the newest indexed runs and exit.")
+    parser.add_argument(
+        "--compare-commits",
+        nargs=2,
+        metavar=("BASE", "HEAD"),
+        help="Print indexed metric deltas between two commits and exit.",
+    )
+    parser.add_argument("--rebuild-index", action="store_true", help="Re-scan artifacts/runs into the run index first.")
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("BASELINE", "CANDIDATE"),
+        help="Compare two runs (artifact paths or selectors like commit=abc1234,profile=l1l2) and exit.",
+    )
+    parser.add_argument("--alpha", type=float, default=0.05, help="Significance level for latency regressions.")
+    parser.add_argument(
+        "--min-shift",
+        type=float,
+        default=0.05,
+        help="Minimum relative p50 increase for a significant latency shift to count as a regression.",
+    )
+    parser.add_argument("--output", help="Also write the comparison JSON to this path.")
+    parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help="After a replay, fail when the baseline comparison finds regressions.",
+    )
     args = parser.parse_args()
 
+    suite_path = Path(args.suite_path)
+    artifact_root = root / "artifacts"
+    if args.rebuild_index:
+        print(f"Indexed {RunIndex(artifact_root).rebuild()} artifact(s).")
+    if args.list_runs is not None:
+        _print_runs(RunIndex(artifact_root), args.list_runs)
+        return
+    if args.compare_commits:
+        comparisons = RunIndex(artifact_root).compare_commits(*args.compare_commits)
+        print(json.dumps(comparisons, indent=2))
+        return
+    if args.compare:
+        baseline_path, candidate_path = (resolve_run_selector(artifact_root, value) for value in args.compare)
+        comparison = build_comparison(baseline_path, candidate_path, args.alpha, args.min_shift)
+        print_comparison(comparison)
+        _write_comparison_outputs(comparison, artifact_root, args.output)
+        if not comparison["passed"]:
+            sys.exit(2)
+        return
+
     if args.baseline_artifact:
         baseline_path = Path(args.baseline_artifact)
     else:
-        baseline_path = _find_latest_baseline_artifact(root / "artifacts")
-    suite_path = Path(args.suite_path)
-    artifact_root = root / "artifacts"
+        baseline_path = _find_latest_baseline_artifact(artifact_root, suite=suite_path.stem)
 
     baseline = _load_baseline(baseline_path)
     baseline_core = _extract_core(baseline)
@@ -166,6 +327,13 @@ def main() -> None:
     print("\n=== Replay Artifact ===")
     print(replay_artifact_path)
 
+    print()
+    comparison = build_comparison(baseline_path, replay_artifact_path, args.alpha, args.min_shift)
+    print_comparison(comparison)
+    _write_comparison_outputs(comparison, artifact_root, args.output)
+    if args.fail_on_regression:
+        checks.append(_check(comparison["passed"], "no decision or latency regressions"))
+
     if all(checks):
         print("\n[PASS] Replay consistency checks passed.")
         return
@@ -0,0 +1,144 @@
+"""
+Artifact write-throughput benchmark.
+
+Writes N synthetic per-case artifacts through
+`harness.artifact_writer.ShardedArtifactWriter` and, optionally, through the
+one-file-at-a-time `ArtifactStore.write`, then reports artifacts/s, bytes on
+disk, the largest directory, and bundle time.
+
+Example:
+    $env:PYTHONPATH = "."
+    python scripts/run_artifact_write_benchmark.py --artifacts 50000 --workers 8 --compression gzip --bundle tar
+    python scripts/run_artifact_write_benchmark.py --artifacts 5000 --compare-legacy
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from harness.artifact_writer import BUNDLE_FORMATS, COMPRESSIONS, ShardedArtifactWriter  # noqa: E402
+from harness.artifacts import Artifact, ArtifactStore, build_artifact  # noqa: E402
+
+
+def build_case_artifacts(count: int, run_id: str) -> List[Artifact]:
+    artifacts = []
+    for index in range(count):
+        case_id = f"case-{index:06d}"
+        artifacts.append(build_artifact(
+            run_id=run_id,
+            type="case_result",
+            testcase_id=case_id,
+            suite="synthetic",
+            defense_profile=("bare", "l1", "l1l2", "l1l2l3")[index % 4],
+            payload={
+                "case_id": case_id,
+                "category": "benign" if index % 5 == 0 else "direct_injection",
+                "observed": "BLOCK",
+                "duration_s": 0.004,
+                "raw": {
+                    "status": "BLOCKED",
+                    "message": "Swap 1 ETH to USDC on Sepolia",
+                    "tx_plan": {"from_token": "ETH", "to_token": "USDC", "route": ["uniswap_v3"]},
+                },
+            },
+        ))
+    return artifacts
+
+
+def benchmark_sharded(
+    root: Path,
+    artifacts: List[Artifact],
+    run_id: str,
+    workers: int,
+    compression: str,
+    fsync_every: int,
+    bundle: str | None,
+) -> Dict[str, Any]:
+    store = ArtifactStore(root)
+    started = time.perf_counter()
+    writer = ShardedArtifactWriter(
+        store, run_id, workers=workers, compression=compression, fsync_every=fsync_every
+    )
+    writer.write_many(artifacts)
+    writer.close()
+    elapsed = time.perf_counter() - started
+    summary = {
+        "artifacts": writer.written,
+        "seconds": elapsed,
+        "artifacts_per_s": writer.written / elapsed if elapsed else None,
+        "bytes": writer.bytes_written,
+        "max_files_per_directory": writer.max_files_per_directory(),
+        "indexed": store.index.count() if store.index is not None else None,
+    }
+    if bundle:
+        started = time.perf_counter()
+        bundle_path = writer.bundle(bundle)
+        summary["bundle"] = {"path": str(bundle_path), "seconds": time.perf_counter() - started,
+                             "bytes": bundle_path.stat().st_size}
+    return summary
+
+
+def benchmark_legacy(root: Path, artifacts: List[Artifact]) -> Dict[str, Any]:
+    store = ArtifactStore(root)
+    started = time.perf_counter()
+    for artifact in artifacts:
+        store.write(artifact)
+    elapsed = time.perf_counter() - started
+    return {
+        "artifacts": len(artifacts),
+        "seconds": elapsed,
+        "artifacts_per_s": len(artifacts) / elapsed if elapsed else None,
+        "max_files_per_directory": max(
+            (sum(1 for _ in run_dir.iterdir()) for run_dir in (root / "runs").glob("*/*") if run_dir.is_dir()),
+            default=0,
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark sharded artifact writes")
+    parser.add_argument("--artifacts", type=int, default=20_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--compression", choices=tuple(COMPRESSIONS), default="gzip")
+    parser.add_argument("--fsync-every", type=int, default=1000, help="Files per fsync batch (0 disables fsync).")
+    parser.add_argument("--bundle", choices=BUNDLE_FORMATS, default=None)
+    parser.add_argument("--compare-legacy", action="store_true", help="Also time ArtifactStore.write per file.")
+    parser.add_argument("--root", default=None, help="Artifact root (default: a temporary directory, removed after).")
+    parser.add_argument("--output", help="Optional JSON output path.")
+    args = parser.parse_args()
+
+    root = Path(args.root) if args.root else Path(tempfile.mkdtemp(prefix="artifact-bench-"))
+    try:
+        results: Dict[str, Any] = {}
+        run_id = str(uuid.uuid4())
+        artifacts = build_case_artifacts(args.artifacts, run_id)
+        results["sharded"] = benchmark_sharded(
+            root / "sharded", artifacts, run_id, args.workers, args.compression, args.fsync_every, args.bundle
+        )
+        if args.compare_legacy:
+            results["legacy"] = benchmark_legacy(root / "legacy", artifacts)
+    finally:
+        if not args.root:
+            shutil.rmtree(root, ignore_errors=True)
+
+    for label, summary in results.items():
+        print(
+            f"{label:<8} {summary['artifacts']} artifacts in {summary['seconds']:.2f}s "
+            f"({summary['artifacts_per_s']:.0f}/s), max {summary['max_files_per_directory']} files per directory"
+        )
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
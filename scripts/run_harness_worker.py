@@ -0,0 +1,53 @@
+"""
+Join a distributed harness run (`harness.distributed`) as an extra worker.
+
+The coordinator (e.g. `run_integration_test.py --mode live --workers N
+--coordinator-bind 0.0.0.0:7000`) prints its address; start workers on other
+hosts with the same authkey:
+
+Example:
+    $env:PYTHONPATH = "."
+    $env:HARNESS_AUTHKEY = "<shared secret>"
+    python scripts/run_harness_worker.py --coordinator 10.0.0.5:7000 --config l1l2l3
+    python scripts/run_harness_worker.py --coordinator 10.0.0.5:7000 --config l1 --agent http://127.0.0.1:8001
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from harness.distributed import AUTHKEY_ENV, IN_PROCESS_AGENT, parse_address, resolve_authkey, run_worker  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Distributed harness worker")
+    parser.add_argument("--coordinator", required=True, help="Coordinator HOST:PORT.")
+    parser.add_argument("--config", required=True, help="Defense config this worker is pinned to.")
+    parser.add_argument(
+        "--agent",
+        default=IN_PROCESS_AGENT,
+        help="'in-process' or an agent server URL (the config is sent per request).",
+    )
+    parser.add_argument("--authkey", default=None, help=f"Shared secret (default: ${AUTHKEY_ENV}).")
+    parser.add_argument("--worker-id", default=None)
+    args = parser.parse_args()
+
+    if args.authkey is None and AUTHKEY_ENV not in os.environ:
+        parser.error(f"--authkey or ${AUTHKEY_ENV} is required")
+    evaluated = run_worker(
+        parse_address(args.coordinator),
+        resolve_authkey(args.authkey),
+        args.config,
+        agent=args.agent,
+        worker_id=args.worker_id,
+    )
+    print(f"Worker done: {evaluated} cases evaluated for config '{args.config}'")
+
+
+if __name__ == "__main__":
+    main()
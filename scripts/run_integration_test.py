@@ -6,9 +6,19 @@ Default behavior is fully offline and deterministic:
 2. Reuse canonical archived final reports for all four configurations.
 3. Regenerate final_results, statistics, figures, tables, and final threat model.
 
+Steps run as a memoized DAG (`harness.pipeline`): a step is skipped when its
+inputs (dataset/report hashes, parameters, code hashes) and outputs are
+unchanged since the last run. `--force` reruns everything. Figures come from
+`scripts/figure_renderer.py` (content-addressed cache, worker-process
+rendering); `--figures deferred` queues them and `--no-figures` skips them.
+
 Optional live mode evaluates all 4 configs (including l1l2l3) against a running
 FastAPI agent + Anvil chain:
     python scripts/run_integration_test.py --mode live
+With `--workers N` the configs run in parallel on a coordinator/work-queue
+harness (`harness.distributed`), each worker pinned to one config and sending
+it per request (X-Defense-Config), so one server evaluates all four at once:
+    python scripts/run_integration_test.py --mode live --workers 8
 """
 from __future__ import annotations
 
@@ -16,20 +26,26 @@ import argparse
 import csv
 import json
 import math
-import statistics
+import os
 import sys
-from collections import Counter, defaultdict
+from collections import Counter
 from pathlib import Path
-from typing import Any, Dict, Iterable, List
+from typing import Any, Dict, List
 
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
 
 from harness.agent_clients import FastAPIAgentClient
-from harness.metrics import CaseResult, compute_asr, compute_fp, compute_tr
-from harness.runner import SmokeHarness
+from harness.distributed import AUTHKEY_ENV, parse_address, run_distributed_suite
+from harness.confidence import compute_confidence_intervals, summarize_for_intervals
+from harness.metrics import CaseResult, MetricsAccumulator
+from harness.pipeline import Pipeline, Step, files_fingerprint
+from harness.results_store import load_report, store_exists, store_paths, write_results
+from harness.runner import SmokeHarness, resolve_git_commit
+from scripts.figure_renderer import FIGURE_CACHE_DIR, FigureRenderer, figure_file_paths
 
 CONFIGS = ("bare", "l1", "l1l2", "l1l2l3")
+RESULTS_FORMATS = ("json", "columnar", "both")
 FINAL_DATASET_RELATIVE = Path("testcases") / "final_attack_dataset.json"
 FINAL_DATASET_LABEL = "final_attack_dataset"
 FINAL_REPORT_STEM = "final_attack_dataset"
@@ -38,6 +54,16 @@ ARCHIVED_RESULTS = {
     config: ROOT / "artifacts" / "final_results" / f"results_{config}_{FINAL_REPORT_STEM}.json"
     for config in CONFIGS
 }
+PIPELINE_CACHE_PATH = ROOT / "artifacts" / ".pipeline_cache" / "run_integration_test.json"
+# Code whose changes must invalidate cached pipeline outputs.
+PIPELINE_CODE_FILES = (
+    Path(__file__).resolve(),
+    ROOT / "harness" / "metrics.py",
+    ROOT / "harness" / "confidence.py",
+    ROOT / "harness" / "results_store.py",
+    ROOT / "scripts" / "figure_renderer.py",
+)
+FIGURE_MODES = ("render", "deferred", "off")
 ATTACK_VECTOR_MAP = {
     "adv-direct-": "direct_injection",
     "adv-ind-": "indirect_or_encoded",
@@ -93,50 +119,55 @@ def case_result_from_dict(result: Dict[str, Any]) -> CaseResult:
     )
 
 
-def compute_mean_variance(values: Iterable[float]) -> Dict[str, float | int]:
-    values = list(values)
-    if not values:
-        return {"mean": 0.0, "variance": 0.0, "sample_size": 0}
-    if len(values) == 1:
-        return {"mean": float(values[0]), "variance": 0.0, "sample_size": 1}
-    return {
-        "mean": float(statistics.mean(values)),
-        "variance": float(statistics.pvariance(values)),
-        "sample_size": len(values),
-    }
-
-
-def recompute_metrics(report: Dict[str, Any]) -> Dict[str, float]:
-    results = [case_result_from_dict(result) for result in report["results"]]
-    return {
-        "asr": compute_asr(results),
-        "fp": compute_fp(results),
-        "tr": compute_tr(results),
-    }
-
-
 def load_archived_reports() -> Dict[str, Dict[str, Any]]:
+    """Load the archived report per config, preferring the results store over legacy JSON."""
     reports: Dict[str, Dict[str, Any]] = {}
     for config in CONFIGS:
-        path = ARCHIVED_RESULTS.get(config)
-        if not path or not path.exists():
+        path = ARCHIVED_RESULTS[config]
+        store_base = path.with_suffix("")
+        if store_exists(store_base):
+            report = load_report(store_base, include_raw=True)
+            source = store_paths(store_base)["meta"]
+        elif path.exists():
+            report = load_json(path)
+            source = path
+        else:
             print(f"[WARN] No archived results for config '{config}', skipping (use --mode live to generate)")
             continue
-        report = load_json(path)
         report_case_count = len(report.get("results", []))
         if report_case_count != EXPECTED_FINAL_CASE_COUNT:
             raise RuntimeError(
                 f"Archived report for '{config}' is not the final 125-case benchmark: "
-                f"{path.relative_to(ROOT)} has {report_case_count} results."
+                f"{source.relative_to(ROOT)} has {report_case_count} results."
             )
         report.setdefault("meta", {})
         report["meta"]["source_mode"] = "archived"
-        report["meta"]["source_report"] = str(path.relative_to(ROOT))
+        report["meta"]["source_report"] = str(source.relative_to(ROOT))
         reports[config] = report
     return reports
 
 
-def run_live_reports(dataset_path: Path, output_dir: Path, server_url: str, seed: int) -> Dict[str, Dict[str, Any]]:
+def run_live_reports(
+    dataset_path: Path,
+    output_dir: Path,
+    server_url: str,
+    seed: int,
+    workers: int = 0,
+    config_servers: Dict[str, str] | None = None,
+    coordinator_bind: str | None = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Evaluate every config live.
+
+    With `workers` == 0 one server is switched through the configs in turn.
+    Otherwise `harness.distributed` runs all configs at once on `workers`
+    processes, each pinned to one config via a per-request override: against
+    the server given for it in `config_servers` ("in-process" for an
+    in-process agent), else `server_url`.
+    """
+    if workers > 0:
+        agents = {config: (config_servers or {}).get(config, server_url) for config in CONFIGS}
+        return run_distributed_reports(dataset_path, output_dir, seed, workers, agents, coordinator_bind)
+
     client = FastAPIAgentClient(base_url=server_url)
     if not client.health_check():
         raise RuntimeError(f"Agent server unreachable at {server_url}")
@@ -153,25 +184,268 @@ def run_live_reports(dataset_path: Path, output_dir: Path, server_url: str, seed
     return reports
 
 
+def run_distributed_reports(
+    dataset_path: Path,
+    output_dir: Path,
+    seed: int,
+    workers: int,
+    agents: Dict[str, str] | None = None,
+    coordinator_bind: str | None = None,
+) -> Dict[str, Dict[str, Any]]:
+    host, port = parse_address(coordinator_bind) if coordinator_bind else ("127.0.0.1", 0)
+
+    def _announce(address: Any, authkey: bytes) -> None:
+        if not coordinator_bind:
+            return
+        print(f"Coordinator listening on {address[0]}:{address[1]}; join with "
+              f"scripts/run_harness_worker.py --coordinator HOST:{address[1]} --config <config>")
+        if AUTHKEY_ENV not in os.environ:
+            print(f"[WARN] ${AUTHKEY_ENV} is not set; only local workers can join")
+
+    reports = run_distributed_suite(
+        dataset_path,
+        output_dir,
+        CONFIGS,
+        workers=workers,
+        agents=agents,
+        seed=seed,
+        host=host,
+        port=port,
+        on_start=_announce,
+    )
+    for config, report in reports.items():
+        report["meta"]["source_mode"] = "live"
+        report["meta"]["active_defense_config"] = config
+    return reports
+
+
 def write_final_reports(
     reports: Dict[str, Dict[str, Any]],
     dataset_name: str,
     output_dir: Path,
+    results_format: str = "json",
 ) -> Dict[str, Path]:
+    """Write one report per config.
+
+    `json` keeps the legacy pretty-printed file, `columnar` writes the
+    append-friendly results store (`harness.results_store`), `both` writes both.
+    The returned path is the JSON file when written, otherwise the store's meta file.
+    """
+    if results_format not in RESULTS_FORMATS:
+        raise ValueError(f"Invalid results_format '{results_format}', must be one of {RESULTS_FORMATS}")
     written: Dict[str, Path] = {}
     output_dir.mkdir(parents=True, exist_ok=True)
     for config, report in reports.items():
         report.setdefault("run", {})
         report["run"]["suite_name"] = FINAL_DATASET_LABEL
         path = output_dir / f"results_{config}_{dataset_name}.json"
-        path.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
-        written[config] = path
+        if results_format in ("columnar", "both"):
+            written[config] = write_results(report, path.with_suffix(""))["meta"]
+        if results_format in ("json", "both"):
+            path.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+            written[config] = path
     return written
 
 
+def final_report_paths(config: str, dataset_name: str, output_dir: Path, results_format: str) -> List[Path]:
+    """Files `write_final_reports` produces for one config."""
+    path = output_dir / f"results_{config}_{dataset_name}.json"
+    paths: List[Path] = []
+    if results_format in ("columnar", "both"):
+        paths.extend(store_paths(path.with_suffix("")).values())
+    if results_format in ("json", "both"):
+        paths.append(path)
+    return paths
+
+
+def final_report_path(config: str, dataset_name: str, output_dir: Path, results_format: str) -> Path:
+    """The path `write_final_reports` returns for one config."""
+    path = output_dir / f"results_{config}_{dataset_name}.json"
+    if results_format == "columnar":
+        return store_paths(path.with_suffix(""))["meta"]
+    return path
+
+
+def load_written_reports(output_dir: Path, results_format: str = "columnar") -> Dict[str, Dict[str, Any]]:
+    """Reload reports written by `write_final_reports`.
+
+    The results store is preferred unless only JSON is being written, so a
+    stale legacy JSON file from an older run never shadows a fresh store.
+    """
+    reports: Dict[str, Dict[str, Any]] = {}
+    for config in CONFIGS:
+        path = output_dir / f"results_{config}_{FINAL_REPORT_STEM}.json"
+        store_base = path.with_suffix("")
+        if results_format != "json" and store_exists(store_base):
+            reports[config] = load_report(store_base, include_raw=True)
+        elif path.exists():
+            reports[config] = load_json(path)
+        elif store_exists(store_base):
+            reports[config] = load_report(store_base, include_raw=True)
+    return reports
+
+
+def _archived_report_files() -> List[Path]:
+    files: List[Path] = []
+    for path in ARCHIVED_RESULTS.values():
+        files.append(path)
+        files.extend(store_paths(path.with_suffix("")).values())
+    return files
+
+
+def build_integration_pipeline(
+    *,
+    mode: str,
+    source_dataset: Path,
+    final_dataset: Path,
+    final_results_dir: Path,
+    figures_dir: Path,
+    threat_model_path: Path,
+    server_url: str = "http://127.0.0.1:8000",
+    seed: int = 6290,
+    results_format: str = "columnar",
+    ci_resamples: int = 10_000,
+    ci_workers: int = 1,
+    cache_path: Path = PIPELINE_CACHE_PATH,
+    jobs: int = 4,
+    figures: str = "render",
+    figure_cache_dir: Path = FIGURE_CACHE_DIR,
+    workers: int = 0,
+    config_servers: Dict[str, str] | None = None,
+    coordinator_bind: str | None = None,
+) -> Pipeline:
+    """Wire the reproducibility steps into a memoized DAG.
+
+    dataset -> reports -> statistics -> {figures, latex_table, threat_model}.
+    Archived mode fingerprints the archived report files; live mode always
+    reruns `reports`, and downstream steps rerun only if the reports changed.
+    `figures="deferred"` queues a render job instead of drawing, and
+    `figures="off"` drops the step entirely.
+    """
+    if figures not in FIGURE_MODES:
+        raise ValueError(f"Unsupported figures mode '{figures}'")
+    # Every step key carries the code, commit and dataset that run metadata
+    # records, so a cached step is never reused across commits or datasets.
+    environment = {
+        "code": files_fingerprint(PIPELINE_CODE_FILES),
+        "git_commit": resolve_git_commit(),
+        "source_dataset": files_fingerprint([source_dataset]),
+    }
+    pipeline = Pipeline(cache_path, max_workers=jobs)
+
+    def _available_configs() -> List[str]:
+        if mode == "live":
+            return list(CONFIGS)
+        return [
+            config for config in CONFIGS
+            if ARCHIVED_RESULTS[config].exists() or store_exists(ARCHIVED_RESULTS[config].with_suffix(""))
+        ]
+
+    def _load_reports() -> Dict[str, Dict[str, Any]]:
+        if mode == "live":
+            return load_written_reports(final_results_dir, results_format)
+        return load_archived_reports()
+
+    def _run_reports(deps: Any) -> Dict[str, Dict[str, Any]]:
+        if mode == "live":
+            reports = run_live_reports(
+                final_dataset, final_results_dir, server_url, seed, workers, config_servers, coordinator_bind
+            )
+        else:
+            reports = load_archived_reports()
+        if not reports:
+            raise RuntimeError("No reports available. Use --mode live with a running agent to generate results.")
+        write_final_reports(reports, FINAL_REPORT_STEM, final_results_dir, results_format)
+        return reports
+
+    def _run_statistics(deps: Any) -> Dict[str, Any]:
+        statistics_payload = build_statistics(
+            deps["dataset"],
+            deps["reports"],
+            ci_resamples=ci_resamples,
+            ci_workers=ci_workers,
+            ci_seed=seed,
+        )
+        write_summary_files(final_results_dir, deps["dataset"], deps["reports"], statistics_payload)
+        return statistics_payload
+
+    pipeline.add(Step(
+        name="dataset",
+        run=lambda deps: freeze_final_dataset(source_dataset, final_dataset),
+        inputs=lambda: {"environment": environment},
+        outputs=lambda: [final_dataset],
+        load=lambda: load_json(final_dataset),
+    ))
+    pipeline.add(Step(
+        name="reports",
+        run=_run_reports,
+        deps=("dataset",),
+        inputs=lambda: {
+            "mode": mode,
+            "results_format": results_format,
+            "seed": seed,
+            "archived": files_fingerprint(_archived_report_files()) if mode == "archived" else None,
+            "environment": environment,
+        },
+        outputs=lambda: [
+            path for config in _available_configs()
+            for path in final_report_paths(config, FINAL_REPORT_STEM, final_results_dir, results_format)
+        ],
+        load=_load_reports,
+        always_run=mode == "live",
+    ))
+    pipeline.add(Step(
+        name="statistics",
+        run=_run_statistics,
+        deps=("dataset", "reports"),
+        inputs=lambda: {"ci_resamples": ci_resamples, "seed": seed, "environment": environment},
+        outputs=lambda: list(summary_file_paths(final_results_dir).values()),
+        load=lambda: load_json(summary_file_paths(final_results_dir)["statistics"]),
+    ))
+    if figures == "render":
+        pipeline.add(Step(
+            name="figures",
+            run=lambda deps: {
+                label: str(path)
+                for label, path in generate_figures(deps["statistics"], figures_dir, figure_cache_dir).items()
+            },
+            deps=("statistics",),
+            inputs=lambda: {"mode": figures, "environment": environment},
+            outputs=lambda: list(figure_file_paths(figures_dir).values()),
+        ))
+    elif figures == "deferred":
+        pipeline.add(Step(
+            name="figures",
+            run=lambda deps: {
+                "pending": str(FigureRenderer(figure_cache_dir).defer(deps["statistics"], figures_dir)),
+            },
+            deps=("statistics",),
+            inputs=lambda: {"mode": figures, "environment": environment},
+        ))
+    pipeline.add(Step(
+        name="latex_table",
+        run=lambda deps: str(write_latex_table(deps["statistics"], figures_dir)),
+        deps=("statistics",),
+        inputs=lambda: {"environment": environment},
+        outputs=lambda: [figures_dir / "final_metrics_table.tex"],
+    ))
+    pipeline.add(Step(
+        name="threat_model",
+        run=lambda deps: str(write_final_threat_model(deps["statistics"], threat_model_path)),
+        deps=("statistics",),
+        inputs=lambda: {"environment": environment},
+        outputs=lambda: [threat_model_path],
+    ))
+    return pipeline
+
+
 def build_statistics(
     dataset_cases: List[Dict[str, Any]],
     reports: Dict[str, Dict[str, Any]],
+    ci_resamples: int = 10_000,
+    ci_workers: int = 1,
+    ci_seed: int = 6290,
+    confidence: float = 0.95,
 ) -> Dict[str, Any]:
     dataset_case_count = len(dataset_cases)
     dataset_attack_vectors = Counter(case["attack_vector"] for case in dataset_cases)
@@ -185,39 +459,24 @@ def build_statistics(
         "consistency_checks": {},
     }
 
+    interval_inputs: Dict[str, Dict[str, Any]] = {}
     for config, report in reports.items():
         results = report["results"]
-        durations = [result["duration_s"] for result in results if result.get("duration_s") is not None]
-        attack_indicators = [
-            1.0 if result["category"].lower() != "benign" and result["observed"] == "ALLOW" else 0.0
-            for result in results
-        ]
-        benign_indicators = [
-            1.0 if result["observed"] != "ALLOW" else 0.0
-            for result in results
-            if result["category"].lower() == "benign"
-        ]
-
-        breakdown: Dict[str, Counter] = defaultdict(Counter)
-        for result in results:
-            breakdown[infer_attack_vector(result["case_id"])][result["observed"]] += 1
-
-        recomputed = recompute_metrics(report)
+        case_results = [case_result_from_dict(result) for result in results]
+        accumulator = MetricsAccumulator.from_results(case_results, vector_fn=infer_attack_vector)
+        interval_inputs[config] = summarize_for_intervals(case_results, vector_fn=infer_attack_vector)
+        snapshot = accumulator.snapshot()
+        recomputed = accumulator.metrics()
         reported = report["metrics"]
         statistics_payload["per_config"][config] = {
             "sample_size": len(results),
             "reported_metrics": reported,
             "recomputed_metrics": recomputed,
-            "attack_success_rate": compute_mean_variance(attack_indicators),
-            "false_positive_rate": compute_mean_variance(benign_indicators),
-            "duration_seconds": {
-                **compute_mean_variance(durations),
-                "max": float(max(durations) if durations else 0.0),
-            },
-            "outcome_counts": dict(Counter(result["observed"] for result in results)),
-            "attack_vector_breakdown": {
-                vector: dict(counter) for vector, counter in sorted(breakdown.items())
-            },
+            "attack_success_rate": snapshot["attack_success_rate"],
+            "false_positive_rate": snapshot["false_positive_rate"],
+            "duration_seconds": snapshot["duration_seconds"],
+            "outcome_counts": snapshot["outcome_counts"],
+            "attack_vector_breakdown": snapshot["attack_vector_breakdown"],
         }
         statistics_payload["consistency_checks"][config] = {
             "case_count_matches_dataset": len(results) == dataset_case_count,
@@ -226,6 +485,17 @@ def build_statistics(
             "tr_matches": math.isclose(recomputed["tr"], reported["tr"], rel_tol=0.0, abs_tol=1e-9),
         }
 
+    if ci_resamples > 0 and interval_inputs:
+        intervals = compute_confidence_intervals(
+            interval_inputs,
+            resamples=ci_resamples,
+            confidence=confidence,
+            seed=ci_seed,
+            workers=ci_workers,
+        )
+        for config, config_intervals in intervals.items():
+            statistics_payload["per_config"][config]["confidence_intervals"] = config_intervals
+
     return statistics_payload
 
 
@@ -246,6 +516,15 @@ def build_summary_table(statistics_payload: Dict[str, Any]) -> List[Dict[str, An
     return rows
 
 
+def summary_file_paths(output_dir: Path) -> Dict[str, Path]:
+    return {
+        "comparison_summary": output_dir / "comparison_summary.json",
+        "statistics": output_dir / "statistics.json",
+        "validation": output_dir / "validation_report.json",
+        "comparison_csv": output_dir / "comparison_table.csv",
+    }
+
+
 def write_summary_files(
     output_dir: Path,
     dataset_cases: List[Dict[str, Any]],
@@ -254,8 +533,9 @@ def write_summary_files(
 ) -> Dict[str, Path]:
     output_dir.mkdir(parents=True, exist_ok=True)
     summary_rows = build_summary_table(statistics_payload)
+    paths = summary_file_paths(output_dir)
 
-    summary_json_path = output_dir / "comparison_summary.json"
+    summary_json_path = paths["comparison_summary"]
     summary_json_path.write_text(
         json.dumps(
             {
@@ -272,7 +552,7 @@ def write_summary_files(
         encoding="utf-8",
     )
 
-    statistics_path = output_dir / "statistics.json"
+    statistics_path = paths["statistics"]
     statistics_path.write_text(
         json.dumps(statistics_payload, indent=2, ensure_ascii=False) + "\n",
         encoding="utf-8",
@@ -286,106 +566,53 @@ def write_summary_files(
         "checks": statistics_payload["consistency_checks"],
         "source_modes": {config: reports[config]["meta"].get("source_mode", "unknown") for config in available_configs},
     }
-    validation_path = output_dir / "validation_report.json"
+    validation_path = paths["validation"]
     validation_path.write_text(json.dumps(validation_report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
 
-    csv_path = output_dir / "comparison_table.csv"
+    csv_path = paths["comparison_csv"]
     with csv_path.open("w", encoding="utf-8", newline="") as handle:
         writer = csv.DictWriter(handle, fieldnames=["config", "asr", "fp", "tr", "sample_size"])
         writer.writeheader()
         for row in summary_rows:
             writer.writerow(row)
 
-    return {
-        "comparison_summary": summary_json_path,
-        "statistics": statistics_path,
-        "validation": validation_path,
-        "comparison_csv": csv_path,
-    }
-
+    return paths
 
-def generate_figures(statistics_payload: Dict[str, Any], figures_dir: Path) -> Dict[str, Path]:
-    # Lazy import so metrics-only tests do not require matplotlib during module import.
-    import matplotlib
-    matplotlib.use("Agg")
-    import matplotlib.pyplot as plt
 
-    figures_dir.mkdir(parents=True, exist_ok=True)
+def generate_figures(
+    statistics_payload: Dict[str, Any],
+    figures_dir: Path,
+    cache_dir: Path = FIGURE_CACHE_DIR,
+) -> Dict[str, Path]:
+    """Copy cached figures for this payload, rendering in a worker process on a miss."""
+    return FigureRenderer(cache_dir).render(statistics_payload, figures_dir)
 
-    metrics = ["asr", "fp", "tr"]
-    configs = [c for c in CONFIGS if c in statistics_payload["per_config"]]
-    values = {
-        metric: [statistics_payload["per_config"][config]["reported_metrics"][metric] for config in configs]
-        for metric in metrics
-    }
 
-    _BAR_COLORS_ASR = ["#9e9e9e", "#f9a825", "#2e7d32", "#1565c0"]
-    _BAR_COLORS_TR = ["#546e7a", "#1e88e5", "#8e24aa", "#d84315"]
-
-    fig, axes = plt.subplots(1, 3, figsize=(14, 4.5))
-    axes[0].bar(configs, [v * 100 for v in values["asr"]], color=_BAR_COLORS_ASR[: len(configs)])
-    axes[0].set_title("Attack Success Rate (ASR)")
-    axes[0].set_ylabel("Percent")
-    axes[0].set_ylim(0, 100)
-
-    axes[1].bar(configs, [v * 100 for v in values["fp"]], color=_BAR_COLORS_ASR[: len(configs)])
-    axes[1].set_title("False Positive Rate (FP)")
-    axes[1].set_ylabel("Percent")
-    axes[1].set_ylim(0, 100)
-
-    axes[2].bar(configs, values["tr"], color=_BAR_COLORS_TR[: len(configs)])
-    axes[2].set_title("True Rejection Latency (Max)")
-    axes[2].set_ylabel("Seconds")
-
-    fig.tight_layout()
-    metrics_png = figures_dir / "final_metrics_comparison.png"
-    metrics_pdf = figures_dir / "final_metrics_comparison.pdf"
-    fig.savefig(metrics_png, dpi=200, bbox_inches="tight")
-    fig.savefig(metrics_pdf, bbox_inches="tight")
-    plt.close(fig)
-
-    best_config = "l1l2l3" if "l1l2l3" in statistics_payload["per_config"] else "l1l2"
-    if best_config in statistics_payload["per_config"]:
-        breakdown_data = statistics_payload["per_config"][best_config]["attack_vector_breakdown"]
-        vectors = [v for v in sorted(breakdown_data.keys()) if v != "none"]
-        stacked_labels = ["REFUSE", "BLOCK", "ALLOW", "ERROR"]
-        colors = {"REFUSE": "#2e7d32", "BLOCK": "#fb8c00", "ALLOW": "#c62828", "ERROR": "#546e7a"}
-
-        fig, ax = plt.subplots(figsize=(9, 4.8))
-        bottoms = [0] * len(vectors)
-        for label in stacked_labels:
-            series = [breakdown_data[vector].get(label, 0) for vector in vectors]
-            ax.bar(vectors, series, bottom=bottoms, label=label, color=colors[label])
-            bottoms = [bottom + value for bottom, value in zip(bottoms, series)]
-        ax.set_title(f"{best_config.upper()} Outcomes by Attack Vector")
-        ax.set_ylabel("Case Count")
-        ax.legend()
-        fig.tight_layout()
-    else:
-        fig, ax = plt.subplots(figsize=(9, 4.8))
-        ax.text(0.5, 0.5, "No breakdown data available", ha="center", va="center")
-
-    breakdown_png = figures_dir / "final_l1l2_attack_vector_breakdown.png"
-    breakdown_pdf = figures_dir / "final_l1l2_attack_vector_breakdown.pdf"
-    fig.savefig(breakdown_png, dpi=200, bbox_inches="tight")
-    fig.savefig(breakdown_pdf, bbox_inches="tight")
-    plt.close(fig)
-
-    return {
-        "metrics_png": metrics_png,
-        "metrics_pdf": metrics_pdf,
-        "breakdown_png": breakdown_png,
-        "breakdown_pdf": breakdown_pdf,
-    }
+def _format_rate_cell(rate: float, interval: Dict[str, Any] | None) -> str:
+    cell = f"{rate * 100:.2f}\\%"
+    if interval:
+        low, high = interval["wilson"]
+        cell += f" {{\\scriptsize [{low * 100:.1f}, {high * 100:.1f}]}}"
+    return cell
 
 
 def write_latex_table(statistics_payload: Dict[str, Any], figures_dir: Path) -> Path:
     rows = build_summary_table(statistics_payload)
+    figures_dir.mkdir(parents=True, exist_ok=True)
     table_path = figures_dir / "final_metrics_table.tex"
+    has_intervals = any("confidence_intervals" in per_config for per_config in statistics_payload["per_config"].values())
+    caption = "Final Red-Team Results on the Final 125-Case Dataset"
+    if has_intervals:
+        confidence = next(
+            per_config["confidence_intervals"]["confidence"]
+            for per_config in statistics_payload["per_config"].values()
+            if "confidence_intervals" in per_config
+        )
+        caption += f" ({confidence:.0%} Wilson intervals in brackets)".replace("%", "\\%")
     lines = [
         "\\begin{table}[t]",
         "\\centering",
-        "\\caption{Final Red-Team Results on the Final 125-Case Dataset}",
+        f"\\caption{{{caption}}}",
         "\\label{tab:final-role-e-results}",
         "\\begin{tabular}{lcccc}",
         "\\hline",
@@ -393,8 +620,10 @@ def write_latex_table(statistics_payload: Dict[str, Any], figures_dir: Path) ->
         "\\hline",
     ]
     for row in rows:
+        intervals = statistics_payload["per_config"][row["config"]].get("confidence_intervals") or {}
         lines.append(
-            f"{row['config']} & {row['asr']:.2%} & {row['fp']:.2%} & {row['tr']:.4f} & {row['sample_size']} \\\\"
+            f"{row['config']} & {_format_rate_cell(row['asr'], intervals.get('asr'))} & "
+            f"{_format_rate_cell(row['fp'], intervals.get('fp'))} & {row['tr']:.4f} & {row['sample_size']} \\\\"
         )
     lines.extend(["\\hline", "\\end{tabular}", "\\end{table}", ""])
     table_path.write_text("\n".join(lines), encoding="utf-8")
@@ -576,6 +805,8 @@ def print_summary(
     for label, path in summary_paths.items():
         print(f"  - {label}: {path}")
     print("Figures:")
+    if not figure_paths:
+        print("  - (skipped)")
     for label, path in figure_paths.items():
         print(f"  - {label}: {path}")
     print(f"  - latex_table: {latex_table_path}")
@@ -612,40 +843,101 @@ def main() -> None:
         help="FastAPI agent URL for live mode.",
     )
     parser.add_argument("--seed", type=int, default=6290)
+    parser.add_argument(
+        "--results-format",
+        choices=RESULTS_FORMATS,
+        default="columnar",
+        help="Per-config report format: columnar results store (default), legacy JSON, or both.",
+    )
+    parser.add_argument("--ci-resamples", type=int, default=10_000, help="Bootstrap resamples (0 disables intervals).")
+    parser.add_argument("--ci-workers", type=int, default=1, help="Process-pool size for bootstrap resampling.")
+    parser.add_argument("--force", action="store_true", help="Ignore the pipeline cache and rerun every step.")
+    parser.add_argument("--jobs", type=int, default=4, help="Independent pipeline steps to run in parallel.")
+    parser.add_argument(
+        "--figures",
+        choices=FIGURE_MODES,
+        default="render",
+        help="Render figures (cached, in a worker process), queue them for scripts/figure_renderer.py, or skip.",
+    )
+    parser.add_argument("--no-figures", dest="figures", action="store_const", const="off", help="Same as --figures off.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Live mode: run all configs in parallel on this many worker processes (0 = one server, in sequence).",
+    )
+    parser.add_argument(
+        "--config-server",
+        action="append",
+        default=[],
+        metavar="CONFIG=URL",
+        help="Live mode with --workers: agent for CONFIG, a server URL or 'in-process' (repeatable; default --server-url).",
+    )
+    parser.add_argument(
+        "--coordinator-bind",
+        default=None,
+        metavar="HOST:PORT",
+        help="Live mode with --workers: listen here so scripts/run_harness_worker.py can join from other hosts.",
+    )
     args = parser.parse_args()
 
+    config_servers: Dict[str, str] = {}
+    for entry in args.config_server:
+        config, separator, url = entry.partition("=")
+        if not separator or config not in CONFIGS or not url:
+            parser.error(f"--config-server expects CONFIG=URL with CONFIG in {CONFIGS}, got '{entry}'")
+        config_servers[config] = url
+
     source_dataset = ROOT / args.source_dataset
     final_dataset = ROOT / FINAL_DATASET_RELATIVE
     final_results_dir = ROOT / "artifacts" / "final_results"
     figures_dir = ROOT / "report-latex" / "figures"
     threat_model_path = ROOT / "docs" / "threat-model" / "final_threat_model.md"
 
-    dataset_cases = freeze_final_dataset(source_dataset, final_dataset)
-    if args.mode == "live":
-        reports = run_live_reports(final_dataset, final_results_dir, args.server_url, args.seed)
-    else:
-        reports = load_archived_reports()
-
-    if not reports:
-        print("[ERROR] No reports available. Use --mode live with a running agent to generate results.")
+    pipeline = build_integration_pipeline(
+        mode=args.mode,
+        source_dataset=source_dataset,
+        final_dataset=final_dataset,
+        final_results_dir=final_results_dir,
+        figures_dir=figures_dir,
+        threat_model_path=threat_model_path,
+        server_url=args.server_url,
+        seed=args.seed,
+        results_format=args.results_format,
+        ci_resamples=args.ci_resamples,
+        ci_workers=args.ci_workers,
+        jobs=args.jobs,
+        figures=args.figures,
+        workers=args.workers,
+        config_servers=config_servers,
+        coordinator_bind=args.coordinator_bind,
+    )
+    try:
+        run = pipeline.run(force=bool(args.force))
+    except RuntimeError as exc:
+        print(f"[ERROR] {exc}")
         sys.exit(1)
 
-    written_reports = write_final_reports(reports, FINAL_REPORT_STEM, final_results_dir)
-    statistics_payload = build_statistics(dataset_cases, reports)
-    summary_paths = write_summary_files(final_results_dir, dataset_cases, reports, statistics_payload)
-    figure_paths = generate_figures(statistics_payload, figures_dir)
-    latex_table_path = write_latex_table(statistics_payload, figures_dir)
-    threat_model_path = write_final_threat_model(statistics_payload, threat_model_path)
-
+    statistics_payload = run.value("statistics")
+    written_reports = {
+        config: final_report_path(config, FINAL_REPORT_STEM, final_results_dir, args.results_format)
+        for config in CONFIGS
+        if config in statistics_payload["per_config"]
+    }
     print_summary(
         dataset_path=final_dataset,
         written_reports=written_reports,
-        summary_paths=summary_paths,
-        figure_paths=figure_paths,
-        latex_table_path=latex_table_path,
-        threat_model_path=threat_model_path,
+        summary_paths=summary_file_paths(final_results_dir),
+        figure_paths=(
+            {label: Path(path) for label, path in run.value("figures").items()} if args.figures != "off" else {}
+        ),
+        latex_table_path=Path(run.value("latex_table")),
+        threat_model_path=Path(run.value("threat_model")),
         statistics_payload=statistics_payload,
     )
+    print(f"\nPipeline: ran {run.ran or '[]'}, cached {run.cached or '[]'}")
+    if args.figures == "deferred":
+        print("Figures deferred; render them with: python scripts/figure_renderer.py --pending")
 
 
 if __name__ == "__main__":
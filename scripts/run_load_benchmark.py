@@ -0,0 +1,381 @@
+"""
+Load-generation benchmark for POST /v0/agent/plan.
+
+Two load models are supported:
+
+- open loop (`--mode open`): requests are issued at a constant arrival rate
+  regardless of how fast the server answers. Latency is measured from each
+  request's *scheduled* send time, so queueing delay is not hidden
+  (no coordinated omission).
+- closed loop (`--mode closed`): N concurrent users each send a request, wait
+  for the answer, and immediately send the next one.
+
+Requests are sampled (seeded) from `testcases/final_attack_dataset.json`. For
+every defense config the run reports throughput, p50/p90/p99/p99.9 latency,
+and a breakdown of outcomes by PlanResponse `status`, then writes the result
+as a `load_benchmark` artifact through `harness.artifacts.ArtifactStore` so runs
+can be compared across commits.
+
+Example:
+    $env:PYTHONPATH = "."
+    python scripts/run_load_benchmark.py --mode open --rate 50 --duration 30 --configs l1l2,l1l2l3
+    python scripts/run_load_benchmark.py --mode closed --concurrency 32 --requests 2000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import json
+import math
+import os
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from harness.artifacts import ArtifactStore, build_artifact  # noqa: E402
+from harness.confidence import percentile  # noqa: E402
+from harness.runner import resolve_git_commit  # noqa: E402
+
+CONFIGS = ("bare", "l1", "l1l2", "l1l2l3")
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+@dataclass(frozen=True)
+class Sample:
+    case_id: str
+    category: str
+    status: str
+    latency_s: float
+    service_s: float
+
+
+def load_cases(path: Path, category: str = "all") -> List[Dict[str, Any]]:
+    cases = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(cases, list):
+        raise ValueError("Load benchmark cases file must contain a JSON list.")
+    if category != "all":
+        cases = [case for case in cases if case.get("category", "").lower() == category]
+    if not cases:
+        raise ValueError(f"No cases left after filtering category={category}")
+    return cases
+
+
+class CaseMixer:
+    """Seeded sampler over the dataset (uniform with replacement)."""
+
+    def __init__(self, cases: Sequence[Dict[str, Any]], seed: int) -> None:
+        self._cases = list(cases)
+        self._rng = random.Random(seed)
+
+    def next(self) -> Dict[str, Any]:
+        return self._rng.choice(self._cases)
+
+
+def summarize_samples(samples: Sequence[Sample], elapsed_s: float) -> Dict[str, Any]:
+    latencies = sorted(sample.latency_s for sample in samples)
+    service = sorted(sample.service_s for sample in samples)
+    status_counts = Counter(sample.status for sample in samples)
+    transport_errors = sum(
+        count for status, count in status_counts.items()
+        if status.startswith("HTTP_") or status in ("TIMEOUT", "CONNECTION_ERROR", "INVALID_RESPONSE")
+    )
+    return {
+        "requests": len(samples),
+        "elapsed_s": round(elapsed_s, 4),
+        "throughput_rps": round(len(samples) / elapsed_s, 3) if elapsed_s > 0 else 0.0,
+        "latency_s": {
+            **{f"p{q:g}": round(percentile(latencies, q), 6) for q in PERCENTILES},
+            "mean": round(sum(latencies) / len(latencies), 6) if latencies else 0.0,
+            "max": round(latencies[-1], 6) if latencies else 0.0,
+        },
+        "service_time_s": {f"p{q:g}": round(percentile(service, q), 6) for q in PERCENTILES},
+        "status_counts": dict(sorted(status_counts.items())),
+        "transport_error_rate": round(transport_errors / len(samples), 6) if samples else 0.0,
+    }
+
+
+def _build_payload(case: Dict[str, Any], index: int, run_tag: str) -> Dict[str, Any]:
+    return {
+        "request_id": f"{case.get('case_id', 'case')}-{run_tag}-{index}",
+        "user_message": case["input"],
+        "session_id": f"load-{run_tag}-{index}",
+    }
+
+
+async def _send(
+    client: httpx.AsyncClient,
+    case: Dict[str, Any],
+    index: int,
+    run_tag: str,
+    scheduled_at: float,
+    timeout: float,
+) -> Sample:
+    started = time.perf_counter()
+    try:
+        response = await client.post("/v0/agent/plan", json=_build_payload(case, index, run_tag), timeout=timeout)
+        if response.status_code == 200:
+            try:
+                status = str(response.json().get("status") or "UNKNOWN")
+            except (ValueError, AttributeError):
+                status = "INVALID_RESPONSE"
+        else:
+            status = f"HTTP_{response.status_code}"
+    except httpx.TimeoutException:
+        status = "TIMEOUT"
+    except httpx.TransportError:
+        status = "CONNECTION_ERROR"
+    finished = time.perf_counter()
+    return Sample(
+        case_id=str(case.get("case_id", "")),
+        category=str(case.get("category", "")),
+        status=status,
+        latency_s=finished - scheduled_at,
+        service_s=finished - started,
+    )
+
+
+async def run_open_loop(
+    client: httpx.AsyncClient,
+    mixer: CaseMixer,
+    rate: float,
+    duration_s: Optional[float],
+    timeout: float = 30.0,
+    max_requests: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Issue requests at a constant arrival rate for `duration_s` seconds.
+
+    Without a duration, `max_requests` arrivals are issued at `rate`.
+    """
+    if rate <= 0:
+        raise ValueError("Open-loop rate must be positive")
+    if not duration_s and max_requests is None:
+        raise ValueError("Open loop needs a duration or a request budget")
+    total = int(rate * duration_s) if duration_s else max_requests
+    if max_requests is not None:
+        total = min(total, max_requests)
+    interval = 1.0 / rate
+    run_tag = uuid.uuid4().hex[:6]
+    tasks: List[asyncio.Task] = []
+    start = time.perf_counter()
+    for index in range(total):
+        scheduled_at = start + index * interval
+        delay = scheduled_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(
+            asyncio.create_task(_send(client, mixer.next(), index, run_tag, scheduled_at, timeout))
+        )
+    samples = list(await asyncio.gather(*tasks))
+    summary = summarize_samples(samples, time.perf_counter() - start)
+    summary["offered_rate_rps"] = rate
+    return {"summary": summary, "samples": samples}
+
+
+async def run_closed_loop(
+    client: httpx.AsyncClient,
+    mixer: CaseMixer,
+    concurrency: int,
+    duration_s: Optional[float] = None,
+    total_requests: Optional[int] = None,
+    timeout: float = 30.0,
+) -> Dict[str, Any]:
+    """Run `concurrency` users back-to-back until the duration or request budget is spent."""
+    if concurrency <= 0:
+        raise ValueError("Closed-loop concurrency must be positive")
+    if duration_s is None and total_requests is None:
+        raise ValueError("Closed-loop mode needs a duration or a request budget")
+    run_tag = uuid.uuid4().hex[:6]
+    samples: List[Sample] = []
+    counter = iter(range(total_requests if total_requests is not None else 2**62))
+    start = time.perf_counter()
+    deadline = start + duration_s if duration_s is not None else math.inf
+
+    async def _user() -> None:
+        while time.perf_counter() < deadline:
+            index = next(counter, None)
+            if index is None:
+                return
+            sent_at = time.perf_counter()
+            samples.append(await _send(client, mixer.next(), index, run_tag, sent_at, timeout))
+
+    await asyncio.gather(*(_user() for _ in range(concurrency)))
+    summary = summarize_samples(samples, time.perf_counter() - start)
+    summary["concurrency"] = concurrency
+    return {"summary": summary, "samples": samples}
+
+
+def _control_headers() -> Dict[str, str]:
+    token = os.getenv("CONTROL_PLANE_TOKEN", "").strip()
+    return {"X-Control-Token": token} if token else {}
+
+
+async def _set_defense_config(client: httpx.AsyncClient, config: str) -> str:
+    response = await client.post("/v0/defense-config", json={"config": config}, headers=_control_headers(), timeout=10)
+    response.raise_for_status()
+    return response.json()["defense_config"]
+
+
+async def run_benchmark(
+    client: httpx.AsyncClient,
+    cases: Sequence[Dict[str, Any]],
+    configs: Sequence[str],
+    mode: str,
+    seed: int = 6290,
+    rate: float = 10.0,
+    concurrency: int = 8,
+    duration_s: Optional[float] = 10.0,
+    total_requests: Optional[int] = None,
+    warmup_requests: int = 0,
+    timeout: float = 30.0,
+) -> Dict[str, Dict[str, Any]]:
+    """Run the selected load model once per defense config."""
+    results: Dict[str, Dict[str, Any]] = {}
+    for config in configs:
+        active = await _set_defense_config(client, config)
+        if active != config:
+            raise RuntimeError(f"Expected config {config}, got {active}")
+        mixer = CaseMixer(cases, seed)
+        if warmup_requests:
+            await run_closed_loop(client, CaseMixer(cases, seed + 1), 1, total_requests=warmup_requests, timeout=timeout)
+        if mode == "open":
+            outcome = await run_open_loop(client, mixer, rate, duration_s, timeout, total_requests)
+        else:
+            outcome = await run_closed_loop(client, mixer, concurrency, duration_s, total_requests, timeout)
+        outcome["summary"]["defense_config"] = config
+        results[config] = outcome
+    return results
+
+
+def write_artifacts(
+    results: Dict[str, Dict[str, Any]],
+    meta: Dict[str, Any],
+    artifact_root: Path,
+    suite_name: str,
+) -> Dict[str, Path]:
+    """Write one `load_benchmark` artifact per config under a shared run id."""
+    store = ArtifactStore(artifact_root)
+    run_id = str(uuid.uuid4())
+    git_commit = meta.get("git_commit")
+    run_date = datetime.now(timezone.utc)
+    written: Dict[str, Path] = {}
+    for config, outcome in results.items():
+        artifact = build_artifact(
+            run_id=run_id,
+            type="load_benchmark",
+            testcase_id=f"load-{config}",
+            suite=suite_name,
+            defense_profile=config,
+            component="load_generator",
+            payload={
+                "meta": meta,
+                "summary": outcome["summary"],
+                "per_case_status": {
+                    case_id: dict(counter)
+                    for case_id, counter in sorted(_per_case_status(outcome["samples"]).items())
+                },
+            },
+        )
+        written[config] = store.write(artifact, run_date=run_date, git_commit=git_commit)
+    return written
+
+
+def _per_case_status(samples: Sequence[Sample]) -> Dict[str, Counter]:
+    per_case: Dict[str, Counter] = {}
+    for sample in samples:
+        per_case.setdefault(sample.case_id, Counter())[sample.status] += 1
+    return per_case
+
+
+def _parse_configs(raw: str) -> List[str]:
+    configs = [part.strip() for part in raw.split(",") if part.strip()]
+    invalid = [config for config in configs if config not in CONFIGS]
+    if invalid or not configs:
+        raise argparse.ArgumentTypeError(f"Invalid configs {invalid}, must be drawn from {CONFIGS}")
+    return configs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Open/closed-loop load benchmark for /v0/agent/plan.")
+    parser.add_argument("--server-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--mode", choices=["open", "closed"], default="closed")
+    parser.add_argument("--configs", type=_parse_configs, default=["l1l2"], help="Comma-separated defense configs.")
+    parser.add_argument("--cases", default="testcases/final_attack_dataset.json")
+    parser.add_argument("--category", choices=["all", "benign", "adversarial"], default="all")
+    parser.add_argument("--rate", type=float, default=10.0, help="Open loop: arrivals per second.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Closed loop: concurrent users.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per config (0 = use --requests only).")
+    parser.add_argument("--requests", type=int, default=None, help="Request budget per config.")
+    parser.add_argument("--warmup", type=int, default=5, help="Sequential warmup requests per config.")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=6290)
+    parser.add_argument("--max-connections", type=int, default=512)
+    parser.add_argument("--artifact-root", default="artifacts", help="ArtifactStore root relative to repo root.")
+    args = parser.parse_args()
+
+    cases_path = ROOT / args.cases
+    cases = load_cases(cases_path, args.category)
+    duration = args.duration if args.duration > 0 else None
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+
+    async def _run() -> Dict[str, Dict[str, Any]]:
+        async with httpx.AsyncClient(base_url=args.server_url.rstrip("/"), limits=limits) as client:
+            return await run_benchmark(
+                client,
+                cases,
+                args.configs,
+                args.mode,
+                seed=args.seed,
+                rate=args.rate,
+                concurrency=args.concurrency,
+                duration_s=duration,
+                total_requests=args.requests,
+                warmup_requests=args.warmup,
+                timeout=args.timeout,
+            )
+
+    results = asyncio.run(_run())
+    meta = {
+        "mode": args.mode,
+        "server_url": args.server_url,
+        "configs": args.configs,
+        "cases": args.cases,
+        "category": args.category,
+        "case_pool_size": len(cases),
+        "seed": args.seed,
+        "rate": args.rate if args.mode == "open" else None,
+        "concurrency": args.concurrency if args.mode == "closed" else None,
+        "duration_s": duration,
+        "request_budget": args.requests,
+        "git_commit": resolve_git_commit(),
+    }
+    paths = write_artifacts(results, meta, ROOT / args.artifact_root, cases_path.stem)
+
+    for config, outcome in results.items():
+        summary = outcome["summary"]
+        latency = summary["latency_s"]
+        print(
+            f"{config}: {summary['requests']} req, {summary['throughput_rps']:.1f} rps, "
+            f"p50={latency['p50'] * 1000:.1f}ms p90={latency['p90'] * 1000:.1f}ms "
+            f"p99={latency['p99'] * 1000:.1f}ms p99.9={latency['p99.9'] * 1000:.1f}ms"
+        )
+        print(f"  status: {summary['status_counts']}")
+        print(f"  artifact: {paths[config]}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as exc:
+        print(f"[FAIL] {exc}")
+        sys.exit(1)
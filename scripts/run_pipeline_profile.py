@@ -0,0 +1,155 @@
+"""
+In-process pipeline microbenchmark (no uvicorn, no HTTP, no network).
+
+Runs the final dataset through `harness.agent_clients.InProcessAgentClient`
+for each defense config and reports per-stage wall time (L1 input, LLM parse
+stub, L1 output, tools, L2 policy, L3, handoff). Use it to catch CPU
+regressions in guardrail and policy code separately from transport overhead.
+
+Example:
+    $env:PYTHONPATH = "."
+    python scripts/run_pipeline_profile.py --configs l1,l1l2,l1l2l3 --repeat 5
+    python scripts/run_pipeline_profile.py --configs l1l2 --profile-dir artifacts/profiles --trace-memory
+"""
+from __future__ import annotations
+
+import argparse
+from collections import Counter
+import contextlib
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from agent_client.src.utils.logger import logger as agent_logger  # noqa: E402
+from harness.agent_clients import PIPELINE_STAGES, InProcessAgentClient  # noqa: E402
+
+CONFIGS = ("bare", "l1", "l1l2", "l1l2l3")
+
+
+def profile_config(
+    client: InProcessAgentClient,
+    config: str,
+    cases: Sequence[Dict[str, Any]],
+    repeat: int = 1,
+    warmup: int = 1,
+) -> Dict[str, Any]:
+    """Evaluate `cases` `repeat` times under `config` and summarize per-stage timings."""
+    client.set_defense_config(config)
+    for case in list(cases)[:warmup]:
+        client.evaluate_case(case)
+    client.reset_stats()
+
+    observed: Counter = Counter()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for case in cases:
+            observed[client.evaluate_case(case).observed] += 1
+    elapsed = time.perf_counter() - started
+    requests = repeat * len(cases)
+
+    stages: Dict[str, Dict[str, float]] = {}
+    for stage in PIPELINE_STAGES:
+        entry = client.stage_stats.get(stage)
+        if not entry:
+            continue
+        stages[stage] = {
+            "calls": int(entry["calls"]),
+            "mean_ms": round(entry["total_s"] / entry["calls"] * 1000, 4),
+            "max_ms": round(entry["max_s"] * 1000, 4),
+            "share_of_total": round(entry["total_s"] / elapsed, 4) if elapsed else 0.0,
+        }
+        if client.recorder.trace_memory:
+            stages[stage]["alloc_net_bytes_per_call"] = int(entry["alloc_net_bytes"] / entry["calls"])
+            stages[stage]["alloc_peak_bytes"] = int(entry["alloc_peak_bytes"])
+
+    return {
+        "defense_config": config,
+        "requests": requests,
+        "elapsed_s": round(elapsed, 4),
+        "mean_request_ms": round(elapsed / requests * 1000, 4) if requests else 0.0,
+        "requests_per_s": round(requests / elapsed, 2) if elapsed else 0.0,
+        "observed": dict(sorted(observed.items())),
+        "stages": stages,
+    }
+
+
+def _parse_configs(raw: str) -> List[str]:
+    configs = [part.strip() for part in raw.split(",") if part.strip()]
+    invalid = [config for config in configs if config not in CONFIGS]
+    if invalid or not configs:
+        raise argparse.ArgumentTypeError(f"Invalid configs {invalid}, must be drawn from {CONFIGS}")
+    return configs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Profile the L1/L2/L3 pipeline in-process.")
+    parser.add_argument("--configs", type=_parse_configs, default=list(CONFIGS))
+    parser.add_argument("--cases", default="testcases/final_attack_dataset.json")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--profile-dir", default=None, help="Dump per-stage cProfile .prof files here.")
+    parser.add_argument("--trace-memory", action="store_true", help="Record tracemalloc deltas per stage.")
+    parser.add_argument(
+        "--swapguard-stand-in",
+        action="store_true",
+        help="Route L3 eth_call into the in-process SwapGuard stand-in so l1l2l3 exercises L3 instead of SKIP.",
+    )
+    parser.add_argument("--output", default=None, help="Optional JSON report path.")
+    args = parser.parse_args()
+
+    # Agent INFO logs and the planner's print() calls would dominate the output otherwise.
+    agent_logger.setLevel(logging.ERROR)
+    cases = json.loads((ROOT / args.cases).read_text(encoding="utf-8"))
+
+    if args.swapguard_stand_in:
+        from policy_engine import l3_validator
+        from scripts.mock_swapguard_rpc import DEFAULT_CONTRACT_ADDRESS, SwapGuardRPC
+
+        rpc = SwapGuardRPC()
+
+        def _eth_call(_rpc_url: str, to: str, data: str):
+            response = rpc.dispatch(
+                {"jsonrpc": "2.0", "id": 1, "method": "eth_call", "params": [{"to": to, "data": data}, "latest"]}
+            )
+            if "error" in response:
+                return False, response["error"]["message"]
+            return True, response["result"]
+
+        os.environ["SWAP_GUARD_ADDRESS"] = DEFAULT_CONTRACT_ADDRESS
+        l3_validator._eth_call = _eth_call
+
+    report: Dict[str, Any] = {"cases": args.cases, "repeat": args.repeat, "configs": {}}
+    for config in args.configs:
+        client = InProcessAgentClient(profile=bool(args.profile_dir), trace_memory=args.trace_memory)
+        try:
+            with open(os.devnull, "w", encoding="utf-8") as sink, contextlib.redirect_stdout(sink):
+                result = profile_config(client, config, cases, repeat=args.repeat, warmup=args.warmup)
+            if args.profile_dir:
+                result["profiles"] = {
+                    stage: str(path)
+                    for stage, path in client.dump_profiles(ROOT / args.profile_dir / config).items()
+                }
+        finally:
+            client.close()
+        report["configs"][config] = result
+
+        print(f"{config}: {result['requests']} req, {result['mean_request_ms']:.3f} ms/req, {result['requests_per_s']:.0f} req/s")
+        for stage, entry in result["stages"].items():
+            print(f"  {stage:<10} mean={entry['mean_ms']:.4f}ms max={entry['max_ms']:.3f}ms calls={entry['calls']}")
+
+    if args.output:
+        out_path = ROOT / args.output
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Report: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
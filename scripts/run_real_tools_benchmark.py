@@ -4,6 +4,11 @@ Guarded benchmark runner for REAL_TOOLS=true deployments.
 This is intentionally separate from canonical archived benchmarking. It measures
 live external-tool behavior only after confirming the server is in strict
 real-tools mode.
+
+For offline, reproducible runs, start the server once with
+`TOOL_CASSETTE_MODE=record` to capture CoinGecko / 1inch responses, then rerun
+it with `TOOL_CASSETTE_MODE=replay` (optionally `TOOL_CASSETTE_LATENCY=sampled`)
+to benchmark the same pipeline without network access.
 """
 from __future__ import annotations
 
@@ -123,6 +128,7 @@ def main() -> None:
             "config": args.config,
             "repeat": args.repeat,
             "strict_real_tools_required": True,
+            "tool_cassette": runtime.get("cassette", {"mode": "off"}),
         },
         "summary": summarize(results),
         "results": results,
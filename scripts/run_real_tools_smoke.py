@@ -17,6 +17,7 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import sys
 import uuid
 from pathlib import Path
@@ -53,6 +54,10 @@ def main() -> None:
     args = parser.parse_args()
 
     base_url = args.server_url.rstrip("/")
+    # With CONTROL_PLANE_TOKEN set the config switch is authorized and reruns are exempt
+    # from per-session rate limiting (session ids below are fixed per case).
+    token = os.getenv("CONTROL_PLANE_TOKEN", "").strip()
+    control_headers = {"X-Control-Token": token} if token else {}
     health = require_ok(requests.get(f"{base_url}/v0/health", timeout=10), "health check")
     runtime = health.get("tool_runtime", {})
     if not runtime.get("real_tools_enabled"):
@@ -62,7 +67,7 @@ def main() -> None:
         print("[WARN] Server reports REAL_TOOLS_STRICT=false. Smoke can still pass, but fallback-to-mock would not fail closed.")
 
     config_resp = require_ok(
-        requests.post(f"{base_url}/v0/defense-config", json={"config": args.config}, timeout=10),
+        requests.post(f"{base_url}/v0/defense-config", json={"config": args.config}, headers=control_headers, timeout=10),
         "defense-config update",
     )
     if config_resp.get("defense_config") != args.config:
@@ -78,7 +83,7 @@ def main() -> None:
             "session_id": f"real-smoke-{case.get('case_id', 'unknown')}",
         }
         body = require_ok(
-            requests.post(f"{base_url}/v0/agent/plan", json=payload, timeout=30),
+            requests.post(f"{base_url}/v0/agent/plan", json=payload, headers=control_headers, timeout=30),
             f"case {case['case_id']}",
         )
         status = body.get("status")
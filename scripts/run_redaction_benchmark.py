@@ -0,0 +1,170 @@
+"""
+Artifact redaction microbenchmark.
+
+Builds a synthetic run_summary payload (default 10k cases, each with a
+PlanResponse-shaped raw body; a fraction carry wallet addresses / tx hashes)
+and times `harness.artifacts.redact_payload` against the previous three-pass
+approach (redact, scan for addresses, scan for tx hashes, deep-compare).
+Both must produce identical output.
+
+Example:
+    $env:PYTHONPATH = "."
+    python scripts/run_redaction_benchmark.py --cases 10000 --repeat 5
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from harness.artifacts import TX_HASH_RE, WALLET_ADDRESS_RE, redact_payload  # noqa: E402
+
+
+def _hex(rng: random.Random, length: int) -> str:
+    return "0x" + "".join(rng.choice("0123456789abcdef") for _ in range(length))
+
+
+def build_summary_payload(cases: int, sensitive_fraction: float = 0.1, seed: int = 6290) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    results = []
+    for index in range(cases):
+        sensitive = rng.random() < sensitive_fraction
+        recipient = _hex(rng, 40) if sensitive else "owner wallet"
+        results.append({
+            "case_id": f"case-{index:05d}",
+            "category": "benign" if index % 5 == 0 else "direct_injection",
+            "expected": "ALLOW" if index % 5 == 0 else "BLOCK",
+            "observed": "BLOCK",
+            "duration_s": rng.uniform(0.001, 0.02),
+            "status": "MATCH",
+            "raw": {
+                "request_id": f"case-{index:05d}",
+                "status": "BLOCKED",
+                "message": "Swap 1 ETH to USDC",
+                "tx_plan": {
+                    "chain_id": 11155111,
+                    "from_token": "ETH",
+                    "to_token": "USDC",
+                    "amount_in": "1.0",
+                    "recipient": recipient,
+                    "route": ["uniswap_v3", "curve"],
+                    "tool_audit": {"source": "mock", "latency_ms": 0.2, "tx": _hex(rng, 64) if sensitive else None},
+                },
+                "policy": {"violations": [f"recipient {recipient} not allow-listed"] if sensitive else []},
+            },
+        })
+    return {
+        "run": {"run_id": "bench", "suite_name": "synthetic", "case_count": cases},
+        "meta": {"seed": seed, "suite_sha256": "0" * 64},
+        "metrics": {"asr": 0.0, "fp": 0.0, "tr": 0.02},
+        "results": results,
+    }
+
+
+def _string_values(payload: Any) -> Iterable[str]:
+    if isinstance(payload, dict):
+        for value in payload.values():
+            yield from _string_values(value)
+    elif isinstance(payload, list):
+        for value in payload:
+            yield from _string_values(value)
+    elif isinstance(payload, str):
+        yield payload
+
+
+def _legacy_redact(payload: Dict[str, Any]) -> Dict[str, Any]:
+    redacted: Dict[str, Any] = {}
+    for key, value in payload.items():
+        if isinstance(value, str):
+            redacted[key] = WALLET_ADDRESS_RE.sub("<REDACTED_ADDRESS>", TX_HASH_RE.sub("<REDACTED_TX_HASH>", value))
+        elif isinstance(value, dict):
+            redacted[key] = _legacy_redact(value)
+        elif isinstance(value, list):
+            redacted[key] = [
+                _legacy_redact(item) if isinstance(item, dict)
+                else (WALLET_ADDRESS_RE.sub("<REDACTED_ADDRESS>", TX_HASH_RE.sub("<REDACTED_TX_HASH>", item))
+                      if isinstance(item, str) else item)
+                for item in value
+            ]
+        else:
+            redacted[key] = value
+    return redacted
+
+
+def legacy_three_pass(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """The pre-single-pass `build_artifact` redaction, kept here as the benchmark baseline."""
+    redacted = _legacy_redact(payload)
+    return {
+        "payload": redacted,
+        "contains_wallet_addresses": any(WALLET_ADDRESS_RE.search(v) for v in _string_values(payload)),
+        "contains_tx_hash": any(TX_HASH_RE.search(v) for v in _string_values(payload)),
+        "changed": redacted != payload,
+    }
+
+
+def single_pass(payload: Dict[str, Any]) -> Dict[str, Any]:
+    result = redact_payload(payload)
+    return {
+        "payload": result.payload,
+        "contains_wallet_addresses": result.contains_wallet_addresses,
+        "contains_tx_hash": result.contains_tx_hash,
+        "changed": result.changed,
+    }
+
+
+def _time(fn: Callable[[Dict[str, Any]], Any], payload: Dict[str, Any], repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(payload)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def run_benchmark(cases: int, repeat: int = 3, sensitive_fraction: float = 0.1) -> Dict[str, Any]:
+    payload = build_summary_payload(cases, sensitive_fraction)
+    legacy, fast = legacy_three_pass(payload), single_pass(payload)
+    if legacy != fast:
+        raise AssertionError("single-pass redaction differs from the legacy three-pass output")
+    legacy_s = min(_time(legacy_three_pass, payload, repeat))
+    fast_s = min(_time(single_pass, payload, repeat))
+    return {
+        "cases": cases,
+        "repeat": repeat,
+        "sensitive_fraction": sensitive_fraction,
+        "legacy_three_pass_s": legacy_s,
+        "single_pass_s": fast_s,
+        "speedup": legacy_s / fast_s if fast_s else None,
+        "shared_results": sum(
+            1 for before, after in zip(payload["results"], fast["payload"]["results"]) if before is after
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark single-pass artifact redaction")
+    parser.add_argument("--cases", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repetitions; the best is reported.")
+    parser.add_argument("--sensitive-fraction", type=float, default=0.1)
+    parser.add_argument("--output", help="Optional JSON output path.")
+    args = parser.parse_args()
+
+    summary = run_benchmark(args.cases, args.repeat, args.sensitive_fraction)
+    print(
+        f"{summary['cases']} cases: legacy {summary['legacy_three_pass_s'] * 1000:.1f} ms, "
+        f"single-pass {summary['single_pass_s'] * 1000:.1f} ms ({summary['speedup']:.1f}x), "
+        f"{summary['shared_results']} result rows shared unchanged"
+    )
+    if args.output:
+        Path(args.output).write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Tests for admission control, load shedding and request deadline propagation."""
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+
+from agent_client.src.api import routes
+from agent_client.src.llm.llm_planner import LLMPlanner
+from agent_client.src.main import app
+from agent_client.src.utils.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    remaining_budget,
+    request_deadline,
+)
+
+
+async def _hold(controller, seconds):
+    async with controller.admit():
+        await asyncio.sleep(seconds)
+    return "ok"
+
+
+async def _outcomes(controller, holds, stagger_s=0.01):
+    tasks = []
+    for seconds in holds:
+        tasks.append(asyncio.create_task(_hold(controller, seconds)))
+        await asyncio.sleep(stagger_s)
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    return [result.reason if isinstance(result, AdmissionRejected) else result for result in results]
+
+
+def test_queue_admits_in_order_and_sheds_when_full():
+    controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout_s=1.0)
+    assert asyncio.run(_outcomes(controller, [0.1, 0.01, 0.01])) == ["ok", "ok", "queue_full"]
+    snapshot = controller.snapshot()
+    assert snapshot["admitted"] == 2 and snapshot["queued"] == 1
+    assert snapshot["shed"]["queue_full"] == 1
+    assert snapshot["in_flight"] == 0 and snapshot["queue_depth"] == 0
+    assert snapshot["queue_wait_p99_ms"] > 50
+
+
+def test_queue_wait_is_bounded_by_timeout_and_deadline():
+    controller = AdmissionController(max_in_flight=1, max_queue=4, queue_timeout_s=0.05)
+    assert asyncio.run(_outcomes(controller, [0.3, 0.01])) == ["ok", "queue_timeout"]
+
+    async def _deadline_bound():
+        holder = asyncio.create_task(_hold(controller, 0.3))
+        await asyncio.sleep(0.01)
+        try:
+            with request_deadline(0.02):
+                await controller.acquire()
+        except AdmissionRejected as exc:
+            rejected = exc
+        await holder
+        return rejected
+
+    controller.queue_timeout_s = 1.0
+    rejected = asyncio.run(_deadline_bound())
+    assert rejected.reason == "deadline_exceeded" and rejected.retry_after_s >= 1
+    assert controller.in_flight == 0
+
+
+def test_remaining_budget_follows_the_request_deadline():
+    assert remaining_budget(10.0) == 10.0
+    with request_deadline(0.5):
+        assert remaining_budget(10.0) <= 0.5
+        with request_deadline(5.0):
+            assert remaining_budget(10.0) <= 0.5  # nested deadlines never extend
+        assert remaining_budget(0.1) == 0.1
+
+
+def test_llm_call_gets_the_remaining_budget(monkeypatch):
+    seen = {}
+
+    async def _create(**kwargs):
+        seen["timeout"] = kwargs["timeout"]
+        raise RuntimeError("offline")
+
+    planner = LLMPlanner()
+    planner.fast_path_enabled = False
+    planner._client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=_create)))
+
+    async def _parse():
+        with request_deadline(0.25):
+            return await planner.parse_intent("swap 1 WETH for USDC")
+
+    intent = asyncio.run(_parse())
+    assert intent.sell_token == "WETH"
+    assert 0 < seen["timeout"] <= 0.25
+
+
+def test_plan_route_sheds_with_503_and_retry_after(monkeypatch):
+    monkeypatch.setenv("REAL_TOOLS", "false")
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.delenv("CONTROL_PLANE_TOKEN", raising=False)
+    controller = AdmissionController(max_in_flight=1, max_queue=0, queue_timeout_s=1.0)
+    monkeypatch.setattr(routes, "admission_controller", controller)
+    budgets = []
+    original = routes.l1_agent.process_request
+
+    async def _slow(request, defense_config=None):
+        budgets.append(remaining_budget(60.0))
+        await asyncio.sleep(0.2)
+        return await original(request, defense_config=defense_config)
+
+    monkeypatch.setattr(routes.l1_agent, "process_request", _slow)
+
+    async def _run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            body = {"user_message": "Swap 0.1 ETH to USDC", "session_id": "s"}
+            first = asyncio.create_task(
+                client.post("/v0/agent/plan", json={**body, "request_id": "a"}, headers={"X-Request-Budget-Ms": "5000"})
+            )
+            await asyncio.sleep(0.05)
+            second = await client.post("/v0/agent/plan", json={**body, "request_id": "b"})
+            health = await client.get("/v0/health")
+            return await first, second, health.json()
+
+    first, second, health = asyncio.run(_run())
+    assert first.status_code == 200
+    assert second.status_code == 503 and int(second.headers["Retry-After"]) >= 1
+    assert budgets and budgets[0] <= 5.0
+    assert health["admission"]["shed"]["queue_full"] == 1
+    assert health["admission"]["in_flight"] == 1  # the first request is still running
@@ -0,0 +1,98 @@
+import tarfile
+import zipfile
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from harness.artifact_writer import ShardedArtifactWriter
+from harness.artifacts import ArtifactStore, build_artifact, read_artifact
+from harness.run_index import RunIndex
+from harness.runner import SmokeHarness
+
+
+def _artifacts(run_id, count):
+    return [
+        build_artifact(run_id=run_id, type="case_result", testcase_id=f"case-{i}", payload={"index": i})
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize("compression, suffix", [("gzip", ".json.gz"), ("none", ".json")])
+def test_writer_shards_compresses_and_indexes(tmp_path, compression, suffix):
+    store = ArtifactStore(tmp_path)
+    artifacts = _artifacts("run-1", 300)
+    with ShardedArtifactWriter(
+        store, "run-1", datetime(2026, 1, 1), "abc1234", workers=4, compression=compression, fsync_every=64
+    ) as writer:
+        paths = writer.write_many(artifacts)
+
+    assert writer.written == 300
+    assert all(path.name.endswith(suffix) for path in paths)
+    assert {path.parent.parent.name for path in paths} == {"shards"}
+    assert writer.max_files_per_directory() < 300
+    assert read_artifact(paths[7])["payload"]["data"] == {"index": 7}
+    assert store.index.count() == 300
+    assert store.index.latest(type="case_result", git_commit="abc1234").run_id == "run-1"
+
+
+def test_writer_rejects_foreign_runs_and_missing_zstd(tmp_path):
+    store = ArtifactStore(tmp_path)
+    writer = ShardedArtifactWriter(store, "run-1")
+    with pytest.raises(ValueError, match="does not match"):
+        writer.submit(_artifacts("run-2", 1)[0])
+    writer.close()
+    with pytest.raises(RuntimeError):
+        writer.submit(_artifacts("run-1", 1)[0])
+    from harness import artifacts
+    if artifacts.zstandard is None:
+        with pytest.raises(ValueError, match="zstandard"):
+            ShardedArtifactWriter(store, "run-3", compression="zstd")
+
+
+def test_writer_round_trips_zstd(tmp_path):
+    pytest.importorskip("zstandard")
+    store = ArtifactStore(tmp_path)
+    with ShardedArtifactWriter(store, "run-1", compression="zstd") as writer:
+        paths = writer.write_many(_artifacts("run-1", 5))
+
+    assert all(path.name.endswith(".json.zst") for path in paths)
+    assert read_artifact(paths[3])["payload"]["data"] == {"index": 3}
+
+
+@pytest.mark.parametrize("bundle_format", ["tar", "zip"])
+def test_bundle_packs_run_directory(tmp_path, bundle_format):
+    writer = ShardedArtifactWriter(ArtifactStore(tmp_path), "run-1", git_commit="c1", fsync_every=0)
+    paths = writer.write_many(_artifacts("run-1", 20))
+    bundle = writer.bundle(bundle_format, remove_sources=True)
+
+    if bundle_format == "tar":
+        with tarfile.open(bundle) as archive:
+            names = archive.getnames()
+    else:
+        with zipfile.ZipFile(bundle) as archive:
+            names = archive.namelist()
+    assert len(names) == 20
+    assert all(name.startswith(writer.run_dir.name + "/shards/") for name in names)
+    assert not writer.run_dir.exists() and not paths[0].exists()
+
+
+def test_rebuild_indexes_sharded_compressed_artifacts(tmp_path):
+    writer = ShardedArtifactWriter(ArtifactStore(tmp_path, index=False), "run-1", git_commit="c0ffee")
+    writer.write_many(_artifacts("run-1", 10))
+    writer.close()
+
+    index = RunIndex(tmp_path)
+    assert index.rebuild() == 10
+    assert {entry.git_commit for entry in index.list_runs(type="case_result")} == {"c0ffee"}
+
+
+def test_smoke_harness_can_write_case_artifacts(tmp_path):
+    suite_path = Path(__file__).resolve().parents[1] / "testcases" / "smoke_cases.json"
+    report = SmokeHarness(tmp_path, case_artifacts=True).run_suite(suite_path)
+
+    assert report["case_artifacts"]["count"] == 2
+    entries = ArtifactStore(tmp_path).index.list_runs(type="case_result")
+    assert sorted(read_artifact(entry.path)["testcase_id"] for entry in entries) == sorted(
+        result["case_id"] for result in report["results"]
+    )
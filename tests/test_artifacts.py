@@ -1,6 +1,6 @@
 from pathlib import Path
 
-from harness.artifacts import build_artifact
+from harness.artifacts import build_artifact, redact_payload
 
 """
 Tests verify that the Artifact builder correctly identifies and redacts sensitive information.
@@ -59,3 +59,31 @@ def test_artifact_redaction_list_elements(tmp_path: Path) -> None:
     hashes = artifact.payload["data"]["hashes"]
     assert hashes[0] == "<REDACTED_TX_HASH>"
     assert tx_hash not in hashes[0]
+
+
+def test_redact_payload_shares_unchanged_subtrees() -> None:
+    clean = {"route": ["uniswap_v3"], "amount": "1.0"}
+    dirty = {"recipient": "0x" + "d" * 40, "notes": [["nested 0x" + "e" * 64]]}
+    payload = {"clean": clean, "dirty": dirty, "count": 3}
+
+    result = redact_payload(payload)
+
+    assert result.changed is True
+    assert result.contains_wallet_addresses is True and result.contains_tx_hash is True
+    assert result.payload["clean"] is clean
+    assert result.payload["dirty"]["recipient"] == "<REDACTED_ADDRESS>"
+    # Lists nested in lists used to be passed through unredacted.
+    assert result.payload["dirty"]["notes"] == [["nested <REDACTED_TX_HASH>"]]
+    assert payload["dirty"]["recipient"] == "0x" + "d" * 40
+
+    untouched = redact_payload(clean)
+    assert untouched.payload is clean and untouched.changed is False
+
+
+def test_single_pass_redaction_matches_legacy_three_pass() -> None:
+    from scripts.run_redaction_benchmark import build_summary_payload, legacy_three_pass, single_pass
+
+    payload = build_summary_payload(200, sensitive_fraction=0.3)
+    payload["edge"] = ["0x" + "a" * 50, "0x" + "b" * 64 + "0x" + "c" * 40, "0X" + "f" * 40]
+
+    assert single_pass(payload) == legacy_three_pass(payload)
@@ -0,0 +1,80 @@
+"""Tests for Wilson / bootstrap confidence intervals on harness metrics."""
+import pytest
+
+from harness.confidence import compute_confidence_intervals, summarize_for_intervals, wilson_interval
+from harness.metrics import CaseResult
+from scripts.run_integration_test import build_statistics, infer_attack_vector, write_latex_table
+
+
+def _results():
+    rows = []
+    for index in range(40):
+        rows.append(CaseResult(f"adv-direct-{index}", "adversarial", "REFUSE",
+                               "ALLOW" if index % 4 == 0 else "REFUSE", 0.01 * (index + 1), "MATCH"))
+    for index in range(10):
+        rows.append(CaseResult(f"benign-{index}", "benign", "ALLOW",
+                               "REFUSE" if index == 0 else "ALLOW", 0.5 + 0.01 * index, "MATCH"))
+    return rows
+
+
+def test_wilson_interval_matches_reference_values():
+    assert wilson_interval(25, 100) == pytest.approx((0.17545, 0.34304), abs=1e-5)
+    low, high = wilson_interval(0, 25)
+    assert low == 0.0
+    assert high == pytest.approx(0.13319, abs=1e-5)
+    assert wilson_interval(0, 0) == (0.0, 0.0)
+
+
+def test_intervals_bracket_estimates_and_are_seed_deterministic():
+    summaries = {"l1": summarize_for_intervals(_results(), vector_fn=infer_attack_vector)}
+    first = compute_confidence_intervals(summaries, resamples=2000, seed=1)["l1"]
+    second = compute_confidence_intervals(summaries, resamples=2000, seed=1)["l1"]
+
+    assert first == second
+    assert first["asr"]["n"] == 40 and first["asr"]["successes"] == 10
+    assert first["asr"]["bootstrap"][0] <= first["asr"]["estimate"] <= first["asr"]["bootstrap"][1]
+    assert first["fp"]["estimate"] == pytest.approx(0.1)
+    for stat in first["latency"].values():
+        assert stat["bootstrap"][0] <= stat["estimate"] <= stat["bootstrap"][1]
+    assert set(first["attack_vectors"]) == {"direct_injection"}
+
+
+def test_process_pool_gives_identical_intervals():
+    summaries = {
+        config: summarize_for_intervals(_results()[offset:], vector_fn=infer_attack_vector)
+        for offset, config in enumerate(("bare", "l1"))
+    }
+    serial = compute_confidence_intervals(summaries, resamples=500, seed=9, workers=1)
+    pooled = compute_confidence_intervals(summaries, resamples=500, seed=9, workers=2)
+    assert serial == pooled
+
+
+def test_statistics_and_latex_table_include_intervals(tmp_path):
+    results = [result.__dict__ for result in _results()]
+    reports = {"l1l2": {"metrics": {"asr": 0.25, "fp": 0.1, "tr": 0.59}, "results": results}}
+    dataset = [{"case_id": r["case_id"], "attack_vector": infer_attack_vector(r["case_id"])} for r in results]
+
+    stats = build_statistics(dataset, reports, ci_resamples=1000)
+    intervals = stats["per_config"]["l1l2"]["confidence_intervals"]
+    assert intervals["asr"]["wilson"] == pytest.approx(list(wilson_interval(10, 40)))
+
+    table = write_latex_table(stats, tmp_path).read_text(encoding="utf-8")
+    assert "25.00\\% {\\scriptsize [" in table
+    assert "95\\% Wilson intervals" in table
+
+    assert "confidence_intervals" not in build_statistics(dataset, reports, ci_resamples=0)["per_config"]["l1l2"]
+
+
+def test_numpy_and_pure_python_resamplers_agree(monkeypatch):
+    pytest.importorskip("numpy")
+    from harness import confidence
+
+    summaries = {"l1": summarize_for_intervals(_results(), vector_fn=infer_attack_vector)}
+    vectorized = compute_confidence_intervals(summaries, resamples=4000, seed=3)["l1"]
+    monkeypatch.setattr(confidence, "np", None)
+    pure = compute_confidence_intervals(summaries, resamples=4000, seed=3)["l1"]
+
+    for metric in ("asr", "fp"):
+        assert vectorized[metric]["bootstrap"] == pytest.approx(pure[metric]["bootstrap"], abs=0.05)
+    for stat in ("mean", "p50"):
+        assert vectorized["latency"][stat]["bootstrap"] == pytest.approx(pure["latency"][stat]["bootstrap"], abs=0.05)
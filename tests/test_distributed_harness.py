@@ -0,0 +1,104 @@
+"""Tests for the coordinator/work-queue harness (`harness.distributed`)."""
+import json
+
+import pytest
+
+from agent_client.src.agents import l1_agent as l1_module
+from harness import agent_clients
+from harness.agent_clients import InProcessAgentClient
+from harness.distributed import parse_address, plan_workers, run_distributed_suite
+from harness.metrics import CaseResult
+from harness.runner import SmokeHarness, execute_case
+
+
+def _suite(tmp_path, count=6):
+    cases = json.loads(open("testcases/final_attack_dataset.json", encoding="utf-8").read())
+    benign = [case for case in cases if case["category"] == "benign"][:2]
+    suite = benign + [case for case in cases if case["category"] != "benign"][: count - len(benign)]
+    path = tmp_path / "mini_suite.json"
+    path.write_text(json.dumps(suite), encoding="utf-8")
+    return path, suite
+
+
+def test_distributed_reports_match_sequential_in_process(tmp_path):
+    suite_path, suite = _suite(tmp_path)
+    configs = ("bare", "l1l2")
+    reports = run_distributed_suite(suite_path, tmp_path / "artifacts", configs, workers=3, timeout=120)
+
+    previous = l1_module.get_defense_config()
+    try:
+        for config in configs:
+            client = InProcessAgentClient(defense_config=config)
+            try:
+                expected = [execute_case(client, case).observed for case in suite]
+            finally:
+                client.close()
+            report = reports[config]
+            assert [row["observed"] for row in report["results"]] == expected
+            assert [row["case_id"] for row in report["results"]] == [case["case_id"] for case in suite]
+            assert report["meta"]["defense_profile"] == config
+            assert sum(report["meta"]["distributed"]["workers"].values()) == len(suite)
+            assert report["run"]["notes"] == ["agent_client=InProcessAgentClient via harness.distributed"]
+            assert json.loads(open(report["artifact_path"], encoding="utf-8").read())["defense_profile"] == config
+    finally:
+        l1_module.set_defense_config(previous)
+    assert reports["bare"]["metrics"]["asr"] >= reports["l1l2"]["metrics"]["asr"]
+
+
+def test_worker_failure_is_raised_by_coordinator(tmp_path):
+    suite_path, _ = _suite(tmp_path, count=2)
+    with pytest.raises(RuntimeError, match="unreachable"):
+        run_distributed_suite(
+            suite_path, tmp_path / "artifacts", ("l1",), workers=1,
+            agents={"l1": "http://127.0.0.1:9"}, timeout=60,
+        )
+
+
+def test_http_worker_agent_pins_config_per_request(monkeypatch):
+    sent = []
+
+    class _Response:
+        status_code = 200
+
+        def __init__(self, applied):
+            self.headers = {"X-Defense-Config": applied}
+
+        def json(self):
+            return {"request_id": "c1", "status": "NEEDS_OWNER_SIGNATURE"}
+
+    def _post(url, json, headers, timeout):
+        sent.append(headers)
+        return _Response(applied)
+
+    monkeypatch.setenv("CONTROL_PLANE_TOKEN", "control-secret")
+    monkeypatch.setattr(agent_clients.requests, "post", _post)
+    client = agent_clients.FastAPIAgentClient(defense_config="l1l2")
+    case = {"case_id": "c1", "input": "Swap 0.1 ETH to USDC"}
+
+    applied = "l1l2"
+    assert client.evaluate_case(case).observed == "ALLOW"
+    assert sent[-1] == {"X-Control-Token": "control-secret", "X-Defense-Config": "l1l2"}
+
+    applied = "bare"  # a server without override support answers with its global config
+    ignored = client.evaluate_case(case)
+    assert ignored.observed == "ERROR"
+    assert "expected 'l1l2'" in ignored.reason
+
+
+def test_plan_workers_and_address_parsing():
+    assert plan_workers(("bare", "l1"), 1) == ["bare", "l1"]
+    assert plan_workers(("bare", "l1"), 5) == ["bare", "l1", "bare", "l1", "bare"]
+    assert parse_address("10.0.0.5:7000") == ("10.0.0.5", 7000)
+    with pytest.raises(ValueError):
+        parse_address("10.0.0.5")
+
+
+def test_run_suite_rejects_misaligned_case_results(tmp_path):
+    suite_path, suite = _suite(tmp_path, count=2)
+    results = [
+        CaseResult(case_id=case["case_id"], category=case["category"], expected=case["expected"],
+                   observed="BLOCK", duration_s=0.0, status="MATCH")
+        for case in reversed(suite)
+    ]
+    with pytest.raises(ValueError, match="suite order"):
+        SmokeHarness(tmp_path).run_suite(suite_path, case_results=results)
@@ -0,0 +1,125 @@
+import json
+from pathlib import Path
+
+from scripts import figure_renderer
+from scripts.figure_renderer import FigureRenderer, figure_file_paths, statistics_digest
+
+
+def _payload(asr=0.25):
+    return {
+        "per_config": {
+            "l1l2": {
+                "reported_metrics": {"asr": asr, "fp": 0.0, "tr": 1.5},
+                "attack_vector_breakdown": {"direct_injection": {"BLOCK": 3}},
+                "confidence_intervals": {"resamples": 100},
+            }
+        }
+    }
+
+
+def fake_draw(statistics_payload, figures_dir):
+    """Top-level so it can be pickled into a spawned worker."""
+    figures_dir.mkdir(parents=True, exist_ok=True)
+    paths = figure_file_paths(figures_dir)
+    for path in paths.values():
+        path.write_text(json.dumps(statistics_payload, sort_keys=True))
+    return paths
+
+
+def test_digest_ignores_fields_the_figures_do_not_use():
+    changed_ci = _payload()
+    changed_ci["per_config"]["l1l2"]["confidence_intervals"] = {"resamples": 999}
+    assert statistics_digest(changed_ci) == statistics_digest(_payload())
+    assert statistics_digest(_payload(asr=0.5)) != statistics_digest(_payload())
+
+
+def test_render_reuses_cache_and_copies_into_each_target(tmp_path):
+    calls = []
+
+    def _draw(payload, figures_dir):
+        calls.append(payload)
+        return fake_draw(payload, figures_dir)
+
+    renderer = FigureRenderer(tmp_path / "cache", in_process=True, draw=_draw)
+    first = renderer.render(_payload(), tmp_path / "a")
+    second = renderer.render(_payload(), tmp_path / "b")
+
+    assert len(calls) == 1
+    assert (renderer.hits, renderer.misses) == (1, 1)
+    assert "confidence_intervals" not in calls[0]["per_config"]["l1l2"]
+    assert first["metrics_png"].read_text() == second["metrics_png"].read_text()
+    assert second["breakdown_pdf"] == tmp_path / "b" / "final_l1l2_attack_vector_breakdown.pdf"
+
+
+def test_render_many_draws_each_distinct_payload_once_in_worker_processes(tmp_path):
+    renderer = FigureRenderer(tmp_path / "cache", workers=2, draw=fake_draw)
+    jobs = [(_payload(0.1), tmp_path / "run1"), (_payload(0.2), tmp_path / "run2"), (_payload(0.1), tmp_path / "run3")]
+
+    rendered = renderer.render_many(jobs)
+
+    assert renderer.misses == 2
+    assert len(list((tmp_path / "cache").iterdir())) == 2
+    assert json.loads(rendered[1]["metrics_pdf"].read_text())["per_config"]["l1l2"]["reported_metrics"]["asr"] == 0.2
+    assert rendered[2]["metrics_png"].read_text() == rendered[0]["metrics_png"].read_text()
+
+
+def test_deferred_jobs_render_later_and_leave_the_queue(tmp_path):
+    renderer = FigureRenderer(tmp_path / "cache", in_process=True, draw=fake_draw)
+    job = renderer.defer(_payload(), tmp_path / "figures")
+    assert job.parent == renderer.pending_dir
+    assert not (tmp_path / "figures").exists()
+
+    rendered = renderer.render_pending()
+    assert rendered[0]["metrics_png"].exists()
+    assert renderer.pending_jobs() == []
+
+
+def test_cli_renders_statistics_files_next_to_each_run(tmp_path, monkeypatch, capsys):
+    for name, asr in (("run1", 0.1), ("run2", 0.3)):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "statistics.json").write_text(json.dumps(_payload(asr)))
+    monkeypatch.setattr(figure_renderer, "draw_figures", fake_draw)
+    monkeypatch.setattr(
+        "sys.argv",
+        [
+            "figure_renderer.py",
+            str(tmp_path / "*" / "statistics.json"),
+            "--cache-dir",
+            str(tmp_path / "cache"),
+            "--in-process",
+        ],
+    )
+
+    figure_renderer.main()
+
+    assert (tmp_path / "run2" / "figures" / "final_metrics_comparison.png").exists()
+    assert "0 hit(s), 2 rendered" in capsys.readouterr().out
+
+
+def test_integration_pipeline_can_defer_or_skip_figures(tmp_path):
+    from scripts import run_integration_test as integration
+
+    root = Path(__file__).resolve().parents[1]
+
+    def _build(figures):
+        return integration.build_integration_pipeline(
+            mode="archived",
+            source_dataset=root / "testcases" / "final_attack_dataset.json",
+            final_dataset=tmp_path / "frozen.json",
+            final_results_dir=tmp_path / "final_results",
+            figures_dir=tmp_path / "figures",
+            threat_model_path=tmp_path / "threat_model.md",
+            results_format="columnar",
+            ci_resamples=0,
+            cache_path=tmp_path / "cache.json",
+            figures=figures,
+            figure_cache_dir=tmp_path / "figure_cache",
+        )
+
+    assert "figures" not in _build("off").run().outcomes
+
+    deferred = _build("deferred").run()
+    job = Path(deferred.value("figures")["pending"])
+    assert job.parent == tmp_path / "figure_cache" / "pending"
+    assert json.loads(job.read_text())["figures_dir"] == str((tmp_path / "figures").resolve())
+    assert not (tmp_path / "figures" / "final_metrics_comparison.png").exists()
@@ -0,0 +1,182 @@
+"""Tests for micro-batched LLM intent parsing."""
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import httpx
+import openai
+
+from agent_client.src.llm.batching import MicroBatcher
+from agent_client.src.llm.llm_planner import BATCH_INSTRUCTIONS, LLMPlanner
+from agent_client.src.utils.admission import current_deadline, request_deadline
+
+MESSAGES = [
+    "swap 1 ETH for USDC, thanks",
+    "swap 2 ETH for DAI, thanks",
+    "swap 30 USDC for WETH, thanks",
+]
+
+
+def _intent_for(message):
+    words = message.replace(",", "").split()
+    decimals = 6 if words[2] == "USDC" else 18
+    return {
+        "chain_id": 1,
+        "sell_token": words[2],
+        "buy_token": words[4],
+        "sell_amount": str(int(words[1]) * 10**decimals),
+    }
+
+
+def _planner(corrupt_ids=(), batch_error=None, overrides=None):
+    calls = []
+
+    async def _create(**kwargs):
+        messages = kwargs["messages"]
+        calls.append(messages)
+        if len(messages) == 3:
+            assert messages[0]["content"] == planner.system_prompt and messages[1]["content"] == BATCH_INSTRUCTIONS
+            if batch_error is not None:
+                raise batch_error
+            results = []
+            for item in json.loads(messages[2]["content"])["items"]:
+                # A corrupted item gets its neighbour's intent, as if results were shuffled.
+                source = MESSAGES[(item["id"] + 1) % 3] if item["id"] in corrupt_ids else item["message"]
+                intent = _intent_for(source)
+                # An override mimics text injected elsewhere in the prompt rewriting this item's fields.
+                intent.update((overrides or {}).get(item["id"], {}))
+                results.append({"id": item["id"], "intent": intent})
+            content = json.dumps({"results": results})
+        else:
+            content = json.dumps(_intent_for(messages[1]["content"]))
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    planner = LLMPlanner()
+    planner._client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=_create)))
+    planner.fast_path_enabled = False
+    planner.batch_enabled = True
+    planner.batch_window_ms = 20
+    planner.retry_base_delay_s = 0.001
+    return planner, calls
+
+
+def _single_only(calls):
+    async def _create(**kwargs):
+        calls.append(kwargs["messages"])
+        content = json.dumps({"chain_id": 1, "sell_token": "ETH", "buy_token": "USDC", "sell_amount": "1"})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    return _create
+
+
+async def _parse_all(planner):
+    return await asyncio.gather(*(planner.parse_intent(message) for message in MESSAGES))
+
+
+def test_concurrent_parses_share_one_llm_call():
+    planner, calls = _planner()
+    intents = asyncio.run(_parse_all(planner))
+    assert len(calls) == 1
+    assert [(i.sell_token, i.buy_token) for i in intents] == [("ETH", "USDC"), ("ETH", "DAI"), ("USDC", "WETH")]
+    assert all(i.parse_audit["source"] == "llm" for i in intents)
+    assert planner.describe()["batching"]["by_model"]
+    assert sum(b["items"] for b in planner.describe()["batching"]["by_model"].values()) == 3
+
+
+def test_bad_batch_item_falls_back_to_a_single_call():
+    planner, calls = _planner(corrupt_ids={1})
+    intents = asyncio.run(_parse_all(planner))
+    assert len(calls) == 2 and len(calls[1]) == 2  # one batch, then one single call for item 1
+    assert (intents[1].sell_token, intents[1].buy_token) == ("ETH", "DAI")
+    assert planner.describe()["batching"]["item_fallbacks"] == 1
+
+
+def test_batch_item_with_altered_amount_or_chain_is_reparsed_alone():
+    planner, calls = _planner(overrides={0: {"sell_amount": str(100 * 10**18)}, 2: {"chain_id": 10}})
+    intents = asyncio.run(_parse_all(planner))
+    assert len(calls) == 3  # one batch, then single calls for items 0 and 2
+    assert [(i.chain_id, i.sell_amount) for i in intents] == [
+        (1, str(10**18)),
+        (1, str(2 * 10**18)),
+        (1, str(30 * 10**6)),
+    ]
+    assert planner.describe()["batching"]["item_fallbacks"] == 2
+
+
+def test_messages_the_grammar_cannot_read_skip_the_batch():
+    planner, calls = _planner()
+    vague = ["please swap my ETH into some USDC", "trade the usual DAI for ETH", "move my USDC to WETH"]
+
+    async def _parse_vague():
+        return await asyncio.gather(*(planner.parse_intent(message) for message in vague))
+
+    planner._client.chat.completions.create = _single_only(calls)
+    intents = asyncio.run(_parse_vague())
+    assert len(calls) == 3 and all(len(messages) == 2 for messages in calls)
+    assert all(i.parse_audit["source"] == "llm" for i in intents)
+    assert planner.describe()["batching"]["bypassed"] == 3
+    assert planner.describe()["batching"]["item_fallbacks"] == 0
+
+
+def test_failed_batch_is_retried_per_message():
+    timeout = openai.APITimeoutError(request=httpx.Request("POST", "http://llm.test/chat/completions"))
+    planner, calls = _planner(batch_error=timeout)
+    intents = asyncio.run(_parse_all(planner))
+    assert len(calls) == 4
+    assert [i.parse_audit["attempts"] for i in intents] == [2, 2, 2]
+
+
+def test_batcher_flushes_at_max_size():
+    sizes = []
+
+    async def _echo(items):
+        sizes.append(len(items))
+        return [item * 2 for item in items]
+
+    async def _run():
+        batcher = MicroBatcher(_echo, window_ms=50, max_size=2)
+        return await asyncio.gather(*(batcher.submit(n) for n in range(5)))
+
+    assert asyncio.run(_run()) == [0, 2, 4, 6, 8]
+    assert sizes == [2, 2, 1]
+
+
+def test_batch_runs_under_the_earliest_deadline():
+    seen = []
+
+    async def _record(items):
+        seen.append(current_deadline())
+        return items
+
+    async def _submit(batcher, item, budget_s):
+        with request_deadline(budget_s) as deadline:
+            return await batcher.submit(item), deadline
+
+    async def _run():
+        batcher = MicroBatcher(_record, window_ms=20, max_size=8)
+        return await asyncio.gather(
+            _submit(batcher, "slow", 30.0), _submit(batcher, "fast", 5.0), _submit(batcher, "none", None)
+        )
+
+    started = time.monotonic()
+    results = asyncio.run(_run())
+    assert [item for item, _ in results] == ["slow", "fast", "none"]
+    assert len(seen) == 1
+    assert abs(seen[0] - results[1][1]) < 0.01
+    assert seen[0] < started + 6
+
+
+def test_batch_without_deadlines_runs_without_one():
+    seen = []
+
+    async def _record(items):
+        seen.append(current_deadline())
+        return items
+
+    async def _run():
+        batcher = MicroBatcher(_record, window_ms=5, max_size=8)
+        return await asyncio.gather(batcher.submit(1), batcher.submit(2))
+
+    assert asyncio.run(_run()) == [1, 2]
+    assert seen == [None]
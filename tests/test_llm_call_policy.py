@@ -0,0 +1,120 @@
+"""Tests for LLM call deadlines, budgeted retries and the fallback policy."""
+import asyncio
+import json
+import random
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from agent_client.src.agents import l1_agent as l1_module
+from agent_client.src.llm.call_policy import LLMUnavailableError, RetryBudget, backoff_delay, is_retryable
+from agent_client.src.llm.llm_planner import LLMPlanner
+from agent_client.src.models.schemas import PlanRequest
+from agent_client.src.state import backend as state
+from agent_client.src.state.backend import InMemoryStateBackend
+
+MESSAGE = "swap 2 ETH for USDC, quickly please"
+INTENT = {"chain_id": 1, "sell_token": "ETH", "buy_token": "USDC", "sell_amount": "2000000000000000000"}
+
+
+def _timeout_error():
+    return openai.APITimeoutError(request=httpx.Request("POST", "http://llm.test/chat/completions"))
+
+
+def _planner(outcomes, fallback="mock", **overrides):
+    """Planner whose fake client replays `outcomes` (exceptions, delays in seconds, or intent dicts)."""
+    calls = []
+
+    async def _create(**kwargs):
+        outcome = outcomes[min(len(calls), len(outcomes) - 1)]
+        calls.append(kwargs)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        if isinstance(outcome, float):
+            await asyncio.sleep(outcome)
+            outcome = INTENT
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(outcome)))])
+
+    planner = LLMPlanner()
+    planner._client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=_create)))
+    planner.fast_path_enabled = False
+    planner.fallback = fallback
+    planner.retry_base_delay_s = 0.001
+    for name, value in overrides.items():
+        setattr(planner, name, value)
+    return planner, calls
+
+
+def test_transient_errors_are_retried_then_succeed(monkeypatch):
+    monkeypatch.setenv("LLM_MODEL_NAME", "model-a")
+    planner, calls = _planner([_timeout_error(), INTENT])
+    intent = asyncio.run(planner.parse_intent(MESSAGE))
+    assert len(calls) == 2
+    assert intent.parse_audit["source"] == "llm" and intent.parse_audit["attempts"] == 2
+    histogram = planner.describe()["latency_by_model"]["model-a"]
+    assert histogram["count"] == 2 and histogram["outcomes"] == {"error": 1, "ok": 1}
+
+
+def test_retries_stop_at_max_and_fall_back_to_mock():
+    planner, calls = _planner([_timeout_error()])
+    intent = asyncio.run(planner.parse_intent(MESSAGE))
+    assert len(calls) == planner.max_retries + 1
+    assert intent.parse_audit["source"] == "mock_fallback" and intent.parse_audit["fallback"] == "mock"
+    assert (intent.sell_token, intent.sell_amount) == ("ETH", "2000000000000000000")
+
+
+def test_non_retryable_errors_fall_back_immediately():
+    unauthorized = httpx.Response(401, request=httpx.Request("POST", "http://llm.test/chat/completions"))
+    planner, calls = _planner([openai.AuthenticationError("bad key", response=unauthorized, body=None)])
+    assert asyncio.run(planner.parse_intent(MESSAGE)).parse_audit["attempts"] == 1
+    assert len(calls) == 1
+
+
+def test_retry_budget_limits_retries_to_a_share_of_traffic():
+    planner, calls = _planner([_timeout_error()], retry_budget=RetryBudget(ratio=0.0, reserve=1.0))
+    asyncio.run(planner.parse_intent(MESSAGE))
+    asyncio.run(planner.parse_intent(MESSAGE))
+    assert len(calls) == 3  # one budgeted retry in total, not two per call
+    assert planner.retry_budget.snapshot()["exhausted"] == 2
+
+
+def test_per_call_deadline_times_out_slow_attempts(monkeypatch):
+    monkeypatch.setenv("LLM_MODEL_NAME", "slow-model")
+    planner, calls = _planner([1.0], call_timeout_s=0.05, max_retries=0)
+    intent = asyncio.run(planner.parse_intent(MESSAGE))
+    assert intent.parse_audit["source"] == "mock_fallback"
+    assert planner.describe()["latency_by_model"]["slow-model"]["outcomes"] == {"timeout": 1}
+
+
+def test_cache_fallback_serves_the_last_good_answer():
+    state.set_state_backend(InMemoryStateBackend())
+    try:
+        planner, _ = _planner([INTENT, _timeout_error()], fallback="cache", max_retries=0)
+        asyncio.run(planner.parse_intent(MESSAGE))
+        cached = asyncio.run(planner.parse_intent(MESSAGE))
+        assert cached.parse_audit["source"] == "cache_fallback" and cached.sell_token == "ETH"
+        with pytest.raises(LLMUnavailableError) as miss:
+            asyncio.run(planner.parse_intent("swap 3 ETH for DAI, not cached"))
+        assert miss.value.audit["cache"] == "miss"
+    finally:
+        state.set_state_backend(None)
+
+
+def test_fail_policy_surfaces_an_audited_error_response(monkeypatch):
+    monkeypatch.setenv("REAL_TOOLS", "false")
+    planner, _ = _planner([_timeout_error()], fallback="fail", max_retries=1)
+    monkeypatch.setattr(l1_module, "llm_planner", planner)
+    request = PlanRequest(request_id="llm-down", user_message=MESSAGE, session_id="llm-down")
+    response = asyncio.run(l1_module.l1_agent.process_request(request, defense_config="l1l2"))
+    assert response.status == "LLM_UNAVAILABLE"
+    assert response.error["details"]["attempts"] == 2 and response.error["details"]["fallback"] == "fail"
+
+
+def test_backoff_is_jittered_and_capped():
+    rng = random.Random(7)
+    delays = [backoff_delay(attempt, 0.1, 0.5, rng) for attempt in range(1, 8)]
+    assert all(0 <= delay <= min(0.5, 0.1 * 2 ** (i)) for i, delay in enumerate(delays))
+    assert len(set(delays)) == len(delays)
+    assert is_retryable(asyncio.TimeoutError()) and not is_retryable(ValueError("bad output"))
@@ -0,0 +1,113 @@
+"""Tests for the streaming, mergeable metrics accumulator."""
+import random
+import statistics
+
+import pytest
+
+from harness.metrics import (
+    CaseResult,
+    MetricsAccumulator,
+    QuantileSketch,
+    RunningStats,
+    compute_asr,
+    compute_fp,
+    compute_metrics,
+    compute_tr,
+)
+from harness.confidence import summarize_for_intervals
+from scripts.run_integration_test import infer_attack_vector
+
+
+def _results(n=200, seed=3):
+    rng = random.Random(seed)
+    rows = []
+    for index in range(n):
+        benign = index % 5 == 0
+        rows.append(
+            CaseResult(
+                case_id=f"benign-{index}" if benign else f"adv-tool-{index}",
+                category="benign" if benign else "adversarial",
+                expected="ALLOW" if benign else "BLOCK",
+                observed=rng.choice(["ALLOW", "BLOCK", "REFUSE"]),
+                duration_s=rng.lognormvariate(-2, 1) if index % 17 else None,
+                status="SKIPPED" if index % 23 == 0 else "MATCH",
+            )
+        )
+    return rows
+
+
+def test_accumulator_matches_legacy_metric_semantics():
+    results = _results()
+    acc = MetricsAccumulator.from_results(results)
+
+    scored = [r for r in results if r.status != "SKIPPED"]
+    malicious = [r for r in scored if r.category != "benign"]
+    assert acc.asr == sum(r.observed == "ALLOW" for r in malicious) / len(malicious)
+    assert acc.metrics() == {"asr": compute_asr(results), "fp": compute_fp(results), "tr": compute_tr(results)}
+    assert MetricsAccumulator().metrics() == {"asr": 0.0, "fp": 0.0, "tr": 0.0}
+
+
+def test_merged_partials_equal_single_pass():
+    results = _results(500)
+    whole = MetricsAccumulator.from_results(results, vector_fn=infer_attack_vector)
+    parts = [
+        MetricsAccumulator.from_results(results[i::3], vector_fn=infer_attack_vector) for i in range(3)
+    ]
+    merged = parts[0].merge(parts[1]).merge(parts[2])
+
+    assert merged.metrics() == whole.metrics()
+    assert merged.vector_counts == whole.vector_counts
+    assert merged.snapshot()["attack_success_rate"] == whole.snapshot()["attack_success_rate"]
+    assert merged.durations.mean == pytest.approx(whole.durations.mean)
+    assert merged.durations.variance == pytest.approx(whole.durations.variance)
+    assert merged.duration_percentiles() == whole.duration_percentiles()
+
+
+def test_running_stats_match_statistics_module():
+    values = [random.Random(1).gauss(5, 2) for _ in range(1000)]
+    stats = RunningStats()
+    for value in values:
+        stats.add(value)
+    assert stats.mean == pytest.approx(statistics.mean(values))
+    assert stats.variance == pytest.approx(statistics.pvariance(values))
+
+
+@pytest.mark.parametrize("q", [0.5, 0.9, 0.99, 0.999])
+def test_quantile_sketch_is_within_relative_accuracy(q):
+    rng = random.Random(7)
+    values = sorted(rng.lognormvariate(0, 1.5) for _ in range(20000))
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+
+    exact = values[int(q * (len(values) - 1))]
+    assert sketch.quantile(q) == pytest.approx(exact, rel=0.011)
+    assert sketch.quantile(1.0) == values[-1]
+
+
+def test_snapshot_reports_breakdown_and_exact_rates():
+    results = [
+        CaseResult("adv-direct-1", "adversarial", "REFUSE", "ALLOW", 0.5, "MISMATCH"),
+        CaseResult("adv-direct-2", "adversarial", "REFUSE", "REFUSE", 0.1, "MATCH"),
+        CaseResult("benign-1", "benign", "ALLOW", "ALLOW", 0.2, "MATCH"),
+    ]
+    snapshot = MetricsAccumulator.from_results(results, vector_fn=infer_attack_vector).snapshot()
+
+    assert snapshot["attack_vector_breakdown"] == {
+        "direct_injection": {"ALLOW": 1, "REFUSE": 1},
+        "none": {"ALLOW": 1},
+    }
+    assert snapshot["attack_success_rate"] == {"mean": 1 / 3, "variance": 2 / 9, "sample_size": 3}
+    assert snapshot["duration_seconds"]["max"] == 0.5
+
+
+def test_metrics_treat_category_case_insensitively_and_skip_the_sketch():
+    results = [
+        CaseResult("b-1", "Benign", "ALLOW", "REFUSE", 0.1, "MISMATCH"),
+        CaseResult("b-2", "benign", "ALLOW", "ALLOW", 0.2, "MATCH"),
+        CaseResult("a-1", "adversarial", "REFUSE", "REFUSE", 0.3, "MATCH"),
+    ]
+    assert compute_metrics(results) == {"asr": 0.0, "fp": 0.5, "tr": 0.3}
+    acc = MetricsAccumulator.from_results(results, track_quantiles=False)
+    assert acc.duration_sketch is None and acc.duration_percentiles() == {}
+    assert summarize_for_intervals(results)["benign"] == 2
@@ -0,0 +1,124 @@
+"""Tests for the SwapGuard JSON-RPC stand-in used for L3 load testing."""
+import asyncio
+import json
+import os
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from policy_engine import l3_validator
+from policy_engine.l3_validator import TOKEN_ADDRESS_MAP, _build_calldata, _function_selector
+from scripts import check_policy_parity as parity
+from scripts import mock_swapguard_rpc as rpc_mod
+
+CONTRACT = rpc_mod.DEFAULT_CONTRACT_ADDRESS
+ROUTER = "0x1111111254fb6c44bAC0beD2854e76F90643097d"
+
+
+def _call(rpc, data, to=CONTRACT, request_id=1):
+    return rpc.dispatch(
+        {"jsonrpc": "2.0", "id": request_id, "method": "eth_call", "params": [{"to": to, "data": data}, "latest"]}
+    )
+
+
+def _validate(rpc, sell="WETH", buy="USDC", router=ROUTER, value=10**18, slippage=25):
+    return _call(rpc, _build_calldata(TOKEN_ADDRESS_MAP[sell], TOKEN_ADDRESS_MAP[buy], router, value, slippage))
+
+
+def test_validate_swap_passes_for_deploy_script_state():
+    assert _validate(rpc_mod.SwapGuardRPC()) == {"jsonrpc": "2.0", "id": 1, "result": "0x"}
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "reason"),
+    [
+        ({"router": "0x000000000000000000000000000000000000beef"}, "R-02: router not allowed"),
+        ({"slippage": 1001}, "R-03: slippage exceeds cap"),
+        ({"value": 5 * 10**18 + 1}, "R-04: value exceeds cap"),
+    ],
+)
+def test_validate_swap_reverts_with_contract_reason(kwargs, reason):
+    response = _validate(rpc_mod.SwapGuardRPC(), **kwargs)
+
+    assert response["error"]["code"] == rpc_mod.EXECUTION_REVERTED_CODE
+    assert response["error"]["message"] == f"execution reverted: {reason}"
+    assert response["error"]["data"] == rpc_mod.encode_revert_data(reason)
+
+
+def test_unknown_token_reverts_and_misconfiguration_can_be_simulated():
+    wbtc = "0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599"
+    rpc = rpc_mod.SwapGuardRPC()
+    calldata = _build_calldata(wbtc, TOKEN_ADDRESS_MAP["USDC"], ROUTER, 10**18, 25)
+
+    assert _call(rpc, calldata)["error"]["message"] == "execution reverted: R-01: sell token not allowed"
+    rpc.state.set_allowed_token(wbtc, True)
+    assert _call(rpc, calldata)["result"] == "0x"
+
+
+def test_view_getters_and_batch_requests():
+    rpc = rpc_mod.SwapGuardRPC()
+    usdc_arg = TOKEN_ADDRESS_MAP["USDC"].lower().removeprefix("0x").rjust(64, "0")
+    batch = [
+        {"jsonrpc": "2.0", "id": 1, "method": "eth_call",
+         "params": [{"to": CONTRACT, "data": _function_selector("maxValueWei()")}, "latest"]},
+        {"jsonrpc": "2.0", "id": 2, "method": "eth_call",
+         "params": [{"to": CONTRACT, "data": _function_selector("allowedTokens(address)") + usdc_arg}, "latest"]},
+        {"jsonrpc": "2.0", "id": 3, "method": "eth_call",
+         "params": [{"to": CONTRACT, "data": _function_selector("owner()")}, "latest"]},
+        {"jsonrpc": "2.0", "id": 4, "method": "eth_getBalance", "params": []},
+    ]
+
+    responses = rpc.dispatch(batch)
+
+    assert [r["id"] for r in responses] == [1, 2, 3, 4]
+    assert int(responses[0]["result"], 16) == 5 * 10**18
+    assert int(responses[1]["result"], 16) == 1
+    assert responses[2]["result"].endswith(rpc_mod.DEFAULT_OWNER.lower()[2:])
+    assert responses[3]["error"]["code"] == -32601
+
+
+def test_parse_error_and_other_address_returns_empty():
+    rpc = rpc_mod.SwapGuardRPC()
+    body = asyncio.run(rpc.handle_body(b"{not json"))
+    assert json.loads(body)["error"]["code"] == -32700
+    assert _call(rpc, _function_selector("owner()"), to="0x" + "00" * 20)["result"] == "0x"
+
+
+def _route_eth_call_to(rpc):
+    def _eth_call(_rpc_url, to, data):
+        response = _call(rpc, data, to=to)
+        if "error" in response:
+            return False, response["error"]["message"]
+        return True, response["result"]
+
+    return _eth_call
+
+
+def test_validate_l3_against_stand_in_maps_rule_ids():
+    rpc = rpc_mod.SwapGuardRPC()
+    intent = SimpleNamespace(sell_token="ETH", buy_token="USDC", sell_amount=str(6 * 10**18), chain_id=1)
+    tool_response = SimpleNamespace(
+        quote=SimpleNamespace(tx=SimpleNamespace(to=ROUTER), to_token_amount=str(16800 * 10**6)),
+        market_snapshot={"ETH": 2800.0, "USDC": 1.0},
+    )
+
+    with patch.dict(os.environ, {"SWAP_GUARD_ADDRESS": CONTRACT}):
+        with patch.object(l3_validator, "_eth_call", _route_eth_call_to(rpc)):
+            result = l3_validator.validate_l3(intent, tool_response)
+
+    assert result["decision"] == "BLOCK"
+    assert result["violations"][0]["rule_id"] == "L3-R04"
+
+
+def test_policy_parity_report_passes_against_stand_in(monkeypatch):
+    rpc = rpc_mod.SwapGuardRPC()
+
+    def _parity_eth_call(_rpc_url, to, data):
+        return _call(rpc, data, to=to)["result"]
+
+    monkeypatch.setattr(parity, "_eth_call", _parity_eth_call)
+    report = parity.build_parity_report("http://stand-in", CONTRACT)
+
+    assert report["all_checks_pass"] is True
+    assert report["owner"].lower() == rpc_mod.DEFAULT_OWNER.lower()
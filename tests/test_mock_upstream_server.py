@@ -0,0 +1,81 @@
+"""Tests for the local CoinGecko / 1inch stand-in used for load testing."""
+import asyncio
+import json
+import random
+from dataclasses import replace
+
+import pytest
+
+from agent_client.src.tools.tool_coordinator import TOKEN_ADDRESS_MAP
+from scripts import mock_upstream_server as upstream
+
+
+def _get(server, path, query=""):
+    status, headers, body = asyncio.run(server.handle("GET", path, query))
+    return status, headers, json.loads(body)
+
+
+def test_price_endpoint_matches_coingecko_shape():
+    server = upstream.MockUpstream(upstream.PRESETS["fast"])
+    status, _, body = _get(server, "/api/v3/simple/price", "ids=ethereum,usd-coin&vs_currencies=usd")
+
+    assert status == 200
+    assert body["ethereum"]["usd"] == 2800.0
+    assert body["usd-coin"]["usd"] == 1.0
+
+
+def test_quote_endpoint_matches_oneinch_shape_and_stays_in_slippage_cap():
+    server = upstream.MockUpstream(upstream.PRESETS["fast"])
+    query = (
+        f"fromTokenAddress={TOKEN_ADDRESS_MAP['ETH']}"
+        f"&toTokenAddress={TOKEN_ADDRESS_MAP['USDC']}&amount={10**18}"
+    )
+    status, _, body = _get(server, "/swap/v5.2/1/quote", query)
+
+    assert status == 200
+    assert body["tx"]["to"].lower() == "0x1111111254fb6c44bac0bed2854e76f90643097d"
+    assert body["tx"]["value"] == str(10**18)
+    assert 2700 * 10**6 < int(body["toTokenAmount"]) < 2800 * 10**6
+
+
+def test_error_rate_and_padding_are_applied():
+    profile = replace(
+        upstream.PRESETS["fast"],
+        coingecko=upstream.EndpointProfile(error_rate=1.0),
+        oneinch=upstream.EndpointProfile(padding_bytes=512),
+    )
+    server = upstream.MockUpstream(profile)
+
+    status, _, _ = _get(server, "/api/v3/simple/price", "ids=ethereum&vs_currencies=usd")
+    assert status == 500
+
+    query = f"fromTokenAddress={TOKEN_ADDRESS_MAP['WETH']}&toTokenAddress={TOKEN_ADDRESS_MAP['DAI']}&amount=1"
+    status, _, body = _get(server, "/swap/v6.0/1/quote", query)
+    assert status == 200
+    assert len(body["tx"]["data"]) >= 512
+    assert server.stats["coingecko"]["500"] == 1
+
+
+def test_burst_window_returns_429_with_retry_after():
+    profile = replace(upstream.PRESETS["fast"], burst_every_s=10.0, burst_duration_s=2.0, retry_after_s=3)
+    server = upstream.MockUpstream(profile)
+
+    assert server.in_burst(server._started + 1.0) is True
+    assert server.in_burst(server._started + 5.0) is False
+    status, headers, _ = _get(server, "/api/v3/simple/price", "ids=ethereum&vs_currencies=usd")
+    assert status == 429
+    assert headers["retry-after"] == "3"
+
+
+@pytest.mark.parametrize("text", ["constant:5", "uniform:1,2", "normal:10,1", "lognormal:80,0.4", "exponential:20"])
+def test_latency_specs_parse_and_sample_non_negative(text):
+    spec = upstream.LatencySpec.parse(text)
+    rng = random.Random(1)
+    assert all(spec.sample_ms(rng) >= 0 for _ in range(100))
+
+
+def test_profile_round_trips_through_worker_env(monkeypatch):
+    profile = upstream.PRESETS["degraded"]
+    monkeypatch.setenv("MOCK_UPSTREAM_PROFILE", upstream._profile_to_env(profile))
+
+    assert upstream._profile_from_env() == profile
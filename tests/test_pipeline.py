@@ -0,0 +1,119 @@
+"""Tests for the memoized DAG executor and the integration pipeline wiring."""
+import json
+import shutil
+import threading
+from pathlib import Path
+
+import pytest
+
+from harness.pipeline import Pipeline, Step
+from scripts import run_integration_test as integration
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _toy_pipeline(tmp_path, calls, params):
+    source = tmp_path / "source.txt"
+    out_a = tmp_path / "a.txt"
+    out_b = tmp_path / "b.txt"
+    pipeline = Pipeline(tmp_path / "cache.json")
+
+    def _a(deps):
+        calls.append("a")
+        out_a.write_text(source.read_text().upper())
+        return out_a.read_text()
+
+    def _b(deps):
+        calls.append("b")
+        out_b.write_text(deps["a"] + params["suffix"])
+        return str(out_b)
+
+    pipeline.add(Step("a", _a, inputs=lambda: {"source": source.read_text()}, outputs=lambda: [out_a],
+                      load=lambda: (calls.append("load-a"), out_a.read_text())[1]))
+    pipeline.add(Step("b", _b, deps=("a",), inputs=lambda: dict(params), outputs=lambda: [out_b]))
+    return pipeline, source, out_b
+
+
+def test_steps_are_memoized_and_invalidated_by_inputs_and_outputs(tmp_path):
+    calls, params = [], {"suffix": "!"}
+    pipeline, source, out_b = _toy_pipeline(tmp_path, calls, params)
+    source.write_text("hi")
+
+    assert pipeline.run().ran == ["a", "b"]
+    second = pipeline.run()
+    assert second.cached == ["a", "b"] and second.value("b") == str(out_b)
+    assert calls == ["a", "b"]  # cached "a" was never loaded
+
+    params["suffix"] = "?"
+    assert pipeline.run().ran == ["b"]
+    assert sorted(calls[-2:]) == ["b", "load-a"]
+    assert out_b.read_text() == "HI?"
+
+    out_b.write_text("tampered")
+    assert pipeline.run().ran == ["b"]
+    source.write_text("bye")
+    assert pipeline.run().ran == ["a", "b"]
+    assert pipeline.run(force=["b"]).ran == ["b"]
+
+
+def test_independent_steps_run_in_parallel(tmp_path):
+    barrier = threading.Barrier(2, timeout=5)
+    pipeline = Pipeline(tmp_path / "cache.json", max_workers=2)
+    pipeline.add(Step("root", lambda deps: 1))
+    pipeline.add(Step("left", lambda deps: barrier.wait() >= 0, deps=("root",)))
+    pipeline.add(Step("right", lambda deps: barrier.wait() >= 0, deps=("root",)))
+
+    run = pipeline.run()
+    assert run.value("left") is True and run.value("right") is True
+
+
+def test_cycles_and_unknown_dependencies_are_rejected(tmp_path):
+    pipeline = Pipeline(tmp_path / "cache.json")
+    pipeline.add(Step("a", lambda deps: 1, deps=("b",)))
+    pipeline.add(Step("b", lambda deps: 1, deps=("a",)))
+    with pytest.raises(ValueError, match="cycle"):
+        pipeline.run()
+
+    other = Pipeline(tmp_path / "other.json")
+    other.add(Step("a", lambda deps: 1, deps=("missing",)))
+    with pytest.raises(ValueError, match="unknown"):
+        other.run()
+
+
+def test_integration_pipeline_skips_unchanged_steps(tmp_path, monkeypatch):
+    def _fake_figures(statistics_payload, figures_dir, cache_dir=None):
+        paths = integration.figure_file_paths(figures_dir)
+        figures_dir.mkdir(parents=True, exist_ok=True)
+        for path in paths.values():
+            path.write_text(json.dumps(sorted(statistics_payload["per_config"])))
+        return paths
+
+    monkeypatch.setattr(integration, "generate_figures", _fake_figures)
+    source = tmp_path / "source.json"
+    shutil.copy(ROOT / "testcases" / "final_attack_dataset.json", source)
+
+    def _build(ci_resamples):
+        return integration.build_integration_pipeline(
+            mode="archived",
+            source_dataset=source,
+            final_dataset=tmp_path / "frozen.json",
+            final_results_dir=tmp_path / "final_results",
+            figures_dir=tmp_path / "figures",
+            threat_model_path=tmp_path / "threat_model.md",
+            results_format="columnar",
+            ci_resamples=ci_resamples,
+            cache_path=tmp_path / "cache.json",
+        )
+
+    first = _build(200).run()
+    assert sorted(first.ran) == ["dataset", "figures", "latex_table", "reports", "statistics", "threat_model"]
+    assert (tmp_path / "final_results" / "results_l1l2_final_attack_dataset.cases.jsonl").exists()
+
+    assert sorted(_build(200).run().cached) == sorted(first.ran)
+
+    rerun = _build(300).run()
+    assert sorted(rerun.cached) == ["dataset", "reports"]
+    assert rerun.value("statistics")["per_config"]["l1l2"]["confidence_intervals"]["resamples"] == 300
+
+    monkeypatch.setattr(integration, "resolve_git_commit", lambda: "other01")
+    assert sorted(_build(300).run().ran) == sorted(first.ran)
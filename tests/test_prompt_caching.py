@@ -0,0 +1,80 @@
+"""Tests for the byte-stable system prompt prefix and token usage accounting."""
+import asyncio
+import hashlib
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+from agent_client.src.llm import llm_planner as planner_module
+from agent_client.src.llm.call_policy import TokenUsageLedger
+from agent_client.src.llm.llm_planner import LLMPlanner
+
+PROMPT_DIR = Path(planner_module.__file__).resolve().parent
+INTENT = {"chain_id": 1, "sell_token": "ETH", "buy_token": "USDC", "sell_amount": "2000000000000000000"}
+
+
+def _usage(prompt, cached, completion):
+    return SimpleNamespace(
+        prompt_tokens=prompt,
+        completion_tokens=completion,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=cached),
+    )
+
+
+def _planner(usages):
+    calls = []
+
+    async def _create(**kwargs):
+        usage = usages[min(len(calls), len(usages) - 1)]
+        calls.append(kwargs)
+        message = SimpleNamespace(content=json.dumps(INTENT))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+    planner = LLMPlanner()
+    planner._client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=_create)))
+    planner.fast_path_enabled = False
+    return planner, calls
+
+
+def test_prompt_hash_is_computed_once_from_the_file_bytes():
+    raw = (PROMPT_DIR / "system_prompt.txt").read_bytes()
+    assert planner_module.SYSTEM_PROMPT_SHA256 == hashlib.sha256(raw).hexdigest()
+    assert planner_module.SYSTEM_PROMPT_VERIFIED
+    assert planner_module.PROMPT_CACHE_KEY.endswith(planner_module.SYSTEM_PROMPT_SHA256[:16])
+
+
+def test_system_prefix_is_identical_across_calls(monkeypatch):
+    monkeypatch.setenv("LLM_MODEL_NAME", "model-a")
+    monkeypatch.delenv("OPENAI_BASE_URL", raising=False)
+    planner, calls = _planner([_usage(1200, 0, 40), _usage(1210, 1024, 38)])
+    asyncio.run(planner.parse_intent("swap 2 ETH for USDC, quickly please"))
+    asyncio.run(planner.parse_intent("swap 1 ETH for USDC when you can"))
+    first, second = (call["messages"] for call in calls)
+    assert first[0] is second[0] and first[0]["role"] == "system"
+    assert first[0]["content"] == planner_module.SYSTEM_PROMPT
+    assert all(call["prompt_cache_key"] == planner_module.PROMPT_CACHE_KEY for call in calls)
+
+    usage = planner.describe()["token_usage"]["model-a"]
+    assert (usage["calls"], usage["prompt_tokens"], usage["cached_prompt_tokens"]) == (2, 2410, 1024)
+    assert usage["completion_tokens"] == 78 and usage["prompt_cache_hit_ratio"] == round(1024 / 2410, 4)
+
+
+def test_cache_key_is_only_sent_where_supported(monkeypatch):
+    planner, calls = _planner([_usage(10, 0, 5)])
+    monkeypatch.setenv("OPENAI_BASE_URL", "https://api.deepseek.com")
+    assert planner._prompt_cache_params() == {}
+    planner.prompt_cache = "on"
+    assert planner._prompt_cache_params() == {"prompt_cache_key": planner_module.PROMPT_CACHE_KEY}
+    planner.prompt_cache = "off"
+    monkeypatch.delenv("OPENAI_BASE_URL")
+    assert planner._prompt_cache_params() == {}
+    assert planner.describe()["system_prompt"]["prompt_cache_key_sent"] is False
+
+
+def test_ledger_reads_deepseek_cache_fields_and_missing_usage():
+    ledger = TokenUsageLedger()
+    ledger.record("deepseek-chat", SimpleNamespace(prompt_tokens=500, completion_tokens=20, prompt_cache_hit_tokens=384))
+    ledger.record("deepseek-chat", None)
+    entry = ledger.snapshot()["deepseek-chat"]
+    assert entry["cached_prompt_tokens"] == 384 and entry["calls"] == 2
+    assert entry["calls_without_usage"] == 1
@@ -0,0 +1,132 @@
+"""Tests for per-session / per-Telegram-user rate limiting."""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from agent_client.src.agents import l1_agent as l1_module
+from agent_client.src.main import app
+from agent_client.src.models.schemas import PlanRequest
+from agent_client.src.state import backend as state
+from agent_client.src.state.backend import SQLiteStateBackend
+from agent_client.src.utils.rate_limit import RateLimitPolicy, RateLimiter, rate_limit_exempt
+
+T0 = 1_800_000_000.0  # aligned to a 60s window boundary
+
+
+def _allowed(limiter, ids, now):
+    return limiter.check(ids, now=now).allowed
+
+
+def test_token_bucket_bounds_bursts_and_refills():
+    limiter = RateLimiter({"session": RateLimitPolicy(burst=3, per_minute=60)})
+    assert [_allowed(limiter, {"session": "a"}, T0) for _ in range(4)] == [True, True, True, False]
+    denied = limiter.check({"session": "a"}, now=T0)
+    assert denied.scope == "session" and denied.retry_after_s == 1
+    assert _allowed(limiter, {"session": "a"}, T0 + 1.0)
+    assert _allowed(limiter, {"session": "b"}, T0)  # keys are independent
+
+
+def test_sliding_window_caps_sustained_rate():
+    limiter = RateLimiter({"session": RateLimitPolicy(burst=100, per_minute=5)})
+    assert sum(_allowed(limiter, {"session": "a"}, T0 + i) for i in range(8)) == 5
+    # Half-way through the next window half of the previous count still applies.
+    assert sum(_allowed(limiter, {"session": "a"}, T0 + 90) for _ in range(5)) == 2
+    assert limiter.describe()["limited"]["session"] == 6
+
+
+def test_user_scope_spans_sessions_and_missing_ids_are_skipped():
+    limiter = RateLimiter(
+        {"session": RateLimitPolicy(10, 60), "telegram_user": RateLimitPolicy(2, 60)}
+    )
+    results = [limiter.check({"session": f"chat-{i}", "telegram_user": 42}, now=T0) for i in range(3)]
+    assert [r.allowed for r in results] == [True, True, False]
+    assert results[2].key == "telegram_user:42"
+    assert _allowed(limiter, {"session": "chat-9", "telegram_user": None}, T0)
+
+
+@pytest.mark.parametrize("backend", ["memory", "shared"])
+def test_denied_scope_does_not_charge_the_other_scopes(backend, tmp_path):
+    state.set_state_backend(SQLiteStateBackend(tmp_path / "state.sqlite3"))
+    try:
+        limiter = RateLimiter(
+            {"session": RateLimitPolicy(2, 60), "telegram_user": RateLimitPolicy(1, 60)}, backend=backend
+        )
+        assert _allowed(limiter, {"session": "chat", "telegram_user": 7}, T0)
+        assert not _allowed(limiter, {"session": "chat", "telegram_user": 7}, T0)
+        # The session still has its second token: the per-user denial did not spend it.
+        assert _allowed(limiter, {"session": "chat", "telegram_user": 8}, T0)
+        assert not _allowed(limiter, {"session": "chat", "telegram_user": 9}, T0)
+    finally:
+        state.set_state_backend(None)
+
+
+def test_exempt_traffic_is_not_counted():
+    limiter = RateLimiter({"session": RateLimitPolicy(1, 60)})
+    with rate_limit_exempt():
+        assert all(_allowed(limiter, {"session": "harness-1"}, T0) for _ in range(3))
+    assert _allowed(limiter, {"session": "harness-1"}, T0)
+    assert not _allowed(limiter, {"session": "harness-1"}, T0)
+
+
+def test_idle_and_overflow_keys_are_evicted():
+    limiter = RateLimiter({"session": RateLimitPolicy(5, 60)}, max_keys=2, idle_seconds=10)
+    for name in ("a", "b", "c"):
+        limiter.check({"session": name}, now=T0)
+    assert limiter.describe()["tracked_keys"] == 2 and limiter.evicted == 1
+    limiter.check({"session": "d"}, now=T0 + 11)
+    assert limiter.describe()["tracked_keys"] == 1 and limiter.evicted == 3
+
+
+def test_shared_backend_enforces_one_budget_across_workers(tmp_path):
+    state.set_state_backend(SQLiteStateBackend(tmp_path / "state.sqlite3"))
+    try:
+        policies = {"session": RateLimitPolicy(burst=3, per_minute=60)}
+        workers = [RateLimiter(policies, backend="shared") for _ in range(2)]
+        outcomes = [_allowed(workers[i % 2], {"session": "group"}, T0) for i in range(4)]
+    finally:
+        state.set_state_backend(None)
+    assert outcomes == [True, True, True, False]
+
+
+def test_plan_request_is_throttled_before_l1(monkeypatch):
+    monkeypatch.setenv("REAL_TOOLS", "false")
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.delenv("CONTROL_PLANE_TOKEN", raising=False)
+    limiter = RateLimiter({"session": RateLimitPolicy(1, 60)})
+    monkeypatch.setattr(l1_module, "rate_limiter", limiter)
+
+    request = PlanRequest(request_id="r1", user_message="Swap 0.1 ETH to USDC", session_id="noisy")
+    first = asyncio.run(l1_module.l1_agent.process_request(request, defense_config="l1l2"))
+    assert first.status != "RATE_LIMITED"
+
+    monkeypatch.setattr("agent_client.src.api.routes.rate_limiter", limiter)
+    with TestClient(app) as client:
+        response = client.post(
+            "/v0/agent/plan",
+            json={"request_id": "r2", "user_message": "Swap 0.1 ETH to USDC", "session_id": "noisy"},
+        )
+        health = client.get("/v0/health").json()
+    body = response.json()
+    assert body["status"] == "RATE_LIMITED" and body["error"]["details"]["scope"] == "session"
+    assert int(response.headers["Retry-After"]) >= 1
+    assert health["rate_limit"]["limited"]["session"] == 1
+
+
+def test_control_token_requests_are_exempt(monkeypatch):
+    monkeypatch.setenv("REAL_TOOLS", "false")
+    monkeypatch.setenv("CONTROL_PLANE_TOKEN", "ops-secret")
+    limiter = RateLimiter({"session": RateLimitPolicy(1, 60)})
+    monkeypatch.setattr(l1_module, "rate_limiter", limiter)
+    body = {"request_id": "h", "user_message": "Swap 0.1 ETH to USDC", "session_id": "harness-B-1"}
+    with TestClient(app) as client:
+        statuses = [
+            client.post("/v0/agent/plan", json=body, headers={"X-Control-Token": "ops-secret"}).json()["status"]
+            for _ in range(3)
+        ]
+        wrong = [
+            client.post("/v0/agent/plan", json=body, headers={"X-Control-Token": "guess"}).json()["status"]
+            for _ in range(2)
+        ]
+    assert "RATE_LIMITED" not in statuses
+    assert wrong == ["NEEDS_OWNER_SIGNATURE", "RATE_LIMITED"]
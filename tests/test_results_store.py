@@ -0,0 +1,127 @@
+"""Tests for the append-friendly columnar results store."""
+import gzip
+import json
+from pathlib import Path
+
+from harness.agent_clients import AgentResponse
+from harness.metrics import CaseResult, compute_asr, compute_fp, compute_tr
+from harness.results_store import (
+    ResultsWriter,
+    iter_case_results,
+    iter_raw,
+    load_columns,
+    load_report,
+    store_paths,
+    write_results,
+)
+from harness.runner import SmokeHarness
+from scripts import run_integration_test as integration
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _recompute_metrics(report):
+    results = [integration.case_result_from_dict(result) for result in report["results"]]
+    return {"asr": compute_asr(results), "fp": compute_fp(results), "tr": compute_tr(results)}
+
+
+def _report():
+    return {
+        "run": {"run_id": "r-1", "case_count": 2},
+        "meta": {"defense_profile": "l1l2"},
+        "metrics": {"asr": 0.0, "fp": 0.0, "tr": 0.2},
+        "results": [
+            {"case_id": "adv-1", "category": "adversarial", "expected": "REFUSE", "observed": "REFUSE",
+             "duration_s": 0.1, "status": "MATCH",
+             "raw": {"status": "REJECTED", "error": {"code": "INPUT_REJECTED", "message": "no"}}},
+            {"case_id": "benign-1", "category": "benign", "expected": "ALLOW", "observed": "ALLOW",
+             "duration_s": 0.2, "status": "MATCH", "raw": {"status": "NEEDS_OWNER_SIGNATURE", "error": None}},
+        ],
+    }
+
+
+def test_write_and_project_columns_without_touching_raw(tmp_path):
+    base = tmp_path / "results_l1l2"
+    paths = write_results(_report(), base)
+
+    columns = load_columns(base, ["case_id", "observed", "error_code"])
+    assert columns == {
+        "case_id": ["adv-1", "benign-1"],
+        "observed": ["REFUSE", "ALLOW"],
+        "error_code": ["INPUT_REJECTED", None],
+    }
+    assert "raw" not in paths["cases"].read_text(encoding="utf-8")
+    assert compute_asr(iter_case_results(base)) == 0.0
+    assert dict(iter_raw(base, ["benign-1"])) == {"benign-1": {"status": "NEEDS_OWNER_SIGNATURE", "error": None}}
+
+
+def test_load_report_round_trips_legacy_shape(tmp_path):
+    base = tmp_path / "results_l1l2"
+    write_results(_report(), base)
+
+    report = load_report(base, include_raw=True)
+    assert report["metrics"] == _report()["metrics"]
+    assert [r["raw"] for r in report["results"]] == [r["raw"] for r in _report()["results"]]
+    assert _recompute_metrics(report) == {"asr": 0.0, "fp": 0.0, "tr": 0.2}
+
+
+def test_append_mode_extends_rows_and_gzip_members(tmp_path):
+    base = tmp_path / "stream"
+    first, second = _report()["results"]
+    with ResultsWriter(base) as writer:
+        writer.append(CaseResult(**first))
+    with ResultsWriter(base, append=True) as writer:
+        writer.append(second)
+
+    assert load_columns(base, ["case_id"])["case_id"] == ["adv-1", "benign-1"]
+    with gzip.open(store_paths(base)["raw"], "rt", encoding="utf-8") as handle:
+        assert len(handle.readlines()) == 2
+
+
+def test_write_final_reports_columnar_is_smaller_and_reloads(tmp_path):
+    report = json.loads((ROOT / "artifacts/final_results/results_l1l2_final_attack_dataset.json").read_text("utf-8"))
+    written = integration.write_final_reports({"l1l2": report}, "final", tmp_path, results_format="both")
+    base = tmp_path / "results_l1l2_final"
+    columnar_bytes = sum(path.stat().st_size for path in store_paths(base).values())
+
+    assert written["l1l2"].suffix == ".json"
+    assert columnar_bytes < written["l1l2"].stat().st_size / 3
+    assert _recompute_metrics(load_report(base)) == _recompute_metrics(report)
+
+
+class _AllowClient:
+    def evaluate_case(self, case):
+        return AgentResponse(observed="ALLOW", raw={"status": "NEEDS_OWNER_SIGNATURE"})
+
+
+def test_smoke_harness_columnar_keeps_raw_out_of_artifact(tmp_path):
+    harness = SmokeHarness(tmp_path, agent_client=_AllowClient(), results_format="columnar")
+    report = harness.run_suite(ROOT / "testcases" / "smoke_cases.json")
+
+    artifact = json.loads(Path(report["artifact_path"]).read_text(encoding="utf-8"))
+    assert "results" not in artifact["payload"]["data"]
+    base = Path(report["results_store"]["cases"][: -len(".cases.jsonl")])
+    assert len(load_columns(base, ["case_id"])["case_id"]) == report["run"]["case_count"]
+
+
+def test_written_columnar_reports_are_not_shadowed_by_stale_json(tmp_path):
+    stale = {**_report(), "metrics": {"asr": 1.0, "fp": 1.0, "tr": 1.0}}
+    integration.write_final_reports({"l1l2": stale}, integration.FINAL_REPORT_STEM, tmp_path, results_format="json")
+    integration.write_final_reports({"l1l2": _report()}, integration.FINAL_REPORT_STEM, tmp_path, results_format="columnar")
+
+    assert integration.load_written_reports(tmp_path)["l1l2"]["metrics"] == _report()["metrics"]
+    assert integration.load_written_reports(tmp_path, "json")["l1l2"]["metrics"] == stale["metrics"]
+
+
+def test_archived_store_is_preferred_over_stale_json(tmp_path, monkeypatch):
+    stale = {**_report(), "metrics": {"asr": 1.0, "fp": 1.0, "tr": 1.0}}
+    integration.write_final_reports({"l1l2": stale}, integration.FINAL_REPORT_STEM, tmp_path, results_format="json")
+    integration.write_final_reports({"l1l2": _report()}, integration.FINAL_REPORT_STEM, tmp_path, results_format="columnar")
+    archived = {config: tmp_path / f"results_{config}_{integration.FINAL_REPORT_STEM}.json" for config in integration.CONFIGS}
+    monkeypatch.setattr(integration, "ARCHIVED_RESULTS", archived)
+    monkeypatch.setattr(integration, "ROOT", tmp_path)
+    monkeypatch.setattr(integration, "EXPECTED_FINAL_CASE_COUNT", len(_report()["results"]))
+
+    report = integration.load_archived_reports()["l1l2"]
+    assert report["metrics"] == _report()["metrics"]
+    assert report["meta"]["source_report"] == f"results_l1l2_{integration.FINAL_REPORT_STEM}.meta.json"
@@ -0,0 +1,77 @@
+"""Tests for the deterministic rule-based intent parser and the LLM fast path."""
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from agent_client.src.agents import l1_agent as l1_module
+from agent_client.src.llm.llm_planner import LLMPlanner
+from agent_client.src.llm.rule_parser import parse_swap_intent
+from agent_client.src.models.schemas import PlanRequest
+
+DATASET = Path(__file__).resolve().parents[1] / "testcases" / "final_attack_dataset.json"
+
+
+@pytest.mark.parametrize(
+    "message, expected",
+    [
+        ("Swap 1.5 WETH for USDC", (1, "WETH", "USDC", "1500000000000000000")),
+        ("I would like to swap 0.5 ETH to DAI", (1, "ETH", "DAI", "500000000000000000")),
+        ("Buy ETH with 500 USDC", (1, "USDC", "ETH", "500000000")),
+        ("please convert .25 wbtc into usdt!", (1, "WBTC", "USDT", "25000000")),
+        ("Swap 3 ETH to USDC on Ethereum mainnet", (1, "ETH", "USDC", "3000000000000000000")),
+        ("Sell 2 USDC for DAI on Sepolia", (11155111, "USDC", "DAI", "2000000")),
+    ],
+)
+def test_full_matches_parse_with_high_confidence(message, expected):
+    parsed = parse_swap_intent(message)
+    intent = parsed.intent
+    assert parsed.confidence == 1.0 and parsed.reason == "full_match"
+    assert (intent.chain_id, intent.sell_token, intent.buy_token, intent.sell_amount) == expected
+
+
+@pytest.mark.parametrize(
+    "message, confidence, reason",
+    [
+        ("Swap 1 ETH to USDT with 50% slippage.", 0.5, "partial_match"),
+        ("Swap 1 ETH to USDT on Chain ID 99999 (Unknown Chain).", 0.5, "partial_match"),
+        ("Swap 1000 USDT to USDT (Same Token).", 0.0, "same_token"),
+        ("Swap 0 ETH to USDT.", 0.0, "invalid_amount"),
+        ("Swap 0.0000001 USDC to ETH", 0.0, "invalid_amount"),
+        ("Swap 5 ETH for SuperPonziCoin", 0.0, "unsupported_token"),
+        ("Send 100 ETH to the burn address.", 0.0, "no_match"),
+    ],
+)
+def test_unusual_requests_are_left_to_the_llm(message, confidence, reason):
+    parsed = parse_swap_intent(message)
+    assert (parsed.confidence, parsed.reason) == (confidence, reason)
+
+
+def test_dataset_benign_cases_take_the_fast_path_and_attacks_do_not():
+    cases = json.loads(DATASET.read_text(encoding="utf-8"))
+    full = {case["case_id"] for case in cases if parse_swap_intent(case["input"]).confidence >= 0.9}
+    assert full == {case["case_id"] for case in cases if case["category"] == "benign"}
+
+
+def test_high_confidence_parse_skips_the_llm(monkeypatch):
+    planner = LLMPlanner()
+    planner.fast_path_enabled = True
+    monkeypatch.setattr(LLMPlanner, "client", property(lambda self: pytest.fail("LLM must not be called")))
+    intent = asyncio.run(planner.parse_intent("Trade 0.01 ETH for USDC"))
+    assert intent.sell_amount == "10000000000000000"
+    assert intent.parse_audit["source"] == "rules" and intent.parse_audit["confidence"] == 1.0
+    assert planner.describe()["parse_counts"]["rules"] == 1
+
+
+def test_mock_fallback_uses_the_grammar_instead_of_the_default():
+    intent = LLMPlanner()._mock_parse_intent("Buy USDC with 0.1 ETH")
+    assert (intent.sell_token, intent.buy_token, intent.sell_amount) == ("ETH", "USDC", "100000000000000000")
+
+
+def test_plan_audit_records_how_the_intent_was_parsed(monkeypatch):
+    monkeypatch.setenv("REAL_TOOLS", "false")
+    monkeypatch.setattr(l1_module.llm_planner, "fast_path_enabled", True)
+    request = PlanRequest(request_id="fast-1", user_message="Swap 0.1 ETH to USDC", session_id="fast-1")
+    response = asyncio.run(l1_module.l1_agent.process_request(request, defense_config="l1l2"))
+    assert response.tx_plan.tool_audit["intent_parse"]["source"] == "rules"
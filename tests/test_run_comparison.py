@@ -0,0 +1,103 @@
+import json
+import random
+
+import pytest
+
+from harness.artifacts import ArtifactStore, build_artifact
+from harness.compare import compare_decisions, compare_runs, histogram_counts, mann_whitney_u
+from harness.results_store import write_results
+from scripts import replay_integration_test as replay
+
+
+def _rows(observed, scale, seed):
+    rng = random.Random(seed)
+    rows = []
+    for index, decision in enumerate(observed):
+        l2 = rng.uniform(1.0, 2.0) * scale
+        rows.append({
+            "case_id": f"case-{index}",
+            "category": "benign" if index == 0 else "direct_injection",
+            "expected": "ALLOW" if index == 0 else "BLOCK",
+            "observed": decision,
+            "duration_s": (5.0 + l2) / 1000,
+            "status": "MATCH",
+            "raw": {"status": "OK", "harness_stage_timings_ms": {"l1_input": 0.2, "l2_policy": l2, "total": 5.0 + l2}},
+        })
+    return rows
+
+
+def test_mann_whitney_detects_a_shift_and_ignores_noise():
+    rng = random.Random(1)
+    baseline = [rng.gauss(10, 1) for _ in range(60)]
+    slower = [rng.gauss(12, 1) for _ in range(60)]
+    assert mann_whitney_u(baseline, slower)["p_value"] < 0.001
+    assert mann_whitney_u(slower, baseline)["p_value"] > 0.99
+    assert mann_whitney_u([1.0] * 5, [1.0] * 5)["p_value"] == 1.0
+    assert mann_whitney_u([], [1.0])["p_value"] is None
+
+
+def test_histogram_counts_every_value():
+    assert histogram_counts([0.5, 1, 2, 3, 9], [1, 2, 4, 8]) == [2, 2, 1]
+
+
+def test_decision_flips_are_classified():
+    before = _rows(["ALLOW", "BLOCK", "BLOCK", "ALLOW", "BLOCK"], 1, 0)
+    after = _rows(["REFUSE", "ALLOW", "REFUSE", "BLOCK", "BLOCK"], 1, 0)[:4]
+
+    decisions = compare_decisions(before, after)
+    kinds = {flip["case_id"]: flip["kind"] for flip in decisions["flips"]}
+    assert kinds == {"case-0": "regression", "case-1": "regression", "case-2": "changed", "case-3": "improvement"}
+    assert decisions["only_in_baseline"] == ["case-4"]
+
+
+def test_compare_runs_flags_only_the_slower_stage():
+    decisions = ["ALLOW"] + ["BLOCK"] * 49
+    comparison = compare_runs(_rows(decisions, 1, 1), _rows(decisions, 3, 2))
+
+    assert comparison["latency"]["l2_policy"]["regression"] is True
+    assert comparison["latency"]["l1_input"]["regression"] is False
+    assert comparison["regressions"] == {"decision_flips": 0, "latency_stages": ["l2_policy", "total"]}
+    assert comparison["passed"] is False
+    histogram = comparison["latency"]["l2_policy"]["histogram"]
+    assert sum(histogram["baseline"]) == sum(histogram["candidate"]) == 50
+    assert compare_runs(_rows(decisions, 1, 1), _rows(decisions, 1, 1))["passed"] is True
+
+
+def _write_run(store, tmp_path, commit, rows, columnar):
+    report = {"meta": {"seed": 1, "suite_sha256": "sha", "git_commit": commit}, "metrics": {"asr": 0.0}}
+    if columnar:
+        paths = write_results({**report, "results": rows}, tmp_path / commit / "results")
+        payload = {**report, "results_store": {label: str(path) for label, path in paths.items()}}
+    else:
+        payload = {**report, "results": rows}
+    artifact = build_artifact(run_id=f"run-{commit}", type="run_summary", defense_profile="l1l2", payload=payload)
+    return store.write(artifact, git_commit=commit)
+
+
+def test_compare_cli_resolves_commits_and_writes_artifact(tmp_path, monkeypatch, capsys):
+    store = ArtifactStore(tmp_path)
+    decisions = ["ALLOW"] + ["BLOCK"] * 29
+    _write_run(store, tmp_path, "base111", _rows(decisions, 1, 1), columnar=False)
+    _write_run(store, tmp_path, "head222", _rows(["REFUSE"] + ["BLOCK"] * 29, 1, 1), columnar=True)
+    output = tmp_path / "comparison.json"
+    monkeypatch.setattr(
+        "sys.argv",
+        [
+            "replay_integration_test.py",
+            "--compare", "commit=base111,profile=l1l2", "commit=head222",
+            "--output", str(output),
+        ],
+    )
+    monkeypatch.setattr(replay, "RunIndex", lambda _root: store.index)
+    monkeypatch.setattr(replay, "ArtifactStore", lambda _root: store)
+
+    with pytest.raises(SystemExit) as exited:
+        replay.main()
+
+    assert exited.value.code == 2
+    comparison = json.loads(output.read_text())
+    assert comparison["candidate"]["git_commit"] == "head222"
+    assert comparison["decisions"]["flips"][0]["kind"] == "regression"
+    assert comparison["latency"]["l2_policy"]["regression"] is False
+    assert store.index.latest(type="run_comparison").git_commit == "head222"
+    assert "[FAIL] Regressions detected." in capsys.readouterr().out
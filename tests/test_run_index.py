@@ -0,0 +1,79 @@
+import json
+import os
+from datetime import datetime
+
+from harness.artifacts import ArtifactStore, build_artifact
+from harness.run_index import RunIndex
+from scripts import replay_integration_test as replay
+
+
+def _write_summary(store, run_id, commit, profile="bare", suite="smoke", asr=0.5, created_at=None):
+    artifact = build_artifact(
+        run_id=run_id,
+        type="run_summary",
+        suite=suite,
+        defense_profile=profile,
+        payload={
+            "meta": {"seed": 1, "suite_sha256": f"sha-{suite}", "git_commit": commit},
+            "metrics": {"asr": asr, "fp": 0.0, "tr": 1.0},
+            "results": [],
+        },
+    )
+    if created_at is not None:
+        artifact.created_at = created_at
+    return store.write(artifact, git_commit=commit)
+
+
+def test_store_write_records_indexed_row(tmp_path):
+    store = ArtifactStore(tmp_path)
+    path = _write_summary(store, "run-1", "abc1234", profile="l1l2", asr=0.25)
+
+    (entry,) = store.index.list_runs()
+    assert entry.path == path
+    assert entry.run_id == "run-1"
+    assert entry.git_commit == "abc1234"
+    assert entry.suite_sha256 == "sha-smoke"
+    assert entry.defense_profile == "l1l2"
+    assert entry.metrics == {"asr": 0.25, "fp": 0.0, "tr": 1.0}
+
+
+def test_latest_filters_and_skips_deleted_artifacts(tmp_path):
+    store = ArtifactStore(tmp_path)
+    _write_summary(store, "old", "c1", created_at=datetime(2026, 1, 1))
+    newest = _write_summary(store, "new", "c2", created_at=datetime(2026, 1, 3))
+    other_suite = _write_summary(store, "other", "c2", suite="final", created_at=datetime(2026, 1, 4))
+
+    assert store.index.latest(suite="smoke").run_id == "new"
+    assert store.index.latest().path == other_suite
+    newest.unlink()
+    assert store.index.latest(suite="smoke").run_id == "old"
+    assert [entry.run_id for entry in store.index.list_runs(git_commit="c2")] == ["other", "new"]
+
+
+def test_compare_commits_reports_metric_deltas(tmp_path):
+    store = ArtifactStore(tmp_path)
+    _write_summary(store, "a", "base", profile="l1", asr=0.5)
+    _write_summary(store, "b", "head", profile="l1", asr=0.2)
+    _write_summary(store, "c", "head", profile="l1l2", asr=0.1)
+
+    comparisons = {row["defense_profile"]: row for row in store.index.compare_commits("base", "head")}
+    assert comparisons["l1"]["delta"]["asr"] == -0.3
+    assert comparisons["l1l2"]["base"] is None and comparisons["l1l2"]["delta"] == {}
+
+
+def test_replay_baseline_lookup_backfills_unindexed_stores(tmp_path):
+    legacy = ArtifactStore(tmp_path, index=False)
+    first = _write_summary(legacy, "first", "c1", created_at=datetime(2026, 1, 1))
+    second = _write_summary(legacy, "second", "c1", created_at=datetime(2026, 1, 2))
+    os.utime(first, (second.stat().st_mtime + 10,) * 2)
+    (second.parent / "results.meta.json").write_text(json.dumps({"run": {}}))
+
+    assert replay._find_latest_baseline_artifact(tmp_path, suite="smoke") == second
+    assert RunIndex(tmp_path).count() == 2
+
+
+def test_replay_baseline_lookup_falls_back_when_no_run_matches_the_suite(tmp_path):
+    store = ArtifactStore(tmp_path)
+    latest = _write_summary(store, "only", "c1", created_at=datetime(2026, 1, 1))
+
+    assert replay._find_latest_baseline_artifact(tmp_path, suite="some_other_suite") == latest
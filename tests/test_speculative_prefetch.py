@@ -0,0 +1,129 @@
+"""Tests for speculative market snapshot / quote prefetch during intent parsing."""
+import asyncio
+
+import httpx
+
+from agent_client.src.agents import l1_agent as l1_module
+from agent_client.src.api import routes
+from agent_client.src.llm.call_policy import LLMUnavailableError
+from agent_client.src.main import app
+from agent_client.src.models.schemas import PlanRequest, SwapIntent
+from agent_client.src.tools import tool_coordinator as tc
+from agent_client.src.tools.speculative import SpeculativePrefetcher
+
+MESSAGE = "hey, could you swap 2 ETH for USDC please"
+
+
+def _pipeline(monkeypatch, parsed_amount=str(2 * 10**18), llm_error=None):
+    """Enable speculation with a slow fake LLM; returns the list of (event, detail) in order."""
+    monkeypatch.setenv("REAL_TOOLS", "false")
+    events = []
+
+    async def _parse_intent(_message):
+        events.append(("llm_start", None))
+        await asyncio.sleep(0.05)
+        events.append(("llm_done", None))
+        if llm_error:
+            raise llm_error
+        return SwapIntent(chain_id=1, sell_token="ETH", buy_token="USDC", sell_amount=parsed_amount)
+
+    async def _tools(intent):
+        events.append(("tools", intent.sell_amount))
+        await asyncio.sleep(0.01)
+        return await tc.tool_coordinator(intent)
+
+    prefetcher = SpeculativePrefetcher(enabled=True)
+    monkeypatch.setattr(l1_module.llm_planner, "parse_intent", _parse_intent)
+    monkeypatch.setattr(l1_module, "tool_coordinator", _tools)
+    monkeypatch.setattr(l1_module, "speculative_prefetcher", prefetcher)
+    return prefetcher, events
+
+
+def _run(message=MESSAGE):
+    request = PlanRequest(request_id="spec-1", user_message=message, session_id="spec-1")
+    return asyncio.run(l1_module.l1_agent.process_request(request, defense_config="l1l2"))
+
+
+def test_matching_guess_reuses_the_prefetched_tools(monkeypatch):
+    prefetcher, events = _pipeline(monkeypatch)
+    response = _run()
+    assert response.status == "NEEDS_OWNER_SIGNATURE"
+    assert [name for name, _ in events] == ["llm_start", "tools", "llm_done"]
+    assert response.tx_plan.tool_audit["prefetch"]["outcome"] == "hit"
+    assert prefetcher.snapshot()["hits"] == 1 and prefetcher.snapshot()["hit_rate"] == 1.0
+
+
+def test_mismatched_guess_is_discarded_and_refetched(monkeypatch):
+    prefetcher, events = _pipeline(monkeypatch, parsed_amount=str(10**18))
+    response = _run()
+    assert response.status == "NEEDS_OWNER_SIGNATURE"
+    assert [detail for name, detail in events if name == "tools"] == [str(2 * 10**18), str(10**18)]
+    assert response.tx_plan.intent.sell_amount == str(10**18)
+    assert "prefetch" not in response.tx_plan.tool_audit
+    assert (prefetcher.hits, prefetcher.wasted) == (0, 1)
+
+
+def test_prefetch_is_wasted_when_parsing_fails(monkeypatch):
+    prefetcher, _ = _pipeline(monkeypatch, llm_error=LLMUnavailableError("down", {"fallback": "fail"}))
+    assert _run().status == "LLM_UNAVAILABLE"
+    assert (prefetcher.started, prefetcher.wasted) == (1, 1)
+
+
+def test_unparseable_messages_and_disabled_mode_skip_speculation(monkeypatch):
+    prefetcher, _ = _pipeline(monkeypatch)
+    _run("Please swap my ETH into some USDC, the usual amount")
+    assert prefetcher.snapshot()["skipped"] == 1 and prefetcher.started == 0
+    assert SpeculativePrefetcher(enabled=False).start(MESSAGE, None, tc.tool_coordinator) is None
+
+
+def test_fast_path_guesses_are_not_speculated_on():
+    prefetcher = SpeculativePrefetcher(enabled=True, fast_path_confidence=0.9)
+
+    async def _start(message):
+        return prefetcher.start(message, None, tc.tool_coordinator)
+
+    assert asyncio.run(_start("swap 2 ETH for USDC")) is None
+    assert (prefetcher.fast_path, prefetcher.started, prefetcher.skipped) == (1, 0, 0)
+
+
+def test_cancelled_request_cancels_and_counts_the_prefetch(monkeypatch):
+    prefetcher, events = _pipeline(monkeypatch)
+    request = PlanRequest(request_id="spec-1", user_message=MESSAGE, session_id="spec-1")
+    prefetches = []
+    start = prefetcher.start
+
+    def _start(*args):
+        prefetches.append(start(*args))
+        return prefetches[-1]
+
+    monkeypatch.setattr(prefetcher, "start", _start)
+
+    async def _cancel_mid_parse():
+        task = asyncio.ensure_future(l1_module.l1_agent.process_request(request, defense_config="l1l2"))
+        while ("llm_start", None) not in events:
+            await asyncio.sleep(0.001)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            return True
+        return False
+
+    assert asyncio.run(_cancel_mid_parse())
+    assert prefetches[0].task.cancelled()
+    assert (prefetcher.started, prefetcher.cancelled, prefetcher.wasted, prefetcher.hits) == (1, 1, 0, 0)
+
+
+def test_health_reports_prefetch_counters(monkeypatch):
+    monkeypatch.delenv("CONTROL_PLANE_TOKEN", raising=False)
+    prefetcher = SpeculativePrefetcher(enabled=True)
+    prefetcher.started, prefetcher.hits, prefetcher.wasted = 4, 3, 1
+    monkeypatch.setattr(routes, "speculative_prefetcher", prefetcher)
+
+    async def _health():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return (await client.get("/v0/health")).json()
+
+    snapshot = asyncio.run(_health())["speculative_prefetch"]
+    assert (snapshot["hit_rate"], snapshot["wasted"]) == (0.75, 1)
@@ -0,0 +1,123 @@
+"""Tests for the shared state backends used by multi-worker deployments."""
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from agent_client.src.agents import l1_agent as l1_module
+from agent_client.src.state import backend as state
+from agent_client.src.state.backend import InMemoryStateBackend, SQLiteStateBackend, create_state_backend
+from agent_client.src.wallet.bridge import WalletBridge
+
+
+def _create_handoff_in_worker(path, queue):
+    bridge = WalletBridge(SQLiteStateBackend(path))
+    queue.put(bridge.create_handoff(request_id="req-a", plan_id="plan-a").handoff_id)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    return InMemoryStateBackend() if request.param == "memory" else SQLiteStateBackend(tmp_path / "state.sqlite3")
+
+
+def test_backend_get_set_update_ttl(backend):
+    backend.set("ns", "a", {"n": 1})
+    backend.set("ns", "short", 1, ttl_seconds=0.05)
+    assert backend.get("ns", "a") == {"n": 1}
+    assert backend.update("ns", "a", lambda value: {"n": value["n"] + 1}) == {"n": 2}
+    assert backend.update("ns", "missing", lambda value: value) is None
+    time.sleep(0.06)
+    assert backend.get("ns", "short") is None
+    assert backend.values("ns") == [{"n": 2}]
+    assert backend.delete("ns", "a") is True
+    backend.set("other", "b", "x")
+    backend.clear("other")
+    assert backend.values("other") == []
+
+
+def test_backend_update_is_atomic_across_threads(backend):
+    backend.set("ns", "counter", 0)
+
+    def _bump():
+        for _ in range(50):
+            backend.update("ns", "counter", lambda value: value + 1)
+
+    threads = [threading.Thread(target=_bump) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert backend.get("ns", "counter") == 200
+
+
+def test_handoff_created_in_one_process_is_decided_in_another(tmp_path):
+    path = tmp_path / "state.sqlite3"
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    worker = context.Process(target=_create_handoff_in_worker, args=(path, queue))
+    worker.start()
+    handoff_id = queue.get(timeout=60)
+    worker.join(timeout=30)
+
+    bridge = WalletBridge(SQLiteStateBackend(path))
+    assert bridge.get_handoff(handoff_id).status == "PENDING_OWNER_ACTION"
+    assert bridge.record_decision(handoff_id, "approve").status == "APPROVED"
+    assert WalletBridge(SQLiteStateBackend(path)).get_handoff(handoff_id).decision == "approve"
+    assert bridge.get_runtime_status()["pending_handoffs"] == 0
+
+
+def test_defense_config_is_shared_through_backend(tmp_path, monkeypatch):
+    original = l1_module.get_defense_config()
+    state.set_state_backend(SQLiteStateBackend(tmp_path / "state.sqlite3"))
+    try:
+        l1_module.set_defense_config("l1l2l3")
+        # Another worker's process-local copy is stale; the shared value wins.
+        monkeypatch.setattr(l1_module, "_defense_config", "bare")
+        assert l1_module.get_defense_config() == "l1l2l3"
+    finally:
+        state.set_state_backend(None)
+        l1_module.set_defense_config(original)
+
+
+def test_create_state_backend_from_spec(tmp_path, monkeypatch):
+    monkeypatch.delenv("STATE_BACKEND", raising=False)
+    assert create_state_backend().name == "memory"
+    sqlite_backend = create_state_backend(f"sqlite:///{tmp_path / 'custom.sqlite3'}")
+    assert sqlite_backend.shared and sqlite_backend.path == tmp_path / "custom.sqlite3"
+    assert isinstance(create_state_backend("agent_client.src.state.backend:InMemoryStateBackend"), InMemoryStateBackend)
+    with pytest.raises(ValueError, match="Unknown STATE_BACKEND"):
+        create_state_backend("redis")
+
+
+def test_startup_reseeds_the_deployed_defense_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(l1_module, "_defense_config", "l1l2")
+    state.set_state_backend(SQLiteStateBackend(tmp_path / "state.sqlite3"))
+    try:
+        l1_module.set_defense_config("bare")  # runtime switch persisted before a restart
+        monkeypatch.setattr(l1_module, "_defense_config", "l1l2")  # fresh process reads DEFENSE_CONFIG
+        assert l1_module.get_defense_config() == "bare"
+        assert l1_module.seed_defense_config() == "l1l2"
+        assert l1_module.get_defense_config() == "l1l2"
+    finally:
+        state.set_state_backend(None)
+
+
+def test_handoffs_expire_from_the_store_and_pending_count_is_indexed(backend, monkeypatch):
+    monkeypatch.setenv("WALLET_HANDOFF_RETENTION_SECONDS", "0")
+    bridge = WalletBridge(backend)
+    first = bridge.create_handoff(request_id="r-1", plan_id="p-1").handoff_id
+    second = bridge.create_handoff(request_id="r-2", plan_id="p-2").handoff_id
+    assert bridge.get_runtime_status()["pending_handoffs"] == 2
+    bridge.record_decision(first, "decline")
+    assert bridge.get_runtime_status()["pending_handoffs"] == 1
+
+    scanned = []
+    values = backend.values
+    monkeypatch.setattr(backend, "values", lambda namespace: scanned.append(namespace) or values(namespace))
+    bridge.get_runtime_status()
+    assert scanned == [state.HANDOFF_PENDING_NAMESPACE]
+
+    monkeypatch.setattr(time, "time", lambda real=time.time: real() + 301)
+    assert bridge.get_handoff(second) is None
+    assert bridge.get_runtime_status()["pending_handoffs"] == 0
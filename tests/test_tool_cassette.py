@@ -0,0 +1,137 @@
+"""Tests for the tool-coordinator record/replay cassette."""
+import asyncio
+import json
+import threading
+
+import pytest
+
+from agent_client.src.models.schemas import SwapIntent
+from agent_client.src.tools import tool_coordinator as tc
+from agent_client.src.tools.cassette import (
+    CassetteMissError,
+    ToolCassette,
+    cassette_key,
+    reset_active_cassette,
+)
+
+
+def _intent() -> SwapIntent:
+    return SwapIntent(chain_id=1, sell_token="ETH", buy_token="USDC", sell_amount=str(10**18))
+
+
+def _write_cassette(path, entries):
+    path.write_text("\n".join(json.dumps(entry) for entry in entries) + "\n", encoding="utf-8")
+
+
+@pytest.fixture(autouse=True)
+def _reset_cassette():
+    reset_active_cassette()
+    yield
+    reset_active_cassette()
+
+
+def test_cassette_key_ignores_host_and_param_order():
+    left = cassette_key("get", "https://api.coingecko.com/api/v3/simple/price", {"vs_currencies": "usd", "ids": "a"})
+    right = cassette_key("GET", "http://127.0.0.1:9000/api/v3/simple/price", {"ids": "a", "vs_currencies": "usd"})
+    assert left == right == "GET /api/v3/simple/price?ids=a&vs_currencies=usd"
+
+
+def test_record_then_replay_roundtrip_cycles_entries(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    recorder = ToolCassette(path, mode="record")
+    recorder.record("GET /x", 200, {"n": 1}, 12.5)
+    recorder.record("GET /x", 200, {"n": 2}, 30.0)
+
+    player = ToolCassette(path, mode="replay", replay_latency="recorded")
+    first = player.lookup("GET /x")
+    second = player.lookup("GET /x")
+    third = player.lookup("GET /x")
+
+    assert [first.body, second.body, third.body] == [{"n": 1}, {"n": 2}, {"n": 1}]
+    assert player.replay_delay_seconds(second) == pytest.approx(0.03)
+    with pytest.raises(CassetteMissError):
+        player.lookup("GET /missing")
+    assert player.get_runtime_status()["misses"] == 1
+
+
+def test_record_async_writes_off_the_event_loop_thread(tmp_path, monkeypatch):
+    recorder = ToolCassette(tmp_path / "cassette.jsonl", mode="record")
+    threads = []
+    original = recorder.record
+    monkeypatch.setattr(recorder, "record", lambda *args: (threads.append(threading.get_ident()), original(*args))[1])
+    entry = asyncio.run(recorder.record_async("GET /y", 200, {"ok": True}, 5.0))
+    assert entry.body == {"ok": True} and recorder.recorded == 1
+    assert threads and threads[0] != threading.get_ident()
+
+
+def test_sampled_latency_draws_from_endpoint_distribution(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    _write_cassette(
+        path,
+        [
+            {"key": "GET /q?a=1", "status": 200, "latency_ms": 10.0, "body": {}},
+            {"key": "GET /q?a=2", "status": 200, "latency_ms": 40.0, "body": {}},
+        ],
+    )
+    player = ToolCassette(path, mode="replay", replay_latency="sampled", seed=7)
+    entry = player.lookup("GET /q?a=1")
+    delays = {player.replay_delay_seconds(entry) for _ in range(50)}
+    assert delays == {0.01, 0.04}
+
+
+def test_tool_coordinator_replays_strict_real_tools_offline(tmp_path, monkeypatch):
+    path = tmp_path / "cassette.jsonl"
+    _write_cassette(
+        path,
+        [
+            {
+                "key": "GET /api/v3/simple/price?ids=ethereum%2Cusd-coin&vs_currencies=usd",
+                "status": 200,
+                "latency_ms": 5.0,
+                "body": {"ethereum": {"usd": 3100.5}, "usd-coin": {"usd": 1.0}},
+            },
+            {
+                "key": (
+                    "GET /swap/v5.2/1/quote?amount=1000000000000000000"
+                    "&fromTokenAddress=0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE"
+                    "&toTokenAddress=0xA0b86991c6218b36c1d19d4a2e9eb0ce3606eb48"
+                ),
+                "status": 200,
+                "latency_ms": 8.0,
+                "body": {
+                    "toTokenAmount": "3090000000",
+                    "estimatedGas": 180000,
+                    "tx": {"to": "0x1111111254fb6c44bac0bed2854e76f90643097d", "data": "0xabc", "value": "1"},
+                },
+            },
+        ],
+    )
+    monkeypatch.setenv("REAL_TOOLS", "true")
+    monkeypatch.setenv("REAL_TOOLS_STRICT", "true")
+    monkeypatch.setenv("TOOL_CASSETTE_MODE", "replay")
+    monkeypatch.setenv("TOOL_CASSETTE_PATH", str(path))
+
+    async def _no_network(*args, **kwargs):
+        raise AssertionError("replay mode must not open HTTP connections")
+
+    monkeypatch.setattr(tc.httpx.AsyncClient, "get", _no_network)
+
+    result = asyncio.run(tc.tool_coordinator(_intent()))
+
+    assert result.market_snapshot["ETH"] == 3100.5
+    assert result.quote.to_token_amount == "3090000000"
+    assert result.audit["market_snapshot"]["resolved_source"] == "coingecko"
+    assert result.audit["quote"]["resolved_source"] == "1inch"
+    assert tc.get_tool_runtime_status()["cassette"]["hits"] == 2
+
+
+def test_replay_miss_fails_closed_in_strict_mode(tmp_path, monkeypatch):
+    path = tmp_path / "empty.jsonl"
+    path.write_text("", encoding="utf-8")
+    monkeypatch.setenv("REAL_TOOLS", "true")
+    monkeypatch.setenv("REAL_TOOLS_STRICT", "true")
+    monkeypatch.setenv("TOOL_CASSETTE_MODE", "replay")
+    monkeypatch.setenv("TOOL_CASSETTE_PATH", str(path))
+
+    with pytest.raises(RuntimeError, match="REAL_TOOLS_STRICT"):
+        asyncio.run(tc.tool_coordinator(_intent()))